@@ -0,0 +1,202 @@
+"""Synthetic data shared by the benchmark scripts."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+import SimpleITK as sitk
+
+if TYPE_CHECKING:
+    from imgtools.coretypes import MedImage, RTStructureSet
+
+
+def write_ct_series(
+    directory: Path,
+    n_slices: int = 200,
+    rows: int = 512,
+    columns: int = 512,
+    slice_spacing: float = 2.5,
+) -> list[str]:
+    """Write an uncompressed single-frame CT series and return the paths."""
+    directory.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(0)
+    writer = sitk.ImageFileWriter()
+    writer.KeepOriginalImageUIDOn()
+    file_names = []
+    for index in range(n_slices):
+        array = rng.integers(0, 4000, size=(1, rows, columns), dtype=np.int16)
+        slice_image = sitk.GetImageFromArray(array)
+        slice_image.SetSpacing((0.8, 0.8, slice_spacing))
+        slice_image.SetMetaData("0008|0060", "CT")
+        slice_image.SetMetaData("0020|000e", "1.2.826.0.1.3680043.2.1125.9")
+        slice_image.SetMetaData("0020|0013", str(index + 1))
+        slice_image.SetMetaData(
+            "0020|0032", f"-200\\-200\\{index * slice_spacing}"
+        )
+        slice_image.SetMetaData("0020|0037", "1\\0\\0\\0\\1\\0")
+        slice_image.SetMetaData("0028|1052", "-1024")
+        slice_image.SetMetaData("0028|1053", "1")
+        file_name = (directory / f"CT_{index:04d}.dcm").as_posix()
+        writer.SetFileName(file_name)
+        writer.Execute(slice_image)
+        file_names.append(file_name)
+    return file_names
+
+
+def make_roi_contours(
+    n_rois: int = 100,
+    shape: tuple[int, int, int] = (120, 512, 512),
+    n_vertices: int = 200,
+) -> dict[str, dict[int, list[np.ndarray]]]:
+    """Closed contours in index space, keyed by ROI name and slice.
+
+    Every ROI is an ellipsoid of random size and position, sampled as one
+    polygon per slice with vertices rounded to the pixel grid (as done by
+    `physical_points_to_idxs`). Some ROIs have an inner contour describing
+    a hole.
+    """
+    rng = np.random.default_rng(0)
+    depth, rows, columns = shape
+    angles = np.linspace(0, 2 * np.pi, n_vertices, endpoint=False)
+    rois = {}
+    for index in range(n_rois):
+        radius = rng.uniform(3, np.array(shape) / 5)
+        center = rng.uniform(radius, np.array(shape) - radius)
+        slices: dict[int, list[np.ndarray]] = {}
+        first = int(np.ceil(center[0] - radius[0]))
+        last = int(np.floor(center[0] + radius[0]))
+        for z in range(max(first, 0), min(last, depth - 1) + 1):
+            scale = np.sqrt(max(1 - ((z - center[0]) / radius[0]) ** 2, 0))
+            outer = np.column_stack(
+                [
+                    center[1] + radius[1] * scale * np.sin(angles),
+                    center[2] + radius[2] * scale * np.cos(angles),
+                ]
+            )
+            slices[z] = [np.round(outer)]
+            if index % 4 == 0 and scale > 0.5:  # noqa: PLR2004
+                inner = center[1:] + (outer - center[1:]) * 0.4
+                slices[z].append(np.round(inner))
+        rois[f"ROI_{index:03d}"] = slices
+    return rois
+
+
+def make_structure_set(
+    n_rois: int = 30,
+    shape: tuple[int, int, int] = (120, 512, 512),
+) -> tuple[RTStructureSet, MedImage]:
+    """A structure set holding `make_roi_contours` and its reference image.
+
+    The reference has unit spacing and a zero origin, so the physical
+    contour points are the (x, y, z) indices of the synthetic contours.
+    """
+    from types import SimpleNamespace
+
+    from imgtools.coretypes import MedImage, RTStructureSet
+    from imgtools.loggers import logger
+
+    depth, rows, columns = shape
+    reference = MedImage(sitk.Image(columns, rows, depth, sitk.sitkUInt8))
+    roi_map = {
+        name: [
+            SimpleNamespace(
+                ContourData=np.column_stack(
+                    [
+                        polygon[:, 1],
+                        polygon[:, 0],
+                        np.full(len(polygon), z),
+                    ]
+                )
+                .ravel()
+                .tolist()
+            )
+            for z, polygons in slices.items()
+            for polygon in polygons
+        ]
+        for name, slices in make_roi_contours(n_rois, shape).items()
+    }
+    rtstruct = RTStructureSet(
+        metadata={"Modality": "RTSTRUCT"}, roi_map=roi_map
+    )
+    rtstruct.roi_names = list(roi_map)
+    rtstruct.plogger = logger
+    return rtstruct, reference
+
+
+def write_seg(
+    directory: Path,
+    n_segments: int = 100,
+    shape: tuple[int, int, int] = (100, 256, 256),
+) -> Path:
+    """Write a CT series and a binary DICOM-SEG with `n_segments` spheres.
+
+    The CT series is written in `directory / "CT"` and the SEG in
+    `directory / "seg.dcm"`, whose path is returned. Segments are labelled
+    `S000`, `S001`, ... and do not overlap.
+    """
+    import highdicom as hd
+    import pydicom
+    from pydicom.sr.codedict import codes
+
+    depth, rows, columns = shape
+    paths = write_ct_series(directory / "CT", depth, rows, columns)
+    # the source images of a SEG must share their study and frame of reference
+    study, frame_of_reference = hd.UID(), hd.UID()
+    sources = []
+    for path in paths:
+        source = pydicom.dcmread(path)
+        source.StudyInstanceUID = study
+        source.FrameOfReferenceUID = frame_of_reference
+        source.SliceThickness = 2.5
+        for keyword in (
+            "PatientID",
+            "PatientName",
+            "PatientBirthDate",
+            "PatientSex",
+            "StudyDate",
+            "StudyTime",
+            "ReferringPhysicianName",
+            "StudyID",
+            "AccessionNumber",
+        ):
+            source.setdefault(keyword, "")
+        sources.append(source)
+
+    rng = np.random.default_rng(0)
+    labels = np.zeros(shape, dtype=np.uint8 if n_segments < 256 else np.uint16)
+    z, y, x = np.ogrid[:depth, :rows, :columns]
+    for number in range(1, n_segments + 1):
+        radius = rng.uniform(4, min(shape[1:]) / 10)
+        cz, cy, cx = rng.uniform(radius, np.array(shape) - radius)
+        sphere = ((z - cz) * 2.5) ** 2 + (y - cy) ** 2 + (x - cx) ** 2
+        labels[sphere < radius**2] = number
+
+    descriptions = [
+        hd.seg.SegmentDescription(
+            segment_number=number,
+            segment_label=f"S{number - 1:03d}",
+            segmented_property_category=codes.SCT.Tissue,
+            segmented_property_type=codes.SCT.Tissue,
+            algorithm_type=hd.seg.SegmentAlgorithmTypeValues.MANUAL,
+        )
+        for number in range(1, n_segments + 1)
+    ]
+    seg = hd.seg.Segmentation(
+        source_images=sources,
+        pixel_array=labels,
+        segmentation_type=hd.seg.SegmentationTypeValues.BINARY,
+        segment_descriptions=descriptions,
+        series_instance_uid=hd.UID(),
+        series_number=2,
+        sop_instance_uid=hd.UID(),
+        instance_number=1,
+        manufacturer="imgtools",
+        manufacturer_model_name="benchmark",
+        software_versions="1",
+        device_serial_number="1",
+    )
+    seg_file = directory / "seg.dcm"
+    seg.save_as(seg_file)
+    return seg_file
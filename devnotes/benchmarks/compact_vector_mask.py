@@ -0,0 +1,74 @@
+"""Compare the memory of dense and compact RTSTRUCT vector masks.
+
+`RTStructureSet.get_vector_mask` allocates a (Z, Y, X, n_keys) buffer and
+keeps a full-size array per rasterized ROI. `get_compact_vector_mask`
+rasterizes every ROI into the bounding box of its contours and keeps only
+these crops. Peak memory is measured with `tracemalloc`, which sees the
+NumPy allocations (the copy SimpleITK makes of the dense buffer is not
+counted).
+
+Examples
+--------
+30 ROIs on a 100 x 512 x 512 grid, one channel per ROI::
+
+    python devnotes/benchmarks/compact_vector_mask.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import SimpleITK as sitk
+from _synthetic import make_structure_set
+
+from imgtools.coretypes import ROIMatcher, ROIMatchStrategy
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rois", type=int, default=30)
+    parser.add_argument("--shape", type=int, nargs=3, default=[100, 512, 512])
+    args = parser.parse_args()
+    shape = tuple(args.shape)
+    matcher = ROIMatcher(
+        match_map={"ROI": [".*"]},
+        handling_strategy=ROIMatchStrategy.SEPARATE,
+    )
+
+    print(f"{args.rois} ROIs, grid {shape}")
+    print(f"{'mask':<8} {'seconds':>8} {'peak MB':>9} {'stored MB':>10}")
+    results = {}
+    for name in ("dense", "compact"):
+        rtstruct, reference = make_structure_set(args.rois, shape)  # type: ignore[arg-type]
+        tracemalloc.start()
+        start = time.perf_counter()
+        if name == "dense":
+            mask = rtstruct.get_vector_mask(reference, matcher)
+            assert mask is not None
+            stored = sitk.GetArrayViewFromImage(mask).nbytes
+        else:
+            mask = rtstruct.get_compact_vector_mask(reference, matcher)
+            assert mask is not None
+            stored = mask.nbytes
+        seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(
+            f"{name:<8} {seconds:>8.2f} {peak / 2**20:>9.1f}"
+            f" {stored / 2**20:>10.1f}"
+        )
+        results[name] = mask
+
+    dense, compact = results["dense"], results["compact"]
+    for index in range(1, compact.n_masks + 1):
+        assert np.array_equal(
+            sitk.GetArrayViewFromImage(compact.extract_mask(index)),
+            sitk.GetArrayViewFromImage(dense.extract_mask(index)),
+        ), "compact mask differs from the dense one"
+
+
+if __name__ == "__main__":
+    main()
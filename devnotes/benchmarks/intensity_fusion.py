@@ -0,0 +1,73 @@
+"""Compare running point-wise intensity transforms one by one and fused.
+
+Each transform of a chain such as clip -> window -> shift/scale -> cast
+runs its own SimpleITK filter, i.e. a full pass over the volume and a new
+image. The `Transformer` fuses consecutive point-wise transforms: clamps
+are merged, and the rest runs chunk by chunk through all the operations
+into one output image.
+
+Examples
+--------
+A 200 x 512 x 512 CT-like volume::
+
+    python devnotes/benchmarks/intensity_fusion.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+import SimpleITK as sitk
+
+from imgtools.coretypes import Scan
+from imgtools.transforms import (
+    CastIntensity,
+    ClipIntensity,
+    ShiftScaleIntensity,
+    Transformer,
+    WindowIntensity,
+)
+
+CHAINS = {
+    "clip, window": [ClipIntensity(-1024, 3071), WindowIntensity(400, 40)],
+    "clip, window, normalize": [
+        ClipIntensity(-1024, 3071),
+        WindowIntensity(400, 40),
+        CastIntensity("float32"),
+        ShiftScaleIntensity(-40.0, 1 / 400),
+    ],
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shape", type=int, nargs=3, default=[200, 512, 512])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    array = rng.integers(-1024, 3071, args.shape, dtype=np.int16)
+    scan = Scan(sitk.GetImageFromArray(array), metadata={"Modality": "CT"})
+
+    print(f"grid {tuple(args.shape)}, best of {args.repeats}")
+    print(f"{'chain':<26} {'one by one s':>13} {'fused s':>9}")
+    for name, chain in CHAINS.items():
+        transformer = Transformer(chain)
+        sequential, fused = [], []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            image: sitk.Image = scan
+            for transform in chain:
+                image = transform(image)
+            sequential.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            transformer([scan])
+            fused.append(time.perf_counter() - start)
+        print(f"{name:<26} {min(sequential):>13.2f} {min(fused):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
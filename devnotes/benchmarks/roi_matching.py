@@ -0,0 +1,77 @@
+"""Time ROI matching over a dataset repeating the same ROI names.
+
+Before, every RTSTRUCT was matched with `handle_roi_matching`, trying every
+(pattern, ROI name) pair. `ROIMatcher` compiles the match map once (one
+alternation per key), remembers the keys matched by every ROI name and the
+results of every list of names, and `ROIMatcher.match_index` fills these
+caches from the crawl records in one pass.
+
+Examples
+--------
+5,000 structure sets drawing 30 ROI names out of 300, with 40 keys of 5
+patterns each::
+
+    python devnotes/benchmarks/roi_matching.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from imgtools.coretypes.masktypes.roi_matching import (
+    ROIMatcher,
+    handle_roi_matching,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--structure-sets", type=int, default=5000)
+    parser.add_argument("--names", type=int, default=300)
+    parser.add_argument("--rois", type=int, default=30)
+    parser.add_argument("--keys", type=int, default=40)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocabulary = [f"Organ_{i}_{rng.choice('LR')}" for i in range(args.names)]
+    match_map = {
+        f"key_{k}": [f"organ_{k}_.*", f"Organ{k}", f"org_{k}", "GTV.*", "x{2}"]
+        for k in range(args.keys)
+    }
+    crawl_db = [
+        {
+            "SeriesInstanceUID": str(i),
+            "Modality": "RTSTRUCT",
+            "ROINames": rng.sample(vocabulary, args.rois),
+        }
+        for i in range(args.structure_sets)
+    ]
+
+    start = time.perf_counter()
+    expected = [
+        handle_roi_matching(record["ROINames"], match_map, "merge")
+        for record in crawl_db
+    ]
+    pairwise = time.perf_counter() - start
+
+    matcher = ROIMatcher(match_map=match_map)
+    start = time.perf_counter()
+    matches = matcher.match_index(crawl_db)
+    indexed = time.perf_counter() - start
+    assert list(matches.values()) == expected
+
+    start = time.perf_counter()
+    for record in crawl_db:
+        matcher.match_rois(record["ROINames"])
+    rematched = time.perf_counter() - start
+
+    print(f"{args.structure_sets} structure sets, {args.names} ROI names")
+    print(f"pairwise matching     {pairwise:8.2f} s")
+    print(f"match_index           {indexed:8.2f} s")
+    print(f"match_rois after it   {rematched:8.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Compare transforming the images of a sample one by one and as a batch.
+
+A sample of a CT, a dose grid and masks saved one by one on their own grid
+(as DICOM SEG or NIfTI exports often are) is resampled onto the CT. One by
+one, every image is planned and gets its own resampler; as a batch, the
+`Transformer` plans once per distinct grid, reuses the resampler onto the
+reference and can transform the images after the CT in threads.
+
+Examples
+--------
+A 120 x 256 x 256 CT with 40 masks::
+
+    python devnotes/benchmarks/sample_transform.py
+
+More threads::
+
+    python devnotes/benchmarks/sample_transform.py --workers 1 2 4 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+import SimpleITK as sitk
+
+from imgtools.coretypes import Mask, MedImage, Scan
+from imgtools.transforms import Resample, Transformer
+
+
+def make_sample(shape: tuple[int, int, int], n_masks: int) -> list[MedImage]:
+    rng = np.random.default_rng(0)
+    ct = sitk.GetImageFromArray(
+        rng.integers(-1024, 3071, shape, dtype=np.int16)
+    )
+    ct.SetSpacing((0.9, 0.9, 2.5))
+    dose = sitk.GetImageFromArray(
+        rng.random([n // 3 for n in shape], dtype=np.float32)
+    )
+    dose.SetSpacing((2.7, 2.7, 7.5))
+    sample: list[MedImage] = [
+        Scan(ct, metadata={"Modality": "CT"}),
+        Scan(dose, metadata={"Modality": "RTDOSE"}),
+    ]
+    for i in range(n_masks):
+        array = np.zeros(shape, dtype=np.uint8)
+        z, y, x = (rng.random(3) * np.array(shape) * 0.7).astype(int)
+        array[z : z + shape[0] // 5, y : y + 30, x : x + 30] = 1
+        mask = sitk.GetImageFromArray(array)
+        mask.SetSpacing((0.9, 0.9, 2.5))
+        mask.SetOrigin((0.45, 0.45, 0.0))
+        sample.append(Mask(mask, metadata={"Modality": "SEG"}))
+    return sample
+
+
+def one_by_one(transformer: Transformer, sample: list[MedImage]) -> None:
+    reference = transformer._apply_transforms(sample[0])
+    for image in sample[1:]:
+        transformer._apply_transforms(image, ref=reference)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shape", type=int, nargs=3, default=[120, 256, 256])
+    parser.add_argument("--masks", type=int, default=40)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    sample = make_sample(tuple(args.shape), args.masks)
+    transforms = [Resample(spacing=(1.0, 1.0, 2.0))]
+
+    runs = {"one by one": lambda: one_by_one(Transformer(transforms), sample)}
+    for workers in args.workers:
+        transformer = Transformer(transforms, max_workers=workers)
+        runs[f"batch, {workers} threads"] = lambda t=transformer: t(sample)
+
+    print(
+        f"CT {tuple(args.shape)}, dose, {args.masks} masks,"
+        f" best of {args.repeats}"
+    )
+    print(f"{'mode':<20} {'s':>7}")
+    for name, run in runs.items():
+        times = []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+        print(f"{name:<20} {min(times):>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
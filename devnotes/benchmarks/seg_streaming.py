@@ -0,0 +1,76 @@
+"""Compare decoding a DICOM-SEG per segment with streaming its frames.
+
+`SEG.from_dicom` decodes every segment into its own volume before
+`get_vector_mask` copies the slices of the matched ones into the mask. A
+lazy SEG (`lazy=True`) only reads the header: `get_vector_mask` decodes
+the frames of the matched segments and writes them straight into the
+(Z, Y, X, C) mask buffer. Peak memory is measured with `tracemalloc`,
+which sees the NumPy and pydicom allocations.
+
+Examples
+--------
+A SEG of 100 segments on a 100 x 256 x 256 CT, matching 5 of them and
+then all of them::
+
+    python devnotes/benchmarks/seg_streaming.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import SimpleITK as sitk
+from _synthetic import write_seg
+
+from imgtools.coretypes import ROIMatcher, Scan
+from imgtools.coretypes.masktypes.seg import SEG
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--segments", type=int, default=100)
+    parser.add_argument("--shape", type=int, nargs=3, default=[100, 256, 256])
+    parser.add_argument("--matched", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        seg_file = write_seg(directory, args.segments, tuple(args.shape))  # type: ignore[arg-type]
+        reference = Scan.from_dicom(
+            (directory / "CT").as_posix(), metadata={"Modality": "CT"}
+        )
+        print(f"{args.segments} segments, grid {tuple(args.shape)}")
+        print(f"{'matched':<8} {'mode':<8} {'seconds':>8} {'peak MB':>9}")
+        for matched in (args.matched, args.segments):
+            pattern = "|".join(f"S{i:03d}" for i in range(matched))
+            matcher = ROIMatcher(
+                match_map={"ROI": [f"^({pattern})$"]},
+                handling_strategy="separate",
+            )
+            masks = {}
+            for mode in ("decoded", "streamed"):
+                tracemalloc.start()
+                start = time.perf_counter()
+                seg = SEG.from_dicom(seg_file, lazy=mode == "streamed")
+                masks[mode] = seg.get_vector_mask(reference, matcher)
+                seconds = time.perf_counter() - start
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                print(
+                    f"{matched:<8} {mode:<8} {seconds:>8.2f}"
+                    f" {peak / 2**20:>9.1f}"
+                )
+                del seg
+            assert np.array_equal(
+                sitk.GetArrayViewFromImage(masks["decoded"]),
+                sitk.GetArrayViewFromImage(masks["streamed"]),
+            ), "streamed mask differs from the decoded one"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Compare the series read modes of `read_dicom_series`.
+
+Examples
+--------
+Synthetic 200 slice CT series::
+
+    python devnotes/benchmarks/series_reader.py
+
+A real series, sweeping the number of threads::
+
+    python devnotes/benchmarks/series_reader.py \
+        --directory data/NSCLC-Radiomics/LUNG1-001/CT_Series --threads 1 2 4 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import SimpleITK as sitk
+from _synthetic import write_ct_series
+
+from imgtools.io.readers import read_dicom_series
+from imgtools.io.slice_readers import SeriesReadMode
+
+
+def time_read(
+    directory: Path,
+    read_mode: SeriesReadMode,
+    n_threads: int,
+    repeats: int,
+) -> float:
+    """Return the best wall time of `repeats` reads."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        read_dicom_series(
+            directory.as_posix(),
+            metadata={"Modality": "CT"},
+            read_mode=read_mode,
+            n_threads=n_threads,
+        )
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--directory", type=Path, default=None)
+    parser.add_argument("--slices", type=int, default=200)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = args.directory
+        if directory is None:
+            directory = Path(tmp)
+            write_ct_series(directory, n_slices=args.slices)
+
+        reference = time_read(directory, SeriesReadMode.GDCM, 1, args.repeats)
+        print(f"{'mode':<10} {'threads':>7} {'seconds':>9} {'speedup':>8}")
+        print(f"{'gdcm':<10} {1:>7} {reference:>9.3f} {1.0:>8.2f}")
+        for mode in (SeriesReadMode.THREADED, SeriesReadMode.MEMMAP):
+            for n_threads in args.threads:
+                seconds = time_read(directory, mode, n_threads, args.repeats)
+                print(
+                    f"{mode.value:<10} {n_threads:>7} {seconds:>9.3f}"
+                    f" {reference / seconds:>8.2f}"
+                )
+        print(
+            f"SimpleITK global threads: {sitk.ProcessObject.GetGlobalDefaultNumberOfThreads()}"
+        )
+
+
+if __name__ == "__main__":
+    main()
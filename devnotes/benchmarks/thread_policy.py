@@ -0,0 +1,94 @@
+"""Sweep the split of the cores between worker processes and ITK threads.
+
+Every task resamples a CT-like volume with anti-aliasing then windows it,
+the bulk of what a pipeline worker does with SimpleITK. The tasks run on
+`jobs` loky workers with `threads` ITK threads each, see
+`imgtools.utils.execution`. The `oversubscribed` rows give every worker
+ITK's default of one thread per core, the behaviour before the policy.
+
+Examples
+--------
+All the splits of the cores of the machine, 16 tasks::
+
+    python devnotes/benchmarks/thread_policy.py
+
+A given set of splits::
+
+    python devnotes/benchmarks/thread_policy.py --jobs 2 4 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+
+import numpy as np
+import SimpleITK as sitk
+from joblib import Parallel, delayed
+
+from imgtools.transforms import Resample, WindowIntensity
+from imgtools.utils.execution import ExecutionResources, run_with_resources
+
+
+def task(shape: tuple[int, int, int], seed: int) -> float:
+    rng = np.random.default_rng(seed)
+    image = sitk.GetImageFromArray(
+        rng.integers(-1024, 3071, shape, dtype=np.int16)
+    )
+    image.SetSpacing((0.7, 0.7, 1.0))
+    resampled = Resample(spacing=(1.0, 1.0, 2.0))(image)
+    return float(
+        sitk.GetArrayViewFromImage(WindowIntensity(400, 40)(resampled)).mean()
+    )
+
+
+def run(resources: ExecutionResources, args: argparse.Namespace) -> float:
+    start = time.perf_counter()
+    with resources.parallel_config():
+        Parallel(n_jobs=resources.n_jobs)(
+            delayed(run_with_resources)(
+                resources, task, tuple(args.shape), seed
+            )
+            for seed in range(args.tasks)
+        )
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shape", type=int, nargs=3, default=[120, 384, 384])
+    parser.add_argument("--tasks", type=int, default=16)
+    parser.add_argument("--jobs", type=int, nargs="*", default=None)
+    args = parser.parse_args()
+
+    cpu_count = os.cpu_count() or 1
+    jobs = args.jobs or [
+        n for n in (1, 2, 4, 8, 16, 32, 64, 128) if n <= cpu_count
+    ]
+
+    print(f"{args.tasks} tasks of {tuple(args.shape)} on {cpu_count} cores")
+    print(f"{'jobs':>5} {'threads':>14} {'s':>7} {'tasks/s':>8}")
+    for n_jobs in jobs:
+        rows = [
+            (str(n), ExecutionResources.for_jobs(n_jobs, n, cpu_count))
+            for n in sorted({max(1, cpu_count // n_jobs), 1})
+        ]
+        if n_jobs > 1:
+            # ITK's default in every worker, the cores oversubscribed
+            rows.append(
+                (
+                    f"{cpu_count} (oversub.)",
+                    ExecutionResources(n_jobs, cpu_count),
+                )
+            )
+        for label, resources in rows:
+            elapsed = run(resources, args)
+            print(
+                f"{n_jobs:>5} {label:>14} {elapsed:>7.2f}"
+                f" {args.tasks / elapsed:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
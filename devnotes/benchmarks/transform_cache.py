@@ -0,0 +1,69 @@
+"""Compare reading and transforming a reference series with the cache.
+
+Without the cache, every run of the pipeline reads the reference series of
+a sample and transforms it. With `TransformCache`, a rerun with the same
+transforms reads the transformed image back from an uncompressed file.
+
+Examples
+--------
+A 200-slice 512 x 512 CT series, resampled to 1 mm and windowed::
+
+    python devnotes/benchmarks/transform_cache.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from _synthetic import write_ct_series
+
+from imgtools.coretypes import Scan
+from imgtools.io.readers import read_dicom_series
+from imgtools.io.transform_cache import TransformCache
+from imgtools.transforms import Resample, Transformer, WindowIntensity
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--slices", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    transformer = Transformer(
+        [Resample(spacing=(1.0, 1.0, 1.0)), WindowIntensity(400, 40)]
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp) / "series"
+        write_ct_series(directory, n_slices=args.slices)
+        cache = TransformCache(Path(tmp) / "cache")
+        key = cache.key("1.2.3", [str(i) for i in range(args.slices)], [])
+
+        def read_and_transform() -> Scan:
+            image, metadata = read_dicom_series(
+                directory.as_posix(), metadata={"Modality": "CT"}
+            )
+            return transformer([Scan(image, metadata=metadata)])[0]
+
+        cache.put(key, read_and_transform())
+        runs = {
+            "read + transform": read_and_transform,
+            "cache": lambda: cache.get(key),
+        }
+
+        print(f"{args.slices} slices of 512 x 512, best of {args.repeats}")
+        print(f"{'mode':<18} {'s':>7}")
+        for name, run in runs.items():
+            times = []
+            for _ in range(args.repeats):
+                start = time.perf_counter()
+                run()
+                times.append(time.perf_counter() - start)
+            print(f"{name:<18} {min(times):>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
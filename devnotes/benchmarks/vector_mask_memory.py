@@ -0,0 +1,136 @@
+"""Peak memory of the VectorMask conversions, legacy and current.
+
+The legacy conversions copied the whole vector image with
+`sitk.GetArrayFromImage` (twice in `to_label_image`, once more through
+`has_overlap`) and reduced it with `np.sum`, which allocates an int64 array
+per voxel. The current ones read a view of the image buffer, pack it into
+one word per voxel and work on it in slabs.
+
+For every conversion, the peak of the memory traced by `tracemalloc` (NumPy
+allocations, not the SimpleITK output images) is reported in bytes per
+voxel, i.e. the size of the temporaries, along with the run time. The first
+current conversion includes building the cached bitmask.
+
+Examples
+--------
+20 ROIs without overlap on a 100 x 512 x 512 grid::
+
+    python devnotes/benchmarks/vector_mask_memory.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+from typing import Any, Callable
+
+import numpy as np
+import SimpleITK as sitk
+
+from imgtools.coretypes.base_masks import ROIMaskMapping, VectorMask
+
+
+def legacy_has_overlap(mask: VectorMask) -> bool:
+    arr = sitk.GetArrayFromImage(mask)
+    return mask.n_masks > 1 and bool(np.any(np.sum(arr, axis=-1) > 1))
+
+
+def legacy_label_image(mask: VectorMask) -> sitk.Image:
+    if legacy_has_overlap(mask):
+        raise ValueError("overlap")
+    arr = sitk.GetArrayFromImage(mask)
+    label_arr = np.zeros(arr.shape[:3], dtype=np.uint8)
+    for i in range(arr.shape[-1]):
+        label_arr[arr[..., i] == 1] = i + 1
+    label_img = sitk.GetImageFromArray(label_arr)
+    label_img.CopyInformation(mask)
+    return sitk.Cast(label_img, sitk.sitkUInt8)
+
+
+def legacy_background(mask: VectorMask) -> sitk.Image:
+    arr = sitk.GetArrayViewFromImage(mask)
+    return sitk.GetImageFromArray((arr.sum(-1) == 0).astype(np.uint8))
+
+
+def legacy_region_mask(mask: VectorMask) -> sitk.Image:
+    label_image = sitk.Image(mask.GetSize(), sitk.sitkUInt32)
+    label_image.CopyInformation(mask)
+    for i in range(mask.n_masks):
+        component = sitk.VectorIndexSelectionCast(
+            mask, i, outputPixelType=sitk.sitkUInt32
+        )
+        label_image += sitk.ShiftScale(component, shift=0, scale=2**i)
+    return label_image
+
+
+def make_vector_mask(n_rois: int, shape: tuple[int, int, int]) -> VectorMask:
+    rng = np.random.default_rng(0)
+    labels = rng.integers(0, n_rois + 1, shape, dtype=np.uint8)
+    array = np.zeros((*shape, n_rois), dtype=np.uint8)
+    for channel in range(n_rois):
+        array[..., channel] = labels == channel + 1
+    mapping = {
+        i: ROIMaskMapping(f"ROI_{i}", [f"ROI_{i}"], f"ROI_{i}")
+        for i in range(n_rois)
+    }
+    image = sitk.GetImageFromArray(array, isVector=True)
+    return VectorMask(image, mapping, metadata={})
+
+
+def measure(function: Callable[[], Any]) -> tuple[float, int]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    function()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rois", type=int, default=20)
+    parser.add_argument("--shape", type=int, nargs=3, default=[100, 512, 512])
+    args = parser.parse_args()
+    shape = tuple(args.shape)
+    n_voxels = int(np.prod(shape))
+
+    legacy_mask = make_vector_mask(args.rois, shape)  # type: ignore[arg-type]
+    current_mask = make_vector_mask(args.rois, shape)  # type: ignore[arg-type]
+    conversions = {
+        "has_overlap": (
+            lambda: legacy_has_overlap(legacy_mask),
+            current_mask.has_overlap,
+        ),
+        "to_label_image": (
+            lambda: legacy_label_image(legacy_mask),
+            current_mask.to_label_image,
+        ),
+        "background": (
+            lambda: legacy_background(legacy_mask),
+            lambda: current_mask.extract_mask(0),
+        ),
+        "to_region_mask": (
+            lambda: legacy_region_mask(legacy_mask),
+            current_mask.to_region_mask,
+        ),
+    }
+
+    print(f"{args.rois} ROIs, grid {shape}")
+    print(
+        f"{'conversion':<16} {'legacy s':>9} {'B/voxel':>8}"
+        f" {'current s':>10} {'B/voxel':>8}"
+    )
+    for name, (legacy, current) in conversions.items():
+        legacy_seconds, legacy_peak = measure(legacy)
+        current_seconds, current_peak = measure(current)
+        print(
+            f"{name:<16} {legacy_seconds:>9.2f}"
+            f" {legacy_peak / n_voxels:>8.1f}"
+            f" {current_seconds:>10.2f} {current_peak / n_voxels:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,7 @@ from joblib import Parallel, delayed  # type: ignore
 from tqdm import tqdm
 
 from imgtools.autopipeline_utils import PipelineResults, save_pipeline_reports
+from imgtools.coretypes.base_medimage import FingerprintLevel
 from imgtools.coretypes.masktypes.roi_matching import (
     ROIMatchFailurePolicy,
     ROIMatchStrategy,
@@ -21,6 +22,7 @@ from imgtools.io.sample_output import (
     ExistingFileMode,
     SampleOutput,
 )
+from imgtools.io.transform_cache import TransformCache
 from imgtools.loggers import logger, tqdm_logging_redirect
 from imgtools.transforms import (
     BaseTransform,
@@ -28,12 +30,15 @@ from imgtools.transforms import (
     Transformer,
     WindowIntensity,
 )
+from imgtools.transforms.profiling import TransformProfiler, TransformRecord
+from imgtools.utils.execution import ExecutionResources, run_with_resources
 
 if TYPE_CHECKING:
     import rich.repr
 
     from imgtools.coretypes.base_masks import VectorMask
     from imgtools.coretypes.base_medimage import MedImage
+    from imgtools.coretypes.lazy_medimage import LazyMedImage
     from imgtools.dicom.interlacer import SeriesNode
 
 
@@ -123,6 +128,9 @@ class ProcessSampleResult:
     error_details: Optional[Dict] = None
     processing_time: Optional[float] = None
 
+    # Every transform step run on every image, see imgtools.transforms.profiling
+    transform_profile: List[TransformRecord] = field(default_factory=list)
+
     @property
     def has_error(self) -> bool:
         """Check if the processing had an error."""
@@ -143,6 +151,9 @@ class ProcessSampleResult:
                 for s in self.sample
             ],
             "processing_time": f"{self.processing_time:.2f}s",
+            "transform_profile": [
+                record.to_dict() for record in self.transform_profile
+            ],
         }
 
         if not self.has_error:
@@ -166,6 +177,7 @@ def process_one_sample(
         SampleInput,
         Transformer,
         SampleOutput,
+        TransformCache | None,
     ],
 ) -> ProcessSampleResult:
     """
@@ -178,12 +190,17 @@ def process_one_sample(
     - sample_input: SampleInput (class that handles loading the sample)
     - transformer: Transformer (class that handles the transformation pipeline)
     - sample_output: SampleOutput (class that handles saving the sample)
+    - transform_cache: TransformCache | None (cache of the transformed reference images)
+
+    The transform steps run on every image are profiled, and stored in the
+    `transform_profile` of the result.
 
     This function handles the entire lifecycle of processing a medical image sample:
 
     1. First, we load the sample images from the provided input source
     2. Then, we verify that all requested images were properly loaded
-    3. Next, we apply the transformation pipeline to the images (resampling, windowing, etc.)
+    3. Next, we apply the transformation pipeline to the images (resampling, windowing, etc.),
+       reading the transformed reference image from the cache if it is there
     4. Finally, we save the processed images to the output location
 
     Throughout this process, we track any errors that occur and return detailed
@@ -201,7 +218,9 @@ def process_one_sample(
     start_time = time.time()
 
     sample: Sequence[SeriesNode]
-    idx, sample, sample_input, transformer, sample_output = args
+    idx, sample, sample_input, transformer, sample_output, transform_cache = (
+        args
+    )
 
     # Initialize the result with sample information
     result = ProcessSampleResult(
@@ -211,7 +230,9 @@ def process_one_sample(
 
     try:
         # Load the sample
-        sample_images: Sequence[MedImage | VectorMask] = sample_input(sample)
+        sample_images: Sequence[MedImage | LazyMedImage | VectorMask] = (
+            sample_input(sample)
+        )
     except Exception as e:
         error_message = str(e)
         logger.exception("Failed to load sample", e=e)
@@ -247,14 +268,20 @@ def process_one_sample(
             "input_series": list(series_instance_uids),
         }
 
+    profiler = TransformProfiler()
     try:
-        transformed_images = transformer(sample_images)
+        transformed_images = transform_sample(
+            sample_images, sample_input, transformer, transform_cache, profiler
+        )
     except Exception as e:
         error_message = str(e)
+        # the steps run before the failure
+        result.transform_profile = profiler.records
         result.error_type = "TransformError"
         result.error_message = f"Failed during transformation: {error_message}"
         result.processing_time = time.time() - start_time
         return result
+    result.transform_profile = profiler.records
 
     try:
         saved_files = sample_output(
@@ -278,6 +305,43 @@ def process_one_sample(
     return result
 
 
+def transform_sample(
+    sample_images: Sequence[MedImage | LazyMedImage | VectorMask],
+    sample_input: SampleInput,
+    transformer: Transformer,
+    transform_cache: TransformCache | None = None,
+    profiler: TransformProfiler | None = None,
+) -> Sequence[MedImage]:
+    """Transform the images of a sample, the reference through the cache.
+
+    The transformed reference image (the first one) is read from the cache
+    if it is there, and stored in it otherwise. The other images are
+    always transformed, against the transformed reference. The steps run
+    are recorded by `profiler`, if any.
+
+    Returns
+    -------
+    Sequence[MedImage]
+        The transformed images, in the order of `sample_images`.
+    """
+    series_uid = sample_images[0].metadata.get("SeriesInstanceUID")
+    if transform_cache is None or not series_uid:
+        return transformer(sample_images, profiler=profiler)
+
+    key = transform_cache.key(
+        series_uid,
+        sample_input.crawler.get_instance_uids(series_uid),
+        transformer.transforms,
+    )
+    reference = transform_cache.get(key)
+    transformed_images = transformer(
+        sample_images, transformed_reference=reference, profiler=profiler
+    )
+    if reference is None:
+        transform_cache.put(key, transformed_images[0])
+    return transformed_images
+
+
 class Autopipeline:
     """Pipeline for processing medical images."""
 
@@ -305,6 +369,12 @@ class Autopipeline:
         spacing: tuple[float, float, float] = (0.0, 0.0, 0.0),
         window: float | None = None,
         level: float | None = None,
+        *,
+        fingerprint_level: str | FingerprintLevel = FingerprintLevel.FULL,
+        feret_diameter: bool = False,
+        threads_per_job: int | None = None,
+        transform_cache: str | Path | None = None,
+        transform_cache_size_gb: float = 20.0,
     ) -> None:
         """
         Initialize the Autopipeline.
@@ -342,7 +412,35 @@ class Autopipeline:
             Window level for intensity normalization, by default None
         level : float | None, optional
             Window level for intensity normalization, by default None
+        fingerprint_level : str | FingerprintLevel, optional
+            How much of every saved image is described in the index,
+            by default FingerprintLevel.FULL
+        feret_diameter : bool, optional
+            Whether to fill the `mask.feret_diameter` column of the index,
+            by default False. It is slow to compute for large masks, and
+            left empty otherwise.
+        threads_per_job : int | None, optional
+            Number of threads of the SimpleITK filters (and BLAS) in every
+            job, by default None (the cores are split evenly between the
+            jobs). See `imgtools.utils.execution`.
+        transform_cache : str | Path | None, optional
+            Directory to cache the transformed reference images in, by
+            default None (no cache). A rerun with the same transforms reads
+            them from the cache instead of reading and transforming the
+            reference series, which are then loaded lazily.
+            See `imgtools.io.transform_cache`.
+        transform_cache_size_gb : float, optional
+            Size of the transform cache on disk above which the least
+            recently used images are removed, by default 20 GB.
         """
+        self.transform_cache = (
+            TransformCache(
+                Path(transform_cache),
+                max_bytes=int(transform_cache_size_gb * 1024**3),
+            )
+            if transform_cache is not None
+            else None
+        )
         self.input = SampleInput.build(
             directory=Path(input_directory),
             update_crawl=update_crawl,
@@ -353,19 +451,23 @@ class Autopipeline:
             roi_handling_strategy=roi_handling_strategy,
             roi_allow_multi_key_matches=roi_allow_multi_key_matches,
             roi_on_missing_regex=roi_on_missing_regex,
+            # a cached reference series is never read
+            lazy_loading=self.transform_cache is not None,
         )
         self.output = SampleOutput(
             directory=Path(output_directory),
             filename_format=output_filename_format,
             existing_file_mode=existing_file_mode,
             extra_context={},
+            fingerprint_level=FingerprintLevel(fingerprint_level),
+            feret_diameter=feret_diameter,
         )
 
         transforms: list[BaseTransform] = [
-            # we could choose to only add resampling if any spacing component
-            # is non-zero, but this currently does additional non-intuitive
-            # alignment by assuming the first image in the sample is the reference
-            # and all other images get resampled to that via sitk.Resample
+            # the first image in the sample is the reference: it is resampled
+            # to `spacing`, and all other images get resampled to it via
+            # sitk.Resample. The Transformer skips these resamples when they
+            # would not change the image (zero spacing, same grid).
             Resample(
                 spacing,
                 interpolation="linear",
@@ -380,8 +482,15 @@ class Autopipeline:
             transforms.append(WindowIntensity(window=window, level=level))
 
         self.transformer = Transformer(transforms)
+        self.resources = ExecutionResources.for_jobs(
+            self.input.n_jobs, threads_per_job
+        )
 
-        logger.info("Pipeline initialized")
+        logger.info(
+            "Pipeline initialized",
+            n_jobs=self.resources.n_jobs,
+            threads_per_job=self.resources.threads_per_job,
+        )
 
     def run(
         self,
@@ -407,6 +516,10 @@ class Autopipeline:
                 valid_queries=self.input.interlacer.valid_queries,
             )
 
+        # match the ROI names of the crawl once: the matcher is pickled to
+        # the workers with its cache filled
+        self.input.roi_matcher.match_index(self.input.crawler.crawl_db)
+
         # Create a timestamp for this run
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
@@ -418,6 +531,7 @@ class Autopipeline:
                 self.input,
                 self.transformer,
                 self.output,
+                self.transform_cache,
             )
             for idx, sample in enumerate(samples)
         ]
@@ -434,13 +548,19 @@ class Autopipeline:
                 desc="Processing samples",
                 unit="sample",
             ) as pbar,
+            # Process samples in parallel, the threads of every worker
+            # limited to its share of the cores
+            self.resources.parallel_config(),
         ):
-            # Process samples in parallel
             for result in Parallel(
-                n_jobs=self.input.n_jobs,
-                backend="loky",
+                n_jobs=self.resources.n_jobs,
                 return_as="generator",
-            )(delayed(process_one_sample)(arg) for arg in arg_tuples):
+            )(
+                delayed(run_with_resources)(
+                    self.resources, process_one_sample, arg
+                )
+                for arg in arg_tuples
+            ):
                 all_results.append(result)
 
                 # Update progress bar and track results by success/failure
@@ -14,6 +14,7 @@ from typing import TYPE_CHECKING, Callable, Dict, Generic, List, TypeVar
 import pandas as pd
 
 from imgtools.loggers import logger
+from imgtools.transforms.profiling import summarize_records
 
 if TYPE_CHECKING:
     from pathlib import Path
@@ -152,6 +153,17 @@ def save_pipeline_reports(
             lock_file.unlink()
             logger.debug(f"Lock file removed: {lock_file}")
 
+    # Summarize the time spent per transform over all the samples
+    saved_files = {"simple_index": simple_index}
+    profile_file = save_transform_profile(
+        results,
+        index_file.with_name(
+            f"{root_dir_name}_transform_profile_{results.timestamp}.csv"
+        ),
+    )
+    if profile_file is not None:
+        saved_files["transform_profile"] = profile_file
+
     # Convert results to dictionaries for JSON serialization
     success_dicts = [result.to_dict() for result in results.successful_results]
 
@@ -160,7 +172,7 @@ def save_pipeline_reports(
         json.dump(success_dicts, f, indent=2)
     logger.info(f"Detailed success report saved to {success_file}")
 
-    saved_files = {"success_file": success_file, "simple_index": simple_index}
+    saved_files["success_file"] = success_file
 
     # If no failures, we can skip writing the failure file
     if results.failure_count == 0:
@@ -174,3 +186,47 @@ def save_pipeline_reports(
 
     saved_files["failure_file"] = failure_file
     return saved_files
+
+
+def save_transform_profile(
+    results: PipelineResults, profile_file: "Path"
+) -> "Path | None":
+    """Save the transform steps of all the samples, summarized per transform.
+
+    The `transform_profile` records of the results (see
+    `imgtools.transforms.profiling`) are aggregated per transform, step kind
+    and image class, the transforms taking the most time first, and the
+    slowest are logged.
+
+    Parameters
+    ----------
+    results : PipelineResults
+        The pipeline results, successful or not.
+    profile_file : Path
+        Path of the CSV file to write.
+
+    Returns
+    -------
+    Path | None
+        The path of the file, None if no transform was profiled.
+    """
+    records = [
+        record
+        for result in results.all_results
+        for record in getattr(result, "transform_profile", ())
+    ]
+    if not records:
+        return None
+
+    summary = summarize_records(records)
+    pd.DataFrame(summary).to_csv(profile_file, index=False)
+    for row in summary[:3]:
+        logger.info(
+            "Time spent in transform.",
+            transform=row["transform"],
+            image_type=row["image_type"],
+            count=row["count"],
+            total_seconds=round(row["total_seconds"], 2),
+        )
+    logger.info(f"Transform profile saved to {profile_file}")
+    return profile_file
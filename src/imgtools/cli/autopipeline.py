@@ -37,6 +37,7 @@ class ROIMatchFailurePolicy(str, Enum):
     ERROR = "error"
 
 existing_file_modes = ["overwrite", "skip", "fail"]
+fingerprint_levels = ["none", "geometry", "stats", "full"]
 
 
 def parse_spacing(ctx, param, value): # type: ignore
@@ -102,6 +103,17 @@ def parse_spacing(ctx, param, value): # type: ignore
     default=None, 
     help="Number of parallel jobs"
 )
+@click.option(
+    "--threads-per-job", 
+    "-t", 
+    type=click.IntRange(min=1), 
+    default=None, 
+    help=(
+        "Threads of the SimpleITK filters in every job. By default the cores"
+        " are split evenly between the jobs; fewer jobs with more threads"
+        " each, e.g. '-j 4 -t 8' on 32 cores, use less memory"
+    )
+)
 @click.option(
     "--spacing", 
     callback=parse_spacing, 
@@ -165,6 +177,44 @@ def parse_spacing(ctx, param, value): # type: ignore
     default=None,
     help="Path to YAML file containing ROI matching patterns."
 )
+@click.option(
+    "--fingerprint-level",
+    type=click.Choice(fingerprint_levels),
+    default="full",
+    show_default=True,
+    help=(
+        "How much of every saved image is described in the index:"
+        " 'geometry' reads only the header, 'stats' adds one pass over the"
+        " voxels and 'full' adds the voxel hash"
+    )
+)
+@click.option(
+    "--feret-diameter",
+    is_flag=True,
+    help=(
+        "Add the feret diameter of every mask to the index, at the 'stats'"
+        " and 'full' fingerprint levels. Slow for large masks"
+    )
+)
+@click.option(
+    "--transform-cache",
+    type=click.Path(file_okay=False, dir_okay=True, writable=True, path_type=Path, resolve_path=True),
+    default=None,
+    help=(
+        "Directory to cache the transformed reference images in. Reruns"
+        " with the same transforms skip reading and transforming them."
+    )
+)
+@click.option(
+    "--transform-cache-size",
+    type=click.FloatRange(min=0, min_open=True),
+    default=20.0,
+    show_default=True,
+    help=(
+        "Size of the transform cache in GB, above which the least recently"
+        " used images are removed."
+    )
+)
 @click.help_option(
     "-h",
     "--help",
@@ -176,6 +226,7 @@ def autopipeline(
     existing_file_mode: str,
     update_crawl: bool,
     jobs: int,
+    threads_per_job: int | None,
     modalities: str,
     spacing: Tuple[float, float, float],
     window: float,
@@ -186,6 +237,10 @@ def autopipeline(
     roi_on_missing_regex: str,
     roi_match_map: Tuple[str],
     roi_match_yaml: Path,
+    fingerprint_level: str,
+    feret_diameter: bool,
+    transform_cache: Path | None,
+    transform_cache_size: float,
 ) -> None:
     """Core utility to process messy DICOM data into organized NIfTI files.
     
@@ -263,6 +318,11 @@ def autopipeline(
         spacing=spacing,
         window=window,
         level=level,
+        fingerprint_level=fingerprint_level,
+        feret_diameter=feret_diameter,
+        threads_per_job=threads_per_job,
+        transform_cache=transform_cache,
+        transform_cache_size_gb=transform_cache_size,
     )
     
     # Run the pipeline
@@ -83,6 +83,17 @@ existing_file_modes = ["overwrite", "skip", "fail"]
     default=None, 
     help="Number of parallel jobs"
 )
+@click.option(
+    "--threads-per-job", 
+    "-t", 
+    type=click.IntRange(min=1), 
+    default=None, 
+    help=(
+        "Threads of the SimpleITK filters in every job. By default the cores"
+        " are split evenly between the jobs; fewer jobs with more threads"
+        " each, e.g. '-j 4 -t 8' on 32 cores, use less memory"
+    )
+)
 @click.option(
     "--spacing", 
     callback=parse_spacing, 
@@ -128,6 +139,7 @@ def nnunet_pipeline(
     existing_file_mode: str,
     update_crawl: bool,
     jobs: int,
+    threads_per_job: int | None,
     spacing: Tuple[float, float, float],
     window: float,
     level: float,
@@ -189,6 +201,7 @@ def nnunet_pipeline(
         spacing=spacing,
         window=window,
         level=level,
+        threads_per_job=threads_per_job,
     )
     
     # Run the pipeline
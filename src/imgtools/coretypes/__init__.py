@@ -1,6 +1,7 @@
-from .base_medimage import MedImage
+from .base_medimage import FingerprintLevel, MedImage
 from .box import BoxPadMethod, RegionBox
 from .imagetypes import PET, Dose, Scan
+from .lazy_medimage import LazyMedImage, materialize
 from .masktypes import (
     SEG,
     ROIMatcher,
@@ -14,9 +15,13 @@ from .masktypes import (
 from .spatial_types.coord_types import Coordinate3D, Size3D, Spacing3D
 
 from .base_masks import Mask, VectorMask  # isort: skip
+from .compact_mask import CompactVectorMask, MaskCrop  # isort: skip
 
 __all__ = [
     "MedImage",
+    "FingerprintLevel",
+    "LazyMedImage",
+    "materialize",
     "Coordinate3D",
     "Size3D",
     "Spacing3D",
@@ -40,4 +45,7 @@ __all__ = [
     # base masks
     "VectorMask",
     "Mask",
+    # compact masks
+    "CompactVectorMask",
+    "MaskCrop",
 ]
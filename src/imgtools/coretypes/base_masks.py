@@ -8,7 +8,9 @@ import numpy as np
 import SimpleITK as sitk
 
 from imgtools.coretypes import MedImage
+from imgtools.coretypes.base_medimage import FingerprintLevel, slabs
 from imgtools.coretypes.box import RegionBox
+from imgtools.coretypes.spatial_types import Coordinate3D
 from imgtools.loggers import logger
 
 if TYPE_CHECKING:
@@ -26,10 +28,16 @@ ROIMaskMapping = namedtuple(
 )
 
 
+MAX_PACKED_CHANNELS = 64
+"""Number of channels that fit in the bitmask of one voxel (a uint64)."""
+
+
 class TooManyComponentsError(ValueError):
     """Raised when attempting to encode a mask with more components than supported by the available integer types."""
 
-    def __init__(self, n_components: int, max_supported: int = 32) -> None:
+    def __init__(
+        self, n_components: int, max_supported: int = MAX_PACKED_CHANNELS
+    ) -> None:
         msg = (
             f"Cannot encode masks with {n_components} components: "
             f"maximum supported is {max_supported} due to bitmask size limits."
@@ -39,6 +47,85 @@ class TooManyComponentsError(ValueError):
         self.max_supported = max_supported
 
 
+def bitmask_dtype(n_components: int) -> np.dtype:
+    """Return the smallest unsigned integer type with `n_components` bits.
+
+    Raises
+    ------
+    TooManyComponentsError
+        If more than `MAX_PACKED_CHANNELS` components are requested.
+    """
+    for dtype in (np.uint8, np.uint16, np.uint32, np.uint64):
+        if n_components <= np.iinfo(dtype).bits:
+            return np.dtype(dtype)
+    raise TooManyComponentsError(n_components)
+
+
+def pack_channels(array: np.ndarray) -> np.ndarray:
+    """Pack binary channels into one unsigned integer per voxel.
+
+    Parameters
+    ----------
+    array : np.ndarray
+        (..., C) array of 0/1 values, e.g. the array view of a `VectorMask`.
+
+    Returns
+    -------
+    np.ndarray
+        (...) array of the `bitmask_dtype(C)` type where bit `i` is set when
+        channel `i` is.
+    """
+    n_components = array.shape[-1]
+    dtype = bitmask_dtype(n_components)
+    packed = np.packbits(array, axis=-1, bitorder="little")
+    if packed.shape[-1] != dtype.itemsize:
+        words = np.zeros((*array.shape[:-1], dtype.itemsize), dtype=np.uint8)
+        words[..., : packed.shape[-1]] = packed
+        packed = words
+    # bit 8k + i of the word is bit i of byte k: the bytes are little-endian
+    little_endian = dtype.newbyteorder("<")
+    return packed.view(little_endian)[..., 0].astype(dtype, copy=False)
+
+
+def highest_label(bitmask: np.ndarray) -> np.ndarray:
+    """Return 1 + the index of the highest set bit, 0 where no bit is set.
+
+    This is the label of the last channel covering each voxel. It is the
+    binary exponent returned by `np.frexp`, exact as long as the value
+    converts to float64 without rounding, so 64-bit words are split in two
+    halves.
+    """
+    if bitmask.dtype.itemsize == 8:  # noqa: PLR2004
+        upper = (bitmask >> np.uint64(32)).astype(np.uint32)
+        lower = bitmask.astype(np.uint32)  # keeps the low 32 bits
+        return np.where(
+            upper != 0, highest_label(upper) + 32, highest_label(lower)
+        ).astype(np.uint8)
+    _, exponent = np.frexp(bitmask.astype(np.float64))
+    return exponent.astype(np.uint8)
+
+
+def with_background(
+    roi_mapping: dict[int, ROIMaskMapping],
+) -> dict[int, ROIMaskMapping]:
+    """Return the mapping with the background at index 0.
+
+    The mappings built from RTSTRUCT and SEG files index the channels from
+    0, user-facing keys start at 1 since index 0 is reserved for the
+    background.
+    """
+    if 0 in roi_mapping and roi_mapping[0].roi_key == "Background":
+        # Background is already set to 0, no need to change
+        return roi_mapping
+
+    mapping = {0: ROIMaskMapping("Background", ["Background"], "Background")}
+    # Shift index to start from 1 for user-facing keys
+    shift = 1 if 0 in roi_mapping else 0
+    for old_idx, roi_mask_mapping in roi_mapping.items():
+        mapping[old_idx + shift] = roi_mask_mapping
+    return mapping
+
+
 class VectorMask(MedImage):
     """A multi-label binary mask image with vector pixels (sitkVectorUInt8).
 
@@ -96,6 +183,7 @@ class VectorMask(MedImage):
     errors: Mapping[str, Exception] | None
 
     _mask_cache: dict[str | int, Mask]
+    _bitmask: np.ndarray | None
 
     def __init__(
         self,
@@ -118,30 +206,16 @@ class VectorMask(MedImage):
             Optional dictionary with error messages from ROI extraction, by default None
         """
         super().__init__(image)
-        # Shift index to start from 1 for user-facing keys
-        self.roi_mapping = {}
-
-        if 0 in roi_mapping and roi_mapping[0].roi_key == "Background":
-            # Background is already set to 0, no need to change
-            self.roi_mapping = roi_mapping
-        elif 0 in roi_mapping:
-            # Background is not set to 0, so we need to adjust the mapping
-            self.roi_mapping[0] = ROIMaskMapping(
-                "Background", ["Background"], "Background"
-            )
-            for old_idx, roi_mask_mapping in roi_mapping.items():
-                self.roi_mapping[old_idx + 1] = roi_mask_mapping
-        else:
-            # no background, so just set 0 and keep the rest
-            self.roi_mapping[0] = ROIMaskMapping(
-                "Background", ["Background"], "Background"
-            )
-            for old_idx, roi_mask_mapping in roi_mapping.items():
-                self.roi_mapping[old_idx] = roi_mask_mapping
-
+        self.roi_mapping = with_background(roi_mapping)
         self.metadata = metadata
         self.errors = errors
         self._mask_cache = {}
+        self._bitmask = None
+
+    def _clear_caches(self) -> None:
+        super()._clear_caches()
+        self._mask_cache = {}
+        self._bitmask = None
 
     def __post_init__(self) -> None:
         if self.dtype != sitk.sitkVectorUInt8:
@@ -202,10 +276,47 @@ class VectorMask(MedImage):
                 self.extract_mask(i),
             )
 
+    def bitmask_array(self) -> np.ndarray:
+        """Return the channels packed into one unsigned integer per voxel.
+
+        Bit `i` of a voxel is set when channel `i` (ROI index `i + 1`) is, see
+        `pack_channels`. The array is computed once from a view of the
+        image buffer and cached.
+
+        Raises
+        ------
+        TooManyComponentsError
+            If the mask has more than `MAX_PACKED_CHANNELS` channels.
+        """
+        self._check_caches()
+        if self._bitmask is None:
+            arr = self._channels_view()
+            bitmask = np.empty(arr.shape[:3], bitmask_dtype(self.n_masks))
+            for slab in slabs(arr.shape):
+                bitmask[slab] = pack_channels(arr[slab])
+            self._bitmask = bitmask
+        return self._bitmask
+
+    def _channels_view(self) -> np.ndarray:
+        """(Z, Y, X, C) view of the image buffer, also with one component."""
+        arr = sitk.GetArrayViewFromImage(self)
+        return arr.reshape(*self.GetSize()[::-1], self.n_masks)
+
     def has_overlap(self) -> bool:
         """Return True if any voxel has >1 mask"""
-        arr = sitk.GetArrayFromImage(self)
-        return self.n_masks > 1 and bool(np.any(np.sum(arr, axis=-1) > 1))
+        if self.n_masks <= 1:
+            return False
+        if self.n_masks > MAX_PACKED_CHANNELS:
+            arr = self._channels_view()
+            return any(
+                np.any(np.sum(arr[slab], axis=-1, dtype=np.uint16) > 1)
+                for slab in slabs(arr.shape)
+            )
+        # a word with more than one bit set is not cleared by x & (x - 1)
+        bits = self.bitmask_array()
+        return any(
+            np.any(bits[slab] & (bits[slab] - 1)) for slab in slabs(bits.shape)
+        )
 
     def _to_label_array(self, allow_overlap: bool) -> Mask:
         """
@@ -225,10 +336,7 @@ class VectorMask(MedImage):
         """
 
         if self.n_masks == 1:  # Already a label image
-            return Mask(
-                sitk.Cast(self[1], sitk.sitkUInt8),
-                metadata=self.metadata.copy(),
-            )
+            return Mask(self.extract_mask(1), metadata=self.metadata.copy())
 
         if self.has_overlap():
             if allow_overlap:
@@ -243,22 +351,25 @@ class VectorMask(MedImage):
                     "Or use `to_region_mask()` for lossless conversion that creates a new region per overlap."
                 )
 
-        arr = sitk.GetArrayFromImage(self)
-
-        # Assign label index (1-based, since 0 = background)
-        label_arr = np.zeros(arr.shape[:3], dtype=np.uint8)
-
-        for i in range(arr.shape[-1]):
-            label_arr[arr[..., i] == 1] = i + 1
+        # Assign label index (1-based, since 0 = background), the
+        # highest-index region wins where masks overlap
+        if self.n_masks <= MAX_PACKED_CHANNELS:
+            bits = self.bitmask_array()
+            label_arr = np.empty(bits.shape, dtype=np.uint8)
+            for slab in slabs(bits.shape):
+                label_arr[slab] = highest_label(bits[slab])
+        else:
+            arr = self._channels_view()
+            label_arr = np.zeros(arr.shape[:3], dtype=np.uint8)
+            for i in range(arr.shape[-1]):
+                label_arr[arr[..., i] == 1] = i + 1
 
+        # uint8 arrays give sitkUInt8 images, no cast needed
         label_img = sitk.GetImageFromArray(label_arr)
         label_img.CopyInformation(self)
 
         # Attach merged metadata
-        return Mask(
-            sitk.Cast(label_img, sitk.sitkUInt8),
-            metadata=self.metadata.copy(),
-        )
+        return Mask(label_img, metadata=self.metadata.copy())
 
     def to_sparse_mask(self) -> Mask:
         """Convert the vector mask to a single-channel binary mass.
@@ -327,30 +438,21 @@ class VectorMask(MedImage):
         Returns
         -------
         Mask
+
+        Raises
+        ------
+        TooManyComponentsError
+            If the mask has more than `MAX_PACKED_CHANNELS` channels.
         """
         n_components = self.GetNumberOfComponentsPerPixel()
         assert self.GetPixelID() == sitk.sitkVectorUInt8
         assert len(self.roi_mapping) == n_components + 1  # +1 for background
 
-        if n_components <= 8:
-            output_type = sitk.sitkUInt8
-        elif n_components <= 16:
-            output_type = sitk.sitkUInt16
-        elif n_components <= 32:
-            output_type = sitk.sitkUInt32
-        else:
-            raise TooManyComponentsError(n_components)
-
-        label_image = sitk.Image(self.GetSize(), output_type)
+        # the voxel value is the bitmask itself, in the smallest unsigned
+        # type (uint8 up to uint64) holding one bit per component
+        label_image = sitk.GetImageFromArray(self.bitmask_array())
         label_image.CopyInformation(self)
 
-        for i in range(n_components):
-            component = sitk.VectorIndexSelectionCast(
-                self, i, outputPixelType=output_type
-            )
-            shifted = sitk.ShiftScale(component, shift=0, scale=2**i)
-            label_image += shifted
-
         return Mask(label_image, metadata=self.metadata.copy())
 
     def extract_mask(self, key: str | int) -> Mask:
@@ -375,6 +477,7 @@ class VectorMask(MedImage):
         # gets the mask for Background
         """
         # Check if the mask is already in the cache
+        self._check_caches()
         if key in self._mask_cache:
             logger.debug(f"Cache hit for mask {key}")
             return self._mask_cache[key]
@@ -388,11 +491,14 @@ class VectorMask(MedImage):
                 msg = f"Index {idx} out of bounds for {self.n_masks=} masks."
                 raise IndexError(msg)
             case int(0) | str("Background"):
-                arr = sitk.GetArrayViewFromImage(self)
                 # create binary image where background is 1 and all others are 0
-                mask_image = sitk.GetImageFromArray(
-                    (arr.sum(-1) == 0).astype(np.uint8)
-                )
+                if self.n_masks <= MAX_PACKED_CHANNELS:
+                    background = self.bitmask_array() == 0
+                else:
+                    background = ~np.any(self._channels_view(), axis=-1)
+                # a bool array is reinterpreted as 0/1 bytes without a copy
+                mask_image = sitk.GetImageFromArray(background.view(np.uint8))
+                mask_image.CopyInformation(self)
 
                 # Update metadata with ROINames
                 mask_metadata["ROINames"] = "Background"
@@ -410,7 +516,7 @@ class VectorMask(MedImage):
 
                 # note: background is bypassed here automatically!
                 idx = self.roi_keys.index(key_str)
-                mask_image = sitk.VectorIndexSelectionCast(self, idx)
+                mask_image = sitk.VectorIndexSelectionCast(self, idx - 1)
 
                 # Get the corresponding mapping entry and update ROINames
                 mask_metadata["ROINames"] = "|".join(
@@ -603,7 +709,34 @@ class Mask(MedImage):
             Bounding box around non-zero voxels in the label image.
             Contains min and max coordinates and size.
         """
-        return RegionBox.from_mask_bbox(self, label=self._label_value)
+        statistics = self._shape_statistics(feret_diameter=False)
+        xstart, ystart, zstart, xsize, ysize, zsize = (
+            statistics.GetBoundingBox(self._label_value)
+        )
+        return RegionBox(
+            Coordinate3D(xstart, ystart, zstart),
+            Coordinate3D(xstart + xsize, ystart + ysize, zstart + zsize),
+        )
+
+    def _shape_statistics(
+        self, feret_diameter: bool
+    ) -> sitk.LabelShapeStatisticsImageFilter:
+        """Run the label shape filter once, computing the feret diameter on demand.
+
+        A filter executed with the feret diameter answers every query, one
+        executed without it is only replaced when the feret diameter is
+        requested.
+        """
+        self._check_caches()
+        results = self._label_shape_filter_results
+        if results is None or (
+            feret_diameter and not results.GetComputeFeretDiameter()
+        ):
+            results = sitk.LabelShapeStatisticsImageFilter()
+            results.SetComputeFeretDiameter(feret_diameter)
+            results.Execute(self)
+            self._label_shape_filter_results = results
+        return results
 
     @property
     def label_shape_filter(
@@ -614,16 +747,10 @@ class Mask(MedImage):
         Returns
         -------
         sitk.LabelShapeStatisticsImageFilter
-            The label shape filter for the mask image.
+            The label shape filter for the mask image, with the feret
+            diameter computed.
         """
-        if self._label_shape_filter_results is None:
-            self._label_shape_filter_results = (
-                sitk.LabelShapeStatisticsImageFilter()
-            )
-            self._label_shape_filter_results.ComputeFeretDiameterOn()
-            self._label_shape_filter_results.Execute(self)
-
-        return self._label_shape_filter_results
+        return self._shape_statistics(feret_diameter=True)
 
     @property
     def equivalent_ellipsoid_diameters(self) -> tuple[float, float, float]:
@@ -634,9 +761,9 @@ class Mask(MedImage):
             If you built an ellipsoid that “behaves” like your shape under
             rotation, these would be its diameters.
         """
-        return self.label_shape_filter.GetEquivalentEllipsoidDiameter(
-            self._label_value
-        )
+        return self._shape_statistics(
+            feret_diameter=False
+        ).GetEquivalentEllipsoidDiameter(self._label_value)
 
     @property
     def equivalent_spherical_radius(self) -> float:
@@ -646,9 +773,9 @@ class Mask(MedImage):
             If you built a sphere that has the same volume as your shape,
             this would be its radius.
         """
-        return self.label_shape_filter.GetEquivalentSphericalRadius(
-            self._label_value
-        )
+        return self._shape_statistics(
+            feret_diameter=False
+        ).GetEquivalentSphericalRadius(self._label_value)
 
     @property
     def equivalent_spherical_perimeter(self) -> float:
@@ -658,52 +785,103 @@ class Mask(MedImage):
             If you built a sphere that has the same volume as your shape,
             this would be its perimeter.
         """
-        return self.label_shape_filter.GetEquivalentSphericalPerimeter(
-            self._label_value
-        )
+        return self._shape_statistics(
+            feret_diameter=False
+        ).GetEquivalentSphericalPerimeter(self._label_value)
 
     @property
     def feret_diameter(self) -> float:
         """Get the longest distance between any two points on the mask image."""
-        return self.label_shape_filter.GetFeretDiameter(self._label_value)
+        return self._shape_statistics(feret_diameter=True).GetFeretDiameter(
+            self._label_value
+        )
 
     @property
     def roundness(self) -> float:
         """Get how similar the mask image is to a sphere"""
-        return self.label_shape_filter.GetRoundness(self._label_value)
+        return self._shape_statistics(feret_diameter=False).GetRoundness(
+            self._label_value
+        )
 
     @property
     def flatness(self) -> float:
         """Get the flatness of the mask image."""
-        return self.label_shape_filter.GetFlatness(self._label_value)
+        return self._shape_statistics(feret_diameter=False).GetFlatness(
+            self._label_value
+        )
 
     @property
     def elongation(self) -> float:
         """Get how 'stretched out' the mask is"""
-        return self.label_shape_filter.GetElongation(self._label_value)
+        return self._shape_statistics(feret_diameter=False).GetElongation(
+            self._label_value
+        )
 
     @property
     def volume_count(self) -> int:
         """Get the number of connected components in the mask image."""
+        statistics = self._shape_statistics(feret_diameter=False)
+        image: sitk.Image = self
+        if list(statistics.GetLabels()) == [self._label_value]:
+            # every foreground voxel is in the bounding box of the label
+            bbox = statistics.GetBoundingBox(self._label_value)
+            image = sitk.RegionOfInterest(self, size=bbox[3:], index=bbox[:3])
         cc = sitk.ConnectedComponentImageFilter()
-        cc.Execute(self)
+        cc.Execute(image)
         return int(cc.GetObjectCount())
 
-    @property
-    def fingerprint(self) -> dict[str, Any]:  # noqa: ANN001
-        """Append to MedImage fingerprint"""
+    def shape_statistics(self, feret_diameter: bool = False) -> dict[str, Any]:
+        """Get the shape statistics of the label from one label shape pass.
+
+        Parameters
+        ----------
+        feret_diameter : bool, optional
+            Whether to compute the feret diameter, by default False. It is
+            the most expensive statistic, its cost grows with the square of
+            the number of voxels on the border of the label.
+
+        Returns
+        -------
+        dict[str, Any]
+            The `mask.*` fingerprint entries.
+        """
+        statistics = self._shape_statistics(feret_diameter)
+        label = self._label_value
         bbox = self.get_label_bounding_box()
-        return {
-            **super().fingerprint,
+        shape = {
             "mask.bbox.size": bbox.size,
             "mask.bbox.min_coord": bbox.min,
             "mask.bbox.max_coord": bbox.max,
-            "mask.feret_diameter": self.feret_diameter,
-            "mask.roundness": self.roundness,
-            "mask.flatness": self.flatness,
-            "mask.elongation": self.elongation,
-            "mask.equivalent_spherical_radius": self.equivalent_spherical_radius,
-            "mask.equivalent_spherical_perimeter": self.equivalent_spherical_perimeter,
-            "mask.equivalent_ellipsoid_diameters": self.equivalent_ellipsoid_diameters,
+        }
+        if feret_diameter:
+            shape["mask.feret_diameter"] = statistics.GetFeretDiameter(label)
+        return {
+            **shape,
+            "mask.roundness": statistics.GetRoundness(label),
+            "mask.flatness": statistics.GetFlatness(label),
+            "mask.elongation": statistics.GetElongation(label),
+            "mask.equivalent_spherical_radius": (
+                statistics.GetEquivalentSphericalRadius(label)
+            ),
+            "mask.equivalent_spherical_perimeter": (
+                statistics.GetEquivalentSphericalPerimeter(label)
+            ),
+            "mask.equivalent_ellipsoid_diameters": (
+                statistics.GetEquivalentEllipsoidDiameter(label)
+            ),
             "mask.volume_count": self.volume_count,
         }
+
+    def _fingerprint(self, level: FingerprintLevel) -> dict[str, Any]:
+        """Append the shape statistics of the label to the MedImage fingerprint.
+
+        The feret diameter is left out, use `shape_statistics` to compute it
+        (or `NIFTIWriter.feret_diameter` to add it to the index).
+        """
+        if level == FingerprintLevel.STATS:
+            return {**super()._fingerprint(level), **self.shape_statistics()}
+        return super()._fingerprint(level)
+
+    def _clear_caches(self) -> None:
+        super()._clear_caches()
+        self._label_shape_filter_results = None
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any, Type
+from enum import Enum
+from functools import wraps
+from typing import TYPE_CHECKING, Any, Callable, Iterator, Type
 
+import numpy as np
 import SimpleITK as sitk
 
 from imgtools.coretypes.spatial_types import (
@@ -15,7 +18,94 @@ from imgtools.coretypes.spatial_types import (
 if TYPE_CHECKING:
     from pathlib import Path
 
-    import numpy as np
+SLAB_VOXELS = 1 << 20
+"""Voxels processed at once by the array reductions, bounding temporaries."""
+
+
+def slabs(shape: tuple[int, ...]) -> Iterator[slice]:
+    """Split the first axis of an array in slabs of about `SLAB_VOXELS`."""
+    step = max(1, SLAB_VOXELS // max(1, int(np.prod(shape[1:3]))))
+    for start in range(0, shape[0], step):
+        yield slice(start, start + step)
+
+
+def array_statistics(array: np.ndarray) -> dict[str, float]:
+    """Compute the intensity statistics of an array in a single traversal.
+
+    Every slab is converted to float64 once, and its minimum, maximum, sum
+    and sum of squares are accumulated. The values match the ones of
+    `sitk.StatisticsImageFilter`, the variance being the unbiased one.
+
+    Parameters
+    ----------
+    array : np.ndarray
+        The image array, typically a view of the image buffer.
+
+    Returns
+    -------
+    dict[str, float]
+        The min, max, sum, mean, std and variance of the array.
+    """
+    minimum, maximum = np.inf, -np.inf
+    total = squares = 0.0
+    for slab in slabs(array.shape):
+        values = array[slab].astype(np.float64).ravel()
+        if values.size == 0:
+            continue
+        minimum = min(minimum, float(values.min()))
+        maximum = max(maximum, float(values.max()))
+        total += float(values.sum())
+        squares += float(np.dot(values, values))
+    count = array.size
+    mean = total / count if count else 0.0
+    variance = (
+        max(squares - total * mean, 0.0) / (count - 1) if count > 1 else 0.0
+    )
+    return {
+        "min": minimum,
+        "max": maximum,
+        "sum": total,
+        "mean": mean,
+        "std": float(np.sqrt(variance)),
+        "variance": variance,
+    }
+
+
+# alternative to StrEnum for python 3.10 compatibility
+class FingerprintLevel(str, Enum):
+    """How much of an image the fingerprint describes.
+
+    Every level includes the entries of the previous ones.
+
+    Attributes
+    ----------
+    NONE : str
+        No fingerprint.
+    GEOMETRY : str
+        Class, size, spacing, origin, direction and pixel type. Read from
+        the image header, no voxel is visited.
+    STATS : str
+        Intensity statistics, and the shape statistics of masks. One pass
+        over the voxels.
+    FULL : str
+        The SHA1 hash of the voxels, a second pass.
+    """
+
+    NONE = "none"
+    GEOMETRY = "geometry"
+    STATS = "stats"
+    FULL = "full"
+
+
+def _clears_caches(method: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a `sitk.Image` method modifying the image in place."""
+
+    @wraps(method)
+    def wrapper(self: MedImage, *args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+        self._clear_caches()
+        return method(self, *args, **kwargs)
+
+    return wrapper
 
 
 class MedImage(sitk.Image):
@@ -159,27 +249,105 @@ class MedImage(sitk.Image):
     @property
     def fingerprint(self) -> dict[str, Any]:  # noqa: ANN001
         """Get image statistics."""
-        filter_ = sitk.StatisticsImageFilter()
-        filter_.Execute(self)
+        return self.compute_fingerprint(FingerprintLevel.FULL)
+
+    def compute_fingerprint(
+        self, level: FingerprintLevel | str = FingerprintLevel.FULL
+    ) -> dict[str, Any]:
+        """Get the fingerprint of the image at the given level.
+
+        Fingerprints are cached on the image, and the cache is cleared when
+        the pixels or the geometry of the image are modified in place. Once
+        the pixels are exposed by `writable_array_view`, they are no longer
+        cached.
+
+        Parameters
+        ----------
+        level : FingerprintLevel | str, optional
+            How much of the image to describe, by default FULL.
+
+        Returns
+        -------
+        dict[str, Any]
+            The fingerprint entries, a copy of the cached ones.
+        """
+        level = FingerprintLevel(level)
+        self._check_caches()
+        cache: dict[FingerprintLevel, dict[str, Any]] = (
+            self.__dict__.setdefault("_fingerprints", {})
+        )
+        if level not in cache:
+            cache[level] = self._fingerprint(level)
+        return dict(cache[level])
+
+    def _fingerprint(self, level: FingerprintLevel) -> dict[str, Any]:
+        """Compute the fingerprint at `level`, from the cached lower level."""
+        match level:
+            case FingerprintLevel.NONE:
+                return {}
+            case FingerprintLevel.GEOMETRY:
+                return {
+                    "class": self.__class__.__name__,
+                    "size": self.size,
+                    "ndim": self.ndim,
+                    "nvoxels": self.size.volume,
+                    "spacing": self.spacing,
+                    "origin": self.origin,
+                    "direction": self.direction,
+                    "dtype_str": self.dtype_str,
+                    "dtype_numpy": self.dtype_np,
+                }
+            case FingerprintLevel.STATS:
+                return {
+                    **self.compute_fingerprint(FingerprintLevel.GEOMETRY),
+                    **array_statistics(sitk.GetArrayViewFromImage(self)),
+                }
+        fingerprint = self.compute_fingerprint(FingerprintLevel.STATS)
         return {
-            "class": self.__class__.__name__,
+            "class": fingerprint.pop("class"),
             "hash": sitk.Hash(self),
-            "size": self.size,
-            "ndim": self.ndim,
-            "nvoxels": self.size.volume,
-            "spacing": self.spacing,
-            "origin": self.origin,
-            "direction": self.direction,
-            "min": filter_.GetMinimum(),
-            "max": filter_.GetMaximum(),
-            "sum": filter_.GetSum(),
-            "mean": filter_.GetMean(),
-            "std": filter_.GetSigma(),
-            "variance": filter_.GetVariance(),
-            "dtype_str": self.dtype_str,
-            "dtype_numpy": self.dtype_np,
+            **fingerprint,
         }
 
+    def _clear_caches(self) -> None:
+        """Drop the values computed from the pixels, called on mutation."""
+        self.__dict__.pop("_fingerprints", None)
+
+    def _expose_buffer(self) -> None:
+        """Stop trusting the caches, the pixels are written through a view.
+
+        Called by `writable_array_view`. Writes through the view cannot be
+        observed, so from then on the caches are dropped whenever they are
+        read (see `_check_caches`).
+        """
+        self.__dict__["_exposed_buffer"] = True
+        self._clear_caches()
+
+    def _check_caches(self) -> None:
+        """Drop the caches if the pixels may have changed behind our back."""
+        if self.__dict__.get("_exposed_buffer", False):
+            self._clear_caches()
+
+    # the sitk.Image methods modifying the pixels or the geometry in place
+    SetPixel = _clears_caches(sitk.Image.SetPixel)
+    SetOrigin = _clears_caches(sitk.Image.SetOrigin)
+    SetSpacing = _clears_caches(sitk.Image.SetSpacing)
+    SetDirection = _clears_caches(sitk.Image.SetDirection)
+    CopyInformation = _clears_caches(sitk.Image.CopyInformation)
+    ToScalarImage = _clears_caches(sitk.Image.ToScalarImage)
+    ToVectorImage = _clears_caches(sitk.Image.ToVectorImage)
+    __setitem__ = _clears_caches(sitk.Image.__setitem__)
+    __iadd__ = _clears_caches(sitk.Image.__iadd__)
+    __isub__ = _clears_caches(sitk.Image.__isub__)
+    __imul__ = _clears_caches(sitk.Image.__imul__)
+    __itruediv__ = _clears_caches(sitk.Image.__itruediv__)
+    __ifloordiv__ = _clears_caches(sitk.Image.__ifloordiv__)
+    __imod__ = _clears_caches(sitk.Image.__imod__)
+    __ipow__ = _clears_caches(sitk.Image.__ipow__)
+    __iand__ = _clears_caches(sitk.Image.__iand__)
+    __ior__ = _clears_caches(sitk.Image.__ior__)
+    __ixor__ = _clears_caches(sitk.Image.__ixor__)
+
     @property
     def serialized_fingerprint(self) -> dict[str, Any]:
         """Get a serialized version of the image fingerprint with primitive types.
@@ -190,7 +358,25 @@ class MedImage(sitk.Image):
             A dictionary with serialized image metadata that can be easily
             converted to JSON or other serialization formats.
         """
-        fp = self.fingerprint.copy()
+        return self.serialize_fingerprint(FingerprintLevel.FULL)
+
+    def serialize_fingerprint(
+        self, level: FingerprintLevel | str = FingerprintLevel.FULL
+    ) -> dict[str, Any]:
+        """Get the fingerprint at the given level with primitive types.
+
+        Parameters
+        ----------
+        level : FingerprintLevel | str, optional
+            How much of the image to describe, by default FULL.
+
+        Returns
+        -------
+        dict[str, Any]
+            A dictionary with serialized image metadata that can be easily
+            converted to JSON or other serialization formats.
+        """
+        fp = self.compute_fingerprint(level)
         # Convert custom types to tuples
         for k, v in fp.items():
             if isinstance(v, (Coordinate3D, Size3D, Spacing3D)):
@@ -0,0 +1,361 @@
+"""Bounding-box cropped storage of multi-channel masks.
+
+A `VectorMask` keeps every ROI as a full channel of a `sitkVectorUInt8`
+image, so its size is the image volume times the number of ROIs, even
+though most structures only cover a small part of the image. A
+`CompactVectorMask` instead keeps every channel as the array of its
+bounding box (a `MaskCrop`), so memory scales with the volume of the
+structures.
+
+The common conversions (`extract_mask`, `to_label_image`,
+`to_sparse_mask`, `to_region_mask`, `has_overlap`) are computed from the
+crops and only allocate the single-channel output. Anything else, e.g. a
+transform, works on the dense `VectorMask`, built once on first use like
+the voxels of a `LazyMedImage`.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterator, Mapping
+
+import numpy as np
+import SimpleITK as sitk
+
+from imgtools.coretypes.base_masks import (
+    Mask,
+    ROIMaskMapping,
+    VectorMask,
+    bitmask_dtype,
+    with_background,
+)
+from imgtools.coretypes.lazy_medimage import LazyMedImage
+from imgtools.loggers import logger
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from imgtools.coretypes.spatial_types import ImageGeometry
+
+__all__ = ["MaskCrop", "CompactVectorMask"]
+
+
+@dataclass(frozen=True)
+class MaskCrop:
+    """A binary mask stored as the array of its bounding box.
+
+    Attributes
+    ----------
+    offset : tuple[int, int, int]
+        (z, y, x) index of the first voxel of `array` in the full grid.
+    array : np.ndarray
+        (Z, Y, X) uint8 array of 0 and 1.
+    """
+
+    offset: tuple[int, int, int]
+    array: np.ndarray
+
+    @classmethod
+    def empty(cls) -> MaskCrop:
+        """A crop without any voxel."""
+        return cls((0, 0, 0), np.zeros((0, 0, 0), dtype=np.uint8))
+
+    @classmethod
+    def from_dense(cls, array: np.ndarray) -> MaskCrop:
+        """Crop a full (Z, Y, X) binary array to its non-zero voxels."""
+        nonzero = [
+            np.flatnonzero(array.any(axis=axes)) for axes in _OTHER_AXES
+        ]
+        if any(len(indices) == 0 for indices in nonzero):
+            return cls.empty()
+        start = tuple(int(indices[0]) for indices in nonzero)
+        stop = tuple(int(indices[-1]) + 1 for indices in nonzero)
+        box = tuple(slice(a, b) for a, b in zip(start, stop, strict=True))
+        return cls(start, np.ascontiguousarray(array[box], dtype=np.uint8))  # type: ignore[arg-type]
+
+    @property
+    def stop(self) -> tuple[int, int, int]:
+        """(z, y, x) index one past the last voxel of `array`."""
+        return tuple(  # type: ignore[return-value]
+            o + n for o, n in zip(self.offset, self.array.shape, strict=True)
+        )
+
+    @property
+    def box(self) -> tuple[slice, slice, slice]:
+        """Slices selecting the crop in the full (Z, Y, X) array."""
+        return tuple(  # type: ignore[return-value]
+            slice(a, b) for a, b in zip(self.offset, self.stop, strict=True)
+        )
+
+    @property
+    def is_empty(self) -> bool:
+        return self.array.size == 0
+
+    def union(self, other: MaskCrop) -> MaskCrop:
+        """Return the voxel-wise OR of two crops."""
+        if other.is_empty:
+            return self
+        if self.is_empty:
+            return other
+        start = np.minimum(self.offset, other.offset)
+        stop = np.maximum(self.stop, other.stop)
+        array = np.zeros(tuple(stop - start), dtype=np.uint8)
+        merged = MaskCrop(tuple(int(i) for i in start), array)  # type: ignore[arg-type]
+        for crop in (self, other):
+            view = merged.view(crop.box)
+            np.bitwise_or(view, crop.array, out=view)
+        return merged
+
+    def view(self, box: tuple[slice, slice, slice]) -> np.ndarray:
+        """View of `array` for a box of the full grid lying inside the crop."""
+        local = tuple(
+            slice(s.start - o, s.stop - o)
+            for s, o in zip(box, self.offset, strict=True)
+        )
+        return self.array[local]
+
+    def intersection(
+        self, other: MaskCrop
+    ) -> tuple[slice, slice, slice] | None:
+        """Return the box shared by both crops, or None if they are apart."""
+        start = np.maximum(self.offset, other.offset)
+        stop = np.minimum(self.stop, other.stop)
+        if np.any(stop <= start):
+            return None
+        return tuple(  # type: ignore[return-value]
+            slice(int(a), int(b)) for a, b in zip(start, stop, strict=True)
+        )
+
+
+_OTHER_AXES = ((1, 2), (0, 2), (0, 1))
+
+
+class CompactVectorMask(LazyMedImage):
+    """A `VectorMask` whose channels are stored as bounding-box crops.
+
+    The ROI mapping and metadata follow the `VectorMask` conventions:
+    index 0 is the background, the channel of `crops[i]` has index `i + 1`.
+
+    Parameters
+    ----------
+    crops : Sequence[MaskCrop]
+        One crop per channel, in channel order.
+    roi_mapping : dict[int, ROIMaskMapping]
+        Mapping from channel indices to `ROIMaskMapping`.
+    metadata : dict[str, str]
+        Metadata of the RTSTRUCT or SEG the mask was built from.
+    geometry : ImageGeometry
+        Geometry of the reference image the mask is aligned with.
+    errors : Mapping[str, Exception] | None, optional
+        Errors from ROI extraction, if any.
+
+    Examples
+    --------
+    >>> compact = rtstruct.get_compact_vector_mask(
+    ...     ct, matcher
+    ... )
+    >>> compact.nbytes  # only the bounding boxes are stored
+    1843200
+    >>> gtv = compact.extract_mask("GTV")
+    >>> dense = compact.to_vector_mask()
+    """
+
+    roi_mapping: dict[int, ROIMaskMapping]
+    errors: Mapping[str, Exception] | None
+
+    def __init__(
+        self,
+        crops: Sequence[MaskCrop],
+        roi_mapping: dict[int, ROIMaskMapping],
+        metadata: dict[str, str],
+        geometry: ImageGeometry,
+        errors: Mapping[str, Exception] | None = None,
+    ) -> None:
+        super().__init__(self._densify, geometry, metadata)
+        self.crops = list(crops)
+        self.roi_mapping = with_background(roi_mapping)
+        self.errors = errors
+        self._mask_cache: dict[str | int, Mask] = {}
+
+    @property
+    def n_masks(self) -> int:
+        """Number of binary mask channels, without the background."""
+        return len(self.crops)
+
+    @property
+    def roi_keys(self) -> list[str]:
+        """List of ROI keys from mapping"""
+        return [mapping.roi_key for mapping in self.roi_mapping.values()]
+
+    @property
+    def shape(self) -> tuple[int, int, int]:
+        """(Z, Y, X) shape of the full grid."""
+        size = self.size
+        return (size.depth, size.height, size.width)
+
+    @property
+    def nbytes(self) -> int:
+        """Number of bytes used by the stored crops."""
+        return sum(crop.array.nbytes for crop in self.crops)
+
+    def to_vector_mask(self) -> VectorMask:
+        """Return the dense `VectorMask`, built once."""
+        return self.load()  # type: ignore[return-value]
+
+    def _densify(self) -> VectorMask:
+        logger.debug(
+            "Densifying compact vector mask.",
+            n_masks=self.n_masks,
+            shape=self.shape,
+        )
+        array = np.zeros((*self.shape, self.n_masks), dtype=np.uint8)
+        for channel, crop in enumerate(self.crops):
+            array[crop.box + (channel,)] = crop.array
+        image = self._to_image(array, is_vector=True)
+        return VectorMask(
+            image,
+            self.roi_mapping,
+            metadata=self._metadata,
+            errors=self.errors,
+        )
+
+    def _to_image(
+        self, array: np.ndarray, is_vector: bool = False
+    ) -> sitk.Image:
+        image = sitk.GetImageFromArray(array, isVector=is_vector)
+        image.SetOrigin(self.GetOrigin())
+        image.SetSpacing(self.GetSpacing())
+        image.SetDirection(self.GetDirection())
+        return image
+
+    def _dense_channel(self, channel: int) -> np.ndarray:
+        array = np.zeros(self.shape, dtype=np.uint8)
+        crop = self.crops[channel]
+        array[crop.box] = crop.array
+        return array
+
+    def __getitem__(self, key):  # type: ignore # noqa
+        """Extract a mask by ROI key or index, like `VectorMask`."""
+        try:
+            return self.extract_mask(key)
+        except (IndexError, KeyError, TypeError):
+            return self.to_vector_mask()[key]
+
+    def iter_masks(
+        self, include_background: bool = False
+    ) -> Iterator[tuple[int, str, list[str], str, Mask]]:
+        """Yield (index, roi_key, roi_names, image_id, Mask) for each mask channel."""
+        for i, mapping in self.roi_mapping.items():
+            if i == 0 and not include_background:
+                continue
+            yield (
+                i,
+                mapping.roi_key,
+                mapping.roi_names,
+                mapping.image_id,
+                self.extract_mask(i),
+            )
+
+    def has_overlap(self) -> bool:
+        """Return True if any voxel has >1 mask.
+
+        Only the boxes shared by two crops are compared.
+        """
+        for i, first in enumerate(self.crops):
+            for second in self.crops[i + 1 :]:
+                box = first.intersection(second)
+                if box is not None and np.any(
+                    first.view(box) & second.view(box)
+                ):
+                    return True
+        return False
+
+    def extract_mask(self, key: str | int) -> Mask:
+        """Extract a single binary mask by index or ROI key.
+
+        Same as `VectorMask.extract_mask`, only the requested channel is
+        densified.
+        """
+        if key in self._mask_cache:
+            logger.debug(f"Cache hit for mask {key}")
+            return self._mask_cache[key]
+
+        mask_metadata = dict(self.metadata)
+
+        match key:
+            case int(idx) if idx > self.n_masks or idx < 0:
+                msg = f"Index {idx} out of bounds for {self.n_masks=} masks."
+                raise IndexError(msg)
+            case int(0) | str("Background"):
+                array = np.ones(self.shape, dtype=np.uint8)
+                for crop in self.crops:
+                    array[crop.box][crop.array == 1] = 0
+                mask_metadata["ROINames"] = "Background"
+            case int(idx):
+                array = self._dense_channel(idx - 1)
+                mask_metadata["ROINames"] = "|".join(
+                    self.roi_mapping[idx].roi_names
+                )
+            case str(key_str):
+                if key_str not in self.roi_keys:
+                    msg = f"Key '{key_str}' not found in mapping"
+                    msg += f" {self.roi_mapping=}"
+                    raise KeyError(msg)
+                idx = self.roi_keys.index(key_str)
+                array = self._dense_channel(idx - 1)
+                mask_metadata["ROINames"] = "|".join(
+                    self.roi_mapping[idx].roi_names
+                )
+            case _:
+                msg = (
+                    f"Invalid key type {type(key)=} where {key=}. "
+                    "Expected int or str."
+                )
+                raise TypeError(msg)
+
+        mask = Mask(self._to_image(array), metadata=mask_metadata)
+        self._mask_cache[key] = mask
+        return mask
+
+    def _to_label_array(self, allow_overlap: bool) -> Mask:
+        """Build the label image of `VectorMask._to_label_array` from the crops."""
+        if self.n_masks > 1 and self.has_overlap():
+            if allow_overlap:
+                logger.warning(
+                    "Vector mask has overlaps. "
+                    "Converting to sparse mask will result in a lossy conversion."
+                )
+            else:
+                raise ValueError(
+                    "Cannot convert to label image: overlap detected. "
+                    "Use `to_sparse_mask()` for lossy conversion that resolves overlaps by label order."
+                    "Or use `to_region_mask()` for lossless conversion that creates a new region per overlap."
+                )
+
+        label_arr = np.zeros(self.shape, dtype=np.uint8)
+        for i, crop in enumerate(self.crops):
+            label_arr[crop.box][crop.array == 1] = i + 1
+        return Mask(self._to_image(label_arr), metadata=dict(self.metadata))
+
+    def to_sparse_mask(self) -> Mask:
+        """Same as `VectorMask.to_sparse_mask`, built from the crops."""
+        return self._to_label_array(allow_overlap=True)
+
+    def to_label_image(self) -> Mask:
+        """Same as `VectorMask.to_label_image`, built from the crops."""
+        return self._to_label_array(allow_overlap=False)
+
+    def to_region_mask(self) -> Mask:
+        """Same as `VectorMask.to_region_mask`, built from the crops."""
+        dtype = bitmask_dtype(self.n_masks)
+        label_arr = np.zeros(self.shape, dtype=dtype)
+        for i, crop in enumerate(self.crops):
+            label_arr[crop.box] |= crop.array.astype(dtype) << dtype.type(i)
+        return Mask(self._to_image(label_arr), metadata=dict(self.metadata))
+
+    def __repr__(self) -> str:
+        return (
+            f"<CompactVectorMask modality={self.metadata.get('Modality', 'Unknown')} "
+            f"size={self.size} n_masks={self.n_masks} nbytes={self.nbytes} "
+            f"roi_mapping={self.roi_mapping!r}>"
+        )
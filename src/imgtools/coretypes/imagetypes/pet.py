@@ -3,20 +3,26 @@ from __future__ import annotations
 import pathlib
 from dataclasses import dataclass
 from enum import Enum
-from typing import TYPE_CHECKING, Any, Dict, Optional
+from typing import Any, Dict, Optional
 
+import numpy as np
 import SimpleITK as sitk
-from pydicom import dcmread
 
 from imgtools.coretypes import MedImage
+from imgtools.dicom.dicom_metadata.modality_utils.pt_utils import (
+    read_pet_scale_factors,
+)
 from imgtools.io.readers import read_dicom_series
 from imgtools.loggers import logger
-
-if TYPE_CHECKING:
-    from pydicom.dataset import FileDataset
+from imgtools.utils import copy_geometry, writable_array_view
 
 __all__ = ["PET", "PETImageType"]
 
+_FACTOR_KEYS = {
+    "SUV": "SUVScaleFactor",
+    "ACT": "ActivityScaleFactor",
+}
+
 
 # alternative to StrEnum for python 3.10 compatibility
 class PETImageType(str, Enum):
@@ -69,6 +75,63 @@ def read_dicom_pet(
     )
 
 
+def _scale_factor(
+    metadata: Dict[str, Any],
+    pet_type: PETImageType,
+    path: str,
+    file_names: list[str] | None,
+) -> float:
+    """Find the factor converting stored PET values to SUV or activity.
+
+    The factor recorded in the metadata (at crawl time, or when the series
+    metadata was extracted) is used when present. Otherwise only the two
+    private scale factor tags of the first file are read.
+    """
+    key = _FACTOR_KEYS[pet_type.value]
+    if key in metadata:
+        factor = metadata[key]
+    else:
+        if file_names:
+            first_file = file_names[0]
+        else:
+            try:
+                first_file = next(pathlib.Path(path).iterdir()).as_posix()
+            except StopIteration as e:
+                msg = f"No files found in directory: {path}"
+                raise FileNotFoundError(msg) from e
+        suv, activity = read_pet_scale_factors(first_file)
+        factor = suv if pet_type == PETImageType.SUV else activity
+
+    if factor in (None, ""):
+        logger.warning(
+            "Scale factor not available in DICOMs. Calculating based on metadata, may contain errors"
+        )
+        # factor = cls.calc_factor(dcm, pet_type)
+        return 1.0  # fallback to 1.0 or re-enable the calc_factor logic
+    return float(factor)
+
+
+def _scale_abs_float32(image: sitk.Image, factor: float) -> sitk.Image:
+    """Compute `sitk.Abs(sitk.Cast(image, sitkFloat32) * factor)` in place.
+
+    The values are cast into a single float32 buffer (the input buffer when
+    it already is float32), then scaled and made absolute without
+    allocating any further volume.
+    """
+    if image.GetPixelID() == sitk.sitkFloat32:
+        output = image
+        values = writable_array_view(output)
+    else:
+        output = sitk.Image(image.GetSize(), sitk.sitkFloat32)
+        copy_geometry(output, image)
+        values = writable_array_view(output)
+        np.copyto(values, sitk.GetArrayViewFromImage(image), casting="unsafe")
+    if factor != 1.0:
+        np.multiply(values, np.float32(factor), out=values)
+    np.abs(values, out=values)
+    return output
+
+
 @dataclass
 class PET(MedImage):
     metadata: Dict[str, str]
@@ -99,7 +162,6 @@ class PET(MedImage):
         If there is no data on SUV/ACT then backup calculation is done based on the formula in the documentation, although, it may
         have some error.
         """
-        # TODO: this logic might repetitive... idk how pet is supposed to be used
         image, metadata = read_dicom_series(
             path,
             series_id=series_id,
@@ -107,41 +169,11 @@ class PET(MedImage):
             file_names=file_names,
             **kwargs,
         )
-        pet = cls(image, metadata=metadata)
-
-        img_pet: sitk.Image = sitk.Cast(pet, sitk.sitkFloat32)
-        directory_path = pathlib.Path(path)
-
-        try:
-            first_file = next(directory_path.iterdir()).as_posix()
-        except StopIteration as e:
-            msg = f"No files found in directory: {path}"
-            raise FileNotFoundError(msg) from e
-
-        dcm: FileDataset = dcmread(first_file)
-
-        pet_type: PETImageType = PETImageType(pet_image_type)
-
-        # Finding the Scale factor
-        try:
-            if pet_type == PETImageType.SUV:
-                factor: float = dcm.to_json_dict()["70531000"]["Value"][0]
-            else:
-                factor = dcm.to_json_dict()["70531009"]["Value"][0]
-        except KeyError:
-            logger.warning(
-                "Scale factor not available in DICOMs. Calculating based on metadata, may contain errors"
-            )
-            # factor = cls.calc_factor(dcm, pet_type)
-            factor = 1.0  # fallback to 1.0 or re-enable the calc_factor logic
-
+        factor = _scale_factor(
+            metadata, PETImageType(pet_image_type), path, file_names
+        )
         # SimpleITK reads some pixel values as negative but with correct value
-        img_pet = sitk.Abs(img_pet * factor)
-
-        # metadata: Dict[str, Union[str, float, bool]] = cls.get_metadata(dcm)
-        # metadata["factor"] = factor
-
-        return cls(img_pet, metadata=metadata)
+        return cls(_scale_abs_float32(image, factor), metadata=metadata)
 
     # @staticmethod
     # def get_metadata(dcm: FileDataset) -> Dict[str, Union[str, float, bool]]:
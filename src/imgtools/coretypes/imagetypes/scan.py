@@ -9,6 +9,8 @@ from imgtools.loggers import logger
 if TYPE_CHECKING:
     import SimpleITK as sitk
 
+    from imgtools.coretypes.box import RegionBox
+
 __all__ = ["Scan"]
 
 
@@ -103,6 +105,8 @@ class Scan(MedImage):
         series_id: str | None = None,
         recursive: bool = False,
         file_names: list[str] | None = None,
+        *,
+        region: RegionBox | None = None,
         **kwargs: Any,  # noqa
     ) -> Scan:
         """Read a DICOM scan from a directory.
@@ -117,8 +121,11 @@ class Scan(MedImage):
             Whether to read the files recursively, by default False
         file_names : list[str] | None, optional
             List of file names to read, by default None
+        region : RegionBox | None, optional
+            Only read the voxels inside this box (in the index space of the
+            full series), by default None
         **kwargs : Any
-            Unused keyword arguments.
+            Passed to `read_dicom_series`.
         Returns
         -------
         Scan
@@ -129,6 +136,7 @@ class Scan(MedImage):
             series_id=series_id,
             recursive=recursive,
             file_names=file_names,
+            region=region,
             **kwargs,
         )
 
@@ -0,0 +1,224 @@
+"""Deferred loading of image series.
+
+A `LazyMedImage` stands in for a `MedImage` whose geometry is already known
+(for instance from the positions recorded while crawling) but whose voxels
+have not been read. Everything that only needs the geometry, such as
+rasterizing an RTSTRUCT onto the reference grid or matching ROI names, works
+on the proxy directly. Pixel access, or any `sitk.Image` method not provided
+by the proxy, reads the series once and forwards to the loaded image.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Callable
+
+import SimpleITK as sitk
+
+from imgtools.coretypes.spatial_types import (
+    Coordinate3D,
+    Direction,
+    ImageGeometry,
+    Size3D,
+    Spacing3D,
+)
+from imgtools.loggers import logger
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from imgtools.coretypes.base_medimage import MedImage
+
+__all__ = ["LazyMedImage", "materialize"]
+
+
+class LazyMedImage:
+    """A `MedImage` proxy that reads its voxels on first use.
+
+    Parameters
+    ----------
+    loader : Callable[[], MedImage]
+        Reads the image. Called at most once.
+    geometry : ImageGeometry
+        The geometry the loaded image is expected to have.
+    metadata : dict[str, Any] | None, optional
+        Metadata available before loading, e.g. from the crawl database.
+        Once loaded, the metadata of the loaded image is used instead.
+
+    Examples
+    --------
+    >>> lazy = LazyMedImage(
+    ...     lambda: scan,
+    ...     scan.geometry,
+    ...     {"Modality": "CT"},
+    ... )
+    >>> lazy.size  # no pixel I/O
+    Size3D(w=512, h=512, d=100)
+    >>> lazy.is_loaded
+    False
+    >>> arr = lazy.to_numpy()  # reads the series
+    >>> lazy.is_loaded
+    True
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], MedImage],
+        geometry: ImageGeometry,
+        metadata: dict[str, Any] | None = None,
+    ) -> None:
+        self._loader = loader
+        self._geometry = geometry
+        self._metadata = metadata or {}
+        self._image: MedImage | None = None
+        self._geometry_image: sitk.Image | None = None
+
+    @classmethod
+    def from_geometry(
+        cls,
+        loader: Callable[[], MedImage],
+        geometry: tuple[
+            Sequence[int], Sequence[float], Sequence[float], Sequence[float]
+        ],
+        metadata: dict[str, Any] | None = None,
+    ) -> LazyMedImage:
+        """Create a proxy from size, origin, spacing and direction values.
+
+        The values are in ITK order, as returned by
+        `imgtools.io.slice_readers.series_geometry`.
+        """
+        size, origin, spacing, direction = geometry
+        return cls(
+            loader,
+            ImageGeometry(
+                size=Size3D(*size),
+                origin=Coordinate3D(*origin),  # type: ignore[arg-type]
+                direction=Direction(tuple(direction)),  # type: ignore[arg-type]
+                spacing=Spacing3D(*spacing),
+            ),
+            metadata,
+        )
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the voxels have been read."""
+        return self._image is not None
+
+    def load(self) -> MedImage:
+        """Read the image, or return it if it was already read."""
+        if self._image is None:
+            image = self._loader()
+            if not _same_geometry(image, self._geometry):
+                logger.warning(
+                    "Loaded image geometry differs from the predicted one.",
+                    predicted=self._geometry,
+                    loaded=image.geometry,
+                )
+            self._image = image
+            self._geometry_image = None
+        return self._image
+
+    @property
+    def metadata(self) -> dict[str, Any]:
+        if self._image is not None:
+            return self._image.metadata
+        return self._metadata
+
+    @property
+    def geometry(self) -> ImageGeometry:
+        if self._image is not None:
+            return self._image.geometry
+        return self._geometry
+
+    @property
+    def size(self) -> Size3D:
+        return self.geometry.size
+
+    @property
+    def origin(self) -> Coordinate3D:
+        return self.geometry.origin
+
+    @property
+    def spacing(self) -> Spacing3D:
+        return self.geometry.spacing
+
+    @property
+    def direction(self) -> Direction:
+        return self.geometry.direction
+
+    @property
+    def ndim(self) -> int:
+        return 3
+
+    # sitk.Image geometry API, answered without reading the voxels
+
+    def GetDimension(self) -> int:  # noqa: N802
+        return 3
+
+    def GetSize(self) -> tuple[int, int, int]:  # noqa: N802
+        return self.size.to_tuple()
+
+    def GetOrigin(self) -> tuple[float, float, float]:  # noqa: N802
+        return self.origin.to_tuple()
+
+    def GetSpacing(self) -> tuple[float, float, float]:  # noqa: N802
+        return self.spacing.to_tuple()
+
+    def GetDirection(self) -> tuple[float, ...]:  # noqa: N802
+        return tuple(self.direction.matrix)
+
+    def TransformPhysicalPointToIndex(  # noqa: N802
+        self, point: Sequence[float]
+    ) -> tuple[int, int, int]:
+        return self._index_space.TransformPhysicalPointToIndex(point)
+
+    def TransformPhysicalPointToContinuousIndex(  # noqa: N802
+        self, point: Sequence[float]
+    ) -> tuple[float, float, float]:
+        return self._index_space.TransformPhysicalPointToContinuousIndex(point)
+
+    def TransformIndexToPhysicalPoint(  # noqa: N802
+        self, index: Sequence[int]
+    ) -> tuple[float, float, float]:
+        return self._index_space.TransformIndexToPhysicalPoint(index)
+
+    def TransformContinuousIndexToPhysicalPoint(  # noqa: N802
+        self, index: Sequence[float]
+    ) -> tuple[float, float, float]:
+        return self._index_space.TransformContinuousIndexToPhysicalPoint(index)
+
+    @property
+    def _index_space(self) -> sitk.Image:
+        """A one-voxel image with the same index to physical mapping."""
+        if self._image is not None:
+            return self._image
+        if self._geometry_image is None:
+            image = sitk.Image([1, 1, 1], sitk.sitkUInt8)
+            image.SetOrigin(self.GetOrigin())
+            image.SetSpacing(self.GetSpacing())
+            image.SetDirection(self.GetDirection())
+            self._geometry_image = image
+        return self._geometry_image
+
+    def __getattr__(self, name: str) -> Any:  # noqa: ANN401
+        # only called for attributes the proxy does not define
+        if name.startswith("__") or name in {"_image", "_loader"}:
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.is_loaded else "not loaded"
+        return (
+            f"LazyMedImage<{self.metadata.get('Modality', 'Unknown')}, "
+            f"size={self.size}, {state}>"
+        )
+
+
+def _same_geometry(image: MedImage, geometry: ImageGeometry) -> bool:
+    return ImageGeometry.from_image(image).is_close(geometry)
+
+
+def materialize(image: Any) -> Any:  # noqa: ANN401
+    """Return the loaded image behind a `LazyMedImage`, else `image`."""
+    if isinstance(image, LazyMedImage):
+        return image.load()
+    return image
@@ -1,3 +1,9 @@
+from .rasterize import (
+    FillRule,
+    rasterize_polygon,
+    rasterize_slice,
+    rasterize_slices,
+)
 from .roi_matching import (
     ROIMatcher,
     ROIMatchFailurePolicy,
@@ -22,6 +28,11 @@ __all__ = [
     "ROIMatchFailurePolicy",
     "Valid_Inputs",
     "create_roi_matcher",
+    # rasterize
+    "FillRule",
+    "rasterize_polygon",
+    "rasterize_slice",
+    "rasterize_slices",
     # structureset
     "RTStructureSet",
     "ContourPointsAcrossSlicesError",
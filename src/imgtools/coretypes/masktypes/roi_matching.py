@@ -1,13 +1,11 @@
 from __future__ import annotations
 
 import re
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from enum import Enum
-from functools import lru_cache
-from itertools import product
-from typing import Annotated, ClassVar
+from typing import Annotated, Any, ClassVar, Iterable, Mapping
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, PrivateAttr, field_validator
 
 from imgtools.loggers import logger
 
@@ -17,6 +15,9 @@ __all__ = [
     "handle_roi_matching",
     "ROIMatchFailurePolicy",
     "ROIMatchingError",
+    "CompiledPatterns",
+    "compile_match_map",
+    "apply_roi_strategy",
 ]
 
 
@@ -108,6 +109,81 @@ Valid_Inputs = (
 """
 
 
+# numbered or named backreferences, which an alternation would renumber
+_BACKREFERENCE = re.compile(r"\\[1-9]|\(\?P=")
+
+
+class CompiledPatterns:
+    """The compiled regex patterns of one key of a match map.
+
+    Parameters
+    ----------
+    patterns : list[PatternString]
+        The regex patterns of the key, in order.
+    flags : int
+        The `re` flags to compile the patterns with.
+
+    Attributes
+    ----------
+    patterns : tuple[re.Pattern[str], ...]
+        Every pattern compiled on its own, in order.
+    combined : re.Pattern[str] | None
+        The alternation of all the patterns, matching a name if any pattern
+        does. None when the patterns cannot be combined (backreferences or
+        inline flags), in which case every pattern is tried.
+    """
+
+    def __init__(self, patterns: list[PatternString], flags: int) -> None:
+        self.patterns = tuple(re.compile(p, flags) for p in patterns)
+        self.combined: re.Pattern[str] | None = None
+        if len(self.patterns) == 1:
+            self.combined = self.patterns[0]
+        elif not any(_BACKREFERENCE.search(p) for p in patterns):
+            try:
+                self.combined = re.compile(
+                    "|".join(f"(?:{p})" for p in patterns), flags
+                )
+            except re.error:
+                # e.g. inline global flags that are not at the start
+                self.combined = None
+
+    def match(self, roi_name: str) -> tuple[int, ...]:
+        """Indices of the patterns that fully match the ROI name."""
+        if self.combined is not None and not self.combined.fullmatch(roi_name):
+            return ()
+        if len(self.patterns) == 1:
+            return (0,)
+        return tuple(
+            i
+            for i, pattern in enumerate(self.patterns)
+            if pattern.fullmatch(roi_name)
+        )
+
+
+def compile_match_map(
+    roi_matching: ROIGroupPatterns, ignore_case: bool = True
+) -> dict[str, CompiledPatterns]:
+    """Compile the regex patterns of every key of a match map.
+
+    Parameters
+    ----------
+    roi_matching : ROIGroupPatterns
+        Mapping of keys to list of regex patterns.
+    ignore_case : bool
+        Whether to ignore case during matching.
+
+    Returns
+    -------
+    dict[str, CompiledPatterns]
+        The compiled patterns, in the order of the keys.
+    """
+    flags = re.IGNORECASE if ignore_case else 0
+    return {
+        key: CompiledPatterns(patterns, flags)
+        for key, patterns in roi_matching.items()
+    }
+
+
 def create_roi_matcher(
     nonvalidated_input: Valid_Inputs,
     handling_strategy: ROIMatchStrategy = ROIMatchStrategy.MERGE,
@@ -158,6 +234,24 @@ class ROIMatcher(BaseModel):
 
     default_key: ClassVar[str] = "ROI"
 
+    match_cache_size: ClassVar[int] = 256
+    """Number of distinct lists of ROI names whose matches are cached."""
+
+    # the compiled match map and the caches are only valid for the
+    # configuration they were built with, see `_compiled_patterns`
+    _configuration: tuple | None = PrivateAttr(default=None)
+    _compiled: dict[str, CompiledPatterns] = PrivateAttr(default_factory=dict)
+    _name_matches: dict[str, dict[str, tuple[int, ...]]] = PrivateAttr(
+        default_factory=dict
+    )
+    _match_cache: OrderedDict[tuple[str, ...], list[tuple[str, list[str]]]] = (
+        PrivateAttr(default_factory=OrderedDict)
+    )
+
+    def model_post_init(self, context: Any) -> None:  # noqa: ANN401
+        """Compile the match map once the matcher is validated."""
+        self._compiled_patterns()
+
     @field_validator("match_map", mode="before")
     @classmethod
     def validate_match_map(cls, v: Valid_Inputs) -> ROIGroupPatterns:
@@ -203,17 +297,117 @@ class ROIMatcher(BaseModel):
         See Also
         --------
         handle_roi_matching : Function to handle the matching logic.
+
+        Notes
+        -----
+        The patterns are compiled once per matcher, and the results are
+        cached per tuple of ROI names and per ROI name, so a dataset
+        repeating the same names matches every name once. See `match_index`
+        to fill the cache from a crawl.
         """
-        return handle_roi_matching(
-            roi_names,
-            self.match_map,
-            self.handling_strategy,
-            ignore_case=self.ignore_case,
-            allow_multi_key_matches=self.allow_multi_key_matches,
-        )
+        compiled = self._compiled_patterns()
+        names = tuple(roi_names)
+        cached = self._match_cache.get(names)
+        if cached is None:
+            hits: dict[str, list[tuple[int, int]]] = {}
+            # private attributes of a pydantic model are slow to look up
+            name_matches = self._name_matches
+            for position, name in enumerate(names):
+                matched = name_matches.get(name)
+                if matched is None:
+                    matched = self._match_name(name)
+                for key, indices in matched.items():
+                    hits.setdefault(key, []).extend(
+                        (index, position) for index in indices
+                    )
+            # pattern by pattern, then in the order of the names
+            raw_results = {
+                key: [names[position] for _, position in sorted(hits[key])]
+                for key in compiled
+                if key in hits
+            }
+            cached = apply_roi_strategy(
+                raw_results,
+                self.handling_strategy,
+                allow_multi_key_matches=self.allow_multi_key_matches,
+            )
+            self._match_cache[names] = cached
+            if len(self._match_cache) > self.match_cache_size:
+                self._match_cache.popitem(last=False)
+        else:
+            self._match_cache.move_to_end(names)
+        return [(key, list(rois)) for key, rois in cached]
+
+    def match_index(
+        self,
+        crawl_index: Iterable[Mapping[str, Any]],
+        modalities: tuple[str, ...] = ("RTSTRUCT", "SEG"),
+    ) -> dict[str, list[tuple[str, list[str]]]]:
+        """Match the ROI names of every series of a crawl in one pass.
+
+        The matches are computed from the `ROINames` of the crawl records,
+        without reading the files, and kept in the cache of the matcher:
+        the `match_rois` calls made later while loading these series (in
+        this process, or in the workers the matcher is pickled to) are
+        cache hits.
 
+        Parameters
+        ----------
+        crawl_index : Iterable[Mapping[str, Any]]
+            The crawl records, e.g. `Crawler.crawl_db`.
+        modalities : tuple[str, ...]
+            The modalities whose `ROINames` are matched.
+
+        Returns
+        -------
+        dict[str, list[tuple[str, list[str]]]]
+            The matches of every series, by SeriesInstanceUID.
+        """
+        matches = {}
+        for record in crawl_index:
+            roi_names = record.get("ROINames")
+            if record.get("Modality") not in modalities or not isinstance(
+                roi_names, list
+            ):
+                continue
+            matches[record["SeriesInstanceUID"]] = self.match_rois(roi_names)
+        logger.debug(
+            "Matched the ROI names of the crawl.",
+            series=len(matches),
+            distinct_names=len(self._name_matches),
+        )
+        return matches
 
-def handle_roi_matching(  # noqa: PLR0912
+    def _compiled_patterns(self) -> dict[str, CompiledPatterns]:
+        """The compiled match map, rebuilt if the matcher was modified."""
+        configuration = (
+            tuple((k, tuple(v)) for k, v in self.match_map.items()),
+            self.ignore_case,
+            self.handling_strategy,
+            self.allow_multi_key_matches,
+        )
+        if configuration != self._configuration:
+            self._compiled = compile_match_map(
+                self.match_map, self.ignore_case
+            )
+            self._name_matches = {}
+            self._match_cache = OrderedDict()
+            self._configuration = configuration
+        return self._compiled
+
+    def _match_name(self, roi_name: str) -> dict[str, tuple[int, ...]]:
+        """Indices of the patterns matching the ROI name, by matched key."""
+        matched = self._name_matches.get(roi_name)
+        if matched is None:
+            matched = {}
+            for key, patterns in self._compiled.items():
+                if indices := patterns.match(roi_name):
+                    matched[key] = indices
+            self._name_matches[roi_name] = matched
+        return matched
+
+
+def handle_roi_matching(
     roi_names: list[str],
     roi_matching: ROIGroupPatterns,
     strategy: ROIMatchStrategy,
@@ -302,19 +496,43 @@ def handle_roi_matching(  # noqa: PLR0912
             **its still available for 'gtv'**
             - KEEP_FIRST: [('primary', ['GTVp']), ('gtv', ['GTVp_2'])]
     """
-    flags = re.IGNORECASE if ignore_case else 0
+    # First pass: collect all potential matches without considering allow_multi_key_matches
+    raw_results: dict[str, list[str]] = defaultdict(list)
+    for key, patterns in compile_match_map(roi_matching, ignore_case).items():
+        for pattern in patterns.patterns:
+            raw_results[key].extend(
+                roi_name
+                for roi_name in roi_names
+                if pattern.fullmatch(roi_name)
+            )
+
+    return apply_roi_strategy(
+        raw_results, strategy, allow_multi_key_matches=allow_multi_key_matches
+    )
 
-    @lru_cache(maxsize=128)
-    def _match_pattern(roi_name: str, pattern: PatternString) -> bool:
-        return re.fullmatch(pattern, roi_name, flags=flags) is not None
 
-    # First pass: collect all potential matches without considering allow_multi_key_matches
-    raw_results = defaultdict(list)
-    for key, patterns in roi_matching.items():
-        for pattern, roi_name in product(patterns, roi_names):
-            if _match_pattern(roi_name, pattern):
-                raw_results[key].append(roi_name)
+def apply_roi_strategy(  # noqa: PLR0912
+    raw_results: Mapping[str, list[str]],
+    strategy: ROIMatchStrategy,
+    allow_multi_key_matches: bool = True,
+) -> list[tuple[str, list[str]]]:
+    """Apply a handling strategy to the ROI names matched by every key.
 
+    Parameters
+    ----------
+    raw_results : Mapping[str, list[str]]
+        The ROI names matched by every key, pattern by pattern.
+    strategy : ROIMatchStrategy
+        Strategy to use: MERGE, KEEP_FIRST, or SEPARATE.
+    allow_multi_key_matches : bool
+        Whether to allow an ROI to match multiple keys.
+
+    Returns
+    -------
+    list[tuple[str, list[str]]]
+        List of tuples containing the key and matched ROI names.
+        See `handle_roi_matching` for notes on the handling strategies.
+    """
     # If no matches were found, return an empty list
     # The ROIMatchFailurePolicy is now handled in the caller
     if not any(raw_results.values()):
@@ -7,6 +7,7 @@ from typing import TYPE_CHECKING, Any
 import highdicom as hd
 import numpy as np
 import SimpleITK as sitk
+from pydicom.pixels import iter_pixels
 
 from imgtools.coretypes.base_masks import ROIMaskMapping, VectorMask
 from imgtools.coretypes.masktypes.roi_matching import (
@@ -18,9 +19,13 @@ from imgtools.coretypes.masktypes.roi_matching import (
 from imgtools.dicom import DicomInput, load_dicom
 from imgtools.dicom.dicom_metadata import extract_metadata
 from imgtools.loggers import logger
+from imgtools.utils import copy_geometry, physical_points_to_idxs
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable
+
     import rich.repr
+    from pydicom import Dataset
 
     from imgtools.coretypes import MedImage
     from imgtools.coretypes.masktypes.roi_matching import (
@@ -29,6 +34,7 @@ if TYPE_CHECKING:
 
 __all__ = [
     "SEG",
+    "match_segment_labels",
     "SegmentationTypeUnsupportedError",
     "SegmentDuplicateError",
     "SegmentDataMissingError",
@@ -136,6 +142,47 @@ class Segment:
         )
 
 
+def match_segment_labels(
+    labels: list[str],
+    roi_matcher: ROIMatcher,
+) -> list[tuple[str, list[str]]]:
+    """Match segment labels, applying the failure policy when none matched.
+
+    The labels can come from a loaded SEG or from the crawl metadata
+    (`ROINames`), so a SEG without any matching segment is never read.
+
+    Raises
+    ------
+    ROIMatchingError
+        If no segments matched the specified patterns and the
+        ROIMatchFailurePolicy is ERROR.
+    """
+    matched_results = roi_matcher.match_rois(labels)
+
+    # Handle the case where no matches were found, according to the policy
+    if not matched_results:
+        message = "No ROIs matched any patterns in the match_map."
+        match roi_matcher.on_missing_regex:
+            case ROIMatchFailurePolicy.IGNORE:
+                # Silently return None
+                pass
+            case ROIMatchFailurePolicy.WARN:
+                logger.warning(
+                    message,
+                    roi_names=labels,
+                    roi_matching=roi_matcher.match_map,
+                )
+            case ROIMatchFailurePolicy.ERROR:
+                # Raise an error
+                errmsg = f"{message} Available ROIs: {labels}, "
+                raise ROIMatchingError(
+                    errmsg,
+                    roi_names=labels,
+                    match_patterns=roi_matcher.match_map,
+                )
+    return matched_results
+
+
 def get_ref_indices(
     seg: hd.seg.Segmentation,
 ) -> np.ndarray:
@@ -172,21 +219,35 @@ def get_ref_indices(
 
 @dataclass
 class SEG:
-    """Represents a DICOM Segmentation (DICOM-SEG) object."""
+    """Represents a DICOM Segmentation (DICOM-SEG) object.
 
-    raw_seg: hd.seg.Segmentation = field(repr=False)
-    ref_indices: np.ndarray = field(repr=False)
+    The pixel data of the segments can be read lazily (see `from_dicom`).
+    A lazy SEG only parses the header of the file: `get_vector_mask` then
+    streams the frames of the matched segments from `path` straight into
+    the mask, and `raw_seg`, `ref_indices` and the `data_array` of the
+    segments stay `None` until `load_segments` is called for them.
+    """
+
+    raw_seg: hd.seg.Segmentation | None = field(repr=False)
+    ref_indices: np.ndarray | None = field(repr=False)
     segments: dict[int, Segment] = field(default_factory=dict)
     metadata: dict[str, Any] = field(default_factory=dict)  # noqa
+    path: Path | None = field(default=None, repr=False)
+    dataset: Dataset | None = field(default=None, repr=False)
 
     @classmethod
-    def from_dicom(  # noqa: PLR0912
+    def from_dicom(
         cls,
         dicom: DicomInput,
         metadata: dict[str, Any] | None = None,
+        lazy: bool = False,
     ) -> SEG:
         """
         Loads a DICOM-SEG object from a DICOM file.
+
+        With `lazy=True` and a file path, only the header is read: frames
+        are retrieved from the file when `get_vector_mask` (or
+        `load_segments`) needs the segments they belong to.
         """
         if isinstance(dicom, (str, Path)):
             dicom = Path(dicom)
@@ -199,9 +260,18 @@ class SEG:
                         f"Cannot determine which one to load."
                     )
                     raise SegmentationError(msg)
-        ds_seg = load_dicom(dicom, stop_before_pixels=False)
+        lazy = lazy and isinstance(dicom, Path)
         try:
-            seg = hd.seg.Segmentation.from_dataset(ds_seg)
+            if lazy:
+                # the frames are read from the file when they are needed
+                seg = None
+                ds_seg = load_dicom(dicom)
+                if "SegmentationType" not in ds_seg:
+                    # highdicom raises the same error when parsing the file
+                    raise KeyError(0x0062000A)
+            else:
+                ds_seg = load_dicom(dicom, stop_before_pixels=False)
+                seg = hd.seg.Segmentation.from_dataset(ds_seg)
         except KeyError as e:
             #  check if KeyError: (0062,000A)
             msg = (
@@ -212,8 +282,8 @@ class SEG:
 
         metadata = metadata or extract_metadata(ds_seg, "SEG", extra_tags=None)  # type: ignore
         segments: dict[int, Segment] = {}
-        for segnum in seg.segment_numbers:
-            segdesc = seg.get_segment_description(segnum)
+        for segdesc in ds_seg.SegmentSequence:
+            segnum = int(segdesc.SegmentNumber)
 
             if segnum in segments:
                 raise SegmentDuplicateError(segdesc.SegmentLabel, segnum)
@@ -223,13 +293,62 @@ class SEG:
                 description=segdesc.get("SegmentDescription", None),
             )
 
-        ref_indices = get_ref_indices(seg)
+        instance = cls(
+            raw_seg=seg,
+            ref_indices=None,
+            segments=segments,
+            metadata={k: v for k, v in metadata.items() if v},
+            path=dicom if lazy else None,  # type: ignore[arg-type]
+            dataset=ds_seg if lazy else None,
+        )
+        if not lazy:
+            instance.load_segments()
+        return instance
+
+    def _segmentation(self) -> hd.seg.Segmentation:
+        """Return `raw_seg`, reading it from `path` the first time."""
+        if self.raw_seg is None:
+            assert self.path is not None
+            self.raw_seg = hd.seg.segread(self.path, lazy_frame_retrieval=True)
+        return self.raw_seg
+
+    def load_segments(
+        self,
+        segment_numbers: Iterable[int] | None = None,
+    ) -> None:
+        """Decode the pixel data of segments that have not been read yet.
+
+        Parameters
+        ----------
+        segment_numbers : Iterable[int] | None, optional
+            The segments to decode, by default all of them.
+
+        Raises
+        ------
+        SegmentationTypeUnsupportedError
+            If the segmentation is neither binary nor fractional.
+        SegmentDataMissingError, SegmentationValidationError
+            If a decoded segment has no data or does not match the
+            reference indices.
+        """
+        seg = self._segmentation()
+        numbers = [
+            number
+            for number in (
+                self.segments if segment_numbers is None else segment_numbers
+            )
+            if self.segments[number].data_array is None
+        ]
+        if self.ref_indices is None:
+            self.ref_indices = get_ref_indices(seg)
+        if not numbers:
+            return
 
         match hd.seg.SegmentationTypeValues(seg.SegmentationType):
             case hd.seg.SegmentationTypeValues.BINARY:
                 # Binary segmentation
-                for segment_number, segment in segments.items():
-                    segment.data_array = (
+                for segment_number in numbers:
+                    self.segments[segment_number].data_array = (
                         seg.get_volume(
                             combine_segments=False,
                             rescale_fractional=False,
@@ -248,30 +367,26 @@ class SEG:
                 )
                 # assume that the pixel array is just for one segment
                 # add to the segment
-                segments[seg.segment_numbers[0]].data_array = seg.pixel_array
+                self.segments[
+                    seg.segment_numbers[0]
+                ].data_array = seg.pixel_array
             case _:
                 raise SegmentationTypeUnsupportedError(seg.SegmentationType)
 
         # sanity check
-        for segment in segments.values():
+        for number in numbers:
+            segment = self.segments[number]
             if segment.data_array is None:
                 raise SegmentDataMissingError(segment.number, segment.label)
             # length of ref_indices should be the same as 0th dimension of data_array
-            if segment.data_array.shape[0] != len(ref_indices):
+            if segment.data_array.shape[0] != len(self.ref_indices):
                 raise SegmentationValidationError(
                     segment.number,
                     segment.label,
                     segment.data_array.shape,
-                    len(ref_indices),
+                    len(self.ref_indices),
                 )
 
-        return cls(
-            raw_seg=seg,
-            ref_indices=ref_indices,
-            segments=segments,
-            metadata={k: v for k, v in metadata.items() if v},
-        )
-
     @property
     def labels(self) -> list[str]:
         """
@@ -324,35 +439,20 @@ class SEG:
         ------
         SegmentationError
             If no segments matched the specified patterns and the ROIMatchFailurePolicy is ERROR.
+
+        Notes
+        -----
+        The matched segments are written in a single (Z, Y, X, C) buffer,
+        one channel per ROI key. A lazy SEG streams the frames of the
+        matched segments from its file into that buffer, the other frames
+        are never decoded and no per-segment volume is allocated.
         """
         roi_identifier_mapping = self.extract_roi_identifiers()
-        roi_names = self.labels
 
-        matched_results = roi_matcher.match_rois(
-            list(roi_identifier_mapping.keys())
+        matched_results = match_segment_labels(
+            list(roi_identifier_mapping.keys()), roi_matcher
         )
-
-        # Handle the case where no matches were found, according to the policy
         if not matched_results:
-            message = "No ROIs matched any patterns in the match_map."
-            match roi_matcher.on_missing_regex:
-                case ROIMatchFailurePolicy.IGNORE:
-                    # Silently return None
-                    pass
-                case ROIMatchFailurePolicy.WARN:
-                    logger.warning(
-                        message,
-                        roi_names=list(roi_identifier_mapping.keys()),
-                        roi_matching=roi_matcher.match_map,
-                    )
-                case ROIMatchFailurePolicy.ERROR:
-                    # Raise an error
-                    errmsg = f"{message} Available ROIs: {list(roi_identifier_mapping.keys())}, "
-                    raise ROIMatchingError(
-                        errmsg,
-                        roi_names=roi_names,
-                        match_patterns=roi_matcher.match_map,
-                    )
             return None
 
         # Process the matches and build the segments
@@ -366,28 +466,151 @@ class SEG:
             ]
             matched_rois.append((key, segs))
 
-        ref_image_indices = [
-            reference_image.TransformPhysicalPointToIndex(pos)
-            for pos in self.ref_indices
-        ]
+        mask_array = np.zeros(
+            (
+                reference_image.size.depth,
+                reference_image.size.height,
+                reference_image.size.width,
+                len(matched_rois),
+            ),
+            dtype=np.uint8,
+        )
+        if self._can_stream(reference_image):
+            self._stream_frames(reference_image, matched_rois, mask_array)
+        else:
+            self._fill_from_segments(reference_image, matched_rois, mask_array)
 
         # we need something to store the mapping
         # so that we can keep track of what the 3D mask matches to
         # the original roi name(s)
-        mapping: dict[int, ROIMaskMapping] = {}
-        mask_images = []
-
-        for iroi, (roi_key, segment_matches) in enumerate(matched_rois):
-            mask_array_3d = np.zeros(
-                (
-                    reference_image.size.depth,
-                    reference_image.size.height,
-                    reference_image.size.width,
-                ),
-                dtype=np.uint8,
+        mapping: dict[int, ROIMaskMapping] = {
+            iroi: ROIMaskMapping(
+                roi_key=roi_key,
+                roi_names=[f"{segment.label}" for segment in segment_matches],
+                image_id=roi_key
+                if roi_matcher.handling_strategy.value == "merge"
+                else f"{roi_key}__[{segment_matches[0].label}]",
             )
-            # we use the pre-stored data in each segment
-            # then for each z slice, we need to determine which index in the output mask
+            for iroi, (roi_key, segment_matches) in enumerate(matched_rois)
+        }
+
+        mask_image = sitk.GetImageFromArray(mask_array, isVector=True)
+        copy_geometry(mask_image, reference_image)
+
+        assert mask_image.GetNumberOfComponentsPerPixel() == len(mapping)
+
+        return VectorMask(
+            image=mask_image,
+            roi_mapping=mapping,
+            metadata=self.metadata,
+            errors=None,
+        )
+
+    def _slice_indices(
+        self,
+        reference_image: MedImage,
+        positions: np.ndarray,
+    ) -> np.ndarray:
+        """Return the z index in `reference_image` of every frame position."""
+        if not len(positions):
+            return np.zeros(0, dtype=np.int64)
+        (indices,) = physical_points_to_idxs(
+            reference_image, [np.asarray(positions, dtype=np.float64)]
+        )
+        return indices[:, 0]
+
+    def _can_stream(self, reference_image: MedImage) -> bool:
+        """Whether the frames can be streamed from the file into the mask.
+
+        Requires a lazy SEG whose frames are on the in-plane grid of the
+        reference image, with a position in every per-frame group.
+        """
+        ds = self.dataset
+        if self.path is None or ds is None or self.raw_seg is not None:
+            return False
+        if (int(ds.Rows), int(ds.Columns)) != (
+            reference_image.size.height,
+            reference_image.size.width,
+        ):
+            return False
+        groups = ds.get("PerFrameFunctionalGroupsSequence")
+        if not groups:
+            return False
+        return all("PlanePositionSequence" in group for group in groups)
+
+    def _frame_index(self) -> tuple[np.ndarray, np.ndarray]:
+        """Return the segment number and the position of every frame."""
+        assert self.dataset is not None
+        shared = self.dataset.get("SharedFunctionalGroupsSequence", [{}])[0]
+        numbers, positions = [], []
+        for group in self.dataset.PerFrameFunctionalGroupsSequence:
+            identification = group.get(
+                "SegmentIdentificationSequence"
+            ) or shared.get("SegmentIdentificationSequence")
+            numbers.append(int(identification[0].ReferencedSegmentNumber))
+            positions.append(
+                group.PlanePositionSequence[0].ImagePositionPatient
+            )
+        return np.array(numbers), np.array(positions, dtype=np.float64)
+
+    def _stream_frames(
+        self,
+        reference_image: MedImage,
+        matched_rois: list[tuple[str, list[Segment]]],
+        mask_array: np.ndarray,
+    ) -> None:
+        """Decode the frames of the matched segments into `mask_array`."""
+        seg_type = hd.seg.SegmentationTypeValues(
+            self.dataset.SegmentationType  # type: ignore[union-attr]
+        )
+        if seg_type not in (
+            hd.seg.SegmentationTypeValues.BINARY,
+            hd.seg.SegmentationTypeValues.FRACTIONAL,
+        ):
+            raise SegmentationTypeUnsupportedError(seg_type.value)
+
+        channels: dict[int, list[int]] = {}
+        for channel, (_, segment_matches) in enumerate(matched_rois):
+            for segment in segment_matches:
+                channels.setdefault(segment.number, []).append(channel)
+
+        frame_segments, positions = self._frame_index()
+        frames = np.flatnonzero(np.isin(frame_segments, list(channels)))
+        z_indices = self._slice_indices(reference_image, positions[frames])
+        in_bounds = (z_indices >= 0) & (z_indices < mask_array.shape[0])
+        if not in_bounds.all():
+            logger.warning(
+                "Frames out of bounds for reference image shape. Skipping.",
+                z_indices=z_indices[~in_bounds].tolist(),
+            )
+        frames, z_indices = frames[in_bounds], z_indices[in_bounds]
+
+        for frame_index, z, frame in zip(
+            frames,
+            z_indices,
+            iter_pixels(self.path, indices=frames.tolist()),  # type: ignore[arg-type]
+            strict=True,
+        ):
+            foreground = frame.astype(bool)
+            for channel in channels[frame_segments[frame_index]]:
+                mask_array[z, :, :, channel] |= foreground
+
+    def _fill_from_segments(
+        self,
+        reference_image: MedImage,
+        matched_rois: list[tuple[str, list[Segment]]],
+        mask_array: np.ndarray,
+    ) -> None:
+        """Decode the matched segments and copy their slices in `mask_array`."""
+        # only the matched segments are decoded
+        self.load_segments(
+            segment.number for _, segs in matched_rois for segment in segs
+        )
+        assert self.ref_indices is not None
+        z_indices = self._slice_indices(reference_image, self.ref_indices)
+
+        for channel, (roi_key, segment_matches) in enumerate(matched_rois):
+            # for each z slice, we need to determine which index in the output mask
             for segment_of_interest in segment_matches:
                 # Use the pre-stored data_array from the segment
                 arr = segment_of_interest.data_array
@@ -399,48 +622,15 @@ class SEG:
                     continue
 
                 # now we insert each slice into the correct index in the 3D mask array
-                for index, seg_slice in zip(
-                    ref_image_indices, arr, strict=True
-                ):
+                for z, seg_slice in zip(z_indices, arr, strict=True):
                     # we need to check if the z index is in bounds of the mask_array
-                    (_x, _y, z) = index
-                    if 0 <= z < reference_image.size.depth:
-                        mask_array_3d[z, :, :] = np.logical_or(
-                            mask_array_3d[z, :, :], seg_slice
-                        )
+                    if 0 <= z < mask_array.shape[0]:
+                        mask_array[z, :, :, channel] |= seg_slice.astype(bool)
                     else:
                         logger.warning(
                             f"Z-index {z} out of bounds for reference image shape. "
                             f"Skipping slice for ROI '{roi_key}'"
                         )
-                mapping[iroi] = ROIMaskMapping(
-                    roi_key=roi_key,
-                    roi_names=segment_matches,
-                    image_id=roi_key
-                    if roi_matcher.handling_strategy.value == "merge"
-                    else f"{roi_key}__[{segment_matches[0].label}]",
-                )
-            mask_images.append(sitk.GetImageFromArray(mask_array_3d))
-
-        mask_image = sitk.Compose(mask_images)
-        mask_image.CopyInformation(reference_image)
-
-        assert mask_image.GetNumberOfComponentsPerPixel() == len(mapping)
-
-        # Update the map to be to strings, not segments
-        for idx, m in mapping.items():
-            mapping[idx] = ROIMaskMapping(
-                roi_key=m.roi_key,
-                roi_names=[f"{segment.label}" for segment in m.roi_names],
-                image_id=m.image_id,
-            )
-
-        return VectorMask(
-            image=mask_image,
-            roi_mapping=mapping,
-            metadata=self.metadata,
-            errors=None,
-        )
 
     def __rich_repr__(self) -> rich.repr.Result:
         yield "segments", self.segments
@@ -12,9 +12,10 @@ from typing import (
 import numpy as np
 import SimpleITK as sitk
 from pydicom.dataset import FileDataset
-from skimage.draw import polygon2mask
 
 from imgtools.coretypes.base_masks import ROIMaskMapping, VectorMask
+from imgtools.coretypes.compact_mask import CompactVectorMask, MaskCrop
+from imgtools.coretypes.masktypes.rasterize import FillRule, rasterize_slices
 from imgtools.coretypes.masktypes.roi_matching import (
     ROIMatchFailurePolicy,
     ROIMatchingError,
@@ -26,7 +27,7 @@ from imgtools.exceptions import (
     ROIContourError,
 )
 from imgtools.loggers import logger
-from imgtools.utils import physical_points_to_idxs
+from imgtools.utils import copy_geometry, physical_points_to_idxs
 
 if TYPE_CHECKING:
     from pydicom.dataset import FileDataset
@@ -215,6 +216,13 @@ class RTStructureSet:
         Dictionary mapping ROI names to their corresponding `ROI` objects.
     roi_map_errors : dict[str, ROIExtractionErrorMsg]
         Dictionary mapping ROI names to any extraction errors encountered.
+    fill_rule : FillRule
+        How contours on the same slice are combined when building masks.
+        `FillRule.UNION` (default) fills every contour, `FillRule.EVEN_ODD`
+        keeps holes described by inner contours. Set it before the first
+        mask is built, masks are cached.
+    raster_threads : int
+        Number of slices rasterized concurrently when building a mask.
 
     Methods
     -------
@@ -248,6 +256,14 @@ class RTStructureSet:
         default_factory=dict,
         init=False,
     )
+    _roi_crop_cache: dict[str, MaskCrop] = field(
+        repr=False,
+        default_factory=dict,
+        init=False,
+    )
+
+    fill_rule: FillRule = field(default=FillRule.UNION, repr=False)
+    raster_threads: int = field(default=1, repr=False)
 
     @property
     def plogger(self):  # type: ignore[no-untyped-def] # noqa
@@ -488,7 +504,10 @@ class RTStructureSet:
         (stored in the `ROIContourSequence[roi_index].ContourSequence.ContourData`
         attribute) into pixel indices representing the boundaries of the
         contour using `physical_points_to_idxs` and then fill the mask
-        using `skimage.draw.polygon2mask`.
+        with the scanline rasterizer in `imgtools.coretypes.masktypes.rasterize`,
+        which gives the same masks as `skimage.draw.polygon2mask` while
+        only touching the bounding box of each contour. Contours are
+        grouped by slice and combined according to `self.fill_rule`.
 
         One key assumption here is that each 2D contour lies on a single axial slice.
         We raise explicit errors if we detect contours that span multiple slices or
@@ -528,6 +547,96 @@ class RTStructureSet:
         if roi_name in self._roi_cache:
             return self._roi_cache[roi_name]
 
+        contours_by_slice = self._contours_by_slice(
+            reference_image, roi_name, mask_img_size, continuous=continuous
+        )
+        mask_array_3d = np.zeros(
+            mask_img_size[0:3],
+            dtype=np.uint8,
+        )
+
+        # the 0/1 uint8 buffer is filled in place through a boolean view
+        rasterize_slices(
+            contours_by_slice,
+            mask_array_3d.view(bool),
+            fill_rule=self.fill_rule,
+            n_threads=self.raster_threads,
+        )
+
+        # Store the mask in the cache
+        self._roi_cache[roi_name] = mask_array_3d
+
+        return mask_array_3d
+
+    def get_mask_crop(
+        self,
+        reference_image: MedImage,
+        roi_name: str,
+        mask_img_size: tuple[int, int, int, int],
+    ) -> MaskCrop:
+        """Get the mask of an ROI cropped to the bounding box of its contours.
+
+        Same as `get_mask_ndarray`, but only the bounding box of the
+        contours (clipped to the image) is allocated and rasterized.
+
+        Returns
+        -------
+        MaskCrop
+            The mask of the ROI and the index of its bounding box.
+        """
+        if roi_name in self._roi_crop_cache:
+            return self._roi_crop_cache[roi_name]
+        if roi_name in self._roi_cache:
+            return MaskCrop.from_dense(self._roi_cache[roi_name])
+
+        contours_by_slice = self._contours_by_slice(
+            reference_image, roi_name, mask_img_size
+        )
+        crop = MaskCrop.empty()
+        if contours_by_slice:
+            points = np.concatenate(
+                [
+                    p
+                    for polygons in contours_by_slice.values()
+                    for p in polygons
+                ]
+            )
+            # pixels outside the bounding box of the vertices are never set
+            start = np.maximum(np.floor(points.min(axis=0)), 0).astype(int)
+            stop = np.minimum(
+                np.ceil(points.max(axis=0)) + 1, mask_img_size[1:3]
+            ).astype(int)
+            first_z, last_z = min(contours_by_slice), max(contours_by_slice)
+            if np.all(stop > start):
+                array = np.zeros(
+                    (last_z - first_z + 1, *(stop - start)), dtype=np.uint8
+                )
+                # contour indices are integers, shifting them is exact
+                rasterize_slices(
+                    {
+                        z - first_z: [polygon - start for polygon in polygons]
+                        for z, polygons in contours_by_slice.items()
+                    },
+                    array.view(bool),
+                    fill_rule=self.fill_rule,
+                    n_threads=self.raster_threads,
+                )
+                crop = MaskCrop((first_z, int(start[0]), int(start[1])), array)
+
+        self._roi_crop_cache[roi_name] = crop
+        return crop
+
+    def _contours_by_slice(
+        self,
+        reference_image: MedImage,
+        roi_name: str,
+        mask_img_size: tuple[int, int, int, int],
+        continuous: bool = False,
+    ) -> dict[int, list[np.ndarray]]:
+        """Convert the contours of an ROI to (row, column) polygons per slice.
+
+        See `get_mask_ndarray` for the parameters and the errors raised.
+        """
         slices = [
             np.array(slc.ContourData).reshape(-1, 3)
             for slc in self.roi_map[roi_name]
@@ -537,10 +646,7 @@ class RTStructureSet:
             reference_image, slices, continuous=continuous
         )
 
-        mask_array_3d = np.zeros(
-            mask_img_size[0:3],
-            dtype=np.uint8,
-        )
+        contours_by_slice: dict[int, list[np.ndarray]] = {}
 
         for contour_num, contour in enumerate(mask_points, start=0):
             # split the contour into z values and the points
@@ -582,19 +688,40 @@ class RTStructureSet:
                         uniq_z_vals,
                     )
 
-            filled_mask_array = polygon2mask(
-                mask_img_size[1:3],
-                slice_points,
-            )
+            contours_by_slice.setdefault(int(z_idx), []).append(slice_points)
 
-            mask_array_3d[z_idx, :, :] = np.logical_or(
-                mask_array_3d[z_idx, :, :], filled_mask_array
-            )
+        return contours_by_slice
 
-        # Store the mask in the cache
-        self._roi_cache[roi_name] = mask_array_3d
+    def _match_rois(
+        self, roi_matcher: ROIMatcher
+    ) -> list[tuple[str, list[str]]]:
+        """Match the ROI names, applying the policy when nothing matched."""
+        matched_rois: list[tuple[str, list[str]]] = roi_matcher.match_rois(
+            self.roi_names
+        )
 
-        return mask_array_3d
+        # Handle the case where no matches were found, according to the policy
+        if not matched_rois:
+            message = "No ROIs matched any patterns in the match_map."
+            match roi_matcher.on_missing_regex:
+                case ROIMatchFailurePolicy.IGNORE:
+                    # Silently continue
+                    pass
+                case ROIMatchFailurePolicy.WARN:
+                    self.plogger.warning(
+                        message,
+                        roi_names=self.roi_names,
+                        roi_matching=roi_matcher.match_map,
+                    )
+                case ROIMatchFailurePolicy.ERROR:
+                    # Raise an error
+                    errmsg = f"{message} Available ROIs: {self.roi_names}, "
+                    raise ROIMatchingError(
+                        errmsg,
+                        roi_names=self.roi_names,
+                        match_patterns=roi_matcher.match_map,
+                    )
+        return matched_rois
 
     def get_vector_mask(
         self,
@@ -648,31 +775,8 @@ class RTStructureSet:
         Its companion class `VectorMask` offers high-level access to
         individual ROIs, label conversion, and overlap inspection.
         """
-        matched_rois: list[tuple[str, list[str]]] = roi_matcher.match_rois(
-            self.roi_names
-        )
-
-        # Handle the case where no matches were found, according to the policy
+        matched_rois = self._match_rois(roi_matcher)
         if not matched_rois:
-            message = "No ROIs matched any patterns in the match_map."
-            match roi_matcher.on_missing_regex:
-                case ROIMatchFailurePolicy.IGNORE:
-                    # Silently return None
-                    pass
-                case ROIMatchFailurePolicy.WARN:
-                    self.plogger.warning(
-                        message,
-                        roi_names=self.roi_names,
-                        roi_matching=roi_matcher.match_map,
-                    )
-                case ROIMatchFailurePolicy.ERROR:
-                    # Raise an error
-                    errmsg = f"{message} Available ROIs: {self.roi_names}, "
-                    raise ROIMatchingError(
-                        errmsg,
-                        roi_names=self.roi_names,
-                        match_patterns=roi_matcher.match_map,
-                    )
             return None
 
         self.plogger.debug("Matched ROIs", matched_rois=matched_rois)
@@ -699,6 +803,8 @@ class RTStructureSet:
             self.plogger.debug(
                 f"Processing {roi_key=} & {matches=} : ({iroi + 1}/{len(matched_rois)})",
             )
+            # the masks of a key are merged in place into its channel
+            channel = mask_array_4d[:, :, :, iroi]
             match matches:
                 case [*many_rois]:
                     # most likely handle type MERGE
@@ -710,25 +816,14 @@ class RTStructureSet:
                             continuous=False,
                         )
                         # here we want to combine the masks in the same 4th dimension
-                        mask_array_4d[:, :, :, iroi] = np.logical_or(
-                            mask_array_4d[:, :, :, iroi], mask_3d
-                        )
-                    # image_id depends on the roi_matcher.handling_strategy
-                    # if merging, image_id is just the key
-                    # if separate, image_id is {roi_key}__[{roi_name}]
-                    # if keeping first, image_id is {roi_key}__[{roi_name}]
-
-                    mapping[iroi] = ROIMaskMapping(
-                        roi_key=roi_key,
-                        roi_names=many_rois,
-                        image_id=roi_key
-                        if roi_matcher.handling_strategy.value == "merge"
-                        else f"{roi_key}__[{many_rois[0]}]",
+                        np.bitwise_or(channel, mask_3d, out=channel)
+                    mapping[iroi] = _roi_mask_mapping(
+                        roi_key, many_rois, roi_matcher
                     )
 
         # convert to sitk image
         mask_image = sitk.GetImageFromArray(mask_array_4d, isVector=True)
-        mask_image.CopyInformation(reference_image)
+        copy_geometry(mask_image, reference_image)
 
         assert mask_image.GetPixelIDValue() == 13
         assert mask_image.GetNumberOfComponentsPerPixel() == len(matched_rois)
@@ -740,6 +835,85 @@ class RTStructureSet:
             errors=self.roi_map_errors,
         )
 
+    def get_compact_vector_mask(
+        self,
+        reference_image: MedImage,
+        roi_matcher: ROIMatcher,
+    ) -> CompactVectorMask | None:
+        """Construct a vector mask storing every channel as its bounding box.
+
+        Same matching and channels as `get_vector_mask`, but every ROI is
+        rasterized into the bounding box of its contours and no
+        (Z, Y, X, C) buffer is allocated, so memory scales with the volume
+        of the structures rather than the image volume times the number of
+        keys. The dense `VectorMask` is built only when needed, see
+        `CompactVectorMask`.
+
+        Parameters
+        ----------
+        reference_image : MedImage
+            The image whose geometry defines the spatial alignment of the masks.
+        roi_matcher : ROIMatcher
+            Matcher used to resolve user-defined keys to actual ROI names.
+
+        Returns
+        -------
+        CompactVectorMask | None
+            The mask, or None if no ROI matched and the policy allows it.
+        """
+        matched_rois = self._match_rois(roi_matcher)
+        if not matched_rois:
+            return None
+
+        self.plogger.debug("Matched ROIs", matched_rois=matched_rois)
+        ref_size = reference_image.size
+        mask_img_size = (
+            ref_size.depth,
+            ref_size.height,
+            ref_size.width,
+            len(matched_rois),
+        )
+
+        def _channel_crop(iroi: int) -> MaskCrop:
+            crop = MaskCrop.empty()
+            for roi_name in matched_rois[iroi][1]:
+                crop = crop.union(
+                    self.get_mask_crop(
+                        reference_image, roi_name, mask_img_size
+                    )
+                )
+            return crop
+
+        crops = [_channel_crop(iroi) for iroi in range(len(matched_rois))]
+
+        mapping = {
+            iroi: _roi_mask_mapping(roi_key, matches, roi_matcher)
+            for iroi, (roi_key, matches) in enumerate(matched_rois)
+        }
+        return CompactVectorMask(
+            crops,
+            mapping,
+            metadata=self.metadata,
+            geometry=reference_image.geometry,
+            errors=self.roi_map_errors,
+        )
+
+
+def _roi_mask_mapping(
+    roi_key: str, roi_names: list[str], roi_matcher: ROIMatcher
+) -> ROIMaskMapping:
+    # image_id depends on the roi_matcher.handling_strategy
+    # if merging, image_id is just the key
+    # if separate, image_id is {roi_key}__[{roi_name}]
+    # if keeping first, image_id is {roi_key}__[{roi_name}]
+    return ROIMaskMapping(
+        roi_key=roi_key,
+        roi_names=roi_names,
+        image_id=roi_key
+        if roi_matcher.handling_strategy.value == "merge"
+        else f"{roi_key}__[{roi_names[0]}]",
+    )
+
 
 if __name__ == "__main__":  # pragma: no cover
     from rich import print  # noqa
@@ -1,4 +1,9 @@
+from __future__ import annotations
+
 from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
 
 from imgtools.coretypes.spatial_types import (
     Coordinate3D,
@@ -7,6 +12,11 @@ from imgtools.coretypes.spatial_types import (
     Spacing3D,
 )
 
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    import SimpleITK as sitk
+
 
 @dataclass(frozen=True)
 class ImageGeometry:
@@ -16,3 +26,53 @@ class ImageGeometry:
     origin: Coordinate3D
     direction: Direction
     spacing: Spacing3D
+
+    @classmethod
+    def from_image(cls, image: sitk.Image) -> ImageGeometry:
+        """Read the geometry of a 3D `sitk.Image`, without its voxels."""
+        return cls(
+            size=Size3D(*image.GetSize()),
+            origin=Coordinate3D(*image.GetOrigin()),
+            direction=Direction(tuple(image.GetDirection())),  # type: ignore[arg-type]
+            spacing=Spacing3D(*image.GetSpacing()),
+        )
+
+    def index_to_physical(
+        self, index: Sequence[float] | np.ndarray
+    ) -> np.ndarray:
+        """Map a (continuous) voxel index to its physical point.
+
+        The same mapping as `sitk.Image.TransformContinuousIndexToPhysicalPoint`.
+        """
+        direction = np.reshape(self.direction.matrix, (3, 3))
+        return np.asarray(self.origin.to_tuple()) + direction @ (
+            np.asarray(index, dtype=np.float64)
+            * np.asarray(self.spacing.to_tuple())
+        )
+
+    def physical_to_index(
+        self, point: Sequence[float] | np.ndarray
+    ) -> np.ndarray:
+        """Map a physical point to its continuous voxel index.
+
+        The inverse of `index_to_physical`.
+        """
+        axes = np.reshape(self.direction.matrix, (3, 3)) * np.asarray(
+            self.spacing.to_tuple()
+        )
+        return np.linalg.solve(
+            axes, np.asarray(point) - np.asarray(self.origin.to_tuple())
+        )
+
+    def is_close(self, other: ImageGeometry) -> bool:
+        """Whether both geometries describe the same voxel grid.
+
+        The sizes must be equal, the origins, spacings and directions equal
+        up to floating point error (`np.allclose`).
+        """
+        return (
+            self.size.to_tuple() == other.size.to_tuple()
+            and np.allclose(self.origin.to_tuple(), other.origin.to_tuple())
+            and np.allclose(self.spacing.to_tuple(), other.spacing.to_tuple())
+            and np.allclose(self.direction.matrix, other.direction.matrix)
+        )
@@ -38,13 +38,19 @@ class CrawlerOutputDirError(Exception):
 
 @dataclass
 class Crawler:
-    """Crawl a DICOM directory and extract metadata."""
+    """Crawl a DICOM directory and extract metadata.
+
+    With `record_pixel_data`, the location of the pixel data of every image
+    instance is recorded too, for the memmap series read mode and lazy
+    loading (see `imgtools.dicom.pixel_data`).
+    """
 
     dicom_dir: Path
     output_dir: Path | None = None
     dataset_name: str | None = None
     n_jobs: int = 1
     force: bool = False
+    record_pixel_data: bool = False
 
     _crawl_results: ParseDicomDirResult | None = field(
         init=False, repr=False, default=None
@@ -71,6 +77,7 @@ class Crawler:
                 dataset_name=self.dataset_name,
                 n_jobs=self.n_jobs,
                 force=self.force,
+                record_pixel_data=self.record_pixel_data,
             )
         self._crawl_results = crawldb
 
@@ -101,6 +108,19 @@ class Crawler:
         first_subseries = next(iter(data.values()))
         return first_subseries["folder"]
 
+    def get_instance_uids(self, series_uid: str) -> list[str]:
+        """Get the SOPInstanceUIDs of all the subseries of a series."""
+        if series_uid not in self.crawl_results.crawl_db_raw:
+            msg = f"Series UID {series_uid} not found in crawl results."
+            raise ValueError(msg)
+
+        data = self.crawl_results.crawl_db_raw[series_uid]
+        return [
+            sop_uid
+            for subseries in data.values()
+            for sop_uid in subseries["instances"]
+        ]
+
     def get_modality(self, series_uid: str) -> str:
         """Get the modality for a given series UID."""
         if series_uid not in self.crawl_results.crawl_db_raw:
@@ -134,6 +154,7 @@ class Crawler:
             "dataset_name",
             "n_jobs",
             "force",
+            "record_pixel_data",
         ]
         return (
             "Crawler(\n"
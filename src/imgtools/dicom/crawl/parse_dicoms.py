@@ -9,10 +9,16 @@ from dpath import (
     search as dpath_search,
 )
 from joblib import Parallel, delayed  # type: ignore
+from pydicom import dcmread
 from tqdm import tqdm
 
 from imgtools.dicom.dicom_find import find_dicoms
 from imgtools.dicom.dicom_metadata import extract_metadata
+from imgtools.dicom.pixel_data import (
+    InstancePixelInfo,
+    PixelLayout,
+    read_pixel_data_location,
+)
 from imgtools.loggers import logger
 from imgtools.utils import timed_context, timer
 
@@ -50,12 +56,48 @@ SopSeriesMap: t.TypeAlias = dict[SopUID, SeriesUID]
 """Datatype represents: {`SOPInstanceUID`: `SeriesInstanceUID`}"""
 
 
+IMAGE_MODALITIES = ("CT", "MR", "PT")
+"""Modalities whose instances are stacked into volumes when loaded."""
+
+
 # Add this outside of any function, at the module level
 def extract_metadata_wrapper(
     dicom: pathlib.Path,
+    record_pixel_data: bool = False,
 ) -> dict[str, object | list[object]]:
-    """Wrapper for extract_metadata to avoid lambda in parallel processing."""
-    return extract_metadata(dicom, None, ["SOPInstanceUID"])
+    """Wrapper for extract_metadata to avoid lambda in parallel processing.
+
+    With `record_pixel_data`, the pixel layout and the location of the
+    pixel data in the file of single-frame image instances are recorded
+    under the `pixel_data` key, using the same header read as the metadata
+    extraction.
+    """
+    with pathlib.Path(dicom).open("rb") as fp:
+        ds = dcmread(fp, force=True, stop_before_pixels=True)
+        location = (
+            read_pixel_data_location(ds, fp) if record_pixel_data else None
+        )
+
+    result = extract_metadata(ds, None, ["SOPInstanceUID"])
+    if (
+        record_pixel_data
+        and result.get("Modality") in IMAGE_MODALITIES
+        and "Rows" in ds
+    ):
+        try:
+            result["pixel_data"] = {
+                "layout": PixelLayout.from_dataset(ds).to_dict(),
+                "instance": InstancePixelInfo.from_dataset(
+                    ds, location
+                ).to_dict(),
+            }
+        except (AttributeError, TypeError, ValueError) as e:
+            logger.debug(
+                "Could not record pixel data layout.",
+                file=str(dicom),
+                error=str(e),
+            )
+    return result
 
 
 @timer("Parsing all DICOMs")
@@ -63,6 +105,7 @@ def parse_all_dicoms(
     dicom_files: list[pathlib.Path],
     top: pathlib.Path,
     n_jobs: int = -1,
+    record_pixel_data: bool = False,
 ) -> tuple[SeriesMetaMap, SopSeriesMap]:
     """Parse a list of DICOM files in parallel and return the metadata.
 
@@ -71,6 +114,9 @@ def parse_all_dicoms(
     1. `series_meta_raw`: A dictionary mapping `SeriesInstanceUID` to
         1 or more `SubSeriesID` and the metadata of each SubSeries.
         where `SubSeriesID` is the `AcquisitionNumber` of the DICOM file.
+        With `record_pixel_data`, image series (CT, MR, PT) also record the
+        per-instance pixel data location under `pixel_data` (see
+        `imgtools.dicom.pixel_data`).
     2. `sop_map`: A dictionary mapping `SOPInstanceUID` to `SeriesInstanceUID`.
 
     ```
@@ -84,6 +130,10 @@ def parse_all_dicoms(
                         <SOPInstanceUID>: <filename>,
                         ...
                     },
+                'pixel_data': {
+                        'layout': {...},
+                        'instances': {<SOPInstanceUID>: {...}, ...},
+                    },
                 }
             }
     }
@@ -100,6 +150,9 @@ def parse_all_dicoms(
         Top directory path (used for relative path calculation)
     n_jobs : int, default=-1
         Number of parallel jobs to run
+    record_pixel_data : bool, default=False
+        Whether to record the pixel data location of image instances, used
+        by the memmap series read mode and lazy loading.
     """
 
     series_meta_raw: SeriesMetaMap = defaultdict(lambda: defaultdict(dict))
@@ -109,7 +162,7 @@ def parse_all_dicoms(
     for dcm, result in zip(
         dicom_files,
         Parallel(n_jobs=n_jobs, return_as="generator")(
-            delayed(extract_metadata_wrapper)(dicom)
+            delayed(extract_metadata_wrapper)(dicom, record_pixel_data)
             for dicom in tqdm(
                 dicom_files,
                 desc=description,
@@ -122,6 +175,7 @@ def parse_all_dicoms(
     ):
         series_uid = result["SeriesInstanceUID"]
         sop_uid = result["SOPInstanceUID"]
+        pixel_data = result.pop("pixel_data", None)
 
         # we cant let the subseries id be None or "None"
         subseries_id = SubSeriesID(result.get("AcquisitionNumber") or "1")
@@ -149,6 +203,12 @@ def parse_all_dicoms(
 
         # Append current instance info
         series_entry["instances"][sop_uid] = filepath.name  # type: ignore
+        if isinstance(pixel_data, dict):
+            series_pixels = series_entry.setdefault(
+                "pixel_data",
+                {"layout": pixel_data["layout"], "instances": {}},
+            )
+            series_pixels["instances"][sop_uid] = pixel_data["instance"]  # type: ignore
 
         # Add the SOP UID to the sop_map dictionary
         sop_map[sop_uid] = series_uid
@@ -156,6 +216,20 @@ def parse_all_dicoms(
     return series_meta_raw, sop_map
 
 
+def has_pixel_data(series_meta_raw: SeriesMetaMap) -> bool:
+    """Whether a crawl recorded the pixel data location of its images.
+
+    A crawl without image series needs none.
+    """
+    images = [
+        meta
+        for subseries_map in series_meta_raw.values()
+        for meta in subseries_map.values()
+        if meta.get("Modality") in IMAGE_MODALITIES
+    ]
+    return not images or any("pixel_data" in meta for meta in images)
+
+
 def series2modality(
     seriesuid: SeriesUID, series_meta_raw: SeriesMetaMap
 ) -> str:
@@ -300,6 +374,8 @@ def parse_dicom_dir(
     extension: str = "dcm",
     n_jobs: int = -1,
     force: bool = True,
+    *,
+    record_pixel_data: bool = False,
 ) -> ParseDicomDirResult:
     """Parse all DICOM files in a directory and return the metadata.
 
@@ -329,6 +405,10 @@ def parse_dicom_dir(
     force : bool, default=True
         If True, overwrite existing crawl database and SOP map JSON files.
         If False, load existing files if they exist.
+    record_pixel_data : bool, default=False
+        Whether to record the pixel data location of every image instance
+        in the crawl database (see `imgtools.dicom.pixel_data`). An existing
+        crawl without it is not loaded, the directory is crawled again.
 
     Returns
     -------
@@ -372,6 +452,7 @@ def parse_dicom_dir(
     sop_map_json: pathlib.Path = output_dir / ds_name / "sop_map.json"
     index_csv: pathlib.Path = output_dir / ds_name / "index.csv"
 
+    series_meta_raw: SeriesMetaMap | None = None
     if (crawl_cache.exists() and sop_map_json.exists()) and not force:
         logger.info(f"{crawl_cache} exists and {force=}. Loading from file.")
         with crawl_cache.open("r") as f:
@@ -379,7 +460,14 @@ def parse_dicom_dir(
         logger.info(f"{sop_map_json} exists and {force=}. Loading from file.")
         with sop_map_json.open("r") as f:
             sop_map = json.load(f)
-    else:
+        if record_pixel_data and not has_pixel_data(series_meta_raw):
+            logger.info(
+                "The crawl cache has no pixel data locations. Recrawling.",
+                crawl_cache=crawl_cache,
+            )
+            series_meta_raw = None
+
+    if series_meta_raw is None:
         dicom_files = find_dicoms(search_directory, extension=extension)
         if not dicom_files:
             msg = f"No DICOM files found in {search_directory} with extension {extension}"
@@ -388,7 +476,10 @@ def parse_dicom_dir(
         logger.info(f"Found {len(dicom_files)} DICOM files in {dicom_dir}")
 
         series_meta_raw, sop_map = parse_all_dicoms(
-            dicom_files, search_directory, n_jobs=n_jobs
+            dicom_files,
+            search_directory,
+            n_jobs=n_jobs,
+            record_pixel_data=record_pixel_data,
         )
 
         with crawl_cache.open("w") as f:
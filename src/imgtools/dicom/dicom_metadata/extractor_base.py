@@ -261,7 +261,9 @@ class ModalityMetadataExtractor(ABC):
                     "This may be due to missing or malformed data in the DICOM file."
                 )
                 warnmsg += f" Error: {e}"
-                logger.warning(warnmsg, file=str(dicom))
+                logger.warning(
+                    warnmsg, file=str(getattr(dicom, "filename", dicom))
+                )
                 output[key] = ""
 
         # sort all keys
@@ -1,9 +1,11 @@
 from typing import Mapping
 
 from pydicom import Dataset
+from pydicom.tag import BaseTag
 
 from imgtools.dicom.dicom_metadata.extractor_base import (
     ComputedField,
+    ComputedValue,
     ModalityMetadataExtractor,
     classproperty,
 )
@@ -237,12 +239,30 @@ class PTMetadataExtractor(ModalityMetadataExtractor):
         """
         PET-specific computed fields.
 
+        The private scale factors are recorded so that `PET.from_dicom` does
+        not have to read the instances again to convert the pixel values.
+
         Returns
         -------
         Mapping[str, ComputedField]
             Mapping of field names to functions that compute values from DICOM datasets.
         """
-        return {}
+        from imgtools.dicom.dicom_metadata.modality_utils.pt_utils import (
+            ACTIVITY_SCALE_FACTOR_TAG,
+            SUV_SCALE_FACTOR_TAG,
+            pet_scale_factor,
+        )
+
+        def _factor(ds: Dataset, tag: BaseTag) -> ComputedValue:
+            factor = pet_scale_factor(ds, tag)
+            return "" if factor is None else factor
+
+        return {
+            "SUVScaleFactor": lambda ds: _factor(ds, SUV_SCALE_FACTOR_TAG),
+            "ActivityScaleFactor": lambda ds: _factor(
+                ds, ACTIVITY_SCALE_FACTOR_TAG
+            ),
+        }
 
 
 @register_extractor
@@ -1,3 +1,9 @@
+from .pt_utils import (
+    ACTIVITY_SCALE_FACTOR_TAG,
+    SUV_SCALE_FACTOR_TAG,
+    pet_scale_factor,
+    read_pet_scale_factors,
+)
 from .rtdose_utils import (
     RTDOSERefPlanSOP,
     RTDOSERefSeries,
@@ -42,6 +48,11 @@ __all__ = [
     "RTDOSERefStructSOP",
     "RTDOSERefPlanSOP",
     "RTDOSERefSeries",
+    # pt
+    "pet_scale_factor",
+    "read_pet_scale_factors",
+    "SUV_SCALE_FACTOR_TAG",
+    "ACTIVITY_SCALE_FACTOR_TAG",
     # sr
     "sr_reference_uids",
     "SR_RefSeries",
@@ -0,0 +1,72 @@
+from pathlib import Path
+
+from pydicom import dcmread
+from pydicom.dataset import Dataset
+from pydicom.multival import MultiValue
+from pydicom.tag import BaseTag, Tag
+
+__all__ = [
+    "SUV_SCALE_FACTOR_TAG",
+    "ACTIVITY_SCALE_FACTOR_TAG",
+    "pet_scale_factor",
+    "read_pet_scale_factors",
+]
+
+SUV_SCALE_FACTOR_TAG = Tag(0x7053, 0x1000)
+"""Philips private tag holding the factor converting pixels to SUV."""
+
+ACTIVITY_SCALE_FACTOR_TAG = Tag(0x7053, 0x1009)
+"""Philips private tag holding the factor converting pixels to Bq/ml."""
+
+
+def pet_scale_factor(ds: Dataset, tag: BaseTag) -> float | None:
+    """Return the value of a private PET scale factor tag.
+
+    Parameters
+    ----------
+    ds : Dataset
+        A PET dataset, read with or without its pixel data.
+    tag : BaseTag
+        `SUV_SCALE_FACTOR_TAG` or `ACTIVITY_SCALE_FACTOR_TAG`.
+
+    Returns
+    -------
+    float | None
+        The scale factor, or None if the tag is missing or not a number.
+    """
+    element = ds.get(tag)
+    if element is None or element.value in (None, b"", ""):
+        return None
+    value = element.value
+    # without a known private creator implicit VR files give raw DS bytes
+    if isinstance(value, bytes):
+        value = value.decode("ascii", errors="ignore").strip("\x00 ")
+    if isinstance(value, MultiValue):
+        value = value[0]
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def read_pet_scale_factors(
+    path: str | Path,
+) -> tuple[float | None, float | None]:
+    """Read the SUV and activity scale factors from a PET file header.
+
+    Only the two private tags are parsed, the pixel data is never read.
+
+    Returns
+    -------
+    tuple[float | None, float | None]
+        The SUV and activity concentration scale factors.
+    """
+    ds = dcmread(
+        path,
+        stop_before_pixels=True,
+        specific_tags=[SUV_SCALE_FACTOR_TAG, ACTIVITY_SCALE_FACTOR_TAG],
+    )
+    return (
+        pet_scale_factor(ds, SUV_SCALE_FACTOR_TAG),
+        pet_scale_factor(ds, ACTIVITY_SCALE_FACTOR_TAG),
+    )
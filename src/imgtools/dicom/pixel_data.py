@@ -0,0 +1,320 @@
+"""Locate the native pixel data of single-frame DICOM instances.
+
+For uncompressed little endian transfer syntaxes the pixel data of an
+instance is stored verbatim at a fixed byte offset in the file. Recording
+that offset (together with the per-instance position and rescale values)
+while crawling lets the memory-mapped series reader in
+`imgtools.io.slice_readers` read the voxels straight into a volume buffer
+without decoding the files again.
+
+When the crawler is asked to (`Crawler.record_pixel_data`, set by
+`SampleInput` for the memmap read mode and lazy loading), the information
+is stored in the crawl database under the `pixel_data` key of every image
+series:
+
+```
+{
+    "layout": {"transfer_syntax_uid": ..., "rows": ..., ...},
+    "instances": {
+        <SOPInstanceUID>: {"offset": ..., "length": ..., "position": ...},
+        ...
+    },
+}
+```
+"""
+
+from __future__ import annotations
+
+import struct
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any
+
+import numpy as np
+from pydicom import dcmread
+from pydicom.uid import ExplicitVRLittleEndian, ImplicitVRLittleEndian
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+
+    from pydicom.dataset import Dataset
+
+__all__ = [
+    "NATIVE_LITTLE_ENDIAN_SYNTAXES",
+    "PixelLayout",
+    "InstancePixelInfo",
+    "SeriesPixelData",
+    "read_pixel_data_location",
+    "read_instance_pixel_info",
+]
+
+NATIVE_LITTLE_ENDIAN_SYNTAXES = frozenset(
+    {ImplicitVRLittleEndian, ExplicitVRLittleEndian}
+)
+"""Transfer syntaxes whose pixel data can be read without decoding."""
+
+_PIXEL_DATA_TAG = struct.pack("<HH", 0x7FE0, 0x0010)
+_UNDEFINED_LENGTH = 0xFFFFFFFF
+
+
+@dataclass(frozen=True)
+class PixelLayout:
+    """Pixel module attributes shared by the instances of a series.
+
+    Attributes
+    ----------
+    transfer_syntax_uid : str
+        Transfer syntax of the instances.
+    rows, columns : int
+        Size of one frame.
+    bits_allocated, bits_stored : int
+        Size of the pixel container and number of meaningful bits.
+    pixel_representation : int
+        0 for unsigned, 1 for two's complement signed pixels.
+    samples_per_pixel : int
+        Number of components per pixel.
+    pixel_spacing : tuple[float, float]
+        Row and column spacing, as stored in `PixelSpacing`.
+    orientation : tuple[float, ...]
+        The six direction cosines of `ImageOrientationPatient`.
+    """
+
+    transfer_syntax_uid: str
+    rows: int
+    columns: int
+    bits_allocated: int
+    bits_stored: int
+    pixel_representation: int
+    samples_per_pixel: int
+    pixel_spacing: tuple[float, float]
+    orientation: tuple[float, ...]
+
+    @classmethod
+    def from_dataset(cls, ds: Dataset) -> PixelLayout:
+        """Build the layout from the header of an instance."""
+        return cls(
+            transfer_syntax_uid=str(ds.file_meta.TransferSyntaxUID),
+            rows=int(ds.Rows),
+            columns=int(ds.Columns),
+            bits_allocated=int(ds.BitsAllocated),
+            bits_stored=int(ds.get("BitsStored", ds.BitsAllocated)),
+            pixel_representation=int(ds.get("PixelRepresentation", 0)),
+            samples_per_pixel=int(ds.get("SamplesPerPixel", 1)),
+            pixel_spacing=tuple(  # type: ignore[arg-type]
+                float(v) for v in ds.get("PixelSpacing", (1.0, 1.0))
+            ),
+            orientation=tuple(
+                float(v)
+                for v in ds.get(
+                    "ImageOrientationPatient", (1.0, 0.0, 0.0, 0.0, 1.0, 0.0)
+                )
+            ),
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> PixelLayout:
+        return cls(
+            **{
+                **data,
+                "pixel_spacing": tuple(data["pixel_spacing"]),
+                "orientation": tuple(data["orientation"]),
+            }
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    @property
+    def is_native(self) -> bool:
+        """Whether the pixel data can be read as a plain array."""
+        return (
+            self.transfer_syntax_uid in NATIVE_LITTLE_ENDIAN_SYNTAXES
+            and self.samples_per_pixel == 1
+            and self.bits_allocated in (8, 16, 32)
+        )
+
+    @property
+    def dtype(self) -> np.dtype:
+        """The numpy dtype of the stored pixel values."""
+        kind = "i" if self.pixel_representation else "u"
+        return np.dtype(f"<{kind}{self.bits_allocated // 8}")
+
+    @property
+    def frame_nbytes(self) -> int:
+        """Number of bytes of one frame."""
+        return self.rows * self.columns * self.bits_allocated // 8
+
+    @property
+    def stored_range(self) -> tuple[int, int]:
+        """Smallest and largest value representable with `bits_stored`."""
+        if self.pixel_representation:
+            return (
+                -(1 << (self.bits_stored - 1)),
+                (1 << (self.bits_stored - 1)) - 1,
+            )
+        return 0, (1 << self.bits_stored) - 1
+
+
+@dataclass(frozen=True)
+class InstancePixelInfo:
+    """Per-instance information needed to place a slice in a volume.
+
+    Attributes
+    ----------
+    offset : int | None
+        Byte offset of the pixel data value in the file, `None` when the
+        pixel data is encapsulated (compressed) or could not be located.
+    length : int | None
+        Length in bytes of the pixel data value.
+    position : tuple[float, float, float] | None
+        `ImagePositionPatient` of the instance.
+    slope, intercept : float
+        `RescaleSlope` and `RescaleIntercept` of the instance.
+    """
+
+    offset: int | None
+    length: int | None
+    position: tuple[float, float, float] | None
+    slope: float = 1.0
+    intercept: float = 0.0
+
+    @classmethod
+    def from_dataset(
+        cls,
+        ds: Dataset,
+        location: tuple[int, int] | None,
+    ) -> InstancePixelInfo:
+        """Build the instance information from its header."""
+        position = ds.get("ImagePositionPatient")
+        offset, length = location if location else (None, None)
+        return cls(
+            offset=offset,
+            length=length,
+            position=(
+                tuple(float(v) for v in position)  # type: ignore[arg-type]
+                if position
+                else None
+            ),
+            slope=float(ds.get("RescaleSlope", 1.0) or 1.0),
+            intercept=float(ds.get("RescaleIntercept", 0.0) or 0.0),
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> InstancePixelInfo:
+        position = data.get("position")
+        return cls(
+            offset=data.get("offset"),
+            length=data.get("length"),
+            position=tuple(position) if position else None,  # type: ignore[arg-type]
+            slope=data.get("slope", 1.0),
+            intercept=data.get("intercept", 0.0),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def read_pixel_data_location(
+    ds: Dataset,
+    fp: IO[bytes],
+) -> tuple[int, int] | None:
+    """Locate the pixel data value of an instance read up to its pixels.
+
+    `fp` must be the file object `ds` was read from with
+    `stop_before_pixels=True`, still positioned at the start of the
+    `PixelData` element.
+
+    Returns
+    -------
+    tuple[int, int] | None
+        The byte offset and length of the pixel data value, or `None` for
+        multi-frame instances, non-native transfer syntaxes, encapsulated
+        pixel data or when the element is not found at the file position.
+    """
+    transfer_syntax = getattr(ds.get("file_meta"), "TransferSyntaxUID", None)
+    if transfer_syntax not in NATIVE_LITTLE_ENDIAN_SYNTAXES:
+        return None
+    if int(ds.get("NumberOfFrames", 1) or 1) != 1:
+        return None
+
+    start = fp.tell()
+    header = fp.read(12)
+    if len(header) < 8 or header[:4] != _PIXEL_DATA_TAG:  # noqa: PLR2004
+        return None
+
+    if transfer_syntax == ImplicitVRLittleEndian:
+        header_length = 8
+        (length,) = struct.unpack("<I", header[4:8])
+    else:
+        # OB/OW have 2 reserved bytes followed by a 4-byte length
+        header_length = 12
+        (length,) = struct.unpack("<I", header[8:12])
+
+    if length == _UNDEFINED_LENGTH:
+        return None
+    return start + header_length, length
+
+
+def read_instance_pixel_info(
+    path: str | Path,
+) -> tuple[PixelLayout, InstancePixelInfo]:
+    """Read the pixel layout and location of one instance (header only)."""
+    with Path(path).open("rb") as fp:
+        ds = dcmread(fp, force=True, stop_before_pixels=True)
+        location = read_pixel_data_location(ds, fp)
+    return (
+        PixelLayout.from_dataset(ds),
+        InstancePixelInfo.from_dataset(ds, location),
+    )
+
+
+@dataclass(frozen=True)
+class SeriesPixelData:
+    """Pixel data locations of the instances of a series.
+
+    Attributes
+    ----------
+    layout : PixelLayout
+        Layout recorded for the first instance of the series.
+    instances : dict[str, InstancePixelInfo]
+        Per-instance information keyed by the path of the instance file.
+    """
+
+    layout: PixelLayout
+    instances: dict[str, InstancePixelInfo]
+
+    @classmethod
+    def from_crawl(
+        cls,
+        entries: Iterable[Mapping[str, Any]],
+        root_dir: Path,
+    ) -> SeriesPixelData | None:
+        """Collect the pixel data recorded while crawling a series.
+
+        Parameters
+        ----------
+        entries : Iterable[Mapping[str, Any]]
+            The crawl database entries of the (sub)series to combine.
+        root_dir : Path
+            Directory the `instances` file names are relative to.
+
+        Returns
+        -------
+        SeriesPixelData | None
+            `None` when the crawl did not record any pixel data, e.g. for
+            crawls made by older versions.
+        """
+        layout = None
+        instances = {}
+        for entry in entries:
+            if not (pixel_data := entry.get("pixel_data")):
+                continue
+            layout = layout or PixelLayout.from_dict(pixel_data["layout"])
+            file_names = entry.get("instances", {})
+            for sop_uid, info in pixel_data["instances"].items():
+                if file_name := file_names.get(sop_uid):
+                    path = (root_dir / file_name).as_posix()
+                    instances[path] = InstancePixelInfo.from_dict(info)
+        if layout is None:
+            return None
+        return cls(layout=layout, instances=instances)
@@ -426,7 +426,7 @@ if __name__ == "__main__":
         loaded_sample = input(sample)
 
         with contextlib.suppress(Exception):
-            output(loaded_sample, SampleNumber=f"{idx:03}")
+            output(loaded_sample, SampleNumber=f"{idx:03}")  # type: ignore[arg-type]
 
         if idx == 5:
             break
@@ -6,6 +6,15 @@ from typing import TYPE_CHECKING, Any, Optional, Union
 import SimpleITK as sitk
 
 from imgtools.dicom.dicom_metadata import extract_metadata
+from imgtools.dicom.pixel_data import SeriesPixelData
+from imgtools.io.slice_readers import (
+    SeriesReadMode,
+    read_series_gdcm,
+    read_series_memmap,
+    read_series_region,
+    read_series_threaded,
+    sort_by_position,
+)
 from imgtools.utils import (
     attrify,
     cleanse_metadata,
@@ -16,17 +25,69 @@ if TYPE_CHECKING:
     from imgtools.coretypes import (
         SEG,
         MedImage,
+        RegionBox,
         RTStructureSet,
     )
 # Type for dispatch functions return values
 MedImageT = Union["MedImage", "RTStructureSet", "SEG"]
 
 
+def _gdcm_series_file_names(
+    path: str,
+    series_id: str | None,
+    recursive: bool,
+) -> list[str]:
+    return list(
+        sitk.ImageSeriesReader.GetGDCMSeriesFileNames(
+            path,
+            seriesID=series_id if series_id else "",
+            recursive=recursive,
+        )
+    )
+
+
+def read_series_metadata(
+    file_name: str,
+    metadata: dict | None = None,
+) -> dict:
+    """Return the cleaned metadata of a series, as `read_dicom_series` does.
+
+    Parameters
+    ----------
+    file_name
+        The first file of the series, the metadata is extracted from it
+        when `metadata` is not given.
+    metadata, default=None
+        Metadata to clean instead.
+
+    Returns
+    -------
+    dict
+        The metadata, cleansed, with datetime values converted and
+        attribute access.
+    """
+    if not metadata:
+        # Extract metadata from the first file
+        metadata = extract_metadata(file_name)
+    # make sure its a dictionary
+    elif not isinstance(metadata, dict):
+        raise ValueError("metadata must be a dictionary")
+
+    metadata = cleanse_metadata(metadata)
+    metadata = convert_dictionary_datetime_values(metadata)
+    return attrify(metadata)
+
+
 def read_dicom_series(
     path: str,
     series_id: str | None = None,
     recursive: bool = False,
     file_names: list[str] | None = None,
+    *,
+    read_mode: SeriesReadMode | str = SeriesReadMode.GDCM,
+    n_threads: int = 1,
+    pixel_data: SeriesPixelData | None = None,
+    region: "RegionBox | None" = None,
     **kwargs: Any,  # noqa
 ) -> tuple[sitk.Image, dict]:
     """Read DICOM series as SimpleITK Image.
@@ -49,6 +110,28 @@ def read_dicom_series(
         If there are multiple acquisitions/"subseries" for an individual series,
         use the provided list of file_names to set the ImageSeriesReader.
 
+    read_mode, default=SeriesReadMode.GDCM
+        How the instances are decoded. `"gdcm"` uses
+        `sitk.ImageSeriesReader`, `"threaded"` decodes the instances on a
+        thread pool and stacks them into a preallocated volume, `"memmap"`
+        reads uncompressed pixel data straight into the output buffer.
+        See `imgtools.io.slice_readers`.
+
+    n_threads, default=1
+        Number of threads used by the `"threaded"` and `"memmap"` modes.
+
+    pixel_data, default=None
+        Pixel data locations recorded while crawling, used by the
+        `"memmap"` mode. When it holds the position of every requested
+        file, the files are sorted from it instead of scanning the
+        directory with GDCM.
+
+    region, default=None
+        Box, in the voxel grid of the full series, to read. Only the
+        instances intersecting its z-extent are read and they are cropped
+        in-plane while the volume is assembled. The result has the same
+        voxels and geometry as `region.crop_image` on the full series.
+
     Returns
     -------
     image
@@ -56,18 +139,24 @@ def read_dicom_series(
     metadata
         Dictionary containing metadata extracted from one file in the series.
     """
-    reader = sitk.ImageSeriesReader()
-    sitk_file_names = reader.GetGDCMSeriesFileNames(
-        path,
-        seriesID=series_id if series_id else "",
-        recursive=recursive,
-    )
-    if file_names is None:
-        file_names = sitk_file_names
-    elif set(file_names) <= set(
-        sitk_file_names
+    read_mode = SeriesReadMode(read_mode)
+    sorted_files = None
+    if (
+        (read_mode == SeriesReadMode.MEMMAP or region is not None)
+        and file_names
+        and pixel_data
+    ):
+        sorted_files = sort_by_position(file_names, pixel_data)
+
+    requested = set(file_names) if file_names is not None else None
+    if sorted_files is not None:
+        file_names = sorted_files
+    elif requested is None:
+        file_names = _gdcm_series_file_names(path, series_id, recursive)
+    elif requested <= set(
+        sitk_file_names := _gdcm_series_file_names(path, series_id, recursive)
     ):  # Extracts the same order provided by sitk
-        file_names = [fn for fn in sitk_file_names if fn in file_names]
+        file_names = [fn for fn in sitk_file_names if fn in requested]
     else:
         errmsg = (
             "The provided file_names are not a subset of the files in the "
@@ -77,21 +166,31 @@ def read_dicom_series(
         errmsg += f"\n\nFiles in directory: {sitk_file_names}"
         raise ValueError(errmsg)
 
-    reader.SetFileNames(file_names)
-
-    metadata = kwargs.pop("metadata", None)
-
-    if not metadata:
-        # Extract metadata from the first file
-        metadata = extract_metadata(file_names[0])
-    # make sure its a dictionary
-    elif not isinstance(metadata, dict):
-        raise ValueError("metadata must be a dictionary")
+    metadata = read_series_metadata(
+        file_names[0], kwargs.pop("metadata", None)
+    )
 
-    metadata = cleanse_metadata(metadata)
-    metadata = convert_dictionary_datetime_values(metadata)
-    metadata = attrify(metadata)
-    return reader.Execute(), metadata
+    if region is not None:
+        image = read_series_region(
+            file_names,
+            index=region.min.to_tuple(),
+            size=region.size.to_tuple(),
+            read_mode=read_mode,
+            n_threads=n_threads,
+            pixel_data=pixel_data,
+        )
+        return image, metadata
+
+    match read_mode:
+        case SeriesReadMode.THREADED:
+            image = read_series_threaded(file_names, n_threads=n_threads)
+        case SeriesReadMode.MEMMAP:
+            image = read_series_memmap(
+                file_names, pixel_data=pixel_data, n_threads=n_threads
+            )
+        case _:
+            image = read_series_gdcm(file_names)
+    return image, metadata
 
 
 def read_dicom_auto(
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import multiprocessing
 from collections import defaultdict
+from functools import partial
 from pathlib import Path
 from typing import TYPE_CHECKING, Sequence, cast
 
@@ -13,7 +14,7 @@ from pydantic import (
     model_validator,
 )
 
-from imgtools.coretypes import MedImage
+from imgtools.coretypes import LazyMedImage, MedImage
 from imgtools.coretypes.masktypes import (
     SEG,
     ROIMatcher,
@@ -23,9 +24,20 @@ from imgtools.coretypes.masktypes import (
     Valid_Inputs as ROIMatcherInputs,
     create_roi_matcher,
 )
+from imgtools.coretypes.masktypes.seg import match_segment_labels
 from imgtools.dicom.crawl import Crawler
 from imgtools.dicom.interlacer import Interlacer, SeriesNode
-from imgtools.io.readers import MedImageT, read_dicom_auto
+from imgtools.dicom.pixel_data import SeriesPixelData
+from imgtools.io.readers import (
+    MedImageT,
+    read_dicom_auto,
+    read_series_metadata,
+)
+from imgtools.io.slice_readers import (
+    SeriesReadMode,
+    series_geometry,
+    sort_by_position,
+)
 from imgtools.io.validators import (
     validate_modalities,
 )
@@ -36,6 +48,9 @@ if TYPE_CHECKING:
 
 __all__ = ["SampleInput"]
 
+LAZY_MODALITIES = ("CT", "MR", "PT")
+"""Modalities that can be returned as `LazyMedImage` by `SampleInput`."""
+
 
 class SampleInput(BaseModel):
     """
@@ -58,7 +73,16 @@ class SampleInput(BaseModel):
         List of modalities to include. None means include all modalities.
     roi_matcher : ROIMatcher
         Configuration for matching regions of interest in the images.
-
+    series_read_mode : SeriesReadMode
+        How image series are decoded, see `imgtools.io.slice_readers`.
+    reader_threads : int
+        Number of threads used to decode the instances of one series.
+    lazy_loading : bool
+        Whether to defer reading the voxels of CT, MR and PT series until a
+        transform or pixel access needs them. Default is False.
+    compact_masks : bool
+        Whether RTSTRUCT masks are returned as `CompactVectorMask`, storing
+        every channel as its bounding box. Default is False.
 
     Examples
     --------
@@ -125,6 +149,29 @@ class SampleInput(BaseModel):
         description="Configuration for ROI (Region of Interest) matching in segmentation data. Defines how regions are identified, matched and processed from RTSTRUCT or SEG files.",
         title="ROI Matcher Configuration",
     )
+    series_read_mode: SeriesReadMode = Field(
+        default=SeriesReadMode.GDCM,
+        description="How the instances of an image series are decoded. 'gdcm' uses SimpleITK's ImageSeriesReader, 'threaded' decodes the instances on a thread pool and stacks them into a preallocated volume, 'memmap' reads uncompressed pixel data straight into the volume using the offsets recorded while crawling.",
+        title="Series Read Mode",
+        examples=["gdcm", "threaded", "memmap"],
+    )
+    reader_threads: int = Field(
+        default=1,
+        description="Number of threads used to decode the instances of a single series when series_read_mode is 'threaded' or 'memmap'.",
+        title="Reader Threads",
+        ge=1,
+        examples=[1, 4, 8],
+    )
+    lazy_loading: bool = Field(
+        default=False,
+        description="Defer reading the voxels of CT, MR and PT series until a transform or pixel access needs them. The geometry is predicted from the positions recorded while crawling, so ROI matching and mask rasterization never read the image series.",
+        title="Lazy Loading",
+    )
+    compact_masks: bool = Field(
+        default=False,
+        description="Store the channels of RTSTRUCT masks as their bounding boxes instead of full-size channels. Memory then scales with the volume of the structures, the dense mask is only built when a transform needs it.",
+        title="Compact Masks",
+    )
     _crawler: Crawler | None = PrivateAttr(default=None)
     _interlacer: Interlacer | None = PrivateAttr(default=None)
 
@@ -157,6 +204,11 @@ class SampleInput(BaseModel):
         roi_on_missing_regex: str | ROIMatchFailurePolicy = (
             ROIMatchFailurePolicy.IGNORE
         ),
+        *,
+        series_read_mode: str | SeriesReadMode = SeriesReadMode.GDCM,
+        reader_threads: int = 1,
+        lazy_loading: bool = False,
+        compact_masks: bool = False,
     ) -> "SampleInput":
         """Create a SampleInput with separate parameters for ROIMatcher.
 
@@ -187,6 +239,15 @@ class SampleInput(BaseModel):
             Whether to allow one ROI to match multiple keys in the match_map.
         roi_on_missing_regex : str | ROIMatchFailurePolicy, optional
             How to handle when no ROI matches any pattern in match_map.
+        series_read_mode : str | SeriesReadMode, optional
+            How image series are decoded, by default SeriesReadMode.GDCM
+        reader_threads : int, optional
+            Number of threads used to decode one series, by default 1
+        lazy_loading : bool, optional
+            Whether to defer reading image voxels, by default False
+        compact_masks : bool, optional
+            Whether to store RTSTRUCT mask channels as bounding boxes,
+            by default False
 
         Returns
         -------
@@ -222,6 +283,10 @@ class SampleInput(BaseModel):
             n_jobs=num_jobs,
             modalities=modalities,
             roi_matcher=roi_matcher,
+            series_read_mode=SeriesReadMode(series_read_mode),
+            reader_threads=reader_threads,
+            lazy_loading=lazy_loading,
+            compact_masks=compact_masks,
         )
 
     @classmethod
@@ -252,6 +317,11 @@ class SampleInput(BaseModel):
                 dataset_name=self.dataset_name,
                 force=self.update_crawl,
                 n_jobs=self.n_jobs,
+                # only these read the voxels from the recorded locations
+                record_pixel_data=(
+                    self.series_read_mode == SeriesReadMode.MEMMAP
+                    or self.lazy_loading
+                ),
             )
             crawler.crawl()
             self._crawler = crawler
@@ -294,7 +364,7 @@ class SampleInput(BaseModel):
         modality: str,
         folder: str,
         load_subseries: bool = False,
-    ) -> list[MedImageT]:
+    ) -> list[MedImageT | LazyMedImage]:
         """
         Read a medical image series from DICOM files.
 
@@ -317,9 +387,11 @@ class SampleInput(BaseModel):
 
         Returns
         -------
-        list[MedImageT]
+        list[MedImageT | LazyMedImage]
             A list of loaded medical images, one per subseries if load_subseries=True,
-            otherwise a list containing a single combined image
+            otherwise a list containing a single combined image.
+            With `lazy_loading`, CT, MR and PT series whose geometry is
+            known from the crawl are returned as `LazyMedImage`.
 
         Raises
         ------
@@ -333,18 +405,10 @@ class SampleInput(BaseModel):
             msg = f"Directory does not exist: {root_dir}"
             raise FileNotFoundError(msg)
 
-        file_name_sets = []
         series_info = self.crawler.crawl_db_raw[series_uid]
+        subseries_sets = []
         if load_subseries:
-            for subseries in series_info:
-                file_name_sets.append(
-                    [
-                        (root_dir / file_name).as_posix()
-                        for file_name in series_info[subseries][
-                            "instances"
-                        ].values()
-                    ]
-                )
+            subseries_sets = [[subseries] for subseries in series_info]
         else:
             if len(series_info) > 1:
                 msg = (
@@ -352,32 +416,57 @@ class SampleInput(BaseModel):
                     "load_subseries is set to False. Combining into one image."
                 )
                 logger.warning(msg, folder=folder, modality=modality)
-            file_name_sets.append(
-                [
-                    (root_dir / file_name).as_posix()
-                    for subseries in series_info
-                    for file_name in series_info[subseries][
-                        "instances"
-                    ].values()
-                ]
-            )
+            subseries_sets.append(list(series_info))
 
         # load the series
-        return [
-            read_dicom_auto(
+        images: list[MedImageT | LazyMedImage] = []
+        for subseries_set in subseries_sets:
+            file_names = [
+                (root_dir / file_name).as_posix()
+                for subseries in subseries_set
+                for file_name in series_info[subseries]["instances"].values()
+            ]
+            pixel_data = SeriesPixelData.from_crawl(
+                (series_info[subseries] for subseries in subseries_set),
+                root_dir,
+            )
+            loader = partial(
+                read_dicom_auto,
                 path=root_dir.as_posix(),
                 modality=modality,
-                file_names=file_name_set,
+                file_names=file_names,
                 series_id=series_uid,
+                read_mode=self.series_read_mode,
+                n_threads=self.reader_threads,
+                pixel_data=pixel_data,
             )
-            for file_name_set in file_name_sets
-        ]
+            geometry = (
+                series_geometry(file_names, pixel_data)
+                if self.lazy_loading
+                and pixel_data is not None
+                and modality in LAZY_MODALITIES
+                else None
+            )
+            if geometry is None:
+                images.append(loader())
+                continue
+            # the voxels are read when a transform or pixel access needs them,
+            # the metadata is the one the loaded image will have
+            sorted_files = sort_by_position(file_names, pixel_data)  # type: ignore[arg-type]
+            images.append(
+                LazyMedImage.from_geometry(
+                    loader,  # type: ignore[arg-type]
+                    geometry,
+                    read_series_metadata((sorted_files or file_names)[0]),
+                )
+            )
+        return images
 
     def __call__(  # noqa: PLR0912
         self,
         sample: Sequence[SeriesNode],
         load_subseries: bool = False,
-    ) -> Sequence[MedImage | VectorMask]:
+    ) -> Sequence[MedImage | LazyMedImage | VectorMask]:
         """
         Load a complete sample of medical images and masks from DICOM series.
 
@@ -402,9 +491,10 @@ class SampleInput(BaseModel):
 
         Returns
         -------
-        Sequence[MedImage | VectorMask]
+        Sequence[MedImage | LazyMedImage | VectorMask]
             Collection of loaded medical images and vector masks, with the reference
-            image always as the first element
+            image always as the first element. With `lazy_loading`, images
+            are `LazyMedImage` proxies that `Transformer` reads when needed.
 
         Raises
         ------
@@ -452,10 +542,12 @@ class SampleInput(BaseModel):
             load_subseries=load_subseries,
         )
 
-        images: Sequence[MedImage] = []
+        images: Sequence[MedImage | LazyMedImage] = []
 
         # hack to satisfy mypy for now
-        reference_scans = cast("list[MedImage]", reference_images)
+        reference_scans = cast(
+            "list[MedImage | LazyMedImage]", reference_images
+        )
 
         # Extract the first (of possibly many subseries) as the reference image
         reference_image = reference_scans[0]
@@ -481,10 +573,10 @@ class SampleInput(BaseModel):
     def _load_non_ref_image(
         self,
         load_subseries: bool,
-        reference_image: MedImage,
+        reference_image: MedImage | LazyMedImage,
         modality: str,
         series: SeriesNode,
-    ) -> MedImage | VectorMask | None:
+    ) -> MedImage | LazyMedImage | VectorMask | None:
         """Load a non-reference image series based on modality."""
         series_info = self.crawler.get_series_info(
             series_uid=series.SeriesInstanceUID
@@ -492,14 +584,41 @@ class SampleInput(BaseModel):
         try:
             match modality:
                 case "RTSTRUCT" | "SEG":
-                    mask_klass = (
-                        RTStructureSet if modality == "RTSTRUCT" else SEG
+                    roi_names = series_info.get("ROINames")
+                    if (
+                        modality == "SEG"
+                        and isinstance(roi_names, list)
+                        and not match_segment_labels(
+                            roi_names, self.roi_matcher
+                        )
+                    ):
+                        # the segment labels from the crawl did not match,
+                        # the file is not read
+                        return None
+                    dicom = self.directory.parent / series.folder
+                    mask = (
+                        RTStructureSet.from_dicom(
+                            dicom=dicom,
+                            metadata=series_info,  # pass along metadata
+                        )
+                        if modality == "RTSTRUCT"
+                        # only the frames of the matched segments are
+                        # streamed from the file
+                        else SEG.from_dicom(
+                            dicom=dicom,
+                            metadata=series_info,
+                            lazy=True,
+                        )
                     )
-                    vm = mask_klass.from_dicom(
-                        dicom=self.directory.parent / series.folder,
-                        metadata=series_info,  # pass along metadata
-                    ).get_vector_mask(
-                        reference_image=reference_image,
+                    # a LazyMedImage answers the geometry queries made
+                    # while building the mask without reading voxels
+                    if self.compact_masks and isinstance(mask, RTStructureSet):
+                        return mask.get_compact_vector_mask(
+                            reference_image=cast("MedImage", reference_image),
+                            roi_matcher=self.roi_matcher,
+                        )
+                    vm = mask.get_vector_mask(
+                        reference_image=cast("MedImage", reference_image),
                         roi_matcher=self.roi_matcher,
                     )
                     return vm
@@ -513,7 +632,10 @@ class SampleInput(BaseModel):
                     # if len (misc) > 1, that means that somehow a non-reference
                     # image has multiple subseries, which is not expected
                     # and we should handle this at some point
-                    assert isinstance(misc[0], MedImage) and len(misc) == 1
+                    assert (
+                        isinstance(misc[0], (MedImage, LazyMedImage))
+                        and len(misc) == 1
+                    )
                     return misc[0]
                 case _:
                     msg = f"Unsupported modality: {modality}"
@@ -595,4 +717,4 @@ if __name__ == "__main__":  # pragma: no cover
             except ValueError as e:
                 logger.error(f"Error loading series: {e}")
                 continue
-            medoutput(result)
+            medoutput(result)  # type: ignore[arg-type]
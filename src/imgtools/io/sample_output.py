@@ -10,7 +10,12 @@ from pydantic import (
     field_validator,
 )
 
-from imgtools.coretypes import MedImage, VectorMask
+from imgtools.coretypes import (
+    CompactVectorMask,
+    FingerprintLevel,
+    MedImage,
+    VectorMask,
+)
 from imgtools.io.validators import validate_directory
 from imgtools.io.writers import (
     AbstractBaseWriter,
@@ -91,6 +96,11 @@ class SampleOutput(BaseModel):
         How to handle existing files (FAIL, SKIP, OVERWRITE).
     extra_context : Dict[str, Any]
         Additional metadata to include when saving files.
+    fingerprint_level : FingerprintLevel
+        How much of every saved image is described in the index (NONE,
+        GEOMETRY, STATS, FULL).
+    feret_diameter : bool
+        Whether to add the feret diameter of every saved mask to the index.
 
     Examples
     --------
@@ -131,6 +141,16 @@ class SampleOutput(BaseModel):
             {"dataset": "NSCLC-Radiomics", "processing_date": "2025-04-22"}
         ],
     )
+    fingerprint_level: FingerprintLevel = Field(
+        default=FingerprintLevel.FULL,
+        description="How much of every saved image is described in the index: NONE, GEOMETRY (header only), STATS (one pass over the voxels) or FULL (adds the voxel hash).",
+        title="Fingerprint Level",
+    )
+    feret_diameter: bool = Field(
+        default=False,
+        description="Add the feret diameter of every saved mask to the index (mask.feret_diameter), at the STATS and FULL fingerprint levels. Slow for large masks.",
+        title="Feret Diameter",
+    )
 
     _writer: AbstractBaseWriter | None = PrivateAttr(default=None)
 
@@ -141,6 +161,8 @@ class SampleOutput(BaseModel):
             existing_file_mode=self.existing_file_mode,
             filename_format=self.filename_format,
             context=self.extra_context,
+            fingerprint_level=self.fingerprint_level,
+            feret_diameter=self.feret_diameter,
         )
 
     @field_validator("directory")
@@ -188,7 +210,7 @@ class SampleOutput(BaseModel):
         save_errors = []
         for image in data:
             try:
-                if isinstance(image, VectorMask):
+                if isinstance(image, (VectorMask, CompactVectorMask)):
                     for (
                         _i,
                         roi_key,
@@ -0,0 +1,631 @@
+"""Alternative slice-stacking readers for DICOM image series.
+
+`sitk.ImageSeriesReader` decodes the instances of a series one after the
+other on a single thread. For large series (or compressed transfer
+syntaxes) the decode step dominates loading time, so this module provides
+readers that decode the instances independently and stack them into one
+preallocated volume.
+
+For uncompressed little endian files, `read_series_memmap` skips decoding
+altogether: the pixel data of every instance is read straight from its byte
+offset (recorded while crawling, see `imgtools.dicom.pixel_data`) into the
+buffer of the output image, and the rescale slope/intercept is applied in
+place.
+
+The output images reproduce the geometry computed by ITK's
+`ImageSeriesReader` for the same (already sorted) list of files:
+
+- the origin is the position of the first slice
+- the in-plane spacing and the direction come from the first slice
+- the slice spacing is the distance between the first and the last slice
+  divided by the number of gaps
+"""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+import SimpleITK as sitk
+
+from imgtools.dicom.pixel_data import (
+    InstancePixelInfo,
+    PixelLayout,
+    SeriesPixelData,
+    read_instance_pixel_info,
+)
+from imgtools.loggers import logger
+from imgtools.utils import writable_array_view
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+__all__ = [
+    "SeriesReadMode",
+    "read_series_gdcm",
+    "read_series_threaded",
+    "read_series_memmap",
+    "read_series_region",
+    "sort_by_position",
+    "series_geometry",
+    "SeriesGeometry",
+]
+
+
+# alternative to StrEnum for python 3.10 compatibility
+class SeriesReadMode(str, Enum):
+    """
+    Strategy used by `read_dicom_series` to decode the instances of a series.
+
+    Attributes
+    ----------
+    GDCM : str
+        Use `sitk.ImageSeriesReader` (single threaded, the default).
+    THREADED : str
+        Decode each instance with its own SimpleITK reader on a thread pool
+        and copy the slices into a preallocated volume.
+    MEMMAP : str
+        Read uncompressed little endian pixel data straight from the files
+        into the output buffer. Other transfer syntaxes fall back to GDCM.
+    """
+
+    GDCM = "gdcm"
+    THREADED = "threaded"
+    MEMMAP = "memmap"
+
+
+def read_series_gdcm(file_names: Sequence[str]) -> sitk.Image:
+    """Read a sorted list of DICOM files with `sitk.ImageSeriesReader`."""
+    reader = sitk.ImageSeriesReader()
+    reader.SetFileNames(list(file_names))
+    return reader.Execute()
+
+
+_thread_state = threading.local()
+
+
+def _read_slice(file_name: str) -> sitk.Image:
+    """Read one instance, reusing a file reader per thread."""
+    reader = getattr(_thread_state, "reader", None)
+    if reader is None:
+        reader = sitk.ImageFileReader()
+        reader.SetImageIO("GDCMImageIO")
+        _thread_state.reader = reader
+    reader.SetFileName(file_name)
+    return reader.Execute()
+
+
+def _slice_view(image: sitk.Image) -> np.ndarray:
+    """Return a view of a single slice image with a leading slice axis."""
+    view = sitk.GetArrayViewFromImage(image)
+    if image.GetDimension() == 2:  # noqa: PLR2004
+        return view[np.newaxis]
+    return view
+
+
+def _stack_geometry(
+    image: sitk.Image,
+    first_slice: sitk.Image,
+    last_origin: tuple[float, ...],
+) -> None:
+    """Set the geometry of a stacked volume the way ITK's series reader does."""
+    n_slices = image.GetDepth()
+    first_origin = np.array(first_slice.GetOrigin()[:3])
+    gap = np.linalg.norm(np.array(last_origin[:3]) - first_origin)
+
+    slice_spacing = gap / (n_slices - 1) if gap > 0 else 1.0
+    spacing = first_slice.GetSpacing()
+    image.SetSpacing((spacing[0], spacing[1], slice_spacing))
+    image.SetOrigin(tuple(first_origin))
+    if first_slice.GetDimension() == 3:  # noqa: PLR2004
+        image.SetDirection(first_slice.GetDirection())
+
+
+def read_series_threaded(
+    file_names: Sequence[str],
+    n_threads: int = 4,
+    *,
+    crop: tuple[slice, slice] | None = None,
+) -> sitk.Image:
+    """Decode the instances of a series in parallel and stack them.
+
+    Each instance is read with its own SimpleITK reader on a thread pool and
+    copied into the buffer of the preallocated output image.
+
+    Parameters
+    ----------
+    file_names : Sequence[str]
+        Paths of the instances, already sorted along the slice axis
+        (e.g. by `sitk.ImageSeriesReader.GetGDCMSeriesFileNames`).
+    n_threads : int, default=4
+        Number of worker threads used to decode the instances.
+    crop : tuple[slice, slice] | None, optional
+        Row and column slices kept from every instance while stacking.
+        The geometry is not adjusted for the crop, see `read_series_region`.
+
+    Returns
+    -------
+    sitk.Image
+        The stacked volume, with the same pixel type and geometry as
+        `sitk.ImageSeriesReader` would produce.
+
+    Notes
+    -----
+    Multi-frame instances cannot be stacked slice by slice, so series whose
+    first instance holds more than one frame are read with
+    `read_series_gdcm` instead.
+    """
+    first_slice = _read_slice(file_names[0])
+    first_view = _slice_view(first_slice)
+    if len(file_names) == 1 and crop is None:
+        return first_slice
+    if first_view.shape[0] != 1:
+        return read_series_gdcm(file_names)
+
+    rows, columns = crop or (slice(None), slice(None))
+    plane_shape = first_view.shape[1:3]
+    cropped = first_view[0, rows, columns]
+    image = sitk.Image(
+        [cropped.shape[1], cropped.shape[0], len(file_names)],
+        first_slice.GetPixelID(),
+        first_slice.GetNumberOfComponentsPerPixel(),
+    )
+    volume = writable_array_view(image)
+    volume[0] = cropped
+
+    def _load(index: int) -> tuple[float, ...]:
+        slice_image = _read_slice(file_names[index])
+        view = _slice_view(slice_image)
+        if view.shape[1:3] != plane_shape:
+            msg = (
+                f"Instance {file_names[index]} has shape {view.shape[1:3]}, "
+                f"expected {plane_shape} like the first instance."
+            )
+            raise ValueError(msg)
+        volume[index] = view[0, rows, columns]
+        return slice_image.GetOrigin()
+
+    with ThreadPoolExecutor(max_workers=max(1, n_threads)) as pool:
+        origins = list(pool.map(_load, range(1, len(file_names))))
+
+    _stack_geometry(
+        image, first_slice, origins[-1] if origins else first_slice.GetOrigin()
+    )
+    return image
+
+
+###############################################################################
+# Memory-mapped reading of native (uncompressed) pixel data
+###############################################################################
+
+_SITK_PIXEL_TYPES = {
+    np.dtype("uint8"): sitk.sitkUInt8,
+    np.dtype("int8"): sitk.sitkInt8,
+    np.dtype("uint16"): sitk.sitkUInt16,
+    np.dtype("int16"): sitk.sitkInt16,
+    np.dtype("uint32"): sitk.sitkUInt32,
+    np.dtype("int32"): sitk.sitkInt32,
+    np.dtype("float64"): sitk.sitkFloat64,
+}
+
+
+def _rescaled_dtype(
+    layout: PixelLayout,
+    slope: float,
+    intercept: float,
+) -> np.dtype:
+    """Pixel type GDCM uses for rescaled values.
+
+    Mirrors `gdcm::Rescaler::ComputeInterceptSlopePixelType`: non-integer
+    rescale values give float64, integer ones the smallest integer type
+    holding the rescaled range of the stored pixel format.
+    """
+    if slope == 1 and intercept == 0:
+        return layout.dtype
+    if slope != int(slope) or intercept != int(intercept):
+        return np.dtype("float64")
+
+    low, high = sorted(slope * v + intercept for v in layout.stored_range)
+    candidates = ("uint8", "uint16", "uint32")
+    if low < 0:
+        candidates = ("int8", "int16", "int32")
+    for name in candidates:
+        info = np.iinfo(name)
+        if info.min <= low and high <= info.max:
+            return np.dtype(name)
+    return np.dtype("float64")
+
+
+def _mask_stored_bits(array: np.ndarray, layout: PixelLayout) -> None:
+    """Discard the bits above `BitsStored`, sign-extending signed pixels."""
+    unused = layout.bits_allocated - layout.bits_stored
+    if unused <= 0:
+        return
+    if layout.pixel_representation:
+        array <<= unused
+        array >>= unused
+    else:
+        array &= (1 << layout.bits_stored) - 1
+
+
+def sort_by_position(
+    file_names: Sequence[str],
+    pixel_data: SeriesPixelData,
+) -> list[str] | None:
+    """Sort instances along the slice normal using crawl-time positions.
+
+    Parameters
+    ----------
+    file_names : Sequence[str]
+        Paths of the instances to sort.
+    pixel_data : SeriesPixelData
+        Pixel data recorded while crawling the series.
+
+    Returns
+    -------
+    list[str] | None
+        The sorted paths, or `None` if a position is missing.
+    """
+    positions = []
+    for file_name in file_names:
+        info = pixel_data.instances.get(file_name)
+        if info is None or info.position is None:
+            return None
+        positions.append(info.position)
+
+    row, column = np.reshape(pixel_data.layout.orientation, (2, 3))
+    distances = np.asarray(positions) @ np.cross(row, column)
+    return [file_names[i] for i in np.argsort(distances, kind="stable")]
+
+
+SeriesGeometry = tuple[
+    tuple[int, int, int],
+    tuple[float, float, float],
+    tuple[float, float, float],
+    tuple[float, ...],
+]
+"""Size, origin, spacing and direction of a volume, in ITK order."""
+
+
+def _series_geometry(
+    layout: PixelLayout,
+    first: tuple[float, float, float] | None,
+    last: tuple[float, float, float] | None,
+    n_slices: int,
+) -> SeriesGeometry:
+    """Geometry ITK's `ImageSeriesReader` assigns to a sorted series."""
+    row, column = np.reshape(layout.orientation, (2, 3))
+    normal = np.cross(row, column)
+    direction = tuple(
+        float(v) for v in np.column_stack([row, column, normal]).ravel()
+    )
+    gap = (
+        float(np.linalg.norm(np.subtract(last, first)))
+        if first is not None and last is not None
+        else 0.0
+    )
+    slice_spacing = gap / (n_slices - 1) if gap > 0 else 1.0
+    row_spacing, column_spacing = layout.pixel_spacing
+    return (
+        (layout.columns, layout.rows, n_slices),
+        first if first is not None else (0.0, 0.0, 0.0),
+        (column_spacing, row_spacing, slice_spacing),
+        direction,
+    )
+
+
+def series_geometry(
+    file_names: Sequence[str],
+    pixel_data: SeriesPixelData,
+) -> SeriesGeometry | None:
+    """Predict the geometry of a series from crawl-time pixel data.
+
+    Parameters
+    ----------
+    file_names : Sequence[str]
+        Paths of the instances making up the volume, in any order.
+    pixel_data : SeriesPixelData
+        Pixel data recorded while crawling the series.
+
+    Returns
+    -------
+    SeriesGeometry | None
+        The size, origin, spacing and direction the series readers produce
+        for these files, or `None` when a position is missing or the series
+        has a single instance (whose slice spacing only GDCM knows).
+    """
+    if len(file_names) < 2:  # noqa: PLR2004
+        return None
+    if (sorted_files := sort_by_position(file_names, pixel_data)) is None:
+        return None
+    return _series_geometry(
+        pixel_data.layout,
+        pixel_data.instances[sorted_files[0]].position,
+        pixel_data.instances[sorted_files[-1]].position,
+        len(sorted_files),
+    )
+
+
+def _resolve_crop(
+    crop: tuple[slice, slice],
+    n_rows: int,
+    n_columns: int,
+) -> tuple[slice, slice]:
+    """Normalize row and column slices to explicit, step-less bounds."""
+    rows, columns = crop
+    row_range = range(*rows.indices(n_rows))
+    column_range = range(*columns.indices(n_columns))
+    if row_range.step != 1 or column_range.step != 1:
+        msg = "Crop slices must have a step of 1."
+        raise ValueError(msg)
+    return (
+        slice(row_range.start, max(row_range.start, row_range.stop)),
+        slice(column_range.start, max(column_range.start, column_range.stop)),
+    )
+
+
+def _crop_in_plane(image: sitk.Image, crop: tuple[slice, slice]) -> sitk.Image:
+    """Crop the rows and columns of every slice of a volume."""
+    width, height, depth = image.GetSize()
+    rows, columns = _resolve_crop(crop, height, width)
+    return sitk.RegionOfInterest(
+        image,
+        [columns.stop - columns.start, rows.stop - rows.start, depth],
+        [columns.start, rows.start, 0],
+    )
+
+
+def _clamp_region(
+    index: Sequence[int],
+    size: Sequence[int],
+    full_size: Sequence[int],
+) -> tuple[list[int], list[int]]:
+    """Shift a region that overflows the volume back inside it.
+
+    Mirrors `RegionBox.check_out_of_bounds_coordinates`, so reading a
+    region gives the same voxels as `RegionBox.crop_image` on the full
+    volume.
+    """
+    index, size = list(index), list(size)
+    for axis in range(3):
+        if (overflow := index[axis] + size[axis] - full_size[axis]) > 0:
+            index[axis] -= overflow
+            size[axis] = full_size[axis] - index[axis]
+    if any(i < 0 for i in index) or any(n <= 0 for n in size):
+        msg = (
+            f"Region with index {index} and size {size} does not fit in a "
+            f"volume of size {tuple(full_size)}."
+        )
+        raise ValueError(msg)
+    return index, size
+
+
+def read_series_region(
+    file_names: Sequence[str],
+    index: Sequence[int],
+    size: Sequence[int],
+    *,
+    read_mode: SeriesReadMode | str = SeriesReadMode.GDCM,
+    n_threads: int = 1,
+    pixel_data: SeriesPixelData | None = None,
+) -> sitk.Image:
+    """Read only the voxels of a sorted series that fall inside a box.
+
+    Only the instances intersecting the z-extent of the box are read, and
+    they are cropped in-plane while the volume is assembled, so memory and
+    I/O scale with the box rather than with the whole series.
+
+    Parameters
+    ----------
+    file_names : Sequence[str]
+        Paths of all the instances of the series, sorted along the slice
+        axis.
+    index, size : Sequence[int]
+        Start index and size (x, y, z) of the box, in the voxel grid of the
+        full series. Boxes extending past the volume are shifted back
+        inside it, like `RegionBox.crop_image` does.
+    read_mode : SeriesReadMode | str, default=SeriesReadMode.GDCM
+        Reader used for the selected instances.
+    n_threads : int, default=1
+        Number of threads used by the threaded and memmap readers.
+    pixel_data : SeriesPixelData | None, optional
+        Pixel data recorded while crawling. Positions are read from the
+        file headers when missing.
+
+    Returns
+    -------
+    sitk.Image
+        The same image as `sitk.RegionOfInterest(full_series, size, index)`.
+    """
+    if len(file_names) < 2:  # noqa: PLR2004
+        # single files (e.g. multi-frame) are read whole and cropped
+        full_image = read_series_gdcm(file_names)
+        index, size = _clamp_region(index, size, full_image.GetSize())
+        return sitk.RegionOfInterest(full_image, size, index)
+
+    infos = pixel_data.instances if pixel_data else {}
+    layout = pixel_data.layout if pixel_data else None
+    ends = []
+    for file_name in (file_names[0], file_names[-1]):
+        info = infos.get(file_name)
+        if info is None or info.position is None or layout is None:
+            layout, info = read_instance_pixel_info(file_name)
+        ends.append(info.position)
+    full_size, origin, spacing, direction = _series_geometry(
+        layout,  # type: ignore[arg-type]
+        ends[0],
+        ends[-1],
+        len(file_names),
+    )
+    index, size = _clamp_region(index, size, full_size)
+    selected = file_names[index[2] : index[2] + size[2]]
+    crop = (
+        slice(index[1], index[1] + size[1]),
+        slice(index[0], index[0] + size[0]),
+    )
+
+    match SeriesReadMode(read_mode):
+        case SeriesReadMode.THREADED:
+            image = read_series_threaded(selected, n_threads, crop=crop)
+        case SeriesReadMode.MEMMAP:
+            image = read_series_memmap(
+                selected, pixel_data, n_threads, crop=crop
+            )
+        case _:
+            image = _crop_in_plane(read_series_gdcm(selected), crop)
+
+    # place the box in the geometry of the full series
+    reference = sitk.Image([1, 1, 1], sitk.sitkUInt8)
+    reference.SetOrigin(origin)
+    reference.SetSpacing(spacing)
+    reference.SetDirection(direction)
+    image.SetSpacing(spacing)
+    image.SetDirection(direction)
+    image.SetOrigin(reference.TransformIndexToPhysicalPoint(index))
+    return image
+
+
+def _read_native_slice(
+    file_name: str,
+    info: InstancePixelInfo,
+    target: np.ndarray,
+    skip: int = 0,
+) -> None:
+    """Read raw pixel data of one instance, from byte `skip`, into `target`."""
+    with Path(file_name).open("rb", buffering=0) as fp:
+        fp.seek(info.offset + skip)  # type: ignore[operator]
+        n_read = fp.readinto(target)  # type: ignore[arg-type]
+    if n_read != target.nbytes:
+        msg = (
+            f"Expected {target.nbytes} bytes of pixel data in {file_name}, "
+            f"read {n_read}."
+        )
+        raise ValueError(msg)
+
+
+def read_series_memmap(
+    file_names: Sequence[str],
+    pixel_data: SeriesPixelData | None = None,
+    n_threads: int = 1,
+    *,
+    crop: tuple[slice, slice] | None = None,
+) -> sitk.Image:
+    """Read uncompressed pixel data straight into the output image buffer.
+
+    The output `sitk.Image` is allocated once, and the raw pixel data of
+    every instance is read (`readinto`) directly into its slice of the
+    buffer. Rescale slope and intercept are then applied in place with
+    NumPy, so no intermediate full-size copies are made.
+
+    Parameters
+    ----------
+    file_names : Sequence[str]
+        Paths of the instances, already sorted along the slice axis.
+    pixel_data : SeriesPixelData | None, optional
+        Pixel data locations recorded while crawling. Instances missing
+        from it are located with a header-only read.
+    n_threads : int, default=1
+        Number of threads reading the instances.
+    crop : tuple[slice, slice] | None, optional
+        Row and column slices to read. Only the band of rows is read from
+        each file. The geometry is not adjusted for the crop, see
+        `read_series_region`.
+
+    Returns
+    -------
+    sitk.Image
+        The volume, with the same pixel type and geometry as
+        `sitk.ImageSeriesReader` would produce. Series that cannot be read
+        this way (compressed, multi-frame or color instances) are read with
+        `read_series_gdcm` instead (and cropped afterwards).
+    """
+    if len(file_names) == 1 and crop is None:
+        return read_series_gdcm(file_names)
+
+    layout = pixel_data.layout if pixel_data else None
+    infos: list[InstancePixelInfo] = []
+    for file_name in file_names:
+        info = pixel_data.instances.get(file_name) if pixel_data else None
+        if info is None:
+            header_layout, info = read_instance_pixel_info(file_name)
+            layout = layout or header_layout
+        infos.append(info)
+
+    if (
+        layout is None
+        or not layout.is_native
+        or any(
+            info.offset is None
+            or info.length is None
+            or info.length < layout.frame_nbytes
+            for info in infos
+        )
+    ):
+        logger.debug(
+            "Pixel data cannot be read natively, falling back to GDCM.",
+            n_instances=len(file_names),
+        )
+        image = read_series_gdcm(file_names)
+        if crop is not None:
+            image = _crop_in_plane(image, crop)
+        return image
+
+    stored_dtype = layout.dtype
+    output_dtype = _rescaled_dtype(layout, infos[0].slope, infos[0].intercept)
+    rows, columns = (
+        (slice(0, layout.rows), slice(0, layout.columns))
+        if crop is None
+        else _resolve_crop(crop, layout.rows, layout.columns)
+    )
+    image = sitk.Image(
+        [
+            columns.stop - columns.start,
+            rows.stop - rows.start,
+            len(file_names),
+        ],
+        _SITK_PIXEL_TYPES[output_dtype],
+    )
+    volume = writable_array_view(image)
+    # stored values can be read in place when they have the same size as
+    # the output values (rescaling never overflows the best fit type)
+    in_place = (
+        crop is None
+        and output_dtype.itemsize == stored_dtype.itemsize
+        and output_dtype.kind in "iu"
+    )
+    # only the band of rows inside the crop is read from the files
+    row_nbytes = layout.columns * stored_dtype.itemsize
+    band_shape = (rows.stop - rows.start, layout.columns)
+
+    def _load(index: int) -> None:
+        info = infos[index]
+        target = volume[index]
+        if in_place:
+            raw = target.view(stored_dtype)
+        else:
+            raw = np.empty(band_shape, stored_dtype)
+        _read_native_slice(
+            file_names[index], info, raw, skip=rows.start * row_nbytes
+        )
+        _mask_stored_bits(raw, layout)
+        if not in_place:
+            np.copyto(target, raw[:, columns], casting="unsafe")
+        if info.slope != 1:
+            np.multiply(target, info.slope, out=target, casting="unsafe")
+        if info.intercept != 0:
+            np.add(target, info.intercept, out=target, casting="unsafe")
+
+    with ThreadPoolExecutor(max_workers=max(1, n_threads)) as pool:
+        list(pool.map(_load, range(len(file_names))))
+
+    _, origin, spacing, direction = _series_geometry(
+        layout, infos[0].position, infos[-1].position, len(infos)
+    )
+    image.SetDirection(direction)
+    image.SetSpacing(spacing)
+    image.SetOrigin(origin)
+    return image
@@ -0,0 +1,195 @@
+"""On-disk cache of the transformed reference images of the samples.
+
+Tuning a pipeline (the output format, the ROI keys, the masks) reruns it
+many times with the same transforms, and every run reads and resamples the
+same reference images again. `TransformCache` stores the transformed
+reference image of every sample, keyed by
+
+- the SeriesInstanceUID of the reference series,
+- a hash of its set of SOPInstanceUIDs, so a series with added or removed
+  instances is transformed again,
+- the transforms, serialized with their parameters, and the version of
+  imgtools.
+
+The image is stored uncompressed (MetaImage, `.mha`), with its class and
+metadata next to it (`.pkl`), and is read back in about the time it takes
+to copy the file. With `SampleInput(lazy_loading=True)` the reference
+series is not even read on a hit: its voxels are only read by the
+`Transformer`.
+
+The cache is bounded by its size on disk. When a new entry takes it over
+`max_bytes`, the entries used least recently are removed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import SimpleITK as sitk
+
+from imgtools import __version__
+from imgtools.loggers import logger
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+    from pathlib import Path
+
+    from imgtools.coretypes import MedImage
+    from imgtools.transforms import BaseTransform
+
+__all__ = ["TransformCache"]
+
+IMAGE_SUFFIX = ".mha"
+METADATA_SUFFIX = ".pkl"
+
+
+@dataclass(frozen=True)
+class TransformCache:
+    """A directory of transformed reference images, bounded in size.
+
+    Attributes
+    ----------
+    directory : Path
+        Directory of the cache, created when the first entry is stored.
+    max_bytes : int
+        Size of the cache on disk above which the least recently used
+        entries are removed, by default 20 GB.
+
+    Examples
+    --------
+    >>> cache = TransformCache(
+    ...     Path(".imgtools/transform-cache")
+    ... )
+    >>> key = cache.key(
+    ...     series_uid,
+    ...     instance_uids,
+    ...     transformer.transforms,
+    ... )
+    >>> reference = cache.get(key)
+    >>> if reference is None:
+    ...     reference = transformer([image])[0]
+    ...     cache.put(key, reference)
+    """
+
+    directory: Path
+    max_bytes: int = 20 * 1024**3
+
+    def __post_init__(self) -> None:
+        """Validate the size bound."""
+        if self.max_bytes <= 0:
+            msg = f"max_bytes must be positive, got {self.max_bytes}."
+            raise ValueError(msg)
+
+    @staticmethod
+    def key(
+        series_uid: str,
+        instance_uids: Iterable[str],
+        transforms: Sequence[BaseTransform],
+    ) -> str:
+        """Return the key of a series transformed by `transforms`.
+
+        Parameters
+        ----------
+        series_uid : str
+            The SeriesInstanceUID of the series.
+        instance_uids : Iterable[str]
+            The SOPInstanceUIDs of the instances of the series, in any
+            order.
+        transforms : Sequence[BaseTransform]
+            The transforms, in order. They are serialized with their
+            `repr`, which lists the parameters of the dataclasses.
+
+        Returns
+        -------
+        str
+            The key, a hexadecimal digest.
+        """
+        instances = hashlib.sha256(
+            "\n".join(sorted(instance_uids)).encode()
+        ).hexdigest()
+        serialized = "\n".join(
+            [__version__, series_uid, instances, *map(repr, transforms)]
+        )
+        return hashlib.sha256(serialized.encode()).hexdigest()
+
+    def get(self, key: str) -> MedImage | None:
+        """Return the cached image of a key, None if there is none.
+
+        A hit marks the entry as used. An entry that cannot be read, e.g.
+        removed by another worker meanwhile, is a miss.
+        """
+        image_path, metadata_path = self._paths(key)
+        try:
+            with metadata_path.open("rb") as f:
+                image_class, metadata = pickle.load(f)  # noqa: S301
+            image = image_class(
+                sitk.ReadImage(str(image_path)), metadata=metadata
+            )
+            for path in (image_path, metadata_path):
+                os.utime(path)
+        except (OSError, RuntimeError, pickle.UnpicklingError, EOFError):
+            return None
+        logger.debug("Transform cache hit.", key=key)
+        return image
+
+    def put(self, key: str, image: MedImage) -> None:
+        """Store the image of a key, then evict entries over the bound.
+
+        The files are written then renamed, so that a worker never reads
+        a partial entry. A failure to write is logged, not raised: the
+        cache is only an optimization.
+        """
+        image_path, metadata_path = self._paths(key)
+        suffix = f".{os.getpid()}.partial"
+        partial_image = image_path.with_name(
+            f"{image_path.stem}{suffix}{IMAGE_SUFFIX}"
+        )
+        partial_metadata = metadata_path.with_name(metadata_path.name + suffix)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            sitk.WriteImage(image, str(partial_image), useCompression=False)
+            with partial_metadata.open("wb") as f:
+                pickle.dump((type(image), dict(image.metadata)), f)
+            partial_image.replace(image_path)
+            partial_metadata.replace(metadata_path)
+        except (OSError, RuntimeError, pickle.PicklingError) as e:
+            logger.warning("Could not cache the image.", key=key, error=e)
+            for path in (partial_image, partial_metadata):
+                path.unlink(missing_ok=True)
+            return
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove the least recently used entries above `max_bytes`."""
+        entries = []
+        for image_path in self.directory.glob(f"*{IMAGE_SUFFIX}"):
+            if ".partial" in image_path.name:
+                continue
+            metadata_path = image_path.with_suffix(METADATA_SUFFIX)
+            try:
+                stat = image_path.stat()
+                size = stat.st_size + metadata_path.stat().st_size
+            except OSError:
+                # removed meanwhile, or not complete yet
+                continue
+            entries.append((stat.st_mtime, size, image_path, metadata_path))
+
+        total = sum(size for _, size, _, _ in entries)
+        for _, size, image_path, metadata_path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            for path in (image_path, metadata_path):
+                path.unlink(missing_ok=True)
+            total -= size
+            logger.debug("Evicted from the transform cache.", path=image_path)
+
+    def _paths(self, key: str) -> tuple[Path, Path]:
+        base = self.directory / key
+        return (
+            base.with_suffix(IMAGE_SUFFIX),
+            base.with_suffix(METADATA_SUFFIX),
+        )
@@ -5,7 +5,7 @@ from typing import ClassVar
 import numpy as np
 import SimpleITK as sitk
 
-from imgtools.coretypes import MedImage
+from imgtools.coretypes import FingerprintLevel, Mask, MedImage
 from imgtools.loggers import logger
 from imgtools.utils import truncate_uid
 
@@ -48,6 +48,14 @@ class NIFTIWriter(AbstractBaseWriter[sitk.Image | np.ndarray]):
         this will truncate the UID to the **last** `truncate_uids_in_filename`
         characters.
         A value of 0 means **no truncation**.
+    fingerprint_level : FingerprintLevel, default=FingerprintLevel.FULL
+        How much of every saved MedImage is described in the index, see
+        `MedImage.compute_fingerprint`. Lower levels skip passes over the
+        voxels.
+    feret_diameter : bool, default=False
+        Whether to add the `mask.feret_diameter` of every saved `Mask` to
+        the index, at the STATS and FULL levels. It is left out of the
+        fingerprint because it is slow to compute for large masks.
     VALID_EXTENSIONS : ClassVar[list[str]]
         List of valid file extensions for NIFTI files (".nii", ".nii.gz").
     MAX_COMPRESSION_LEVEL : ClassVar[int]
@@ -94,6 +102,8 @@ class NIFTIWriter(AbstractBaseWriter[sitk.Image | np.ndarray]):
 
     compression_level: int = field(default=9)
     truncate_uids_in_filename: int = field(default=8)
+    fingerprint_level: FingerprintLevel = field(default=FingerprintLevel.FULL)
+    feret_diameter: bool = field(default=False)
 
     # Make extensions immutable
     VALID_EXTENSIONS: ClassVar[list[str]] = [
@@ -163,9 +173,22 @@ class NIFTIWriter(AbstractBaseWriter[sitk.Image | np.ndarray]):
                 msg = "Input must be a SimpleITK Image or a numpy array"
                 raise NiftiWriterValidationError(msg)
 
-        # if the object has the 'fingerprint' property, update the context
-        if hasattr(data, "serialized_fingerprint"):
-            self.set_context(**data.serialized_fingerprint)
+        # if the object has a fingerprint, update the context
+        if hasattr(data, "serialize_fingerprint"):
+            feret_diameter = (
+                # computed first, the same label pass then gives the
+                # shape statistics of the fingerprint
+                data.feret_diameter
+                if self.feret_diameter
+                and isinstance(data, Mask)
+                and self.fingerprint_level
+                in (FingerprintLevel.STATS, FingerprintLevel.FULL)
+                else None
+            )
+            fingerprint = data.serialize_fingerprint(self.fingerprint_level)
+            if feret_diameter is not None:
+                fingerprint["mask.feret_diameter"] = feret_diameter
+            self.set_context(**fingerprint)
         elif isinstance(data, MedImage):
             # if there is no fingerprint, this is unexpected
             # this is an issue now since we auto keep context between
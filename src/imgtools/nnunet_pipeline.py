@@ -23,6 +23,7 @@ from imgtools.transforms import (
     Transformer,
     WindowIntensity,
 )
+from imgtools.utils.execution import ExecutionResources, run_with_resources
 
 if TYPE_CHECKING:
     import rich.repr
@@ -53,6 +54,8 @@ class nnUNetPipeline:  # noqa: N801
         spacing: tuple[float, float, float] = (0.0, 0.0, 0.0),
         window: float | None = None,
         level: float | None = None,
+        *,
+        threads_per_job: int | None = None,
     ) -> None:
         """
         Initialize the nnUNetpipeline.
@@ -85,6 +88,10 @@ class nnUNetPipeline:  # noqa: N801
             Window level for intensity normalization, by default None
         level : float | None, optional
             Window level for intensity normalization, by default None
+        threads_per_job : int | None, optional
+            Number of threads of the SimpleITK filters (and BLAS) in every
+            job, by default None (the cores are split evenly between the
+            jobs). See `imgtools.utils.execution`.
         """
 
         # Validate modalities
@@ -141,8 +148,15 @@ class nnUNetPipeline:  # noqa: N801
             transforms.append(WindowIntensity(window=window, level=level))
 
         self.transformer = Transformer(transforms)
+        self.resources = ExecutionResources.for_jobs(
+            self.input.n_jobs, threads_per_job
+        )
 
-        logger.info("Pipeline initialized")
+        logger.info(
+            "Pipeline initialized",
+            n_jobs=self.resources.n_jobs,
+            threads_per_job=self.resources.threads_per_job,
+        )
 
     def run(
         self,
@@ -173,6 +187,7 @@ class nnUNetPipeline:  # noqa: N801
                 self.input,
                 self.transformer,
                 self.output,
+                None,
             )
             for idx, sample in enumerate(samples, start=1)
         ]
@@ -189,13 +204,19 @@ class nnUNetPipeline:  # noqa: N801
                 desc="Processing samples",
                 unit="sample",
             ) as pbar,
+            # Process samples in parallel, the threads of every worker
+            # limited to its share of the cores
+            self.resources.parallel_config(),
         ):
-            # Process samples in parallel
             for result in Parallel(
-                n_jobs=self.input.n_jobs,
-                backend="loky",
+                n_jobs=self.resources.n_jobs,
                 return_as="generator",
-            )(delayed(process_one_sample)(arg) for arg in arg_tuples):
+            )(
+                delayed(run_with_resources)(
+                    self.resources, process_one_sample, arg
+                )
+                for arg in arg_tuples
+            ):
                 all_results.append(result)
 
                 # Update progress bar and track results by success/failure
@@ -1,17 +1,21 @@
 from .base_transform import BaseTransform
 from .functional import (
+    cast_intensity,
     clip_intensity,
     crop,
     resample,
     resize,
     rotate,
+    shift_scale_intensity,
     window_intensity,
     zoom,
 )
 from .intensity_transforms import (
+    CastIntensity,
     ClipIntensity,
     IntensityTransform,
     N4BiasFieldCorrection,
+    ShiftScaleIntensity,
     WindowIntensity,
 )
 from .lambda_transforms import ImageFunction, SimpleITKFilter
@@ -34,6 +38,8 @@ __all__ = [
     "crop",
     "clip_intensity",
     "window_intensity",
+    "shift_scale_intensity",
+    "cast_intensity",
     # base
     "BaseTransform",
     # lambda transforms
@@ -43,6 +49,8 @@ __all__ = [
     "IntensityTransform",
     "ClipIntensity",
     "WindowIntensity",
+    "ShiftScaleIntensity",
+    "CastIntensity",
     "N4BiasFieldCorrection",
     # spatial transform
     "SpatialTransform",
@@ -0,0 +1,321 @@
+"""Transforms of (array, `ImageGeometry`) pairs, without SimpleITK.
+
+`MedImage.to_numpy` returns the voxels as a (z, y, x) array with the
+geometry of the image. The functions of this module transform such pairs
+directly, without copying the array into a `sitk.Image` and back:
+`functional.resample`, `functional.crop`, `functional.clip_intensity` and
+`functional.window_intensity` call them when they are given a pair (or, for
+the intensity transforms, a bare array).
+
+The results are those of the SimpleITK filters:
+
+- `resample` keeps the origin and direction of the image, so the
+  continuous index of an output voxel along an axis only depends on its
+  index along that axis. Linear interpolation is then the product of one
+  linear interpolation per axis, computed one axis at a time with the
+  bounds of ITK (points past the last half voxel are 0, the neighbours
+  clamped to the image). The indices are computed from the physical
+  points like ITK does, so nearest neighbour rounds the same on ties and
+  is identical. Linear interpolation sums in another order: integer
+  results, truncated, may differ by one. Smoothed images are float32,
+  like the output of `sitk.SmoothingRecursiveGaussian`; the Gaussian is a
+  sampled kernel where SimpleITK uses a recursive filter, both
+  approximating the same Gaussian.
+- `crop` returns a view of the array, no voxel is copied.
+- `clip_intensity` and `window_intensity` cast their bounds to the pixel
+  type like `sitk.Clamp`, and can write into the input (`out=array`).
+
+B-spline interpolation and resampling through a transform are run by
+SimpleITK.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import SimpleITK as sitk
+from scipy import ndimage  # type: ignore[import-untyped]
+
+from imgtools.coretypes.spatial_types import (
+    Coordinate3D,
+    ImageGeometry,
+    Size3D,
+    Spacing3D,
+)
+from imgtools.transforms.functional import (
+    INTERPOLATORS,
+    _anti_alias_sigmas,
+    _crop_box,
+    output_grid,
+)
+from imgtools.transforms.pointwise import Clamp
+
+__all__ = [
+    "ArrayImage",
+    "resample",
+    "crop",
+    "clip_intensity",
+    "window_intensity",
+]
+
+ArrayImage = tuple[np.ndarray, ImageGeometry]
+"""A (z, y, x) or (z, y, x, component) array and the geometry of its grid."""
+
+
+def resample(
+    array: np.ndarray,
+    geometry: ImageGeometry,
+    spacing: float | list[float] | np.ndarray,
+    *,
+    interpolation: str = "linear",
+    anti_alias: bool = True,
+    anti_alias_sigma: float | list[float] | None = None,
+    transform: sitk.Transform | None = None,
+    output_size: list[float] | None = None,
+) -> ArrayImage:
+    """Resample an array to a new spacing, like `functional.resample`.
+
+    Parameters
+    ----------
+    array : np.ndarray
+        The (z, y, x) array, with an optional last axis of components.
+    geometry : ImageGeometry
+        The geometry of the array.
+    spacing, interpolation, anti_alias, anti_alias_sigma, transform, output_size
+        As for `functional.resample`, whose SimpleITK implementation runs
+        the "bspline" interpolation and the resamples with a `transform`.
+
+    Returns
+    -------
+    ArrayImage
+        The resampled array and its geometry. The array has the pixel
+        type of `array`, or float32 when it was smoothed, like the output
+        of SimpleITK.
+
+    Raises
+    ------
+    ValueError
+        If the specified interpolation method is not supported.
+    """
+    if interpolation not in INTERPOLATORS:
+        msg = f"interpolator must be one of {list(INTERPOLATORS.keys())}, got {interpolation}."
+        raise ValueError(msg)
+
+    input_spacing = np.array(geometry.spacing.to_tuple())
+    new_spacing, new_size = output_grid(
+        geometry.spacing.to_tuple(),
+        geometry.size.to_tuple(),
+        spacing,
+        output_size,
+    )
+    output_geometry = ImageGeometry(
+        size=Size3D(*new_size.tolist()),
+        origin=geometry.origin,
+        direction=geometry.direction,
+        spacing=Spacing3D(*new_spacing.tolist()),
+    )
+    if interpolation == "bspline" or transform is not None:
+        from imgtools.transforms import functional
+
+        resampled = functional.resample(
+            _to_image(array, geometry),
+            spacing,
+            interpolation=interpolation,
+            anti_alias=anti_alias,
+            anti_alias_sigma=anti_alias_sigma,
+            transform=transform,
+            output_size=output_size,
+        )
+        return sitk.GetArrayFromImage(resampled), output_geometry
+
+    sigma = (
+        _anti_alias_sigmas(input_spacing, new_spacing, anti_alias_sigma)
+        if anti_alias
+        else None
+    )
+    values = array
+    output_dtype = array.dtype
+    if sigma is not None:
+        # `sitk.SmoothingRecursiveGaussian` outputs float32 for every input,
+        # float64 included, and so does the SimpleITK resample then
+        output_dtype = np.dtype(np.float32)
+        # the sigmas are physical, like for `sitk.SmoothingRecursiveGaussian`
+        voxel_sigma = np.where(sigma > 1e-11, sigma / input_spacing, 0)  # noqa: PLR2004
+        values = ndimage.gaussian_filter(
+            array.astype(output_dtype, copy=False),
+            [*voxel_sigma[::-1], *([0] * (array.ndim - 3))],
+            mode="nearest",
+        )
+    elif interpolation == "linear" and array.dtype != np.float32:
+        # ITK interpolates in double precision
+        values = array.astype(np.float64, copy=False)
+
+    # the continuous indices of the output voxels along the (x, y, z) axes,
+    # from their physical points like ITK to round the same on ties
+    origin = np.asarray(geometry.origin.to_tuple())
+    indices = [
+        ((o + np.arange(n) * s_out) - o) * (1 / s_in)
+        for o, n, s_out, s_in in zip(
+            origin, new_size, new_spacing, input_spacing, strict=True
+        )
+    ]
+    # (z, y, x) axes, the most shrunk first to keep the temporaries small
+    for axis in np.argsort(new_size[::-1] / np.array(array.shape[:3])):
+        values = _resample_axis(
+            values, int(axis), indices[2 - axis], interpolation
+        )
+    return _cast_like_itk(values, output_dtype), output_geometry
+
+
+def crop(
+    array: np.ndarray,
+    geometry: ImageGeometry,
+    crop_centre: list[float] | np.ndarray,
+    size: int | list[int] | np.ndarray,
+) -> ArrayImage:
+    """Crop an array to a window about a centre, like `functional.crop`.
+
+    Parameters
+    ----------
+    array : np.ndarray
+        The (z, y, x) array, with an optional last axis of components.
+    geometry : ImageGeometry
+        The geometry of the array.
+    crop_centre, size
+        As for `functional.crop`, in (x, y, z) order.
+
+    Returns
+    -------
+    ArrayImage
+        A view of `array` and its geometry.
+
+    Raises
+    ------
+    ValueError
+        If the cropping center is outside the image boundaries.
+    """
+    start, stop = _crop_box(geometry.size.to_tuple(), crop_centre, size)
+    box = tuple(slice(a, b) for a, b in zip(start, stop, strict=True))
+    cropped_geometry = ImageGeometry(
+        size=Size3D(*(stop - start).tolist()),
+        origin=Coordinate3D(*geometry.index_to_physical(start).tolist()),
+        direction=geometry.direction,
+        spacing=geometry.spacing,
+    )
+    return array[box[::-1]], cropped_geometry
+
+
+def clip_intensity(
+    array: np.ndarray,
+    lower: float,
+    upper: float,
+    out: np.ndarray | None = None,
+) -> np.ndarray:
+    """Clip the values of an array, like `functional.clip_intensity`.
+
+    Parameters
+    ----------
+    array : np.ndarray
+        The values.
+    lower, upper : float
+        The bounds, cast to the pixel type of `array` like `sitk.Clamp`
+        does.
+    out : np.ndarray | None, optional
+        Where to write the result, e.g. `array` itself to clip it in place.
+        By default a new array.
+
+    Returns
+    -------
+    np.ndarray
+        The clipped values, of the pixel type of `array`.
+    """
+    clamp = Clamp(lower, upper).for_dtype(array.dtype)
+    return np.clip(array, clamp.lower, clamp.upper, out=out)
+
+
+def window_intensity(
+    array: np.ndarray,
+    window: float,
+    level: float,
+    out: np.ndarray | None = None,
+) -> np.ndarray:
+    """Window the values of an array, like `functional.window_intensity`.
+
+    Parameters
+    ----------
+    array : np.ndarray
+        The values.
+    window, level : float
+        The width and mid-point of the window.
+    out : np.ndarray | None, optional
+        Where to write the result, e.g. `array` itself to window it in
+        place. By default a new array.
+
+    Returns
+    -------
+    np.ndarray
+        The windowed values, of the pixel type of `array`.
+    """
+    return clip_intensity(
+        array, level - window / 2, level + window / 2, out=out
+    )
+
+
+def _resample_axis(
+    values: np.ndarray,
+    axis: int,
+    indices: np.ndarray,
+    interpolation: str,
+) -> np.ndarray:
+    """Sample `values` along one axis at increasing continuous indices.
+
+    The indices from the last half voxel on are outside the image, and 0.
+    """
+    input_size = values.shape[axis]
+    size = len(indices)
+    n_inside = int(np.searchsorted(indices, input_size - 0.5))
+    indices = indices[:n_inside]
+
+    if interpolation == "nearest":
+        nearest = np.minimum(
+            np.floor(indices + 0.5).astype(np.intp), input_size - 1
+        )
+        inside = np.take(values, nearest, axis=axis)
+    else:
+        base = np.floor(indices).astype(np.intp)
+        shape = [1] * values.ndim
+        shape[axis] = n_inside
+        weights = (indices - base).astype(values.dtype).reshape(shape)
+        lower = np.take(values, np.clip(base, 0, input_size - 1), axis=axis)
+        upper = np.take(
+            values, np.minimum(base + 1, input_size - 1), axis=axis
+        )
+        inside = lower
+        inside += (upper - lower) * weights
+
+    if n_inside == size:
+        return inside
+    output_shape = list(values.shape)
+    output_shape[axis] = size
+    output = np.zeros(output_shape, dtype=values.dtype)
+    box = [slice(None)] * values.ndim
+    box[axis] = slice(0, n_inside)
+    output[tuple(box)] = inside
+    return output
+
+
+def _cast_like_itk(values: np.ndarray, dtype: np.dtype) -> np.ndarray:
+    """Cast interpolated values, clamped to the range of integer types."""
+    if values.dtype == dtype:
+        return values
+    if dtype.kind in "iu":
+        info = np.iinfo(dtype)
+        values = np.trunc(np.clip(values, info.min, info.max, out=values))
+    return values.astype(dtype, copy=False)
+
+
+def _to_image(array: np.ndarray, geometry: ImageGeometry) -> sitk.Image:
+    image = sitk.GetImageFromArray(array, isVector=array.ndim == 4)  # noqa: PLR2004
+    image.SetOrigin(geometry.origin.to_tuple())
+    image.SetSpacing(geometry.spacing.to_tuple())
+    image.SetDirection(geometry.direction.matrix)
+    return image
@@ -1,7 +1,11 @@
+from typing import TYPE_CHECKING, Sequence, overload
+
 import numpy as np
 import SimpleITK as sitk
 
-from .lambda_transforms import SimpleITKFilter
+if TYPE_CHECKING:
+    from imgtools.coretypes.spatial_types import ImageGeometry
+    from imgtools.transforms.array_functional import ArrayImage
 
 INTERPOLATORS = {
     "linear": sitk.sitkLinear,
@@ -9,27 +13,86 @@ INTERPOLATORS = {
     "bspline": sitk.sitkBSpline,
 }
 
+PIXEL_TYPES = {
+    "uint8": sitk.sitkUInt8,
+    "int8": sitk.sitkInt8,
+    "uint16": sitk.sitkUInt16,
+    "int16": sitk.sitkInt16,
+    "uint32": sitk.sitkUInt32,
+    "int32": sitk.sitkInt32,
+    "uint64": sitk.sitkUInt64,
+    "int64": sitk.sitkInt64,
+    "float32": sitk.sitkFloat32,
+    "float64": sitk.sitkFloat64,
+}
+
+VECTOR_PIXEL_TYPES = {
+    "uint8": sitk.sitkVectorUInt8,
+    "int8": sitk.sitkVectorInt8,
+    "uint16": sitk.sitkVectorUInt16,
+    "int16": sitk.sitkVectorInt16,
+    "uint32": sitk.sitkVectorUInt32,
+    "int32": sitk.sitkVectorInt32,
+    "uint64": sitk.sitkVectorUInt64,
+    "int64": sitk.sitkVectorInt64,
+    "float32": sitk.sitkVectorFloat32,
+    "float64": sitk.sitkVectorFloat64,
+}
+
 __all__ = [
     "resample",
+    "resample_onto",
+    "compose_transforms",
+    "output_grid",
     "resize",
     "zoom",
     "rotate",
+    "scale_transform",
+    "rotation_transform",
     "crop",
     "bias_correction",
+    "estimate_log_bias_field",
+    "apply_log_bias_field",
     "clip_intensity",
     "window_intensity",
+    "shift_scale_intensity",
+    "cast_intensity",
 ]
 
 
+@overload
 def resample(
     image: sitk.Image,
     spacing: float | list[float] | np.ndarray,
+    interpolation: str = ...,
+    anti_alias: bool = ...,
+    anti_alias_sigma: float | list[float] | None = ...,
+    transform: sitk.Transform | None = ...,
+    output_size: list[float] | None = ...,
+) -> sitk.Image: ...
+
+
+@overload
+def resample(
+    image: "ArrayImage",
+    spacing: float | list[float] | np.ndarray,
+    interpolation: str = ...,
+    anti_alias: bool = ...,
+    anti_alias_sigma: float | list[float] | None = ...,
+    transform: sitk.Transform | None = ...,
+    output_size: list[float] | None = ...,
+) -> "ArrayImage": ...
+
+
+def resample(
+    image: "sitk.Image | ArrayImage",
+    spacing: float | list[float] | np.ndarray,
     interpolation: str = "linear",
     anti_alias: bool = True,
     anti_alias_sigma: float | list[float] | None = None,
     transform: sitk.Transform | None = None,
     output_size: list[float] | None = None,
-) -> sitk.Image:
+) -> "sitk.Image | ArrayImage":
     """Resample an image to a new spacing with optional transform.
 
     Resamples the input image using the specified spacing, computing a new
@@ -39,8 +102,9 @@ def resample(
 
     Parameters
     ----------
-    image : sitk.Image
-        The SimpleITK image to be resampled.
+    image : sitk.Image | ArrayImage
+        The SimpleITK image to be resampled, or an (array, geometry) pair,
+        resampled with NumPy by `array_functional.resample`.
     spacing : float | list[float] | np.ndarray
         The desired spacing for each axis. A single float applies to all
         dimensions, while a sequence specifies spacing per axis. Use 0 for any
@@ -56,21 +120,38 @@ def resample(
         provided, it is automatically computed.
     transform : sitk.Transform | None, optional
         A transformation to apply to the image coordinates during resampling.
-        Defaults to the identity transformation if not specified.
+        Defaults to the identity transformation if not specified. The
+        anti-aliasing then follows the net scale of the transform and the
+        spacing, as in `resample_onto`.
     output_size : list[float] | None, optional
         The desired size of the output image. If omitted, the size is
         calculated to preserve the entire extent of the input image.
 
     Returns
     -------
-    sitk.Image
-        The resampled image.
+    sitk.Image | ArrayImage
+        The resampled image, of the type of `image`.
 
     Raises
     ------
     ValueError
         If the specified interpolation method is not supported.
     """
+    if isinstance(image, tuple):
+        # the array backend imports this module
+        from imgtools.transforms import array_functional
+
+        array, geometry = image
+        return array_functional.resample(
+            array,
+            geometry,
+            spacing,
+            interpolation=interpolation,
+            anti_alias=anti_alias,
+            anti_alias_sigma=anti_alias_sigma,
+            transform=transform,
+            output_size=output_size,
+        )
 
     try:
         interpolator = INTERPOLATORS[interpolation]
@@ -78,23 +159,9 @@ def resample(
         msg = f"interpolator must be one of {list(INTERPOLATORS.keys())}, got {interpolation}."
         raise ValueError(msg) from ke
 
-    original_spacing = np.array(image.GetSpacing())
-    original_size = np.array(image.GetSize())
-
-    if isinstance(spacing, (float, int)):
-        new_spacing = np.repeat(spacing, len(original_spacing)).astype(
-            np.float64
-        )
-    else:
-        spacing = np.asarray(spacing)
-        new_spacing = np.where(spacing == 0, original_spacing, spacing)
-
-    if output_size is None:
-        new_size = np.round(
-            original_size * original_spacing / new_spacing, decimals=0
-        ).astype(int)
-    else:
-        new_size = np.asarray(output_size).astype(int)
+    new_spacing, new_size = output_grid(
+        image.GetSpacing(), image.GetSize(), spacing, output_size
+    )
 
     rif = sitk.ResampleImageFilter()
     rif.SetOutputOrigin(image.GetOrigin())
@@ -105,16 +172,22 @@ def resample(
     if transform is not None:
         rif.SetTransform(transform)
 
-    downsample = new_spacing > original_spacing
-    if downsample.any() and anti_alias:
-        if not anti_alias_sigma:
-            # sigma computation adapted from scikit-image
-            # https://github.com/scikit-image/scikit-image/blob/master/skimage/transform/_warps.py
-            anti_alias_sigma = list(
-                np.maximum(1e-11, (original_spacing / new_spacing - 1) / 2)
+    if anti_alias:
+        # a transform changes the scale at which the input is sampled, like
+        # a composed resample (see `resample_onto`)
+        sampled_spacing = (
+            new_spacing
+            if transform is None
+            else _net_spacing(
+                image,
+                transform,
+                origin=image.GetOrigin(),
+                spacing=new_spacing,
+                direction=image.GetDirection(),
+                size=new_size,
             )
-        sigma = np.where(downsample, anti_alias_sigma, 1e-11)
-        image = sitk.SmoothingRecursiveGaussian(image, sigma)
+        )
+        image = _smooth_for_spacing(image, sampled_spacing, anti_alias_sigma)
 
     rif.SetInterpolator(interpolator)
     resampled_image = rif.Execute(image)
@@ -122,6 +195,227 @@ def resample(
     return resampled_image
 
 
+def resample_onto(
+    image: sitk.Image,
+    geometry: "ImageGeometry",
+    transforms: Sequence[sitk.Transform] = (),
+    interpolation: str = "linear",
+    anti_alias: bool = True,
+) -> sitk.Image:
+    """Resample an image onto a grid, through a chain of transforms.
+
+    The transforms are composed into one `sitk.CompositeTransform`, so the
+    image is interpolated once whatever the number of transforms. The
+    anti-aliasing is computed from the net scale of the chain: the spacing
+    of the output grid, mapped through the transforms onto the axes of the
+    input image.
+
+    Parameters
+    ----------
+    image : sitk.Image
+        The 3D image to resample.
+    geometry : ImageGeometry
+        The grid of the output image.
+    transforms : Sequence[sitk.Transform], optional
+        The transforms mapping the output points onto the input, in the
+        order they were applied to the image (the transform of the first
+        resample first). Defaults to none, the identity.
+    interpolation : str, optional
+        The interpolation method to use. Accepted values are "linear",
+        "nearest", and "bspline". Defaults to "linear".
+    anti_alias : bool, optional
+        If True, applies Gaussian smoothing before resampling when the net
+        scale downsamples the image. Defaults to True.
+
+    Returns
+    -------
+    sitk.Image
+        The resampled image.
+
+    Raises
+    ------
+    ValueError
+        If the specified interpolation method is not supported.
+    """
+    try:
+        interpolator = INTERPOLATORS[interpolation]
+    except KeyError as ke:
+        msg = f"interpolator must be one of {list(INTERPOLATORS.keys())}, got {interpolation}."
+        raise ValueError(msg) from ke
+
+    transform = compose_transforms(transforms, image.GetDimension())
+
+    rif = sitk.ResampleImageFilter()
+    rif.SetOutputOrigin(geometry.origin.to_tuple())
+    rif.SetOutputSpacing(geometry.spacing.to_tuple())
+    rif.SetOutputDirection(geometry.direction.matrix)
+    rif.SetSize(list(geometry.size.to_tuple()))
+    rif.SetTransform(transform)
+
+    if anti_alias:
+        image = _smooth_for_spacing(
+            image,
+            _net_spacing(
+                image,
+                transform,
+                origin=geometry.origin.to_tuple(),
+                spacing=geometry.spacing.to_tuple(),
+                direction=geometry.direction.matrix,
+                size=geometry.size.to_tuple(),
+            ),
+        )
+
+    rif.SetInterpolator(interpolator)
+    return rif.Execute(image)
+
+
+def compose_transforms(
+    transforms: Sequence[sitk.Transform], dimension: int = 3
+) -> sitk.CompositeTransform:
+    """Compose the transforms of consecutive resamples into one.
+
+    Parameters
+    ----------
+    transforms : Sequence[sitk.Transform]
+        The transforms mapping the output points onto the input, in the
+        order they were applied to the image.
+    dimension : int, optional
+        The dimension of the image. Defaults to 3.
+
+    Returns
+    -------
+    sitk.CompositeTransform
+        The transform mapping the points of the last output onto the first
+        input. The identity if there are no transforms.
+    """
+    # the composite applies the transform added last first: each resample
+    # maps the points of its output onto the output of the previous one
+    transform = sitk.CompositeTransform(dimension)
+    for step in transforms:
+        transform.AddTransform(step)
+    return transform
+
+
+def _smooth_for_spacing(
+    image: sitk.Image,
+    new_spacing: np.ndarray,
+    anti_alias_sigma: float | list[float] | None = None,
+) -> sitk.Image:
+    """Smooth an image before sampling it at `new_spacing`, if downsampled."""
+    sigma = _anti_alias_sigmas(
+        image.GetSpacing(), new_spacing, anti_alias_sigma
+    )
+    if sigma is None:
+        return image
+    return sitk.SmoothingRecursiveGaussian(image, sigma)
+
+
+def _anti_alias_sigmas(
+    original_spacing: Sequence[float] | np.ndarray,
+    new_spacing: np.ndarray,
+    anti_alias_sigma: float | list[float] | None = None,
+) -> np.ndarray | None:
+    """The physical Gaussian sigmas smoothing the downsampled axes.
+
+    None if no axis is downsampled. The other axes get a negligible sigma.
+    """
+    original_spacing = np.asarray(original_spacing, dtype=np.float64)
+    downsample = new_spacing > original_spacing
+    if not downsample.any():
+        return None
+    if not anti_alias_sigma:
+        # sigma computation adapted from scikit-image
+        # https://github.com/scikit-image/scikit-image/blob/master/skimage/transform/_warps.py
+        anti_alias_sigma = list(
+            np.maximum(1e-11, (original_spacing / new_spacing - 1) / 2)
+        )
+    return np.where(downsample, anti_alias_sigma, 1e-11)
+
+
+def _net_spacing(
+    image: sitk.Image,
+    transform: sitk.Transform,
+    *,
+    origin: Sequence[float],
+    spacing: Sequence[float] | np.ndarray,
+    direction: Sequence[float],
+    size: Sequence[int] | np.ndarray,
+) -> np.ndarray:
+    """The spacing at which the input is sampled, along its own axes.
+
+    One voxel step along every axis of the output grid (`origin`,
+    `spacing`, `direction` and `size`), taken at its centre, is mapped
+    through the transform onto the index space of the input; the largest
+    stride along an input axis gives its spacing. Exact for the affine
+    transforms of the spatial transforms.
+    """
+    dimension = image.GetDimension()
+    steps = np.reshape(direction, (dimension, dimension)) * np.asarray(
+        spacing, dtype=np.float64
+    )
+    centre = np.asarray(origin) + steps @ ((np.asarray(size) - 1) / 2)
+    mapped = np.array(transform.TransformPoint(centre.tolist()))
+    mapped_steps = np.column_stack(
+        [
+            np.array(transform.TransformPoint((centre + step).tolist()))
+            - mapped
+            for step in steps.T
+        ]
+    )
+    input_spacing = np.array(image.GetSpacing())
+    input_axes = (
+        np.reshape(image.GetDirection(), (dimension, dimension))
+        * input_spacing
+    )
+    index_steps = np.linalg.solve(input_axes, mapped_steps)
+    return input_spacing * np.abs(index_steps).max(axis=1)
+
+
+def output_grid(
+    original_spacing: Sequence[float],
+    original_size: Sequence[int],
+    spacing: float | list[float] | np.ndarray,
+    output_size: list[float] | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Compute the spacing and size of the grid `resample` outputs.
+
+    Parameters
+    ----------
+    original_spacing : Sequence[float]
+        The spacing of the image to resample.
+    original_size : Sequence[int]
+        The size of the image to resample.
+    spacing : float | list[float] | np.ndarray
+        The desired spacing, as passed to `resample`. Use 0 for any axis to
+        retain its original spacing.
+    output_size : list[float] | None, optional
+        The desired size, as passed to `resample`. If omitted, the size is
+        calculated to preserve the entire extent of the input image.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        The new spacing (float) and size (int) of every axis.
+    """
+    input_spacing = np.asarray(original_spacing, dtype=np.float64)
+    input_size = np.asarray(original_size)
+
+    if isinstance(spacing, (float, int)):
+        new_spacing = np.repeat(spacing, len(input_spacing)).astype(np.float64)
+    else:
+        spacing = np.asarray(spacing)
+        new_spacing = np.where(spacing == 0, input_spacing, spacing)
+
+    if output_size is None:
+        new_size = np.round(
+            input_size * input_spacing / new_spacing, decimals=0
+        ).astype(int)
+    else:
+        new_size = np.asarray(output_size).astype(int)
+
+    return new_spacing, new_size
+
+
 def resize(
     image: sitk.Image,
     size: int | list[int] | np.ndarray,
@@ -216,16 +510,9 @@ def zoom(
     sitk.Image
         The rescaled image with the same spatial extent as the original.
     """
-    dimension = image.GetDimension()
-
-    if isinstance(scale_factor, float):
-        scale_factor = (scale_factor,) * dimension
-
     centre_idx = np.array(image.GetSize()) / 2
     centre = image.TransformContinuousIndexToPhysicalPoint(centre_idx)
-
-    transform = sitk.ScaleTransform(dimension, scale_factor)
-    transform.SetCenter(centre)
+    transform = scale_transform(centre, scale_factor)
 
     return resample(
         image,
@@ -248,7 +535,9 @@ def rotate(
 
     This function applies an Euler rotation to the input image. For 2D images,
     only the first angle in the provided list is used. For 3D images, all three
-    angles (for the x, y, and z axes, respectively) are applied.
+    angles (for the x, y, and z axes, respectively) are applied. Axes the
+    rotated grid samples more coarsely than their spacing are smoothed
+    first, as in `resample`.
 
     Parameters
     ----------
@@ -273,24 +562,8 @@ def rotate(
         rotation_centre = rotation_centre.tolist()
 
     rotation_centre = image.TransformIndexToPhysicalPoint(rotation_centre)
+    rotation = rotation_transform(rotation_centre, angles)
 
-    rotation: sitk.Euler2DTransform | sitk.Euler3DTransform
-    if image.GetDimension() == 2:
-        rotation = sitk.Euler2DTransform(
-            rotation_centre,
-            angles,
-            (0.0, 0.0),  # no translation
-        )
-    elif image.GetDimension() == 3:
-        x_angle, y_angle, z_angle = angles
-
-        rotation = sitk.Euler3DTransform(
-            rotation_centre,
-            x_angle,  # the angle of rotation around the x-axis, in radians -> coronal rotation
-            y_angle,  # the angle of rotation around the y-axis, in radians -> saggittal rotation
-            z_angle,  # the angle of rotation around the z-axis, in radians -> axial rotation
-            (0.0, 0.0, 0.0),  # no translation
-        )
     return resample(
         image,
         spacing=image.GetSpacing(),
@@ -299,11 +572,87 @@ def rotate(
     )
 
 
+def scale_transform(
+    centre: Sequence[float], scale_factor: float | Sequence[float]
+) -> sitk.ScaleTransform:
+    """Build the transform `zoom` resamples an image with.
+
+    Parameters
+    ----------
+    centre : Sequence[float]
+        The centre of the scaling, in physical coordinates.
+    scale_factor : float | Sequence[float]
+        The scaling factor(s). A float applies to all dimensions.
+
+    Returns
+    -------
+    sitk.ScaleTransform
+        The scaling around the centre.
+    """
+    dimension = len(centre)
+    if isinstance(scale_factor, float):
+        scale_factor = (scale_factor,) * dimension
+
+    transform = sitk.ScaleTransform(dimension, scale_factor)
+    transform.SetCenter(centre)
+    return transform
+
+
+def rotation_transform(
+    centre: Sequence[float], angles: list[float]
+) -> sitk.Euler2DTransform | sitk.Euler3DTransform:
+    """Build the transform `rotate` resamples an image with.
+
+    Parameters
+    ----------
+    centre : Sequence[float]
+        The centre of rotation, in physical coordinates.
+    angles : list[float]
+        The rotation angles in radians: only the first one in 2D, around
+        the x, y and z axes in 3D.
+
+    Returns
+    -------
+    sitk.Euler2DTransform | sitk.Euler3DTransform
+        The rotation around the centre.
+    """
+    if len(centre) == 2:
+        return sitk.Euler2DTransform(
+            centre,
+            angles[0],
+            (0.0, 0.0),  # no translation
+        )
+    x_angle, y_angle, z_angle = angles
+    return sitk.Euler3DTransform(
+        centre,
+        x_angle,  # the angle of rotation around the x-axis, in radians -> coronal rotation
+        y_angle,  # the angle of rotation around the y-axis, in radians -> saggittal rotation
+        z_angle,  # the angle of rotation around the z-axis, in radians -> axial rotation
+        (0.0, 0.0, 0.0),  # no translation
+    )
+
+
+@overload
 def crop(
     image: sitk.Image,
     crop_centre: list[float] | np.ndarray,
     size: int | list[int] | np.ndarray,
-) -> sitk.Image:
+) -> sitk.Image: ...
+
+
+@overload
+def crop(
+    image: "ArrayImage",
+    crop_centre: list[float] | np.ndarray,
+    size: int | list[int] | np.ndarray,
+) -> "ArrayImage": ...
+
+
+def crop(
+    image: "sitk.Image | ArrayImage",
+    crop_centre: list[float] | np.ndarray,
+    size: int | list[int] | np.ndarray,
+) -> "sitk.Image | ArrayImage":
     """Crop an image to a specified window size about a given center.
 
     This function extracts a sub-region from the input image centered at the
@@ -313,8 +662,9 @@ def crop(
 
     Parameters
     ----------
-    image : sitk.Image
-        The SimpleITK image to crop.
+    image : sitk.Image | ArrayImage
+        The SimpleITK image to crop, or an (array, geometry) pair, cropped
+        to a view of the array by `array_functional.crop`.
     crop_centre : list[float] | np.ndarray
         The center of the cropping window in image coordinates.
     size : int | list[int] | np.ndarray
@@ -325,46 +675,73 @@ def crop(
 
     Returns
     -------
-    sitk.Image
-        The cropped image.
+    sitk.Image | ArrayImage
+        The cropped image, of the type of `image`.
 
     Raises
     ------
     ValueError
         If the cropping center is outside the image boundaries.
     """
+    if isinstance(image, tuple):
+        from imgtools.transforms import array_functional
+
+        array, geometry = image
+        return array_functional.crop(array, geometry, crop_centre, size)
+
+    min_coords, max_coords = _crop_box(image.GetSize(), crop_centre, size)
+    min_x, min_y, min_z = min_coords
+    max_x, max_y, max_z = max_coords
+
+    return image[min_x:max_x, min_y:max_y, min_z:max_z]
+
+
+def _crop_box(
+    original_size: Sequence[int],
+    crop_centre: list[float] | np.ndarray,
+    size: int | list[int] | np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """The (x, y, z) start and stop indices of the window of `crop`."""
     crop_centre = np.asarray(crop_centre, dtype=np.float64)
-    original_size = np.asarray(image.GetSize())
+    image_size = np.asarray(original_size)
 
     size = (
-        np.array([size for _ in image.GetSize()])
+        np.array([size for _ in image_size])
         if isinstance(size, int)
         else np.asarray(size)
     )
 
-    if (crop_centre < 0).any() or (crop_centre > original_size).any():
-        msg = f"Crop centre outside image boundaries. Image size = {original_size}, crop centre = {crop_centre}"
+    if (crop_centre < 0).any() or (crop_centre > image_size).any():
+        msg = f"Crop centre outside image boundaries. Image size = {image_size}, crop centre = {crop_centre}"
         raise ValueError(msg)
 
     min_coords = np.clip(
-        np.floor(crop_centre - size / 2).astype(np.int64), 0, original_size
+        np.floor(crop_centre - size / 2).astype(np.int64), 0, image_size
     )
     min_coords = np.where(size == 0, 0, min_coords)
 
     max_coords = np.clip(
-        np.floor(crop_centre + size / 2).astype(np.int64), 0, original_size
+        np.floor(crop_centre + size / 2).astype(np.int64), 0, image_size
     )
-    max_coords = np.where(size == 0, original_size, max_coords)
+    max_coords = np.where(size == 0, image_size, max_coords)
+    return min_coords, max_coords
 
-    min_x, min_y, min_z = min_coords
-    max_x, max_y, max_z = max_coords
 
-    return image[min_x:max_x, min_y:max_y, min_z:max_z]
+@overload
+def clip_intensity(
+    image: sitk.Image, lower: float, upper: float
+) -> sitk.Image: ...
 
 
+@overload
 def clip_intensity(
-    image: sitk.Image, lower: float, upper: float
-) -> sitk.Image:
+    image: np.ndarray, lower: float, upper: float
+) -> np.ndarray: ...
+
+
+def clip_intensity(
+    image: sitk.Image | np.ndarray, lower: float, upper: float
+) -> sitk.Image | np.ndarray:
     """Clip image intensities to a specified range.
 
     Adjusts the input image so that all voxel intensity values lie within the
@@ -373,8 +750,9 @@ def clip_intensity(
 
     Parameters
     ----------
-    image : sitk.Image
-        The input intensity image.
+    image : sitk.Image | np.ndarray
+        The input intensity image, or an array of intensities, clipped by
+        `array_functional.clip_intensity`.
     lower : float
         The minimum allowable intensity value.
     upper : float
@@ -382,15 +760,31 @@ def clip_intensity(
 
     Returns
     -------
-    sitk.Image
+    sitk.Image | np.ndarray
         The resulting image with intensity values clipped between lower and upper.
     """
+    if isinstance(image, np.ndarray):
+        from imgtools.transforms import array_functional
+
+        return array_functional.clip_intensity(image, lower, upper)
     return sitk.Clamp(image, image.GetPixelID(), lower, upper)
 
 
+@overload
 def window_intensity(
     image: sitk.Image, window: float, level: float
-) -> sitk.Image:
+) -> sitk.Image: ...
+
+
+@overload
+def window_intensity(
+    image: np.ndarray, window: float, level: float
+) -> np.ndarray: ...
+
+
+def window_intensity(
+    image: sitk.Image | np.ndarray, window: float, level: float
+) -> sitk.Image | np.ndarray:
     """Restrict image grey level intensities to a given window and level.
 
     The grey level intensities in the resulting image will fall in the range
@@ -398,8 +792,8 @@ def window_intensity(
 
     Parameters
     ----------
-    image : sitk.Image
-        The intensity image to window.
+    image : sitk.Image | np.ndarray
+        The intensity image to window, or an array of intensities.
     window : float
         The width of the intensity window.
     level : float
@@ -407,15 +801,74 @@ def window_intensity(
 
     Returns
     -------
-    sitk.Image
-        The windowed intensity image
+    sitk.Image | np.ndarray
+        The windowed intensity image, of the type of `image`.
     """
     lower = level - window / 2
     upper = level + window / 2
     return clip_intensity(image, lower, upper)
 
 
-def bias_correction(image: sitk.Image) -> sitk.Image:
+def shift_scale_intensity(
+    image: sitk.Image, shift: float = 0.0, scale: float = 1.0
+) -> sitk.Image:
+    """Shift and scale image intensities.
+
+    The intensities of the resulting image are `(value + shift) * scale`,
+    computed in double precision and saturated to the range of the pixel
+    type, which is kept.
+
+    Parameters
+    ----------
+    image : sitk.Image
+        The intensity image.
+    shift : float
+        The value added to the intensities, before scaling.
+    scale : float
+        The factor the shifted intensities are multiplied by.
+
+    Returns
+    -------
+    sitk.Image
+        The shifted and scaled intensity image.
+    """
+    return sitk.ShiftScale(image, shift, scale)
+
+
+def cast_intensity(image: sitk.Image, pixel_type: str) -> sitk.Image:
+    """Cast image intensities to another pixel type.
+
+    Parameters
+    ----------
+    image : sitk.Image
+        The intensity image, scalar or vector.
+    pixel_type : str
+        The NumPy name of the new pixel type, one of the keys of
+        `PIXEL_TYPES`, e.g. "float32".
+
+    Returns
+    -------
+    sitk.Image
+        The cast image.
+
+    Raises
+    ------
+    ValueError
+        If the pixel type is not supported.
+    """
+    is_vector = "vector" in image.GetPixelIDTypeAsString()
+    pixel_types = VECTOR_PIXEL_TYPES if is_vector else PIXEL_TYPES
+    try:
+        pixel_id = pixel_types[pixel_type]
+    except KeyError as ke:
+        msg = (
+            f"pixel_type must be one of {list(PIXEL_TYPES)}, got {pixel_type}."
+        )
+        raise ValueError(msg) from ke
+    return sitk.Cast(image, pixel_id)
+
+
+def bias_correction(image: sitk.Image, shrink_factor: int = 1) -> sitk.Image:
     """Apply N4 bias field correction to reduce smooth intensity inhomogeneities (bias fields) commonly found in
     MR imaging. This transform corrects voxel intensities while preserving image geometry (spacing, orientation, and dimensions).
 
@@ -423,11 +876,77 @@ def bias_correction(image: sitk.Image) -> sitk.Image:
     ----------
     image : sitk.Image
         The MR image to apply bias field correction to.
+    shrink_factor : int, optional
+        Factor the image is shrunk by along every axis to estimate the
+        bias field, see `estimate_log_bias_field`. 1 estimates it at full
+        resolution.
 
     Returns
     -------
     sitk.Image
         The bias corrected image
     """
-    bias_filter = SimpleITKFilter(sitk.N4BiasFieldCorrectionImageFilter())
-    return bias_filter(image)
+    return apply_log_bias_field(
+        image, estimate_log_bias_field(image, shrink_factor)
+    )
+
+
+def estimate_log_bias_field(
+    image: sitk.Image, shrink_factor: int = 1
+) -> sitk.Image:
+    """Estimate the log of the N4 bias field of an image.
+
+    The bias field is smooth, a B-spline with few control points, so it can
+    be fitted on the image shrunk by `shrink_factor` along every axis, which
+    divides the cost of the N4 iterations by about `shrink_factor ** 3`.
+    The fitted B-spline is then evaluated on the grid of the full image.
+
+    Parameters
+    ----------
+    image : sitk.Image
+        The MR image.
+    shrink_factor : int, optional
+        Factor the image is shrunk by, by default 1. No axis is shrunk to
+        less than one voxel.
+
+    Returns
+    -------
+    sitk.Image
+        The log bias field, on the grid of `image`.
+    """
+    image = _as_real(image)
+    factors = [min(shrink_factor, size) for size in image.GetSize()]
+    corrector = sitk.N4BiasFieldCorrectionImageFilter()
+    corrector.Execute(sitk.Shrink(image, factors))
+    return corrector.GetLogBiasFieldAsImage(image)
+
+
+def apply_log_bias_field(
+    image: sitk.Image, log_bias_field: sitk.Image
+) -> sitk.Image:
+    """Divide an image by the bias field, given as its log.
+
+    Parameters
+    ----------
+    image : sitk.Image
+        The MR image.
+    log_bias_field : sitk.Image
+        The log bias field on the grid of `image`, see
+        `estimate_log_bias_field`.
+
+    Returns
+    -------
+    sitk.Image
+        The corrected image, in floating point.
+    """
+    image = _as_real(image)
+    return sitk.Divide(
+        image, sitk.Cast(sitk.Exp(log_bias_field), image.GetPixelID())
+    )
+
+
+def _as_real(image: sitk.Image) -> sitk.Image:
+    """The image as float32, unless it already is floating point."""
+    if image.GetPixelID() in (sitk.sitkFloat32, sitk.sitkFloat64):
+        return image
+    return sitk.Cast(image, sitk.sitkFloat32)
@@ -1,14 +1,30 @@
+import os
 from dataclasses import dataclass
+from pathlib import Path
 
-from SimpleITK import Image
+import numpy as np
+from SimpleITK import Hash, Image, ReadImage, WriteImage
+
+from imgtools.loggers import logger
 
 from .base_transform import BaseTransform
-from .functional import bias_correction, clip_intensity, window_intensity
+from .functional import (
+    PIXEL_TYPES,
+    apply_log_bias_field,
+    cast_intensity,
+    clip_intensity,
+    estimate_log_bias_field,
+    shift_scale_intensity,
+    window_intensity,
+)
+from .pointwise import Cast, Clamp, PointwiseOp, ShiftScale
 
 __all__ = [
     "IntensityTransform",
     "ClipIntensity",
     "WindowIntensity",
+    "ShiftScaleIntensity",
+    "CastIntensity",
     "N4BiasFieldCorrection",
 ]
 
@@ -40,6 +56,20 @@ class IntensityTransform(BaseTransform):
         """
         return False
 
+    def pointwise_ops(self) -> tuple[PointwiseOp, ...] | None:
+        """Return the point-wise operations this transform consists of.
+
+        Consecutive point-wise transforms are fused by the `Transformer`
+        into a single pass over the image, see `imgtools.transforms.pointwise`.
+
+        Returns
+        -------
+        tuple[PointwiseOp, ...] | None
+            None by default, i.e. the transform is not point-wise.
+            Subclasses should override this method.
+        """
+        return None
+
 
 @dataclass
 class ClipIntensity(IntensityTransform):
@@ -95,6 +125,10 @@ class ClipIntensity(IntensityTransform):
         """
         return clip_intensity(image, self.lower, self.upper)
 
+    def pointwise_ops(self) -> tuple[PointwiseOp, ...]:
+        """Return the clamp to [lower, upper]."""
+        return (Clamp(self.lower, self.upper),)
+
 
 @dataclass
 class WindowIntensity(IntensityTransform):
@@ -149,6 +183,102 @@ class WindowIntensity(IntensityTransform):
 
         return window_intensity(image, self.window, self.level)
 
+    def pointwise_ops(self) -> tuple[PointwiseOp, ...]:
+        """Return the clamp to the window."""
+        return (
+            Clamp(self.level - self.window / 2, self.level + self.window / 2),
+        )
+
+
+@dataclass
+class ShiftScaleIntensity(IntensityTransform):
+    """ShiftScaleIntensity operation class.
+
+    A callable class that shifts then scales image grey level intensities,
+    e.g. to normalize them with a known mean and standard deviation:
+    `ShiftScaleIntensity(shift=-mean, scale=1 / std)`.
+
+    The pixel type is kept, and the intensities saturate to its range. To
+    keep fractional values, cast integer images first with `CastIntensity`.
+
+    Parameters
+    ----------
+    shift : float
+        The value added to the intensities, before scaling.
+    scale : float
+        The factor the shifted intensities are multiplied by.
+    """
+
+    shift: float = 0.0
+    scale: float = 1.0
+
+    def __call__(self, image: Image) -> Image:
+        """Shift then scale image intensities.
+
+        Parameters
+        ----------
+        image : Image
+            The input intensity image.
+
+        Returns
+        -------
+        Image
+            The image with intensities `(value + shift) * scale`.
+        """
+        return shift_scale_intensity(image, self.shift, self.scale)
+
+    def pointwise_ops(self) -> tuple[PointwiseOp, ...]:
+        """Return the shift and scale."""
+        return (ShiftScale(self.shift, self.scale),)
+
+
+@dataclass
+class CastIntensity(IntensityTransform):
+    """CastIntensity operation class.
+
+    A callable class that casts image intensities to another pixel type.
+
+    Parameters
+    ----------
+    pixel_type : str
+        The NumPy name of the new pixel type, e.g. "float32" or "int16".
+
+    Raises
+    ------
+    ValueError
+        If the pixel type is not supported.
+    """
+
+    pixel_type: str
+
+    def __post_init__(self) -> None:
+        """Validate the pixel type."""
+        if self.pixel_type not in PIXEL_TYPES:
+            msg = (
+                f"pixel_type must be one of {list(PIXEL_TYPES)}, "
+                f"got {self.pixel_type}"
+            )
+            raise ValueError(msg)
+
+    def __call__(self, image: Image) -> Image:
+        """Cast image intensities to the pixel type.
+
+        Parameters
+        ----------
+        image : Image
+            The input intensity image.
+
+        Returns
+        -------
+        Image
+            The image with the new pixel type.
+        """
+        return cast_intensity(image, self.pixel_type)
+
+    def pointwise_ops(self) -> tuple[PointwiseOp, ...]:
+        """Return the cast."""
+        return (Cast(np.dtype(self.pixel_type)),)
+
 
 @dataclass
 class N4BiasFieldCorrection(IntensityTransform):
@@ -162,6 +292,25 @@ class N4BiasFieldCorrection(IntensityTransform):
     The correction uses SimpleITK's N4BiasFieldCorrectionImageFilter,
     which implements the N4 algorithm (Tustison et al., 2010).
 
+    Parameters
+    ----------
+    shrink_factor : int, optional
+        Factor the image is shrunk by along every axis to estimate the
+        bias field, which is then applied at full resolution, by default
+        1 (no shrinking). 2 to 4 is usual for 3D MR, see
+        `functional.estimate_log_bias_field`.
+    cache_dir : str | Path | None, optional
+        Directory to store the estimated log bias fields in, by
+        `SeriesInstanceUID`, shrink factor and hash of the input voxels.
+        An image whose field is cached is corrected without estimating it
+        again, the hash tells apart the same series transformed
+        differently before the correction. By default, nothing is cached.
+
+    Raises
+    ------
+    ValueError
+        If `shrink_factor` is less than 1.
+
     Notes
     -----
     - This transform is computationally intensive and may take several
@@ -169,21 +318,79 @@ class N4BiasFieldCorrection(IntensityTransform):
     - Best suited for MR images; application to other modalities is
       typically not meaningful.
     - No rotation, translation, or scaling is applied.
+    - The corrected image is in floating point.
     """
 
-    # def __post_init__(self) -> None:
-    #     self.filter = SimpleITKFilter(N4BiasFieldCorrectionImageFilter())
+    shrink_factor: int = 1
+    cache_dir: str | Path | None = None
 
-    def __call__(self, image: Image) -> Image:
+    def __post_init__(self) -> None:
+        """Validate the shrink factor."""
+        if self.shrink_factor < 1:
+            msg = f"shrink_factor must be at least 1, got {self.shrink_factor}"
+            raise ValueError(msg)
+
+    def __call__(self, image: Image, series_uid: str | None = None) -> Image:
         """Apply N4 bias-field correction to an image.
 
         Parameters
         ----------
         image : Image
             The input MR image to apply bias-field correction.
+        series_uid : str | None, optional
+            The `SeriesInstanceUID` of the image, the key of its bias
+            field in `cache_dir`.
+
         Returns
         -------
         Image
             The MR image after applying N4 bias field correction.
         """
-        return bias_correction(image)
+        return apply_log_bias_field(
+            image, self.log_bias_field(image, series_uid)
+        )
+
+    def log_bias_field(
+        self, image: Image, series_uid: str | None = None
+    ) -> Image:
+        """Return the log bias field of an image, from the cache if there.
+
+        The field is cached for the voxels of the image. The hash does not
+        cover the geometry, so a cached field on another grid than the image
+        is estimated again and replaced.
+        """
+        path = self._cache_path(image, series_uid)
+        if path is not None and path.exists():
+            cached = ReadImage(str(path))
+            if _same_grid(cached, image):
+                logger.debug("Using cached bias field.", path=path)
+                return cached
+
+        log_bias_field = estimate_log_bias_field(image, self.shrink_factor)
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # write then rename, so that a worker never reads a partial file
+            partial = path.with_name(f"{path.stem}.{os.getpid()}.partial.mha")
+            WriteImage(log_bias_field, str(partial))
+            partial.replace(path)
+        return log_bias_field
+
+    def _cache_path(self, image: Image, series_uid: str | None) -> Path | None:
+        if self.cache_dir is None or not series_uid:
+            return None
+        # the preceding transforms of the pipeline change the voxels
+        digest = Hash(image)[:16]
+        return (
+            Path(self.cache_dir)
+            / f"{series_uid}__n4_shrink{self.shrink_factor}__{digest}.mha"
+        )
+
+
+def _same_grid(first: Image, second: Image) -> bool:
+    """Whether both images have the same voxel grid, up to rounding."""
+    return (
+        first.GetSize() == second.GetSize()
+        and np.allclose(first.GetOrigin(), second.GetOrigin())
+        and np.allclose(first.GetSpacing(), second.GetSpacing())
+        and np.allclose(first.GetDirection(), second.GetDirection())
+    )
@@ -0,0 +1,273 @@
+"""Plan a sequence of transforms from the geometry of the image.
+
+The `Transformer` does not run its transforms one by one: it first plans
+them from the `ImageGeometry` of the image (and of the reference image),
+which is known without touching the voxels. Planning
+
+- drops the resamples that would not change the grid, such as the
+  `Resample(spacing=0)` the autopipeline always adds;
+- drops the resamples onto a reference image the image is already aligned
+  with, such as a mask built on the grid of its reference scan;
+- fuses consecutive spatial transforms (`Resample`, `Resize`, `Zoom`,
+  `Rotate`, `InPlaneRotate`) into one resample through the composition of
+  their coordinate transforms, so the image is interpolated once;
+- fuses consecutive point-wise intensity transforms (clip, window,
+  shift/scale, cast) into one pass, see `imgtools.transforms.pointwise`.
+
+Spatial transforms are fused when they share their interpolation and
+anti-aliasing. A fused resample is anti-aliased once, from the net scale
+of the chain (see `imgtools.transforms.functional.resample_onto`), and
+transforms with an explicit `anti_alias_sigma` are not fused: the sigma is
+only valid for the spacing it was chosen for.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from enum import Enum
+from typing import TYPE_CHECKING
+
+from imgtools.transforms.intensity_transforms import IntensityTransform
+from imgtools.transforms.spatial_transforms import (
+    InPlaneRotate,
+    Resample,
+    Resize,
+    Rotate,
+    SpatialTransform,
+    Zoom,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    import SimpleITK as sitk
+
+    from imgtools.coretypes.spatial_types import ImageGeometry
+    from imgtools.transforms.base_transform import BaseTransform
+    from imgtools.transforms.pointwise import PointwiseOp
+
+__all__ = ["StepKind", "PlanStep", "plan_transforms"]
+
+
+class StepKind(str, Enum):
+    """What a step of a plan does with the image."""
+
+    # run the transform as is
+    APPLY = "apply"
+
+    # one resample onto the grid of the step through its coordinate
+    # transforms, for fused transforms
+    RESAMPLE = "resample"
+
+    # resample onto the reference image, `sitk.Resample(image, ref)`
+    REFERENCE = "reference"
+
+    # one pass of the fused point-wise intensity transforms
+    POINTWISE = "pointwise"
+
+
+@dataclass(frozen=True)
+class PlanStep:
+    """One step of a transform plan.
+
+    Attributes
+    ----------
+    kind : StepKind
+        What the step does.
+    transforms : tuple[BaseTransform, ...]
+        The transforms the step stands for, one unless fused.
+    geometry : ImageGeometry | None
+        The grid the step outputs, if planned. A RESAMPLE step, or an APPLY
+        step of a spatial transform with a planned grid, resamples onto it.
+    coordinate_transforms : tuple[sitk.Transform, ...]
+        The transforms a RESAMPLE step maps the points of its output
+        through, in the order of the fused transforms. Empty when the
+        fused transforms only change the sampling grid.
+    """
+
+    kind: StepKind
+    transforms: tuple[BaseTransform, ...]
+    geometry: ImageGeometry | None = None
+    coordinate_transforms: tuple[sitk.Transform, ...] = ()
+
+    @property
+    def interpolation(self) -> str:
+        """The interpolation shared by the fused transforms."""
+        return getattr(self.transforms[-1], "interpolation", "linear")
+
+    @property
+    def anti_alias(self) -> bool:
+        """The anti-aliasing shared by the fused transforms."""
+        return getattr(self.transforms[-1], "anti_alias", True)
+
+    @property
+    def is_resample(self) -> bool:
+        """Whether the step is a single resample of the image.
+
+        That is, a resample onto the reference image (REFERENCE) or onto
+        `geometry` through `coordinate_transforms`.
+        """
+        match self.kind:
+            case StepKind.REFERENCE | StepKind.RESAMPLE:
+                return True
+            case StepKind.APPLY:
+                return self.geometry is not None
+            case _:
+                return False
+
+    @property
+    def pointwise_ops(self) -> list[PointwiseOp]:
+        """The operations of the fused point-wise transforms, in order."""
+        return [
+            op
+            for transform in self.transforms
+            for op in transform.pointwise_ops() or ()  # type: ignore[attr-defined]
+        ]
+
+
+def plan_transforms(
+    transforms: Sequence[BaseTransform],
+    geometry: ImageGeometry | None,
+    reference: ImageGeometry | None = None,
+    has_reference: bool = False,
+) -> list[PlanStep]:
+    """Plan the transforms for an image of the given geometry.
+
+    Parameters
+    ----------
+    transforms : Sequence[BaseTransform]
+        The transforms, in order.
+    geometry : ImageGeometry | None
+        The geometry of the image. None if unknown, in which case only the
+        transforms that need no geometry are fused or dropped.
+    reference : ImageGeometry | None
+        The geometry of the reference image, if known.
+    has_reference : bool
+        Whether the image is transformed against a reference image, i.e. a
+        `Resample` resamples it onto the reference.
+
+    Returns
+    -------
+    list[PlanStep]
+        The steps to run, in order. Dropped transforms have no step.
+    """
+    steps: list[PlanStep] = []
+    current = geometry
+    i = 0
+    while i < len(transforms):
+        group = [transforms[i]]
+        if _resample_options(transforms[i]) is not None:
+            while i + len(group) < len(transforms) and _resample_options(
+                transforms[i + len(group)]
+            ) == _resample_options(transforms[i]):
+                group.append(transforms[i + len(group)])
+        elif _is_pointwise(transforms[i]):
+            while i + len(group) < len(transforms) and _is_pointwise(
+                transforms[i + len(group)]
+            ):
+                group.append(transforms[i + len(group)])
+        i += len(group)
+
+        if len(group) > 1 and _is_pointwise(group[0]):
+            steps.append(PlanStep(StepKind.POINTWISE, tuple(group), current))
+            continue
+
+        with_reference = has_reference and any(
+            isinstance(t, Resample) for t in group
+        )
+        if with_reference and all(
+            isinstance(t, (Resample, Resize)) for t in group
+        ):
+            # the whole group ends on the grid of the reference
+            if not (
+                current is not None
+                and reference is not None
+                and current.is_close(reference)
+            ):
+                steps.append(PlanStep(StepKind.REFERENCE, tuple(group)))
+            current = reference
+            continue
+
+        if (
+            current is None
+            or _resample_options(group[0]) is None
+            or (with_reference and reference is None)
+        ):
+            steps.append(PlanStep(StepKind.APPLY, tuple(group)))
+            current = (
+                None if with_reference else _output_geometry(group[0], current)
+            )
+            continue
+
+        target, coordinate_transforms = _compose(
+            group, current, reference if has_reference else None
+        )
+        # a resample that keeps the grid and the points keeps the voxels
+        if coordinate_transforms or not target.is_close(current):
+            kind = StepKind.APPLY if len(group) == 1 else StepKind.RESAMPLE
+            steps.append(
+                PlanStep(kind, tuple(group), target, coordinate_transforms)
+            )
+        current = target
+    return steps
+
+
+def _compose(
+    group: Sequence[BaseTransform],
+    geometry: ImageGeometry,
+    reference: ImageGeometry | None,
+) -> tuple[ImageGeometry, tuple[sitk.Transform, ...]]:
+    """Follow the geometry through spatial transforms run as one resample.
+
+    Returns the output grid and the coordinate transforms, in order. With
+    a reference, a `Resample` resamples onto it, as is.
+    """
+    coordinate_transforms = []
+    for transform in group:
+        if reference is not None and isinstance(transform, Resample):
+            geometry = reference
+            continue
+        coordinate = transform.coordinate_transform(geometry)  # type: ignore[attr-defined]
+        if coordinate is not None:
+            coordinate_transforms.append(coordinate)
+        geometry = transform.output_geometry(geometry)  # type: ignore[attr-defined]
+    return geometry, tuple(coordinate_transforms)
+
+
+def _resample_options(transform: BaseTransform) -> tuple[str, bool] | None:
+    """Return the options of a transform that is a single resample.
+
+    The options are the interpolation and the anti-aliasing; None is
+    returned for the other transforms. Transforms with the same options
+    can be fused. An explicit `anti_alias_sigma` is only valid for the
+    spacing it was chosen for, so such transforms are not fused.
+    """
+    match transform:
+        case (
+            Resample(anti_alias_sigma=None)
+            | Resize(anti_alias_sigma=None)
+            | Zoom(anti_alias_sigma=None)
+        ):
+            return transform.interpolation, transform.anti_alias
+        case Rotate() | InPlaneRotate():
+            # no anti-aliasing option, the default of the others
+            return transform.interpolation, True
+        case _:
+            return None
+
+
+def _is_pointwise(transform: BaseTransform) -> bool:
+    return (
+        isinstance(transform, IntensityTransform)
+        and transform.pointwise_ops() is not None
+    )
+
+
+def _output_geometry(
+    transform: BaseTransform, geometry: ImageGeometry | None
+) -> ImageGeometry | None:
+    if not isinstance(transform, SpatialTransform):
+        return geometry
+    if geometry is None:
+        return None
+    return transform.output_geometry(geometry)
@@ -0,0 +1,204 @@
+"""Fuse point-wise intensity operations into a single pass.
+
+Every intensity transform of a chain such as clip, window, shift/scale and
+cast reads the whole image and allocates a new one. The operations only
+depend on the value of each voxel, so the `Transformer` fuses consecutive
+ones (see `imgtools.transforms.planner`): the operations are compiled for
+the pixel type of the image, consecutive clamps merged into one, and the
+program is run chunk by chunk, every chunk going through all the
+operations while it is in cache, into a single output buffer.
+
+The operations reproduce the SimpleITK filters they stand for, including
+their casts: clamp bounds are truncated to the pixel type like
+`sitk.Clamp` does, and shift/scale is computed in double precision then
+clamped to the range of the pixel type like `sitk.ShiftScale`.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Union
+
+import numpy as np
+import SimpleITK as sitk
+
+from imgtools.utils import writable_array_view
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+__all__ = [
+    "CHUNK_VOXELS",
+    "Clamp",
+    "ShiftScale",
+    "Cast",
+    "PointwiseOp",
+    "compile_pointwise",
+    "apply_pointwise",
+]
+
+CHUNK_VOXELS = 1 << 16
+"""Voxels run through the program at once, keeping temporaries in cache."""
+
+
+@dataclass(frozen=True)
+class Clamp:
+    """Clamp the values to [lower, upper], like `sitk.Clamp`."""
+
+    lower: float
+    upper: float
+
+    def for_dtype(self, dtype: np.dtype) -> Clamp:
+        """Return the clamp with its bounds cast to the pixel type."""
+        if dtype.kind in "iu":
+            info = np.iinfo(dtype)
+            return Clamp(
+                int(np.clip(np.trunc(self.lower), info.min, info.max)),
+                int(np.clip(np.trunc(self.upper), info.min, info.max)),
+            )
+        return Clamp(
+            float(dtype.type(self.lower)), float(dtype.type(self.upper))
+        )
+
+    def then(self, other: Clamp) -> Clamp:
+        """Return the single clamp equal to this one followed by `other`."""
+        return Clamp(
+            min(max(self.lower, other.lower), other.upper),
+            min(max(self.upper, other.lower), other.upper),
+        )
+
+    def output_dtype(self, dtype: np.dtype) -> np.dtype:
+        return dtype
+
+    def apply(self, chunk: np.ndarray) -> np.ndarray:
+        return np.clip(chunk, self.lower, self.upper, out=chunk)
+
+
+@dataclass(frozen=True)
+class ShiftScale:
+    """Compute `(value + shift) * scale`, like `sitk.ShiftScale`."""
+
+    shift: float = 0.0
+    scale: float = 1.0
+
+    def output_dtype(self, dtype: np.dtype) -> np.dtype:
+        return dtype
+
+    def apply(self, chunk: np.ndarray) -> np.ndarray:
+        values = chunk.astype(np.float64, copy=False)
+        values += self.shift
+        values *= self.scale
+        # saturate to the range of the pixel type instead of wrapping
+        if chunk.dtype.kind in "iu":
+            low, high = np.iinfo(chunk.dtype).min, np.iinfo(chunk.dtype).max
+        else:
+            high = np.finfo(chunk.dtype).max
+            low = -high
+        np.clip(values, low, high, out=values)
+        return values.astype(chunk.dtype, copy=False)
+
+
+@dataclass(frozen=True)
+class Cast:
+    """Cast the values to another pixel type, like `sitk.Cast`."""
+
+    dtype: np.dtype
+
+    def output_dtype(self, dtype: np.dtype) -> np.dtype:
+        return self.dtype
+
+    def apply(self, chunk: np.ndarray) -> np.ndarray:
+        return chunk.astype(self.dtype, copy=False)
+
+
+PointwiseOp = Union[Clamp, ShiftScale, Cast]
+
+
+def compile_pointwise(
+    ops: Iterable[PointwiseOp], dtype: np.dtype
+) -> list[PointwiseOp]:
+    """Compile point-wise operations for an input pixel type.
+
+    Clamp bounds are cast to the pixel type they apply to, consecutive
+    clamps are merged and the operations that do nothing are dropped.
+
+    Parameters
+    ----------
+    ops : Iterable[PointwiseOp]
+        The operations, in order.
+    dtype : np.dtype
+        The pixel type of the input.
+
+    Returns
+    -------
+    list[PointwiseOp]
+        The operations to run, in order.
+    """
+    program: list[PointwiseOp] = []
+    for op in ops:
+        compiled = op
+        match op:
+            case Clamp():
+                compiled = op.for_dtype(dtype)
+                if program and isinstance(program[-1], Clamp):
+                    compiled = program.pop().then(compiled)  # type: ignore[union-attr]
+            case ShiftScale(shift=0, scale=1):
+                continue
+            case Cast(dtype=target) if target == dtype:
+                continue
+        program.append(compiled)
+        dtype = compiled.output_dtype(dtype)
+    return program
+
+
+def apply_pointwise(
+    image: sitk.Image, ops: Iterable[PointwiseOp]
+) -> sitk.Image:
+    """Apply point-wise operations to an image in a single pass.
+
+    Parameters
+    ----------
+    image : sitk.Image
+        The image, scalar or vector.
+    ops : Iterable[PointwiseOp]
+        The operations, in order.
+
+    Returns
+    -------
+    sitk.Image
+        A new image with the same geometry. A single clamp is run with
+        `sitk.Clamp`, any other program chunk by chunk with NumPy.
+    """
+    n_components = image.GetNumberOfComponentsPerPixel()
+    is_vector = "vector" in image.GetPixelIDTypeAsString()
+    view = sitk.GetArrayViewFromImage(image)
+    if is_vector:
+        # a single component vector image has no channel axis
+        view = view.reshape(*image.GetSize()[::-1], n_components)
+
+    program = compile_pointwise(ops, view.dtype)
+    match program:
+        case []:
+            return sitk.Image(image)
+        case [Clamp(lower=lower, upper=upper)]:
+            return sitk.Clamp(image, image.GetPixelID(), lower, upper)
+
+    output_dtype = view.dtype
+    for op in program:
+        output_dtype = op.output_dtype(output_dtype)
+    # the chunks are written straight into the buffer of the output image
+    pixel_id = (
+        sitk.extra._get_sitk_vector_pixelid
+        if is_vector
+        else sitk.extra._get_sitk_pixelid
+    )(np.empty(0, dtype=output_dtype))  # type: ignore[arg-type]
+    result = sitk.Image(image.GetSize(), pixel_id, n_components)
+    result.CopyInformation(image)
+    flat_input = view.reshape(-1)
+    flat_output = writable_array_view(result).reshape(-1)
+    for start in range(0, flat_input.size, CHUNK_VOXELS):
+        chunk = np.array(flat_input[start : start + CHUNK_VOXELS])
+        for op in program:
+            chunk = op.apply(chunk)
+        flat_output[start : start + CHUNK_VOXELS] = chunk
+    return result
@@ -0,0 +1,229 @@
+"""Time the transforms applied to every image of a run.
+
+When a sample is slow, the per-sample `processing_time` does not tell
+whether resampling, windowing or N4 is responsible. A `TransformProfiler`
+passed to the `Transformer` records every step it runs on every image:
+
+- the transforms of the step (several when the planner fused them, see
+  `imgtools.transforms.planner`) and its kind,
+- the class and modality of the image,
+- the wall time, and the number of voxels of the input and the output,
+- the increase of the peak resident memory of the process (RSS) during
+  the step: how much the step raised the high-water mark, 0 if it stayed
+  under it.
+
+Transforms that would not change the image are planned away, and have no
+record. The peak RSS is the one of the whole process: with images
+transformed in threads (`Transformer.max_workers`), a step may be charged
+for the memory of another. It is None where the `resource` module is not
+available (Windows).
+
+The `Autopipeline` stores the records of every sample in its
+`ProcessSampleResult`, and `save_pipeline_reports` writes them summarized
+per transform with `summarize_records`, the slowest first.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any, Callable, TypeVar
+
+import numpy as np
+import SimpleITK as sitk
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from imgtools.transforms.planner import PlanStep
+
+__all__ = ["TransformRecord", "TransformProfiler", "summarize_records"]
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class TransformRecord:
+    """One step of the transforms, run on one image.
+
+    Attributes
+    ----------
+    transform : str
+        The name of the transform, the names joined by " + " for fused
+        transforms.
+    kind : str
+        The kind of the step, see `imgtools.transforms.planner.StepKind`.
+    image_type : str
+        The class of the image, e.g. "Scan" or "VectorMask".
+    modality : str | None
+        The modality of the image, if in its metadata.
+    seconds : float
+        Wall time of the step.
+    input_voxels : int
+        Number of voxels of the image before the step.
+    output_voxels : int
+        Number of voxels of the image after the step.
+    peak_rss_delta : int | None
+        Increase of the peak resident memory of the process during the
+        step, in bytes. None where it cannot be measured.
+    """
+
+    transform: str
+    kind: str
+    image_type: str
+    modality: str | None
+    seconds: float
+    input_voxels: int
+    output_voxels: int
+    peak_rss_delta: int | None
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert the record to a dictionary."""
+        return asdict(self)
+
+
+class TransformProfiler:
+    """Collect a `TransformRecord` for every step run by a `Transformer`.
+
+    The records of the images transformed in threads are collected
+    together, in the order the steps end.
+
+    Examples
+    --------
+    >>> profiler = TransformProfiler()
+    >>> transformed = transformer(
+    ...     images, profiler=profiler
+    ... )
+    >>> summarize_records(profiler.records)
+    """
+
+    def __init__(self) -> None:
+        self.records: list[TransformRecord] = []
+        self._lock = threading.Lock()
+
+    def measure(
+        self,
+        step: PlanStep,
+        image: object,
+        run: Callable[[], T],
+        metadata: dict | None = None,
+        image_type: str | None = None,
+    ) -> T:
+        """Run a step on an image and record it.
+
+        Parameters
+        ----------
+        step : PlanStep
+            The step `run` runs.
+        image : object
+            The image the step runs on, a `sitk.Image` or a mask with a
+            `geometry`, to count its voxels.
+        run : Callable[[], T]
+            Runs the step, and returns the transformed image.
+        metadata : dict | None, optional
+            The metadata of the image, for its modality.
+        image_type : str | None, optional
+            The class of the image, by default the class of `image`. The
+            steps after the first run on a plain `sitk.Image`.
+
+        Returns
+        -------
+        T
+            What `run` returns. A step that raises is not recorded.
+        """
+        peak_before = _peak_rss()
+        start = time.perf_counter()
+        result = run()
+        seconds = time.perf_counter() - start
+        peak_after = _peak_rss()
+
+        record = TransformRecord(
+            transform=" + ".join(t.name for t in step.transforms),
+            kind=step.kind.value,
+            image_type=image_type or type(image).__name__,
+            modality=(metadata or {}).get("Modality"),
+            seconds=seconds,
+            input_voxels=_voxels(image),
+            output_voxels=_voxels(result),
+            peak_rss_delta=(
+                peak_after - peak_before
+                if peak_before is not None and peak_after is not None
+                else None
+            ),
+        )
+        with self._lock:
+            self.records.append(record)
+        return result
+
+
+def summarize_records(
+    records: Iterable[TransformRecord],
+) -> list[dict[str, Any]]:
+    """Aggregate records per transform, kind and image class.
+
+    Parameters
+    ----------
+    records : Iterable[TransformRecord]
+        The records, e.g. of all the samples of a run.
+
+    Returns
+    -------
+    list[dict[str, Any]]
+        One row per transform, kind and image class, with the number of
+        steps, their total, mean and maximum wall time, the voxels they
+        read and wrote, the output voxels per second and the largest peak
+        RSS increase. The rows taking the most time come first.
+    """
+    groups: dict[tuple[str, str, str], list[TransformRecord]] = {}
+    for record in records:
+        key = (record.transform, record.kind, record.image_type)
+        groups.setdefault(key, []).append(record)
+
+    rows = []
+    for (transform, kind, image_type), group in groups.items():
+        seconds = np.array([r.seconds for r in group])
+        output_voxels = sum(r.output_voxels for r in group)
+        rss = [r.peak_rss_delta for r in group if r.peak_rss_delta is not None]
+        rows.append(
+            {
+                "transform": transform,
+                "kind": kind,
+                "image_type": image_type,
+                "count": len(group),
+                "total_seconds": float(seconds.sum()),
+                "mean_seconds": float(seconds.mean()),
+                "max_seconds": float(seconds.max()),
+                "input_voxels": sum(r.input_voxels for r in group),
+                "output_voxels": output_voxels,
+                "voxels_per_second": (
+                    output_voxels / seconds.sum()
+                    if seconds.sum() > 0
+                    else None
+                ),
+                "max_peak_rss_delta": max(rss) if rss else None,
+            }
+        )
+    return sorted(rows, key=lambda row: row["total_seconds"], reverse=True)
+
+
+def _voxels(image: object) -> int:
+    """The number of voxels of an image, 0 if unknown."""
+    if isinstance(image, sitk.Image):
+        return int(image.GetNumberOfPixels())
+    geometry = getattr(image, "geometry", None)
+    if geometry is None:
+        return 0
+    return int(np.prod(geometry.size.to_tuple()))
+
+
+def _peak_rss() -> int | None:
+    """The peak resident memory of the process in bytes, if available."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes on Linux
+    return int(peak if sys.platform == "darwin" else peak * 1024)
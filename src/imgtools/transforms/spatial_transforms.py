@@ -4,13 +4,17 @@ from typing import Sequence
 import numpy as np
 import SimpleITK as sitk
 
-from imgtools.coretypes import Size3D
+from imgtools.coretypes import Size3D, Spacing3D
+from imgtools.coretypes.spatial_types import ImageGeometry
 
 from .base_transform import BaseTransform
 from .functional import (
+    output_grid,
     resample,
     resize,
     rotate,
+    rotation_transform,
+    scale_transform,
     zoom,
 )
 
@@ -54,6 +58,46 @@ class SpatialTransform(BaseTransform):
         """
         return False
 
+    def output_geometry(self, geometry: ImageGeometry) -> ImageGeometry | None:
+        """Return the geometry of the output, without transforming an image.
+
+        Used by the `Transformer` to plan the transforms before running them.
+
+        Parameters
+        ----------
+        geometry : ImageGeometry
+            The geometry of the input image.
+
+        Returns
+        -------
+        ImageGeometry | None
+            None by default, i.e. unknown. Subclasses should override this
+            method.
+        """
+        return None
+
+    def coordinate_transform(
+        self, geometry: ImageGeometry
+    ) -> sitk.Transform | None:
+        """Return the transform the image is resampled through.
+
+        The transform maps the points of the output onto the input. Used
+        with `output_geometry` by the `Transformer` to run consecutive
+        spatial transforms as a single resample.
+
+        Parameters
+        ----------
+        geometry : ImageGeometry
+            The geometry of the input image.
+
+        Returns
+        -------
+        sitk.Transform | None
+            None by default, i.e. the identity: the transform only changes
+            the sampling grid.
+        """
+        return None
+
 
 @dataclass
 class Resample(SpatialTransform):
@@ -106,6 +150,29 @@ class Resample(SpatialTransform):
         """
         return True
 
+    def output_geometry(self, geometry: ImageGeometry) -> ImageGeometry:
+        """Return the geometry of the output, without a reference image."""
+        spacing, size = output_grid(
+            geometry.spacing.to_tuple(),
+            geometry.size.to_tuple(),
+            self._spacing_list(),
+            output_size=self.output_size,
+        )
+        return _with_grid(geometry, spacing, size)
+
+    def coordinate_transform(
+        self, geometry: ImageGeometry
+    ) -> sitk.Transform | None:
+        """Return the `transform` of the resample, None for the identity."""
+        return self.transform
+
+    def _spacing_list(self) -> float | list[float] | np.ndarray:
+        return (
+            list(self.spacing)
+            if isinstance(self.spacing, (tuple, Sequence))
+            else self.spacing
+        )
+
     def __call__(
         self, image: sitk.Image, ref: sitk.Image | None = None
     ) -> sitk.Image:
@@ -134,15 +201,9 @@ class Resample(SpatialTransform):
         if isinstance(ref, sitk.Image):
             return sitk.Resample(image, ref)
         else:
-            spacing_list = (
-                list(self.spacing)
-                if isinstance(self.spacing, (tuple, Sequence))
-                else self.spacing
-            )
-
             return resample(
                 image,
-                spacing=spacing_list,
+                spacing=self._spacing_list(),
                 interpolation=self.interpolation,
                 anti_alias=self.anti_alias,
                 anti_alias_sigma=self.anti_alias_sigma,
@@ -183,6 +244,19 @@ class Resize(SpatialTransform):
     anti_alias: bool = True
     anti_alias_sigma: float | None = None
 
+    def output_geometry(self, geometry: ImageGeometry) -> ImageGeometry:
+        """Return the geometry of the output, without resizing an image."""
+        original_size = np.array(geometry.size.to_tuple())
+        if isinstance(self.size, (float, int)):
+            new_size = np.repeat(self.size, len(original_size))
+        else:
+            size = np.asarray(self.size)
+            new_size = np.where(size == 0, original_size, size)
+        spacing = (
+            np.array(geometry.spacing.to_tuple()) * original_size / new_size
+        )
+        return _with_grid(geometry, spacing, new_size.astype(int))
+
     def __call__(self, image: sitk.Image) -> sitk.Image:
         """Resize the input image to the configured dimensions.
 
@@ -232,8 +306,8 @@ class Zoom(SpatialTransform):
         - "bspline" for order-3 b-spline interpolation
     anti_alias : bool, optional
         Whether to smooth the image with a Gaussian kernel before resampling.
-        Only used when downsampling, i.e. when `size < image.GetSize()`.
-        This should be used to avoid aliasing artifacts.
+        Only used when downsampling, i.e. when a scale factor is greater
+        than 1. This should be used to avoid aliasing artifacts.
     anti_alias_sigma : float | None, optional
         The standard deviation of the Gaussian kernel used for anti-aliasing.
     """
@@ -243,6 +317,17 @@ class Zoom(SpatialTransform):
     anti_alias: bool = True
     anti_alias_sigma: float | None = None
 
+    def output_geometry(self, geometry: ImageGeometry) -> ImageGeometry:
+        """Return the geometry of the output: the grid is kept."""
+        return geometry
+
+    def coordinate_transform(self, geometry: ImageGeometry) -> sitk.Transform:
+        """Return the scaling around the centre of the image."""
+        centre = geometry.index_to_physical(
+            np.array(geometry.size.to_tuple()) / 2
+        )
+        return scale_transform(centre.tolist(), self.scale_factor)
+
     def __call__(self, image: sitk.Image) -> sitk.Image:
         """Rescale image, preserving its spatial extent.
 
@@ -314,6 +399,15 @@ class Rotate(SpatialTransform):
                 errmsg += f" but got {self.angles}"
                 raise ValueError(errmsg)
 
+    def output_geometry(self, geometry: ImageGeometry) -> ImageGeometry:
+        """Return the geometry of the output: the grid is kept."""
+        return geometry
+
+    def coordinate_transform(self, geometry: ImageGeometry) -> sitk.Transform:
+        """Return the rotation around `rotation_centre`."""
+        centre = geometry.index_to_physical(self.rotation_centre)
+        return rotation_transform(centre.tolist(), self._angles_list)
+
     def __call__(self, image: sitk.Image) -> sitk.Image:
         """Rotate an image around a specified center.
 
@@ -355,6 +449,16 @@ class InPlaneRotate(SpatialTransform):
     angle: float
     interpolation: str = "linear"
 
+    def output_geometry(self, geometry: ImageGeometry) -> ImageGeometry:
+        """Return the geometry of the output: the grid is kept."""
+        return geometry
+
+    def coordinate_transform(self, geometry: ImageGeometry) -> sitk.Transform:
+        """Return the rotation around the central voxel of the image."""
+        image_centre = geometry.size // 2
+        centre = geometry.index_to_physical(list(image_centre))
+        return rotation_transform(centre.tolist(), [0.0, 0.0, self.angle])
+
     def __call__(self, image: sitk.Image) -> sitk.Image:
         """Rotate an image in its plane.
 
@@ -381,3 +485,15 @@ class InPlaneRotate(SpatialTransform):
             angles=angles,
             interpolation=self.interpolation,
         )
+
+
+def _with_grid(
+    geometry: ImageGeometry, spacing: np.ndarray, size: np.ndarray
+) -> ImageGeometry:
+    """Return the geometry with the new grid; `resample` keeps the origin."""
+    return ImageGeometry(
+        size=Size3D(*(int(n) for n in size)),
+        origin=geometry.origin,
+        direction=geometry.direction,
+        spacing=Spacing3D(*(float(d) for d in spacing)),
+    )
@@ -1,28 +1,60 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Generic, Sequence, TypeVar
+from functools import partial
+from typing import Callable, Generic, Sequence, TypeVar
 
 import SimpleITK as sitk
 
-from imgtools.coretypes.base_masks import VectorMask
+from imgtools.coretypes.base_masks import Mask, VectorMask
 from imgtools.coretypes.base_medimage import MedImage
+from imgtools.coretypes.compact_mask import CompactVectorMask
+from imgtools.coretypes.lazy_medimage import materialize
+from imgtools.coretypes.spatial_types import ImageGeometry
 from imgtools.loggers import logger
 from imgtools.transforms import (
     BaseTransform,
     IntensityTransform,
     SpatialTransform,
 )
+from imgtools.transforms.functional import resample_onto
 from imgtools.transforms.intensity_transforms import N4BiasFieldCorrection
+from imgtools.transforms.label_resampling import (
+    resample_compact_mask,
+    resample_label_image,
+)
+from imgtools.transforms.planner import PlanStep, StepKind, plan_transforms
+from imgtools.transforms.pointwise import apply_pointwise
+from imgtools.transforms.profiling import TransformProfiler
 
 # Define TypeVars for the different image types
 T_MedImage = TypeVar("T_MedImage", bound=MedImage)
+T = TypeVar("T")
 
 
 @dataclass
 class Transformer(Generic[T_MedImage]):
+    """Apply a sequence of transforms to the images of a sample.
+
+    Attributes
+    ----------
+    transforms : Sequence[BaseTransform]
+        The transforms, in order.
+    max_workers : int
+        Number of threads transforming the images after the first one, the
+        reference, by default 1. The SimpleITK filters release the GIL, so
+        threads help with many small images, such as the masks of a sample
+        saved separately.
+    """
+
     transforms: Sequence[BaseTransform]
+    max_workers: int = 1
 
     def __post_init__(self) -> None:
         """Validate transforms."""
+        if self.max_workers < 1:
+            msg = f"max_workers must be at least 1, got {self.max_workers}."
+            raise ValueError(msg)
         errors: list[str] = []
         for transform in self.transforms:
             if isinstance(transform, BaseTransform):
@@ -38,6 +70,7 @@ class Transformer(Generic[T_MedImage]):
         self,
         image: T_MedImage,
         ref: MedImage | None = None,
+        context: "_SampleContext | None" = None,
     ) -> T_MedImage:
         """Apply transforms to an image, preserving its type.
 
@@ -49,45 +82,68 @@ class Transformer(Generic[T_MedImage]):
             For some transforms, a reference image can be used for
             transformation. This is typically used for spatial transforms
             like Resample.
+        context : _SampleContext, optional
+            The work shared with the other images of the sample, instead
+            of `ref`.
 
         Returns
         -------
         T_MedImage
-            The transformed image, with the same type as the input
+            The transformed image, with the same type as the input.
+            A `LazyMedImage` is read first, and the loaded image is returned,
+            except for a `CompactVectorMask` that is only resampled: it is
+            resampled crop by crop, and returned as a `CompactVectorMask`.
+
+        Notes
+        -----
+        The transforms are planned from the geometry of the images first,
+        see `imgtools.transforms.planner`: resamples that would not change
+        the image are skipped, consecutive spatial transforms run as one
+        resample, and consecutive point-wise intensity transforms as one
+        pass.
+
+        Masks (`Mask`, `VectorMask`, `CompactVectorMask`) are resampled as
+        labels, whatever the interpolation of the transforms: nearest
+        neighbour, channel by channel around every structure, see
+        `imgtools.transforms.label_resampling`.
         """
+        if context is None:
+            context = _SampleContext(self, ref)
+        plan = context.plan(image)
+        if isinstance(image, CompactVectorMask) and all(
+            step.is_resample for step in plan
+        ):
+            # the output writes the compact mask without expanding it
+            return self._resample_compact(image, plan, context)  # type: ignore[return-value]
+
+        image = materialize(image)
         # save original image class type + attributes
         img_cls = type(image)
         # Store the metadata (all MedImage subclasses should have this)
         metadata = getattr(image, "metadata", None)
+        labels = isinstance(image, (Mask, VectorMask))
 
-        # Apply all transforms in sequence
-        transformed_image = image
-        for n, transform in enumerate(self.transforms, start=1):
+        # Apply all planned steps in sequence
+        transformed_image: sitk.Image = image
+        for step in plan:
             try:
-                if (
-                    isinstance(transform, SpatialTransform)
-                    and transform.supports_reference()
-                ):
-                    transformed_image = transform(transformed_image, ref)
-                elif isinstance(
-                    transform, (IntensityTransform, SpatialTransform)
-                ):
-                    # Apply N4BiasFieldCorrection only for MR images
-                    if isinstance(transform, N4BiasFieldCorrection):
-                        if (
-                            transformed_image.metadata.get(
-                                "Modality", "Unknown"
-                            )
-                            == "MR"
-                        ):
-                            transformed_image = transform(transformed_image)  # type: ignore
-                    else:
-                        transformed_image = transform(transformed_image)
-                else:
-                    msg = f"Invalid transform type: {type(transform)}"
-                    raise ValueError(msg)
+                transformed_image = context.run(
+                    step,
+                    transformed_image,
+                    partial(
+                        self._run_step,
+                        step,
+                        transformed_image,
+                        context,
+                        metadata,
+                        labels=labels,
+                    ),
+                    metadata,
+                    img_cls,
+                )
             except Exception as e:
-                msg = f"Error applying transform {n}: {transform}."
+                n = self.transforms.index(step.transforms[0]) + 1
+                msg = f"Error applying transform {n}: {step.transforms[0]}."
                 logger.exception(msg)
                 raise ValueError(msg) from e
 
@@ -116,30 +172,258 @@ class Transformer(Generic[T_MedImage]):
             logger.exception(msg)
             raise ValueError(msg) from e
 
-    def __call__(self, images: Sequence[T_MedImage]) -> Sequence[T_MedImage]:
+    def plan(
+        self, image: sitk.Image, ref: sitk.Image | None = None
+    ) -> list[PlanStep]:
+        """Plan the transforms for an image, without running them.
+
+        Parameters
+        ----------
+        image : sitk.Image
+            The image to transform. Only its geometry is read.
+        ref : sitk.Image, optional
+            The reference image the image is resampled onto.
+
+        Returns
+        -------
+        list[PlanStep]
+            The steps to run. Transforms that would not change the image
+            have no step.
+        """
+        plan = plan_transforms(
+            self.transforms,
+            _geometry(image),
+            reference=_geometry(ref) if ref is not None else None,
+            has_reference=ref is not None,
+        )
+        if sum(len(step.transforms) for step in plan) < len(self.transforms):
+            logger.debug(
+                "Skipped transforms that would not change the image.",
+                transforms=len(self.transforms),
+                steps=[step.kind.value for step in plan],
+            )
+        return plan
+
+    def _resample_compact(
+        self,
+        mask: CompactVectorMask,
+        plan: list[PlanStep],
+        context: "_SampleContext",
+    ) -> CompactVectorMask:
+        """Run a plan of resamples on a compact mask, crop by crop."""
+        for step in plan:
+            geometry = _target_geometry(step, context.reference_geometry)
+            if geometry is None:
+                msg = "Cannot resample a compact mask onto a non-3D image."
+                raise ValueError(msg)
+            mask = context.run(
+                step,
+                mask,
+                partial(
+                    resample_compact_mask,
+                    mask,
+                    geometry,
+                    step.coordinate_transforms,
+                ),
+                mask.metadata,
+                CompactVectorMask,
+            )
+        return mask
+
+    def _run_step(
+        self,
+        step: PlanStep,
+        image: sitk.Image,
+        context: "_SampleContext",
+        metadata: dict | None,
+        labels: bool = False,
+    ) -> sitk.Image:
+        """Run one step of a plan.
+
+        `metadata` is the metadata of the input image: the image returned by
+        a previous step is a plain `sitk.Image`. With `labels`, resamples
+        are run as label resamples.
+        """
+        geometry = (
+            _target_geometry(step, context.reference_geometry)
+            if labels
+            else None
+        )
+        if geometry is not None and image.GetDimension() == 3:
+            return resample_label_image(
+                image, geometry, step.coordinate_transforms
+            )
+        match step.kind:
+            case StepKind.REFERENCE:
+                return context.resample_onto_reference(image)
+            case StepKind.POINTWISE:
+                return apply_pointwise(image, step.pointwise_ops)
+            case StepKind.RESAMPLE:
+                assert step.geometry is not None
+                return resample_onto(
+                    image,
+                    step.geometry,
+                    step.coordinate_transforms,
+                    interpolation=step.interpolation,
+                    anti_alias=step.anti_alias,
+                )
+        for transform in step.transforms:
+            if (
+                isinstance(transform, SpatialTransform)
+                and transform.supports_reference()
+            ):
+                image = transform(image, context.reference)
+            elif isinstance(transform, (IntensityTransform, SpatialTransform)):
+                # Apply N4BiasFieldCorrection only for MR images
+                if isinstance(transform, N4BiasFieldCorrection):
+                    modality = (metadata or {}).get("Modality", "Unknown")
+                    if modality == "MR":
+                        image = transform(
+                            image, (metadata or {}).get("SeriesInstanceUID")
+                        )
+                else:
+                    image = transform(image)
+            else:
+                msg = f"Invalid transform type: {type(transform)}"
+                raise ValueError(msg)
+        return image
+
+    def __call__(
+        self,
+        images: Sequence[T_MedImage],
+        transformed_reference: T_MedImage | None = None,
+        profiler: TransformProfiler | None = None,
+    ) -> Sequence[T_MedImage]:
         """Apply transforms to a sequence of images.
 
         Parameters
         ----------
         images : Sequence[T_MedImage]
             A sequence of images to transform
+        transformed_reference : T_MedImage | None, optional
+            The first image, already transformed, e.g. read from a
+            `imgtools.io.transform_cache.TransformCache`. The first image
+            is then not transformed, nor read if it is a `LazyMedImage`.
+        profiler : TransformProfiler | None, optional
+            Records the time, voxels and memory of every step run on every
+            image, see `imgtools.transforms.profiling`.
 
         Returns
         -------
         Sequence[T_MedImage]
             The transformed images, with the same types as the inputs
+
+        Notes
+        -----
+        The first image is transformed first, and is the reference of the
+        others. The work that only depends on the geometry is shared by the
+        other images: they are planned once per distinct grid, and resampled
+        onto the reference by the same configured `ResampleImageFilter`
+        (one per thread). With `max_workers` above 1 they are transformed in
+        threads.
         """
         # Initialize new image list
-        new_images: list[T_MedImage] = [self._apply_transforms(images[0])]
+        new_images: list[T_MedImage] = [
+            transformed_reference
+            if transformed_reference is not None
+            else self._apply_transforms(
+                images[0], context=_SampleContext(self, None, profiler)
+            )
+        ]
+        context = _SampleContext(self, new_images[0], profiler)
+
+        def transform(image: T_MedImage) -> T_MedImage:
+            return self._apply_transforms(image, context=context)
 
-        # Process each image
-        for image in images[1:]:
-            # Apply transforms and maintain type
-            new_images.append(self._apply_transforms(image, ref=new_images[0]))
+        # Apply transforms and maintain type
+        if self.max_workers > 1 and len(images) > 2:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                new_images.extend(pool.map(transform, images[1:]))
+        else:
+            new_images.extend(transform(image) for image in images[1:])
 
         return new_images
 
 
+class _SampleContext:
+    """The work shared by the images transformed against one reference.
+
+    The plans, by grid of the input image, the resampler onto the
+    reference, configured once per thread, and the profiler of the steps.
+    """
+
+    def __init__(
+        self,
+        transformer: Transformer,
+        reference: sitk.Image | None,
+        profiler: TransformProfiler | None = None,
+    ) -> None:
+        self.transformer = transformer
+        self.reference = reference
+        self.profiler = profiler
+        self.reference_geometry = (
+            _geometry(reference) if reference is not None else None
+        )
+        self._plans: dict[tuple, list[PlanStep]] = {}
+        self._local = threading.local()
+
+    def plan(self, image: sitk.Image) -> list[PlanStep]:
+        """The plan of an image, computed once per grid."""
+        key = (
+            image.GetSize(),
+            image.GetOrigin(),
+            image.GetSpacing(),
+            image.GetDirection(),
+        )
+        # two threads may plan the same grid, with the same result
+        if key not in self._plans:
+            self._plans[key] = self.transformer.plan(image, self.reference)
+        return self._plans[key]
+
+    def run(
+        self,
+        step: PlanStep,
+        image: object,
+        run_step: Callable[[], T],
+        metadata: dict | None,
+        image_type: type,
+    ) -> T:
+        """Run a step on an image, through the profiler if any."""
+        if self.profiler is None:
+            return run_step()
+        return self.profiler.measure(
+            step, image, run_step, metadata, image_type.__name__
+        )
+
+    def resample_onto_reference(self, image: sitk.Image) -> sitk.Image:
+        """Resample an image onto the reference, as `sitk.Resample`."""
+        resampler = getattr(self._local, "resampler", None)
+        if resampler is None:
+            # a filter is not thread-safe, every thread has its own
+            resampler = sitk.ResampleImageFilter()
+            resampler.SetReferenceImage(self.reference)
+            self._local.resampler = resampler
+        return resampler.Execute(image)
+
+
+def _geometry(image: sitk.Image) -> ImageGeometry | None:
+    """The geometry of a 3D image, None for other dimensions."""
+    if image.GetDimension() != 3:
+        return None
+    return ImageGeometry.from_image(image)
+
+
+def _target_geometry(
+    step: PlanStep, reference: ImageGeometry | None
+) -> ImageGeometry | None:
+    """The grid a resample step outputs, None if unknown or not a resample."""
+    if not step.is_resample:
+        return None
+    if step.kind == StepKind.REFERENCE:
+        return reference
+    return step.geometry
+
+
 def main() -> None:
     from rich import print  # noqa
 
@@ -11,13 +11,17 @@ from .dictionaries import (
     flatten_dictionary,
     retrieve_nested_value,
 )
+from .execution import ExecutionResources, run_with_resources
 from .imageutils import (
     Array3D,
     ImageArrayMetadata,
     array_to_image,
+    copy_geometry,
     idxs_to_physical_points,
     image_to_array,
     physical_points_to_idxs,
+    physical_to_index_matrix,
+    writable_array_view,
 )
 from .optional_import import OptionalImportError, optional_import
 from .sanitize_file_name import sanitize_file_name
@@ -29,9 +33,15 @@ __all__ = [
     "Array3D",
     "ImageArrayMetadata",
     "array_to_image",
+    "copy_geometry",
     "idxs_to_physical_points",
     "image_to_array",
     "physical_points_to_idxs",
+    "physical_to_index_matrix",
+    "writable_array_view",
+    # execution
+    "ExecutionResources",
+    "run_with_resources",
     # optional_import
     "OptionalImportError",
     "optional_import",
@@ -0,0 +1,172 @@
+"""Share the cores between the worker processes and the threads of each.
+
+The pipelines run `n_jobs` loky worker processes. Inside every worker the
+SimpleITK filters (resampling, smoothing, N4, statistics) run on ITK's
+global thread pool, sized to all the cores of the machine by default, and
+so are the BLAS and OpenMP pools NumPy may use. With many workers the
+machine is oversubscribed: `n_jobs x cores` threads compete for the cores
+and the throughput can drop below the one of a single process.
+
+`ExecutionResources` splits the cores instead: every worker limits its ITK
+pool and its BLAS/OpenMP pools to `threads_per_job` threads. By default
+the cores are split evenly between the jobs. Fewer jobs with more threads
+each (e.g. 4 jobs x 8 threads on 32 cores) trade the parallelism across
+samples for the parallelism inside the filters, and need less memory.
+
+The BLAS/OpenMP limits are set in the environment of the loky workers
+(`joblib.parallel_config(inner_max_num_threads=...)`), and with
+`threadpoolctl` when it is installed, for the pools already loaded.
+
+The limits of a task are restored when it ends: with `n_jobs=1` joblib runs
+the tasks in the calling process, whose SimpleITK and BLAS settings must
+not change.
+"""
+
+from __future__ import annotations
+
+import os
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, TypeVar
+
+import SimpleITK as sitk
+from joblib import parallel_config  # type: ignore
+
+from imgtools.loggers import logger
+from imgtools.utils.optional_import import optional_import
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+__all__ = ["ExecutionResources", "run_with_resources"]
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class ExecutionResources:
+    """How many worker processes run, and how many threads each one uses.
+
+    Attributes
+    ----------
+    n_jobs : int
+        Number of worker processes.
+    threads_per_job : int
+        Number of threads of the ITK, BLAS and OpenMP pools of every worker.
+
+    Examples
+    --------
+    >>> resources = ExecutionResources.for_jobs(
+    ...     4, cpu_count=32
+    ... )
+    >>> resources.threads_per_job
+    8
+    >>> with resources.parallel_config():
+    ...     Parallel(n_jobs=resources.n_jobs)(
+    ...         delayed(run_with_resources)(
+    ...             resources, func, arg
+    ...         )
+    ...         for arg in args
+    ...     )
+    """
+
+    n_jobs: int
+    threads_per_job: int
+
+    @classmethod
+    def for_jobs(
+        cls,
+        n_jobs: int,
+        threads_per_job: int | None = None,
+        cpu_count: int | None = None,
+    ) -> ExecutionResources:
+        """Split the cores between `n_jobs` workers.
+
+        Parameters
+        ----------
+        n_jobs : int
+            Number of worker processes.
+        threads_per_job : int | None, optional
+            Number of threads of every worker. By default the cores are
+            split evenly between the workers, at least one thread each.
+        cpu_count : int | None, optional
+            Number of cores, by default `os.cpu_count()`.
+
+        Returns
+        -------
+        ExecutionResources
+            The resources of the workers.
+
+        Raises
+        ------
+        ValueError
+            If `n_jobs` or `threads_per_job` is not positive.
+        """
+        cpu_count = cpu_count or os.cpu_count() or 1
+        if threads_per_job is None:
+            threads_per_job = max(1, cpu_count // max(1, n_jobs))
+        if n_jobs < 1 or threads_per_job < 1:
+            msg = (
+                "n_jobs and threads_per_job must be positive, got "
+                f"{n_jobs=} and {threads_per_job=}."
+            )
+            raise ValueError(msg)
+        if n_jobs * threads_per_job > cpu_count:
+            logger.warning(
+                "More threads than cores, the workers will compete for them.",
+                n_jobs=n_jobs,
+                threads_per_job=threads_per_job,
+                cpu_count=cpu_count,
+            )
+        return cls(n_jobs=n_jobs, threads_per_job=threads_per_job)
+
+    @contextmanager
+    def parallel_config(self) -> Iterator[None]:
+        """Configure joblib to start loky workers with these limits.
+
+        `Parallel` must be created inside the context, without its own
+        `backend`, for the limits to reach the environment of the workers.
+        """
+        with parallel_config(
+            backend="loky", inner_max_num_threads=self.threads_per_job
+        ):
+            yield
+
+    @contextmanager
+    def limits(self) -> Iterator[None]:
+        """Limit the thread pools of the current process, then restore them.
+
+        Sets the default number of threads of the SimpleITK filters and,
+        if `threadpoolctl` is installed, the BLAS/OpenMP limits. Both are
+        restored on exit, so that the calling process is left unchanged
+        when joblib runs the tasks in it (`n_jobs=1`).
+        """
+        previous = sitk.ProcessObject.GetGlobalDefaultNumberOfThreads()
+        sitk.ProcessObject.SetGlobalDefaultNumberOfThreads(
+            self.threads_per_job
+        )
+        threadpoolctl, has_threadpoolctl = optional_import("threadpoolctl")
+        try:
+            if has_threadpoolctl:
+                with threadpoolctl.threadpool_limits(
+                    limits=self.threads_per_job
+                ):
+                    yield
+            else:
+                yield
+        finally:
+            sitk.ProcessObject.SetGlobalDefaultNumberOfThreads(previous)
+
+
+def run_with_resources(
+    resources: ExecutionResources,
+    func: Callable[..., T],
+    *args: Any,  # noqa: ANN401
+) -> T:
+    """Call `func(*args)` with the threads of the process limited.
+
+    Meant to be the function of the tasks sent to the workers. The limits
+    are restored after the call.
+    """
+    with resources.limits():
+        return func(*args)
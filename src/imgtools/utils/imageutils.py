@@ -1,3 +1,4 @@
+import ctypes
 from typing import List, Tuple
 
 import numpy as np
@@ -62,6 +63,20 @@ def array_to_image(
     return image
 
 
+def copy_geometry(image: sitk.Image, reference: sitk.Image) -> None:
+    """Copy origin, spacing and direction from `reference` to `image`.
+
+    Unlike `sitk.Image.CopyInformation`, only the geometry getters of
+    `reference` are used, so any object exposing `GetOrigin`, `GetSpacing`
+    and `GetDirection` works, e.g. a
+    `imgtools.coretypes.lazy_medimage.LazyMedImage` whose voxels have not
+    been read yet.
+    """
+    image.SetOrigin(reference.GetOrigin())
+    image.SetSpacing(reference.GetSpacing())
+    image.SetDirection(reference.GetDirection())
+
+
 def image_to_array(image: sitk.Image) -> ImageArrayMetadata:
     """Convert a SimpleITK image to a numpy array along with its metadata.
 
@@ -83,6 +98,64 @@ def image_to_array(image: sitk.Image) -> ImageArrayMetadata:
     return array, image["origin"], image["direction"], image["spacing"]
 
 
+def writable_array_view(image: sitk.Image) -> np.ndarray:
+    """Return a writable NumPy view of the pixel buffer of an image.
+
+    `sitk.GetArrayViewFromImage` only returns read-only views. This function
+    exposes the same buffer for writing, which lets callers fill or modify
+    an image in place without the extra full-size copy of
+    `sitk.GetImageFromArray`.
+
+    Parameters
+    ----------
+    image : sitk.Image
+        The image whose buffer is exposed. The buffer is made unique first,
+        so writing through the view never affects other images sharing it.
+
+    Returns
+    -------
+    np.ndarray
+        A view with the shape of `sitk.GetArrayViewFromImage(image)`.
+
+    Warnings
+    --------
+    A `MedImage` stops caching its fingerprints and masks once its
+    buffer is exposed, since writes through the view cannot be observed.
+
+    The view does not keep `image` alive: the image must outlive the view,
+    and the view must not be used after the image has been copied, since
+    SimpleITK copies share buffers until one of them is modified.
+    """
+    view = sitk.GetArrayViewFromImage(image)  # also calls MakeUnique
+    # a MedImage cannot cache values computed from a buffer written behind
+    # its back
+    if (expose_buffer := getattr(image, "_expose_buffer", None)) is not None:
+        expose_buffer()
+    address = view.__array_interface__["data"][0]
+    buffer = (ctypes.c_char * view.nbytes).from_address(address)
+    return np.frombuffer(buffer, dtype=view.dtype).reshape(view.shape)
+
+
+def physical_to_index_matrix(image: sitk.Image) -> np.ndarray:
+    """Return the matrix ITK uses to map physical offsets to indices.
+
+    This is the inverse of `direction @ diag(spacing)`, computed by ITK
+    itself rather than by `numpy.linalg.inv`, so batched transforms built
+    on it round exactly like `TransformPhysicalPointToIndex`. The columns
+    are read back from a one-voxel probe image placed at the origin.
+    """
+    dimension = image.GetDimension()
+    probe = sitk.Image([1] * dimension, sitk.sitkUInt8)
+    probe.SetSpacing(image.GetSpacing())
+    probe.SetDirection(image.GetDirection())
+    return np.array(
+        [
+            probe.TransformPhysicalPointToContinuousIndex(unit.tolist())
+            for unit in np.eye(dimension)
+        ]
+    ).T
+
+
 def physical_points_to_idxs(
     image: sitk.Image,
     points: List[np.ndarray],
@@ -114,41 +187,37 @@ def physical_points_to_idxs(
 
     Notes
     -----
-    The following steps occur within the function:
-    1. A `numpy.vectorize` function is defined to apply the transformation
-       method (physical to index) to each 3D point in the input array.
-    2. The transformation is applied to each set of points in the list,
-       reversing the coordinate order to match the library's indexing
-       convention.
+    All the points are converted at once with the affine transform ITK uses
+    (see `physical_to_index_matrix`), instead of one SWIG call per point:
+
+    1. The points of all the slices are stacked and the origin subtracted.
+    2. Every index component is accumulated in the same order as
+       `itk::ImageBase::TransformPhysicalPointToIndex`, and rounded with the
+       same half-integer-up rule (`round_half_even(2x + 0.5) >> 1`), so the
+       result is identical to calling SimpleITK point by point.
+    3. The result is split back per slice, reversing the coordinate order
+       to match the library's indexing convention.
     """
-    # Select the appropriate transformation function based on the `continuous` parameter.
-    transform = (
-        image.TransformPhysicalPointToContinuousIndex
-        if continuous
-        else image.TransformPhysicalPointToIndex
+    if not points:
+        return []
+    stacked = np.concatenate(
+        [np.asarray(slc, dtype=np.float64).reshape(-1, 3) for slc in points]
     )
+    offsets = stacked - np.asarray(image.GetOrigin(), dtype=np.float64)
+    matrix = physical_to_index_matrix(image)
 
-    # Step 1: Define a vectorized transformation function
-    # The lambda function takes a single 3D point `x` and:
-    # - Applies the selected transformation (`transform(x)`) to convert it from physical space to index space.
-    # - Wraps the result into a numpy array for further processing.
-    # `np.vectorize` creates a vectorized function that can process arrays of points in one call.
-    # The `signature="(3)->(3)"` ensures the transformation operates on 3D points, returning 3D results.
-    vectorized_transform = np.vectorize(
-        lambda x: np.array(transform(x)), signature="(3)->(3)"
-    )
+    # explicit accumulation (no BLAS) keeps ITK's floating point order
+    cindex = np.zeros_like(offsets)
+    for column in range(3):
+        cindex += offsets[:, column, None] * matrix[:, column]
+
+    if continuous:
+        idxs = cindex
+    else:
+        idxs = np.right_shift(np.rint(2.0 * cindex + 0.5).astype(np.int64), 1)
 
-    # Step 2: Apply the vectorized transformation to all slices of points.
-    # For each 2D array `slc` in the `points` list:
-    # - `vectorized_transform(slc)` applies the transformation to all points in `slc`.
-    # - `[:, ::-1]` reverses the coordinate order (from (x, y, z) to (z, y, x)) to match the library's convention.
-    # The result is stored as a list of numpy arrays (`t_points`), each corresponding to a transformed slice.
-    t_points: List[np.ndarray] = [
-        vectorized_transform(slc)[:, ::-1] for slc in points
-    ]
-
-    # Return the list of transformed points.
-    return t_points
+    sizes = np.cumsum([len(slc) for slc in points])[:-1]
+    return [slc[:, ::-1] for slc in np.split(idxs, sizes)]
 
 
 def idxs_to_physical_points(image: sitk.Image, idxs: np.ndarray) -> np.ndarray:
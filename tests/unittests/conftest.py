@@ -1,11 +1,46 @@
 # tests/unit/conftest.py
 
+import numpy as np
 import pytest
+import SimpleITK as sitk
 from pathlib import Path
 
+from imgtools.coretypes import Scan
+from imgtools.coretypes.base_masks import ROIMaskMapping, VectorMask
+
+
 def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
     """Automatically mark all tests collected in this directory as 'unit' tests."""
     for item in items:
         item_path = Path(str(item.fspath))
         if item_path.parts[-2] == "unittests" or "unittests" in item_path.parts:
-            item.add_marker("unittests")
\ No newline at end of file
+            item.add_marker("unittests")
+
+@pytest.fixture
+def scan() -> Scan:
+    """A small oblique CT scan of random intensities."""
+    rng = np.random.default_rng(0)
+    image = sitk.GetImageFromArray(
+        rng.integers(-1000, 1000, (12, 20, 16), dtype=np.int16)
+    )
+    image.SetOrigin((-10.0, 5.0, 2.5))
+    image.SetSpacing((0.8, 0.9, 2.0))
+    image.SetDirection((1, 0, 0, 0, 0.8, -0.6, 0, 0.6, 0.8))
+    return Scan(
+        image, metadata={"Modality": "CT", "SeriesInstanceUID": "1.2.3"}
+    )
+
+
+@pytest.fixture
+def mask(scan: Scan) -> VectorMask:
+    """Two rectangular ROIs on the grid of `scan`."""
+    array = np.zeros((*scan.GetSize()[::-1], 2), dtype=np.uint8)
+    array[2:6, 3:9, 4:10, 0] = 1
+    array[6:9, 10:15, 2:5, 1] = 1
+    image = sitk.GetImageFromArray(array, isVector=True)
+    image.CopyInformation(scan)
+    mapping = {
+        i: ROIMaskMapping(f"roi_{i}", [f"roi_{i}"], f"roi_{i}")
+        for i in range(2)
+    }
+    return VectorMask(image, mapping, metadata={"Modality": "RTSTRUCT"})
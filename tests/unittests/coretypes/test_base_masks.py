@@ -0,0 +1,196 @@
+import numpy as np
+import pytest
+import SimpleITK as sitk
+
+from imgtools.coretypes import MedImage, base_medimage
+from imgtools.coretypes.base_masks import (
+    Mask,
+    ROIMaskMapping,
+    TooManyComponentsError,
+    VectorMask,
+    pack_channels,
+)
+from imgtools.coretypes.box import RegionBox
+from imgtools.utils import writable_array_view
+
+
+def make_vector_mask(n_channels: int, overlap: bool) -> VectorMask:
+    rng = np.random.default_rng(n_channels)
+    shape = (4, 9, 7)
+    if overlap:
+        array = (rng.random((*shape, n_channels)) < 0.1).astype(np.uint8)
+    else:
+        labels = rng.integers(0, n_channels + 1, shape)
+        array = np.zeros((*shape, n_channels), dtype=np.uint8)
+        for channel in range(n_channels):
+            array[..., channel] = labels == channel + 1
+    image = sitk.GetImageFromArray(array, isVector=True)
+    image.SetOrigin((1.0, -2.0, 3.5))
+    image.SetSpacing((0.7, 0.7, 2.5))
+    mapping = {
+        i: ROIMaskMapping(f"roi_{i}", [f"roi_{i}"], f"roi_{i}")
+        for i in range(n_channels)
+    }
+    return VectorMask(image, mapping, metadata={"Modality": "RTSTRUCT"})
+
+
+def legacy_labels(array: np.ndarray) -> np.ndarray:
+    labels = np.zeros(array.shape[:3], dtype=np.uint8)
+    for i in range(array.shape[-1]):
+        labels[array[..., i] == 1] = i + 1
+    return labels
+
+
+@pytest.mark.parametrize("n_channels", [1, 3, 8, 9, 20, 40, 64, 70])
+@pytest.mark.parametrize("overlap", [False, True])
+def test_packed_conversions_match_channel_loops(
+    n_channels: int, overlap: bool
+) -> None:
+    vector_mask = make_vector_mask(n_channels, overlap)
+    # a single component image has no channel axis
+    array = sitk.GetArrayFromImage(vector_mask).reshape(4, 9, 7, n_channels)
+
+    expected_overlap = bool(np.any(array.sum(-1) > 1))
+    assert vector_mask.has_overlap() == (n_channels > 1 and expected_overlap)
+
+    sparse = vector_mask.to_sparse_mask()
+    np.testing.assert_array_equal(
+        sitk.GetArrayViewFromImage(sparse), legacy_labels(array)
+    )
+    assert sparse.GetOrigin() == vector_mask.GetOrigin()
+
+    background = vector_mask.extract_mask(0)
+    np.testing.assert_array_equal(
+        sitk.GetArrayViewFromImage(background), array.sum(-1) == 0
+    )
+
+    if n_channels > 64:
+        with pytest.raises(TooManyComponentsError):
+            vector_mask.to_region_mask()
+        return
+    region = sitk.GetArrayFromImage(vector_mask.to_region_mask())
+    weights = np.array([2**i for i in range(n_channels)], dtype=object)
+    np.testing.assert_array_equal(
+        region.astype(object), (array.astype(object) * weights).sum(-1)
+    )
+    assert region.dtype.itemsize * 8 >= n_channels
+
+
+def test_pack_channels_dtype() -> None:
+    for n_channels, dtype in [(5, np.uint8), (16, np.uint16), (17, np.uint32)]:
+        packed = pack_channels(np.ones((2, 3, n_channels), dtype=np.uint8))
+        assert packed.dtype == dtype
+        assert packed[0, 0] == 2**n_channels - 1
+
+
+@pytest.mark.parametrize("n_channels", [3, 40, 70])
+def test_conversions_are_the_same_by_slabs(
+    n_channels: int, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    expected = make_vector_mask(n_channels, overlap=True)
+    expected_sparse = sitk.GetArrayFromImage(expected.to_sparse_mask())
+
+    # one slice per slab
+    monkeypatch.setattr(base_medimage, "SLAB_VOXELS", 1)
+    vector_mask = make_vector_mask(n_channels, overlap=True)
+
+    assert vector_mask.has_overlap() == expected.has_overlap()
+    np.testing.assert_array_equal(
+        sitk.GetArrayFromImage(vector_mask.to_sparse_mask()), expected_sparse
+    )
+    if n_channels <= 64:
+        np.testing.assert_array_equal(
+            vector_mask.bitmask_array(), expected.bitmask_array()
+        )
+
+
+def make_mask() -> Mask:
+    array = np.zeros((12, 20, 16), dtype=np.uint8)
+    array[2:6, 3:9, 4:10] = 1
+    array[8:11, 12:18, 2:5] = 1
+    image = sitk.GetImageFromArray(array)
+    image.SetSpacing((0.8, 0.8, 2.0))
+    return Mask(image, metadata={})
+
+
+@pytest.mark.parametrize("pixel_type", [sitk.sitkInt16, sitk.sitkFloat32])
+def test_image_statistics_match_statistics_filter(pixel_type: int) -> None:
+    rng = np.random.default_rng(0)
+    array = rng.normal(100, 400, (7, 33, 21))
+    image = MedImage(sitk.Cast(sitk.GetImageFromArray(array), pixel_type))
+    expected = sitk.StatisticsImageFilter()
+    expected.Execute(image)
+
+    fingerprint = image.fingerprint
+
+    assert fingerprint["min"] == expected.GetMinimum()
+    assert fingerprint["max"] == expected.GetMaximum()
+    assert fingerprint["sum"] == pytest.approx(expected.GetSum())
+    assert fingerprint["mean"] == pytest.approx(expected.GetMean())
+    assert fingerprint["std"] == pytest.approx(expected.GetSigma())
+    assert fingerprint["variance"] == pytest.approx(expected.GetVariance())
+
+
+def test_mask_fingerprint_uses_one_shape_pass() -> None:
+    mask = make_mask()
+    expected = sitk.LabelShapeStatisticsImageFilter()
+    expected.ComputeFeretDiameterOn()
+    expected.Execute(mask)
+
+    fingerprint = mask.fingerprint
+
+    assert "mask.feret_diameter" not in fingerprint
+    assert not mask._label_shape_filter_results.GetComputeFeretDiameter()
+    assert fingerprint["mask.volume_count"] == 2
+    bbox = RegionBox.from_mask_bbox(mask)
+    assert fingerprint["mask.bbox.min_coord"] == bbox.min
+    assert fingerprint["mask.bbox.max_coord"] == bbox.max
+    assert fingerprint["mask.roundness"] == expected.GetRoundness(1)
+    assert fingerprint["mask.elongation"] == expected.GetElongation(1)
+
+    statistics = mask.shape_statistics(feret_diameter=True)
+    assert statistics["mask.feret_diameter"] == expected.GetFeretDiameter(1)
+    assert mask.feret_diameter == expected.GetFeretDiameter(1)
+
+
+def test_fingerprint_is_cached_until_modified() -> None:
+    mask = make_mask()
+    geometry = mask.compute_fingerprint("geometry")
+    assert "min" not in geometry
+    assert "mask.volume_count" not in geometry
+    assert mask.compute_fingerprint("none") == {}
+
+    fingerprint = mask.fingerprint
+    assert mask.fingerprint["hash"] == fingerprint["hash"]
+    assert mask.fingerprint is not mask.fingerprint
+
+    mask[0, 0, 0] = 1
+    assert mask.fingerprint["hash"] != fingerprint["hash"]
+    assert mask.fingerprint["mask.volume_count"] == 3
+
+    mask.SetSpacing((1.0, 1.0, 1.0))
+    assert mask.serialize_fingerprint("geometry")["spacing"] == (1.0, 1.0, 1.0)
+
+
+def test_fingerprint_follows_writes_through_a_view() -> None:
+    image = MedImage(sitk.Image(6, 5, 4, sitk.sitkFloat32))
+    assert image.fingerprint["mean"] == 0.0
+
+    view = writable_array_view(image)
+    view[:] = 7.0
+    assert image.fingerprint["mean"] == 7.0
+    view[0] = 1.0
+    assert image.fingerprint["min"] == 1.0
+
+
+def test_vector_mask_follows_writes_through_a_view() -> None:
+    mask = make_vector_mask(3, overlap=True)
+    assert mask.extract_mask(1) is mask.extract_mask(1)
+    mask.bitmask_array()
+
+    view = writable_array_view(mask)
+    view[:] = 0
+    view[..., 1] = 1
+    assert sitk.GetArrayViewFromImage(mask.extract_mask(1)).max() == 0
+    assert sitk.GetArrayViewFromImage(mask.extract_mask(2)).min() == 1
+    np.testing.assert_array_equal(mask.bitmask_array(), 2)
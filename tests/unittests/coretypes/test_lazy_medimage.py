@@ -0,0 +1,229 @@
+from pathlib import Path
+
+import highdicom as hd
+import numpy as np
+import pydicom
+import pytest
+import SimpleITK as sitk
+from pydicom.sr.codedict import codes
+
+from imgtools.coretypes import LazyMedImage, ROIMatcher, Scan, materialize
+from imgtools.coretypes.masktypes import seg as seg_module
+from imgtools.coretypes.masktypes.seg import SEG
+from imgtools.transforms import Resample
+from imgtools.transforms.transformer import Transformer
+
+
+class CountingLoader:
+    def __init__(self, image: Scan) -> None:
+        self.image = image
+        self.calls = 0
+
+    def __call__(self) -> Scan:
+        self.calls += 1
+        return self.image
+
+
+def test_geometry_does_not_load(scan: Scan) -> None:
+    loader = CountingLoader(scan)
+    lazy = LazyMedImage(loader, scan.geometry, {"Modality": "CT"})
+
+    assert lazy.size == scan.size
+    assert lazy.GetSize() == scan.GetSize()
+    assert lazy.GetOrigin() == scan.GetOrigin()
+    assert lazy.GetSpacing() == scan.GetSpacing()
+    assert lazy.GetDirection() == scan.GetDirection()
+    for point in [(0.0, 0.0, 0.0), (3.3, -2.1, 7.9)]:
+        assert lazy.TransformPhysicalPointToIndex(
+            point
+        ) == scan.TransformPhysicalPointToIndex(point)
+        np.testing.assert_allclose(
+            lazy.TransformPhysicalPointToContinuousIndex(point),
+            scan.TransformPhysicalPointToContinuousIndex(point),
+        )
+    assert lazy.metadata == {"Modality": "CT"}
+    assert not lazy.is_loaded
+    assert loader.calls == 0
+
+
+def test_pixel_access_loads_once(scan: Scan) -> None:
+    loader = CountingLoader(scan)
+    lazy = LazyMedImage(loader, scan.geometry)
+
+    assert lazy.GetPixel(1, 2, 3) == scan.GetPixel(1, 2, 3)
+    array, _ = lazy.to_numpy()
+    np.testing.assert_array_equal(array, sitk.GetArrayViewFromImage(scan))
+    assert materialize(lazy) is scan
+    assert lazy.is_loaded
+    assert loader.calls == 1
+
+
+def test_transformer_materializes(scan: Scan) -> None:
+    lazy = LazyMedImage(CountingLoader(scan), scan.geometry)
+    transformer = Transformer([Resample(spacing=(1.6, 1.8, 2.0))])
+
+    (expected,) = transformer([scan])
+    (actual,) = transformer([lazy])
+
+    assert isinstance(actual, Scan)
+    assert actual.GetSize() == expected.GetSize()
+    np.testing.assert_array_equal(
+        sitk.GetArrayViewFromImage(actual),
+        sitk.GetArrayViewFromImage(expected),
+    )
+
+
+def write_seg(directory: Path) -> Path:
+    """Write a small CT series and a two-segment DICOM-SEG for it."""
+    rng = np.random.default_rng(0)
+    positions = [0.0, 2.0, 4.0, 6.0]
+    ct_dir = directory / "CT"
+    ct_dir.mkdir()
+    sources = []
+    for index, z in enumerate(positions):
+        image = sitk.GetImageFromArray(
+            rng.integers(0, 100, (1, 12, 10), dtype=np.int16)
+        )
+        image.SetMetaData("0008|0060", "CT")
+        image.SetMetaData("0020|000e", "1.2.826.0.1.3680043.2.1125.1")
+        image.SetMetaData("0020|000d", "1.2.826.0.1.3680043.2.1125.3")
+        image.SetMetaData("0020|0052", "1.2.826.0.1.3680043.2.1125.2")
+        image.SetMetaData("0020|0013", str(index + 1))
+        image.SetMetaData("0020|0032", f"-5.5\\12.25\\{z}")
+        image.SetMetaData("0020|0037", "1\\0\\0\\0\\1\\0")
+        image.SetMetaData("0018|0050", "2")
+        file_name = ct_dir / f"slice_{index}.dcm"
+        writer = sitk.ImageFileWriter()
+        writer.KeepOriginalImageUIDOn()
+        writer.SetFileName(file_name.as_posix())
+        writer.Execute(image)
+        sources.append(pydicom.dcmread(file_name))
+
+    mask = np.zeros((len(positions), 12, 10), np.uint8)
+    mask[1:3, 2:8, 3:6] = 1
+    mask[0, 0:2, 0:2] = 2
+    descriptions = [
+        hd.seg.SegmentDescription(
+            segment_number=number,
+            segment_label=label,
+            segmented_property_category=codes.SCT.Tissue,
+            segmented_property_type=codes.SCT.Tissue,
+            algorithm_type=hd.seg.SegmentAlgorithmTypeValues.MANUAL,
+        )
+        for number, label in [(1, "GTV"), (2, "Lung")]
+    ]
+    seg = hd.seg.Segmentation(
+        source_images=sources,
+        pixel_array=mask,
+        segmentation_type=hd.seg.SegmentationTypeValues.BINARY,
+        segment_descriptions=descriptions,
+        series_instance_uid=hd.UID(),
+        series_number=2,
+        sop_instance_uid=hd.UID(),
+        instance_number=1,
+        manufacturer="imgtools",
+        manufacturer_model_name="test",
+        software_versions="1",
+        device_serial_number="1",
+    )
+    seg_file = directory / "seg.dcm"
+    seg.save_as(seg_file)
+    return seg_file
+
+
+def test_lazy_seg_decodes_matched_segments(tmp_path: Path) -> None:
+    seg_file = write_seg(tmp_path)
+    reference = Scan.from_dicom(
+        (tmp_path / "CT").as_posix(), metadata={"Modality": "CT"}
+    )
+    matcher = ROIMatcher(match_map={"GTV": ["gtv"]})
+
+    eager = SEG.from_dicom(seg_file)
+    lazy = SEG.from_dicom(seg_file, lazy=True)
+    assert lazy.labels == eager.labels
+    assert all(s.data_array is None for s in lazy.segments.values())
+    # a SEG read without lazy decodes and validates every segment
+    assert all(s.data_array is not None for s in eager.segments.values())
+
+    expected = eager.get_vector_mask(reference, matcher)
+    actual = lazy.get_vector_mask(reference, matcher)
+
+    assert expected is not None and actual is not None
+    np.testing.assert_array_equal(
+        sitk.GetArrayViewFromImage(actual),
+        sitk.GetArrayViewFromImage(expected),
+    )
+    # the frames are streamed into the mask, no segment volume is kept
+    assert lazy.segments[1].data_array is None
+    assert lazy.segments[2].data_array is None
+    assert lazy.raw_seg is None
+
+
+@pytest.mark.parametrize("strategy", ["merge", "separate"])
+def test_streamed_seg_matches_decoded_segments(
+    tmp_path: Path, strategy: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    seg_file = write_seg(tmp_path)
+    reference = Scan.from_dicom(
+        (tmp_path / "CT").as_posix(), metadata={"Modality": "CT"}
+    )
+    matcher = ROIMatcher(
+        match_map={"all": ["gtv", "lung"], "lung": ["lung"]},
+        handling_strategy=strategy,
+    )
+    expected = SEG.from_dicom(seg_file).get_vector_mask(reference, matcher)
+
+    decoded: list[int] = []
+    iter_pixels = seg_module.iter_pixels
+
+    def recording_iter_pixels(path: Path, indices: list[int]):  # noqa: ANN202
+        decoded.extend(indices)
+        return iter_pixels(path, indices=indices)
+
+    monkeypatch.setattr(seg_module, "iter_pixels", recording_iter_pixels)
+    lazy = SEG.from_dicom(seg_file, lazy=True)
+    actual = lazy.get_vector_mask(reference, matcher)
+
+    assert expected is not None and actual is not None
+    assert actual.roi_mapping == expected.roi_mapping
+    np.testing.assert_array_equal(
+        sitk.GetArrayViewFromImage(actual),
+        sitk.GetArrayViewFromImage(expected),
+    )
+    assert decoded == sorted(set(decoded))
+
+    decoded.clear()
+    SEG.from_dicom(seg_file, lazy=True).get_vector_mask(
+        reference, ROIMatcher(match_map={"GTV": ["gtv"]})
+    )
+    # only the frames of the matched segment are decoded
+    assert 0 < len(decoded) < lazy.dataset.NumberOfFrames
+
+
+@pytest.mark.parametrize("groups", ["missing", "empty"])
+def test_seg_without_frame_groups_is_not_streamed(
+    tmp_path: Path, groups: str
+) -> None:
+    seg_file = write_seg(tmp_path)
+    reference = Scan.from_dicom(
+        (tmp_path / "CT").as_posix(), metadata={"Modality": "CT"}
+    )
+    matcher = ROIMatcher(match_map={"GTV": ["gtv"]})
+    expected = SEG.from_dicom(seg_file).get_vector_mask(reference, matcher)
+
+    lazy = SEG.from_dicom(seg_file, lazy=True)
+    if groups == "missing":
+        del lazy.dataset.PerFrameFunctionalGroupsSequence
+    else:
+        lazy.dataset.PerFrameFunctionalGroupsSequence = []
+    actual = lazy.get_vector_mask(reference, matcher)
+
+    assert expected is not None and actual is not None
+    np.testing.assert_array_equal(
+        sitk.GetArrayViewFromImage(actual),
+        sitk.GetArrayViewFromImage(expected),
+    )
+    # the matched segment was decoded instead
+    assert lazy.raw_seg is not None
+    assert lazy.segments[1].data_array is not None
+    assert lazy.segments[2].data_array is None
@@ -0,0 +1,108 @@
+from pathlib import Path
+
+import numpy as np
+import pydicom
+import pytest
+import SimpleITK as sitk
+
+from imgtools.coretypes.imagetypes import pet as pet_module
+from imgtools.coretypes.imagetypes.pet import PET, PETImageType
+from imgtools.dicom.dicom_metadata import extract_metadata
+from imgtools.io.readers import read_dicom_series
+
+SUV_FACTOR = 0.000731
+ACTIVITY_FACTOR = 1.37
+
+
+def write_pet_series(
+    directory: Path,
+    slope: str = "1",
+    private_tags: bool = True,
+) -> list[str]:
+    """Write a small PT series with Philips style scale factor tags."""
+    rng = np.random.default_rng(7)
+    array = rng.integers(-200, 3000, size=(3, 8, 6)).astype(np.int16)
+    writer = sitk.ImageFileWriter()
+    writer.KeepOriginalImageUIDOn()
+    file_names = []
+    for index in range(array.shape[0]):
+        image = sitk.GetImageFromArray(array[index : index + 1])
+        image.SetMetaData("0008|0060", "PT")
+        image.SetMetaData("0020|000e", "1.2.826.0.1.3680043.2.1125.7")
+        image.SetMetaData("0020|0013", str(index + 1))
+        image.SetMetaData("0020|0032", f"0\\0\\{2.0 * index}")
+        image.SetMetaData("0020|0037", "1\\0\\0\\0\\1\\0")
+        file_name = (directory / f"pet_{index}.dcm").as_posix()
+        writer.SetFileName(file_name)
+        writer.Execute(image)
+        ds = pydicom.dcmread(file_name)
+        ds.RescaleSlope = slope
+        ds.RescaleIntercept = "0"
+        if private_tags:
+            block = ds.private_block(
+                0x7053, "Philips PET Private Group", create=True
+            )
+            block.add_new(0x00, "DS", str(SUV_FACTOR))
+            block.add_new(0x09, "DS", str(ACTIVITY_FACTOR))
+        ds.save_as(file_name)
+        file_names.append(file_name)
+    return file_names
+
+
+def legacy_pet(image: sitk.Image, factor: float) -> sitk.Image:
+    return sitk.Abs(sitk.Cast(image, sitk.sitkFloat32) * factor)
+
+
+@pytest.mark.parametrize("slope", ["1", "0.37"])
+@pytest.mark.parametrize(
+    "pet_type,factor",
+    [(PETImageType.SUV, SUV_FACTOR), (PETImageType.ACT, ACTIVITY_FACTOR)],
+)
+def test_pet_matches_legacy_scaling(
+    tmp_path: Path, slope: str, pet_type: PETImageType, factor: float
+) -> None:
+    write_pet_series(tmp_path, slope=slope)
+    raw, _ = read_dicom_series(tmp_path.as_posix())
+
+    pet = PET.from_dicom(tmp_path.as_posix(), pet_image_type=pet_type)
+
+    expected = legacy_pet(raw, factor)
+    assert pet.GetPixelID() == sitk.sitkFloat32
+    assert pet.GetSize() == expected.GetSize()
+    assert pet.GetOrigin() == expected.GetOrigin()
+    assert pet.GetSpacing() == expected.GetSpacing()
+    np.testing.assert_array_equal(
+        sitk.GetArrayViewFromImage(pet), sitk.GetArrayViewFromImage(expected)
+    )
+
+
+def test_pet_uses_metadata_factor(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    file_names = write_pet_series(tmp_path)
+    metadata = extract_metadata(file_names[0])
+    assert metadata["SUVScaleFactor"] == pytest.approx(SUV_FACTOR)
+    assert metadata["ActivityScaleFactor"] == pytest.approx(ACTIVITY_FACTOR)
+
+    def _fail(*_: object) -> None:
+        raise AssertionError("the scale factor should come from metadata")
+
+    monkeypatch.setattr(pet_module, "read_pet_scale_factors", _fail)
+    pet = PET.from_dicom(tmp_path.as_posix(), metadata=metadata)
+    raw, _ = read_dicom_series(tmp_path.as_posix())
+    expected = legacy_pet(raw, SUV_FACTOR)
+    np.testing.assert_array_equal(
+        sitk.GetArrayViewFromImage(pet), sitk.GetArrayViewFromImage(expected)
+    )
+
+
+def test_pet_without_factor_falls_back_to_one(tmp_path: Path) -> None:
+    write_pet_series(tmp_path, private_tags=False)
+    raw, _ = read_dicom_series(tmp_path.as_posix())
+
+    pet = PET.from_dicom(tmp_path.as_posix(), metadata={"Modality": "PT"})
+
+    np.testing.assert_array_equal(
+        sitk.GetArrayViewFromImage(pet),
+        np.abs(sitk.GetArrayViewFromImage(raw)).astype(np.float32),
+    )
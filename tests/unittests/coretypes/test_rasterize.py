@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+from skimage.draw import polygon2mask
+
+from imgtools.coretypes.masktypes.rasterize import (
+    FillRule,
+    rasterize_polygon,
+    rasterize_slice,
+    rasterize_slices,
+)
+
+
+def random_polygons(seed: int, n: int = 300) -> list[np.ndarray]:
+    rng = np.random.default_rng(seed)
+    polygons = []
+    for index in range(n):
+        n_vertices = int(rng.integers(1, 12))
+        match index % 3:
+            case 0:  # vertices on the pixel grid, as built from contours
+                vertices = rng.integers(-10, 50, (n_vertices, 2))
+            case 1:
+                vertices = rng.uniform(-10, 50, (n_vertices, 2))
+            case _:  # half-pixel vertices hit rows and columns exactly
+                vertices = rng.integers(-6, 90, (n_vertices, 2)) * 0.5
+        polygons.append(vertices.astype(np.float64))
+    return polygons
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_polygon_matches_polygon2mask(seed: int) -> None:
+    shape = (40, 33)
+    for polygon in random_polygons(seed):
+        np.testing.assert_array_equal(
+            rasterize_polygon(polygon, np.zeros(shape, dtype=bool)),
+            polygon2mask(shape, polygon),
+            err_msg=f"{polygon.tolist()}",
+        )
+
+
+def test_union_matches_legacy_or() -> None:
+    shape = (40, 33)
+    polygons = random_polygons(7, n=20)
+    expected = np.zeros(shape, dtype=bool)
+    for polygon in polygons:
+        expected |= polygon2mask(shape, polygon)
+
+    actual = rasterize_slice(polygons, np.zeros(shape, dtype=bool))
+
+    np.testing.assert_array_equal(actual, expected)
+
+
+def test_even_odd_keeps_holes() -> None:
+    outer = np.array([[2, 2], [2, 20], [20, 20], [20, 2]], dtype=np.float64)
+    inner = np.array([[6, 6], [6, 14], [14, 14], [14, 6]], dtype=np.float64)
+    island = np.array([[9, 9], [9, 11], [11, 11], [11, 9]], dtype=np.float64)
+
+    union = rasterize_slice([outer, inner], np.zeros((25, 25), dtype=bool))
+    even_odd = rasterize_slice(
+        [outer, inner, island],
+        np.zeros((25, 25), dtype=bool),
+        fill_rule=FillRule.EVEN_ODD,
+        include_boundary=False,
+    )
+
+    assert union[8, 8]
+    assert even_odd[4, 4]
+    assert not even_odd[7, 7]
+    assert even_odd[9, 9]
+    expected = (
+        polygon2mask((25, 25), outer)
+        ^ polygon2mask((25, 25), inner)
+        ^ polygon2mask((25, 25), island)
+    )
+    # away from the shared boundaries even-odd is the xor of the contours
+    np.testing.assert_array_equal(even_odd[3:6, 3:19], expected[3:6, 3:19])
+
+
+@pytest.mark.parametrize("n_threads", [1, 4])
+def test_slices_fill_uint8_buffer(n_threads: int) -> None:
+    shape = (6, 40, 33)
+    polygons = random_polygons(3, n=24)
+    contours = {z: polygons[4 * z : 4 * z + 4] for z in range(shape[0])}
+    expected = np.zeros(shape, dtype=np.uint8)
+    for z, slice_polygons in contours.items():
+        for polygon in slice_polygons:
+            expected[z] |= polygon2mask(shape[1:], polygon)
+
+    actual = np.zeros(shape, dtype=np.uint8)
+    rasterize_slices(contours, actual.view(bool), n_threads=n_threads)
+
+    np.testing.assert_array_equal(actual, expected)
+    assert set(np.unique(actual)) <= {0, 1}
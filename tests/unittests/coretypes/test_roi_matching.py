@@ -1,9 +1,13 @@
+import pickle
+import re
+
 from imgtools.coretypes.masktypes import (
     ROIMatcher,
     ROIMatchStrategy,
     handle_roi_matching,
     ROIMatchFailurePolicy,
 )
+from imgtools.coretypes.masktypes.roi_matching import apply_roi_strategy
 import pytest
 from rich import print
 
@@ -356,3 +360,82 @@ def test_keep_first_with_no_multi_key_matches():
     
     assert "clinical" in result_dict
     assert result_dict["clinical"] == ["CTV"]
+
+
+def reference_matching(roi_names, roi_matching, strategy, allow_multi):
+    """Every (pattern, ROI name) pair tried on its own."""
+    raw_results = {}
+    for key, patterns in roi_matching.items():
+        raw_results[key] = [
+            name
+            for pattern in patterns
+            for name in roi_names
+            if re.fullmatch(pattern, name, flags=re.IGNORECASE)
+        ]
+    return apply_roi_strategy(raw_results, strategy, allow_multi)
+
+
+@pytest.mark.parametrize("strategy", list(ROIMatchStrategy))
+@pytest.mark.parametrize("allow_multi", [True, False])
+def test_compiled_matcher_matches_pairwise_matching(strategy, allow_multi):
+    match_map = {
+        "gtv": ["GTV.*", "gtvp", "Gross.*"],
+        "primary": ["GTVp"],
+        # a backreference cannot be combined into an alternation
+        "twice": [r"(\w)\1.*", "PTV"],
+        # an inline global flag is only valid at the start of a regex
+        "flagged": ["(?s)ctv.*", "CTV_high"],
+        "none": ["nothing"],
+    }
+    roi_names = ["GTVp", "gtv_2", "PTV", "ttv", "CTV_high", "Gross Volume"]
+    matcher = ROIMatcher(
+        match_map=match_map,
+        handling_strategy=strategy,
+        allow_multi_key_matches=allow_multi,
+    )
+
+    expected = reference_matching(roi_names, match_map, strategy, allow_multi)
+
+    assert matcher.match_rois(roi_names) == expected
+    # cache hit
+    assert matcher.match_rois(roi_names) == expected
+    assert handle_roi_matching(
+        roi_names, match_map, strategy, allow_multi_key_matches=allow_multi
+    ) == expected
+
+
+def test_match_cache_returns_copies_and_follows_changes():
+    matcher = ROIMatcher(match_map={"gtv": ["GTV.*"]})
+    first = matcher.match_rois(["GTV1", "PTV"])
+    first[0][1].append("modified")
+    assert matcher.match_rois(["GTV1", "PTV"]) == [("gtv", ["GTV1"])]
+
+    matcher.match_map = {"ptv": ["PTV"]}
+    assert matcher.match_rois(["GTV1", "PTV"]) == [("ptv", ["PTV"])]
+    matcher.ignore_case = False
+    assert matcher.match_rois(["GTV1", "ptv"]) == []
+
+
+def test_match_index_fills_the_cache():
+    matcher = ROIMatcher(match_map={"gtv": ["GTV.*"], "cord": ["cord"]})
+    crawl_db = [
+        {"SeriesInstanceUID": "1", "Modality": "RTSTRUCT",
+         "ROINames": ["GTV", "Cord"]},
+        {"SeriesInstanceUID": "2", "Modality": "SEG",
+         "ROINames": ["GTVn"]},
+        {"SeriesInstanceUID": "3", "Modality": "CT",
+         "ROINames": ["GTV"]},
+        {"SeriesInstanceUID": "4", "Modality": "RTSTRUCT",
+         "ROINames": ""},
+    ]
+
+    matches = matcher.match_index(crawl_db)
+
+    assert matches == {
+        "1": [("gtv", ["GTV"]), ("cord", ["Cord"])],
+        "2": [("gtv", ["GTVn"])],
+    }
+    # the workers receive the filled cache
+    restored = pickle.loads(pickle.dumps(matcher))
+    assert ("GTV", "Cord") in restored._match_cache
+    assert restored.match_rois(["GTV", "Cord"]) == matches["1"]
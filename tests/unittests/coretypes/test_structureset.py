@@ -0,0 +1,140 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import SimpleITK as sitk
+
+from imgtools.coretypes import MedImage
+from imgtools.coretypes.masktypes.roi_matching import (
+    ROIMatcher,
+    ROIMatchStrategy,
+)
+from imgtools.coretypes.masktypes.structureset import RTStructureSet
+from imgtools.loggers import logger
+
+
+def make_structure_set(n_rois: int = 12) -> tuple[RTStructureSet, MedImage]:
+    """Build a structure set of square contours on a 16x40x40 grid."""
+    image = sitk.Image(40, 40, 16, sitk.sitkInt16)
+    image.SetSpacing((0.5, 0.5, 2.0))
+    image.SetOrigin((-10.0, 4.0, 30.0))
+    rng = np.random.default_rng(0)
+    roi_map = {}
+    for index in range(n_rois):
+        x0, y0 = rng.integers(0, 30, 2)
+        size = int(rng.integers(3, 10))
+        contours = []
+        for z in rng.choice(16, size=int(rng.integers(1, 6)), replace=False):
+            corners = [
+                (x0, y0),
+                (x0 + size, y0),
+                (x0 + size, y0 + size),
+                (x0, y0 + size),
+            ]
+            points = [
+                image.TransformIndexToPhysicalPoint((int(x), int(y), int(z)))
+                for x, y in corners
+            ]
+            contours.append(
+                SimpleNamespace(ContourData=np.ravel(points).tolist())
+            )
+        roi_map[f"ROI_{index}"] = contours
+    rtstruct = RTStructureSet(metadata={}, roi_map=roi_map)
+    rtstruct.roi_names = list(roi_map)
+    rtstruct.plogger = logger
+    return rtstruct, MedImage(image)
+
+
+@pytest.mark.parametrize(
+    "strategy", [ROIMatchStrategy.MERGE, ROIMatchStrategy.SEPARATE]
+)
+def test_vector_mask_merges_matched_rois(strategy: ROIMatchStrategy) -> None:
+    match_map = {
+        "low": ["ROI_[0-5]"],
+        "high": ["ROI_([6-9]|1[01])"],
+        "all": ["ROI_.*"],
+    }
+    rtstruct, reference = make_structure_set()
+
+    mask = rtstruct.get_vector_mask(
+        reference, ROIMatcher(match_map=match_map, handling_strategy=strategy)
+    )
+
+    assert mask is not None
+    array = sitk.GetArrayViewFromImage(mask)
+    assert array.max() == 1
+    for iroi, mapping in mask.roi_mapping.items():
+        if iroi == 0:
+            continue
+        expected = np.zeros(array.shape[:3], dtype=bool)
+        for roi_name in mapping.roi_names:
+            expected |= rtstruct.get_mask_ndarray(
+                reference, roi_name, array.shape, continuous=False
+            ).astype(bool)
+        np.testing.assert_array_equal(array[..., iroi - 1], expected)
+
+
+def assert_same_mask(actual: sitk.Image, expected: sitk.Image) -> None:
+    np.testing.assert_array_equal(
+        sitk.GetArrayViewFromImage(actual),
+        sitk.GetArrayViewFromImage(expected),
+    )
+    assert actual.GetOrigin() == expected.GetOrigin()
+    assert actual.GetSpacing() == expected.GetSpacing()
+
+
+@pytest.mark.parametrize(
+    "strategy", [ROIMatchStrategy.MERGE, ROIMatchStrategy.SEPARATE]
+)
+def test_compact_vector_mask_matches_dense(
+    strategy: ROIMatchStrategy,
+) -> None:
+    match_map = {"low": ["ROI_[0-3]"], "high": ["ROI_([4-9]|1[01])"]}
+    matcher = ROIMatcher(match_map=match_map, handling_strategy=strategy)
+    dense_rtstruct, reference = make_structure_set()
+    compact_rtstruct, _ = make_structure_set()
+
+    dense = dense_rtstruct.get_vector_mask(reference, matcher)
+    compact = compact_rtstruct.get_compact_vector_mask(reference, matcher)
+
+    assert dense is not None and compact is not None
+    assert compact.roi_mapping == dense.roi_mapping
+    assert compact.n_masks == dense.n_masks
+    assert compact.nbytes < sitk.GetArrayViewFromImage(dense).nbytes
+    assert compact.has_overlap() == dense.has_overlap()
+    assert not compact.is_loaded
+
+    for key in [0, *range(1, compact.n_masks + 1), *compact.roi_keys]:
+        assert_same_mask(compact.extract_mask(key), dense.extract_mask(key))
+    assert_same_mask(compact.to_sparse_mask(), dense.to_sparse_mask())
+    assert_same_mask(compact.to_region_mask(), dense.to_region_mask())
+    assert not compact.is_loaded
+
+    assert_same_mask(compact.to_vector_mask(), dense)
+    assert compact.is_loaded
+
+
+def test_extract_mask_by_key_selects_its_channel() -> None:
+    rtstruct, reference = make_structure_set()
+    matcher = ROIMatcher(match_map={"a": ["ROI_0"], "b": ["ROI_1"]})
+    vector_mask = rtstruct.get_vector_mask(reference, matcher)
+
+    assert vector_mask is not None
+    for key in ["a", "b"]:
+        index = vector_mask.roi_keys.index(key)
+        assert_same_mask(
+            vector_mask.extract_mask(key), vector_mask.extract_mask(index)
+        )
+
+
+def test_background_mask_keeps_the_geometry() -> None:
+    rtstruct, reference = make_structure_set()
+    vector_mask = rtstruct.get_vector_mask(
+        reference, ROIMatcher(match_map={"a": ["ROI_0"], "b": ["ROI_1"]})
+    )
+
+    assert vector_mask is not None
+    background = vector_mask.extract_mask(0)
+    assert background.GetOrigin() == reference.GetOrigin()
+    assert background.GetSpacing() == reference.GetSpacing()
+    assert background.GetDirection() == reference.GetDirection()
@@ -0,0 +1,347 @@
+from pathlib import Path
+
+import numpy as np
+import pydicom
+import pytest
+import SimpleITK as sitk
+
+from imgtools.coretypes import LazyMedImage, RegionBox
+from imgtools.dicom.crawl.parse_dicoms import has_pixel_data, parse_all_dicoms
+from imgtools.dicom.pixel_data import (
+    SeriesPixelData,
+    read_instance_pixel_info,
+)
+from imgtools.io.readers import read_dicom_series
+from imgtools.io.sample_input import SampleInput
+from imgtools.io.slice_readers import (
+    SeriesReadMode,
+    read_series_gdcm,
+    read_series_memmap,
+    read_series_region,
+    series_geometry,
+    sort_by_position,
+)
+
+
+def write_series(
+    directory: Path,
+    positions: list[float],
+    orientation: str = "1\\0\\0\\0\\1\\0",
+    pixel_type: int = sitk.sitkInt16,
+    intercept: str = "-1024",
+    slope: str = "1",
+) -> list[str]:
+    """Write a synthetic single-frame DICOM series and return the paths."""
+    rng = np.random.default_rng(42)
+    array = rng.integers(0, 3000, size=(len(positions), 12, 10))
+    volume = sitk.Cast(sitk.GetImageFromArray(array), pixel_type)
+    volume.SetSpacing((0.7, 0.9, 1.0))
+
+    writer = sitk.ImageFileWriter()
+    writer.KeepOriginalImageUIDOn()
+    file_names = []
+    for index, z in enumerate(positions):
+        slice_image = volume[:, :, index]
+        slice_image.SetMetaData("0008|0060", "CT")
+        slice_image.SetMetaData("0020|000e", "1.2.826.0.1.3680043.2.1125.1")
+        slice_image.SetMetaData("0020|0013", str(index + 1))
+        slice_image.SetMetaData("0020|0032", f"-5.5\\12.25\\{z}")
+        slice_image.SetMetaData("0020|0037", orientation)
+        file_name = (directory / f"slice_{index:03d}.dcm").as_posix()
+        writer.SetFileName(file_name)
+        writer.Execute(slice_image)
+        # GDCM refuses to write non-integer rescale values for integer
+        # pixels, so patch the rescale tags afterwards
+        ds = pydicom.dcmread(file_name)
+        ds.RescaleIntercept = intercept
+        ds.RescaleSlope = slope
+        ds.save_as(file_name)
+        file_names.append(file_name)
+    return file_names
+
+
+def assert_same_image(actual: sitk.Image, expected: sitk.Image) -> None:
+    assert actual.GetPixelID() == expected.GetPixelID()
+    assert actual.GetSize() == expected.GetSize()
+    np.testing.assert_allclose(actual.GetOrigin(), expected.GetOrigin())
+    np.testing.assert_allclose(actual.GetSpacing(), expected.GetSpacing())
+    np.testing.assert_allclose(actual.GetDirection(), expected.GetDirection())
+    np.testing.assert_array_equal(
+        sitk.GetArrayViewFromImage(actual),
+        sitk.GetArrayViewFromImage(expected),
+    )
+
+
+@pytest.mark.parametrize(
+    "positions,orientation",
+    [
+        ([0.0, 2.5, 5.0, 7.5, 10.0], "1\\0\\0\\0\\1\\0"),
+        # non-uniform sampling is averaged over the whole stack by ITK
+        ([0.0, 2.5, 5.5, 8.2], "1\\0\\0\\0\\1\\0"),
+        ([1.0, 3.0, 5.0], "1\\0\\0\\0\\0.8\\-0.6"),
+        ([4.0], "1\\0\\0\\0\\1\\0"),
+    ],
+)
+@pytest.mark.parametrize("n_threads", [1, 3])
+def test_threaded_reader_matches_gdcm(
+    tmp_path: Path,
+    positions: list[float],
+    orientation: str,
+    n_threads: int,
+) -> None:
+    file_names = write_series(tmp_path, positions, orientation)
+    metadata = {"Modality": "CT"}
+
+    expected, _ = read_dicom_series(
+        tmp_path.as_posix(), file_names=file_names, metadata=metadata
+    )
+    actual, _ = read_dicom_series(
+        tmp_path.as_posix(),
+        file_names=file_names,
+        metadata=metadata,
+        read_mode=SeriesReadMode.THREADED,
+        n_threads=n_threads,
+    )
+    assert_same_image(actual, expected)
+
+
+def test_threaded_reader_float_rescale(tmp_path: Path) -> None:
+    file_names = write_series(
+        tmp_path, [0.0, 3.0, 6.0], intercept="0.5", slope="0.25"
+    )
+    expected, _ = read_dicom_series(
+        tmp_path.as_posix(), metadata={"Modality": "CT"}
+    )
+    actual, _ = read_dicom_series(
+        tmp_path.as_posix(),
+        metadata={"Modality": "CT"},
+        read_mode="threaded",
+        n_threads=2,
+    )
+    assert_same_image(actual, expected)
+
+
+def crawled_pixel_data(file_names: list[str]) -> SeriesPixelData:
+    """Pixel data as it would be recorded by the crawler."""
+    infos = {fn: read_instance_pixel_info(fn) for fn in file_names}
+    layout = next(iter(infos.values()))[0]
+    return SeriesPixelData(
+        layout=layout,
+        instances={fn: info for fn, (_, info) in infos.items()},
+    )
+
+
+@pytest.mark.parametrize("record_pixel_data", [False, True])
+def test_crawl_records_pixel_data_on_request(
+    tmp_path: Path, record_pixel_data: bool
+) -> None:
+    series_dir = tmp_path / "CT"
+    series_dir.mkdir()
+    file_names = write_series(series_dir, [1.0, 3.0, 5.0])
+
+    series_meta_raw, _ = parse_all_dicoms(
+        [Path(fn) for fn in file_names],
+        tmp_path,
+        n_jobs=1,
+        record_pixel_data=record_pixel_data,
+    )
+
+    assert has_pixel_data(series_meta_raw) == record_pixel_data
+    pixel_data = SeriesPixelData.from_crawl(
+        next(iter(series_meta_raw.values())).values(), series_dir
+    )
+    if record_pixel_data:
+        assert pixel_data == crawled_pixel_data(file_names)
+    else:
+        assert pixel_data is None
+
+
+@pytest.mark.parametrize(
+    "pixel_type", [sitk.sitkInt16, sitk.sitkUInt16, sitk.sitkUInt8]
+)
+@pytest.mark.parametrize(
+    "intercept,slope",
+    [("-1024", "1"), ("0", "1"), ("0.5", "0.25"), ("-1024", "2")],
+)
+def test_memmap_reader_matches_gdcm(
+    tmp_path: Path,
+    pixel_type: int,
+    intercept: str,
+    slope: str,
+) -> None:
+    file_names = write_series(
+        tmp_path,
+        [1.0, 3.0, 5.0, 7.0],
+        "1\\0\\0\\0\\0.8\\-0.6",
+        pixel_type=pixel_type,
+        intercept=intercept,
+        slope=slope,
+    )
+    expected = read_series_gdcm(file_names)
+
+    assert_same_image(read_series_memmap(file_names), expected)
+    assert_same_image(
+        read_series_memmap(
+            file_names,
+            pixel_data=crawled_pixel_data(file_names),
+            n_threads=2,
+        ),
+        expected,
+    )
+
+
+def test_memmap_reader_masks_unused_bits(tmp_path: Path) -> None:
+    file_names = write_series(tmp_path, [0.0, 2.0, 4.0])
+    for file_name in file_names:
+        ds = pydicom.dcmread(file_name)
+        ds.BitsStored = 12
+        ds.HighBit = 11
+        array = np.frombuffer(ds.PixelData, np.int16).copy()
+        array[:3] |= np.int16(0x7000)
+        ds.PixelData = array.tobytes()
+        ds.save_as(file_name)
+
+    assert_same_image(
+        read_series_memmap(file_names), read_series_gdcm(file_names)
+    )
+
+
+def test_memmap_reader_sorts_with_crawled_positions(tmp_path: Path) -> None:
+    file_names = write_series(tmp_path, [0.0, 2.5, 5.0, 7.5, 10.0])
+    pixel_data = crawled_pixel_data(file_names)
+    shuffled = [file_names[i] for i in (3, 0, 4, 1, 2)]
+
+    assert sort_by_position(shuffled, pixel_data) == file_names
+
+    expected, _ = read_dicom_series(
+        tmp_path.as_posix(), metadata={"Modality": "CT"}
+    )
+    actual, _ = read_dicom_series(
+        tmp_path.as_posix(),
+        file_names=shuffled,
+        metadata={"Modality": "CT"},
+        read_mode=SeriesReadMode.MEMMAP,
+        pixel_data=pixel_data,
+    )
+    assert_same_image(actual, expected)
+
+
+def test_memmap_reader_falls_back_for_compressed(tmp_path: Path) -> None:
+    file_names = write_series(tmp_path, [0.0, 2.0, 4.0])
+    for file_name in file_names:
+        ds = pydicom.dcmread(file_name)
+        ds.compress(pydicom.uid.RLELossless)
+        ds.save_as(file_name)
+
+    pixel_data = crawled_pixel_data(file_names)
+    assert not pixel_data.layout.is_native
+    assert all(info.offset is None for info in pixel_data.instances.values())
+    assert_same_image(
+        read_series_memmap(file_names, pixel_data=pixel_data),
+        read_series_gdcm(file_names),
+    )
+
+
+@pytest.mark.parametrize(
+    "positions,orientation",
+    [
+        ([0.0, 2.5, 5.5, 8.2], "1\\0\\0\\0\\1\\0"),
+        ([1.0, 3.0, 5.0], "1\\0\\0\\0\\0.8\\-0.6"),
+    ],
+)
+def test_series_geometry_matches_reader(
+    tmp_path: Path, positions: list[float], orientation: str
+) -> None:
+    file_names = write_series(tmp_path, positions, orientation)
+    image = read_series_gdcm(file_names)
+
+    geometry = series_geometry(
+        file_names[::-1], crawled_pixel_data(file_names)
+    )
+
+    assert geometry is not None
+    size, origin, spacing, direction = geometry
+    assert size == image.GetSize()
+    np.testing.assert_allclose(origin, image.GetOrigin())
+    np.testing.assert_allclose(spacing, image.GetSpacing())
+    np.testing.assert_allclose(direction, image.GetDirection())
+
+
+@pytest.mark.parametrize("read_mode", list(SeriesReadMode))
+@pytest.mark.parametrize(
+    "box",
+    [
+        ((2, 3, 1), (7, 9, 3)),
+        ((0, 0, 0), (10, 12, 5)),
+        # overflowing boxes are shifted back inside like RegionBox does
+        ((6, 8, 3), (12, 14, 6)),
+    ],
+)
+def test_region_read_matches_crop(
+    tmp_path: Path,
+    read_mode: SeriesReadMode,
+    box: tuple[tuple[int, int, int], tuple[int, int, int]],
+) -> None:
+    file_names = write_series(
+        tmp_path, [1.0, 3.0, 5.5, 7.0, 9.5], "1\\0\\0\\0\\0.8\\-0.6"
+    )
+    full = read_series_gdcm(file_names)
+    pixel_data = crawled_pixel_data(file_names)
+
+    actual, _ = read_dicom_series(
+        tmp_path.as_posix(),
+        metadata={"Modality": "CT"},
+        read_mode=read_mode,
+        pixel_data=pixel_data,
+        file_names=file_names[::-1],
+        region=RegionBox.from_tuple(*box),
+    )
+
+    assert_same_image(actual, RegionBox.from_tuple(*box).crop_image(full))
+
+
+def test_region_read_only_reads_intersecting_slices(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from imgtools.io import slice_readers
+
+    file_names = write_series(tmp_path, [0.0, 2.0, 4.0, 6.0, 8.0])
+    read = []
+    original = slice_readers._read_native_slice
+
+    def _record(file_name, *args, **kwargs):  # noqa: ANN001, ANN202
+        read.append(file_name)
+        return original(file_name, *args, **kwargs)
+
+    monkeypatch.setattr(slice_readers, "_read_native_slice", _record)
+    image = read_series_region(
+        file_names,
+        index=(1, 2, 1),
+        size=(4, 3, 2),
+        read_mode=SeriesReadMode.MEMMAP,
+        pixel_data=crawled_pixel_data(file_names),
+    )
+
+    assert sorted(read) == file_names[1:3]
+    assert image.GetSize() == (4, 3, 2)
+
+
+def test_lazy_series_has_the_loaded_metadata(tmp_path: Path) -> None:
+    series_dir = tmp_path / "data" / "CT"
+    series_dir.mkdir(parents=True)
+    write_series(series_dir, [5.0, 0.0, 2.5])
+    sample_input = SampleInput.build(
+        tmp_path / "data", n_jobs=1, lazy_loading=True
+    )
+    series_uid = "1.2.826.0.1.3680043.2.1125.1"
+
+    [image] = sample_input._read_series(
+        series_uid, "CT", sample_input.crawler.get_folder(series_uid)
+    )
+
+    assert isinstance(image, LazyMedImage)
+    metadata = dict(image.metadata)
+    assert "instances" not in metadata
+    assert metadata["ImagePositionPatient"] == "[-5.5, 12.25, 0]"
+    image.load()
+    assert dict(image.metadata) == metadata
@@ -0,0 +1,98 @@
+import os
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import SimpleITK as sitk
+
+from imgtools.autopipeline import transform_sample
+from imgtools.coretypes import LazyMedImage, Scan
+from imgtools.coretypes.base_masks import Mask
+from imgtools.io.transform_cache import TransformCache
+from imgtools.transforms import Resample, WindowIntensity
+from imgtools.transforms.transformer import Transformer
+
+TRANSFORMS = [Resample(spacing=(1.0, 1.0, 1.5)), WindowIntensity(400, 40)]
+
+
+def test_round_trip(scan: Scan, tmp_path: Path) -> None:
+    cache = TransformCache(tmp_path)
+    key = cache.key("1.2.3", ["4", "5"], TRANSFORMS)
+
+    assert cache.get(key) is None
+    cache.put(key, scan)
+    cached = cache.get(key)
+
+    assert isinstance(cached, Scan)
+    assert cached.metadata == scan.metadata
+    assert cached.GetSpacing() == scan.GetSpacing()
+    assert cached.GetOrigin() == scan.GetOrigin()
+    np.testing.assert_array_equal(
+        sitk.GetArrayViewFromImage(cached), sitk.GetArrayViewFromImage(scan)
+    )
+
+
+def test_key() -> None:
+    key = TransformCache.key("1.2.3", ["4", "5"], TRANSFORMS)
+
+    assert TransformCache.key("1.2.3", ["5", "4"], TRANSFORMS) == key
+    assert TransformCache.key("1.2.3", ["4"], TRANSFORMS) != key
+    assert TransformCache.key("1.2.4", ["4", "5"], TRANSFORMS) != key
+    assert TransformCache.key("1.2.3", ["4", "5"], TRANSFORMS[:1]) != key
+    assert (
+        TransformCache.key(
+            "1.2.3",
+            ["4", "5"],
+            [Resample(spacing=(1.0, 1.0, 1.5)), WindowIntensity(400, 50)],
+        )
+        != key
+    )
+
+
+def test_least_recently_used_entries_are_evicted(
+    scan: Scan, tmp_path: Path
+) -> None:
+    cache = TransformCache(tmp_path)
+    cache.put("first", scan)
+    entry_size = sum(path.stat().st_size for path in tmp_path.iterdir())
+    cache.put("second", scan)
+    for age, key in [(300, "first"), (200, "second")]:
+        for path in tmp_path.glob(f"{key}.*"):
+            os.utime(path, (path.stat().st_atime - age,) * 2)
+
+    # the first entry is used, the second is now the least recently used
+    assert cache.get("first") is not None
+    bounded = TransformCache(tmp_path, max_bytes=int(2.5 * entry_size))
+    bounded.put("third", scan)
+
+    assert bounded.get("second") is None
+    assert bounded.get("first") is not None
+    assert bounded.get("third") is not None
+
+
+def test_cached_reference_is_not_read(scan: Scan, tmp_path: Path) -> None:
+    def fail() -> Scan:
+        raise AssertionError("the reference series was read")
+
+    mask_image = sitk.GetImageFromArray(
+        np.ones(scan.GetSize()[::-1], dtype=np.uint8)
+    )
+    mask_image.CopyInformation(scan)
+    mask = Mask(mask_image, metadata={"Modality": "SEG"})
+    sample_input = SimpleNamespace(
+        crawler=SimpleNamespace(get_instance_uids=lambda uid: ["4", "5"])
+    )
+    transformer = Transformer(TRANSFORMS)
+    cache = TransformCache(tmp_path)
+
+    first = transform_sample([scan, mask], sample_input, transformer, cache)
+    lazy = LazyMedImage(fail, scan.geometry, scan.metadata)
+    second = transform_sample([lazy, mask], sample_input, transformer, cache)
+
+    assert not lazy.is_loaded
+    for expected, cached in zip(first, second, strict=True):
+        assert type(cached) is type(expected)
+        np.testing.assert_array_equal(
+            sitk.GetArrayViewFromImage(cached),
+            sitk.GetArrayViewFromImage(expected),
+        )
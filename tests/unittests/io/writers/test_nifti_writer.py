@@ -7,6 +7,7 @@ import pytest
 import SimpleITK as sitk
 from SimpleITK import Image
 
+from imgtools.coretypes import FingerprintLevel, Mask, MedImage
 from imgtools.io.writers import (
     ExistingFileMode,
     NIFTIWriter,
@@ -258,3 +259,54 @@ def test_save_bad_image(temp_nifti_dir: Path):
 
     with pytest.raises(NiftiWriterValidationError):
         nifti_writer.save(bad_not_sitk_image, **metadata) # type: ignore[arg-type]
+
+
+@pytest.mark.parametrize(
+    "level, present, absent",
+    [
+        ("geometry", ["size", "spacing"], ["min", "hash"]),
+        ("stats", ["size", "min"], ["hash"]),
+        ("full", ["size", "min", "hash"], []),
+    ],
+)
+def test_fingerprint_level_in_index(
+    tmp_path: Path, level: str, present: list[str], absent: list[str]
+):
+    """Only the fingerprint entries of the level end up in the index."""
+    nifti_writer = NIFTIWriter(
+        root_directory=tmp_path,
+        filename_format="{PatientID}.nii.gz",
+        fingerprint_level=FingerprintLevel(level),
+    )
+    image = MedImage(sitk.Image([8, 8, 4], sitk.sitkInt16))
+    image.metadata = {}
+
+    nifti_writer.save(image, PatientID="patient")
+
+    index = pd.read_csv(nifti_writer.index_file)
+    assert all(column in index.columns for column in present)
+    assert not any(column in index.columns for column in absent)
+
+
+@pytest.mark.parametrize("feret_diameter", [False, True])
+def test_feret_diameter_in_index(tmp_path: Path, feret_diameter: bool):
+    """The feret diameter of masks is only in the index when requested."""
+    nifti_writer = NIFTIWriter(
+        root_directory=tmp_path,
+        filename_format="{PatientID}.nii.gz",
+        feret_diameter=feret_diameter,
+    )
+    array = np.zeros((4, 8, 8), dtype=np.uint8)
+    array[1:3, 2:6, 2:5] = 1
+    mask = Mask(sitk.GetImageFromArray(array), metadata={})
+
+    nifti_writer.save(mask, PatientID="patient")
+
+    index = pd.read_csv(nifti_writer.index_file)
+    assert "mask.roundness" in index.columns
+    if feret_diameter:
+        assert index["mask.feret_diameter"].tolist() == [
+            pytest.approx(mask.feret_diameter)
+        ]
+    else:
+        assert "mask.feret_diameter" not in index.columns
@@ -0,0 +1,118 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+import SimpleITK as sitk
+
+from imgtools.coretypes import Scan
+from imgtools.transforms import N4BiasFieldCorrection, intensity_transforms
+from imgtools.transforms.functional import bias_correction
+from imgtools.transforms.transformer import Transformer
+
+
+@pytest.fixture(scope="module")
+def mr() -> sitk.Image:
+    """A cylinder of constant intensity under a smooth bias field."""
+    z, y, x = np.mgrid[:16, :40, :40]
+    inside = (x - 20) ** 2 + (y - 20) ** 2 < 17**2
+    bias = 1 + 0.4 * (x - 20) / 20
+    noise = np.random.default_rng(0).normal(0, 10, inside.shape)
+    image = sitk.GetImageFromArray(
+        (1000 * inside * bias + noise).astype(np.int16)
+    )
+    image.SetSpacing((1.0, 1.0, 2.5))
+    return image
+
+
+def flatness(image: sitk.Image, reference: sitk.Image) -> float:
+    """Coefficient of variation inside the cylinder."""
+    inside = sitk.GetArrayViewFromImage(reference) > 500
+    values = sitk.GetArrayViewFromImage(image)[inside]
+    return float(values.std() / values.mean())
+
+
+def test_shrunk_estimation_corrects_the_bias(mr: sitk.Image) -> None:
+    shrunk = bias_correction(mr, shrink_factor=4)
+
+    assert shrunk.GetPixelID() == sitk.sitkFloat32
+    assert shrunk.GetSize() == mr.GetSize()
+    assert shrunk.GetSpacing() == mr.GetSpacing()
+    assert flatness(shrunk, mr) < 0.5 * flatness(mr, mr)
+
+
+def test_cached_field_skips_the_estimation(
+    mr: sitk.Image, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    n4 = N4BiasFieldCorrection(shrink_factor=4, cache_dir=tmp_path)
+    first = n4(mr, "1.2.3")
+    assert [p.name for p in tmp_path.iterdir()] == [
+        f"1.2.3__n4_shrink4__{sitk.Hash(mr)[:16]}.mha"
+    ]
+
+    def fail(*args: object) -> None:
+        raise AssertionError("the field was estimated again")
+
+    monkeypatch.setattr(intensity_transforms, "estimate_log_bias_field", fail)
+    second = n4(mr, "1.2.3")
+
+    np.testing.assert_allclose(
+        sitk.GetArrayViewFromImage(second),
+        sitk.GetArrayViewFromImage(first),
+        rtol=1e-6,
+    )
+
+
+def test_cached_field_on_another_grid_is_replaced(
+    mr: sitk.Image, tmp_path: Path
+) -> None:
+    n4 = N4BiasFieldCorrection(shrink_factor=4, cache_dir=tmp_path)
+    moved = sitk.Image(mr)
+    moved.SetOrigin((5.0, 0.0, 0.0))
+    n4(moved, "1.2.3")
+
+    corrected = n4(mr, "1.2.3")
+
+    assert corrected.GetOrigin() == mr.GetOrigin()
+    (path,) = tmp_path.iterdir()
+    assert sitk.ReadImage(str(path)).GetOrigin() == mr.GetOrigin()
+
+
+def test_cached_field_follows_the_preceding_transforms(
+    mr: sitk.Image, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    n4 = N4BiasFieldCorrection(shrink_factor=4, cache_dir=tmp_path)
+    n4(mr, "1.2.3")
+    estimated = []
+    original = intensity_transforms.estimate_log_bias_field
+
+    def _record(image: sitk.Image, shrink_factor: int) -> sitk.Image:
+        estimated.append(image)
+        return original(image, shrink_factor)
+
+    monkeypatch.setattr(
+        intensity_transforms, "estimate_log_bias_field", _record
+    )
+    # the same series and grid, clipped before the correction
+    n4(sitk.Clamp(mr, mr.GetPixelID(), 0, 800), "1.2.3")
+
+    assert len(estimated) == 1
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_transformer_caches_by_series_uid(
+    mr: sitk.Image, tmp_path: Path
+) -> None:
+    scan = Scan(mr, metadata={"Modality": "MR", "SeriesInstanceUID": "4.5.6"})
+    transformer = Transformer(
+        [N4BiasFieldCorrection(shrink_factor=4, cache_dir=tmp_path)]
+    )
+
+    (corrected,) = transformer([scan])
+
+    assert isinstance(corrected, Scan)
+    assert len(list(tmp_path.glob("4.5.6__n4_shrink4__*.mha"))) == 1
+
+
+def test_invalid_shrink_factor() -> None:
+    with pytest.raises(ValueError, match="shrink_factor"):
+        N4BiasFieldCorrection(shrink_factor=0)
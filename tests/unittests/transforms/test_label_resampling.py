@@ -0,0 +1,132 @@
+import numpy as np
+import pytest
+import SimpleITK as sitk
+
+from imgtools.coretypes import Scan
+from imgtools.coretypes.base_masks import Mask, ROIMaskMapping, VectorMask
+from imgtools.coretypes.compact_mask import CompactVectorMask, MaskCrop
+from imgtools.coretypes.spatial_types import ImageGeometry
+from imgtools.transforms import InPlaneRotate, Resample, Zoom
+from imgtools.transforms.functional import resample_onto
+from imgtools.transforms.label_resampling import resample_label_image
+from imgtools.transforms.transformer import Transformer
+
+
+@pytest.fixture
+def mask() -> VectorMask:
+    array = np.zeros((14, 24, 20, 3), dtype=np.uint8)
+    array[2:7, 3:11, 4:12, 0] = 1
+    array[6:12, 12:20, 2:6, 1] = 1
+    array[12, 2, 15, 1] = 1
+    # the third ROI is empty
+    image = sitk.GetImageFromArray(array, isVector=True)
+    image.SetOrigin((-10.0, 5.0, 2.5))
+    image.SetSpacing((0.8, 0.9, 2.0))
+    mapping = {
+        i: ROIMaskMapping(f"roi_{i}", [f"roi_{i}"], f"roi_{i}")
+        for i in range(3)
+    }
+    return VectorMask(image, mapping, metadata={"Modality": "RTSTRUCT"})
+
+
+def reference_on(mask: sitk.Image) -> Scan:
+    image = sitk.Image(17, 19, 30, sitk.sitkInt16)
+    image.SetOrigin((-11.0, 4.0, 1.0))
+    image.SetSpacing((1.0, 1.2, 1.0))
+    return Scan(image, metadata={"Modality": "CT"})
+
+
+def compact(mask: VectorMask) -> CompactVectorMask:
+    channels = sitk.GetArrayViewFromImage(mask)
+    crops = [
+        MaskCrop.from_dense(channels[..., i]) for i in range(mask.n_masks)
+    ]
+    mapping = {i - 1: m for i, m in mask.roi_mapping.items() if i > 0}
+    return CompactVectorMask(
+        crops, mapping, mask.metadata, ImageGeometry.from_image(mask)
+    )
+
+
+def nearest(
+    image: sitk.Image,
+    geometry: ImageGeometry,
+    transforms: list[sitk.Transform] | None = None,
+) -> np.ndarray:
+    resampled = resample_onto(
+        image,
+        geometry,
+        transforms or (),
+        interpolation="nearest",
+        anti_alias=False,
+    )
+    return sitk.GetArrayFromImage(resampled)
+
+
+def test_matches_a_full_nearest_neighbour_resample(mask: VectorMask) -> None:
+    geometry = ImageGeometry.from_image(reference_on(mask))
+
+    resampled = resample_label_image(mask, geometry)
+
+    assert resampled.GetPixelID() == sitk.sitkVectorUInt8
+    assert ImageGeometry.from_image(resampled).is_close(geometry)
+    np.testing.assert_array_equal(
+        sitk.GetArrayViewFromImage(resampled), nearest(mask, geometry)
+    )
+
+
+def test_matches_through_coordinate_transforms(mask: VectorMask) -> None:
+    geometry = ImageGeometry.from_image(mask)
+    transforms = [
+        Zoom(0.7).coordinate_transform(geometry),
+        InPlaneRotate(0.4).coordinate_transform(geometry),
+    ]
+
+    resampled = resample_label_image(mask, geometry, transforms)
+
+    np.testing.assert_array_equal(
+        sitk.GetArrayViewFromImage(resampled),
+        nearest(mask, geometry, transforms),
+    )
+
+
+def test_label_image_keeps_its_labels(mask: VectorMask) -> None:
+    labels = mask.to_label_image()
+    geometry = ImageGeometry.from_image(reference_on(mask))
+
+    resampled = resample_label_image(labels, geometry)
+
+    assert resampled.GetPixelID() == labels.GetPixelID()
+    np.testing.assert_array_equal(
+        sitk.GetArrayViewFromImage(resampled), nearest(labels, geometry)
+    )
+
+
+def test_transformer_resamples_masks_as_labels(mask: VectorMask) -> None:
+    reference = reference_on(mask)
+    transformer = Transformer([Resample(spacing=(0, 0, 0))])
+
+    _, new_mask, new_compact = transformer([reference, mask, compact(mask)])
+
+    assert isinstance(new_mask, VectorMask)
+    assert isinstance(new_compact, CompactVectorMask)
+    assert not new_compact.is_loaded
+    assert new_compact.crops[2].is_empty
+    expected = nearest(mask, ImageGeometry.from_image(reference))
+    np.testing.assert_array_equal(
+        sitk.GetArrayViewFromImage(new_mask), expected
+    )
+    np.testing.assert_array_equal(
+        sitk.GetArrayViewFromImage(new_compact.to_vector_mask()), expected
+    )
+
+
+def test_transformer_resamples_a_label_mask(mask: VectorMask) -> None:
+    reference = reference_on(mask)
+    labels = mask.to_label_image()
+
+    _, new_labels = Transformer([Resample(spacing=(0, 0, 0))])(
+        [reference, labels]
+    )
+
+    assert isinstance(new_labels, Mask)
+    assert set(np.unique(sitk.GetArrayViewFromImage(new_labels))) <= {0, 1, 2}
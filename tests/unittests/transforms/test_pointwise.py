@@ -0,0 +1,123 @@
+import numpy as np
+import pytest
+import SimpleITK as sitk
+
+from imgtools.coretypes import Scan
+from imgtools.transforms import (
+    CastIntensity,
+    ClipIntensity,
+    ShiftScaleIntensity,
+    WindowIntensity,
+    pointwise,
+)
+from imgtools.transforms.planner import StepKind
+from imgtools.transforms.pointwise import (
+    Clamp,
+    apply_pointwise,
+    compile_pointwise,
+)
+from imgtools.transforms.transformer import Transformer
+
+CHAINS = [
+    [ClipIntensity(-1000.5, 2000.7), WindowIntensity(400, 40)],
+    [WindowIntensity(400, 40), ClipIntensity(-10, 300)],
+    [ClipIntensity(-500, 500), ShiftScaleIntensity(0.5, 1.5)],
+    [ShiftScaleIntensity(1000.0, 30.0), WindowIntensity(2000, 0)],
+    [
+        CastIntensity("float32"),
+        ShiftScaleIntensity(-40.0, 1 / 400),
+        ClipIntensity(-0.5, 0.5),
+    ],
+    [
+        WindowIntensity(100, 50),
+        CastIntensity("uint8"),
+        ShiftScaleIntensity(scale=3),
+    ],
+]
+
+
+def make_image(pixel_type: int) -> sitk.Image:
+    rng = np.random.default_rng(pixel_type)
+    array = rng.normal(0, 800, (6, 11, 9))
+    image = sitk.GetImageFromArray(array)
+    image.SetSpacing((0.7, 0.8, 2.5))
+    return sitk.Cast(image, pixel_type)
+
+
+def run_sequentially(image: sitk.Image, transforms: list) -> sitk.Image:
+    for transform in transforms:
+        image = transform(image)
+    return image
+
+
+@pytest.mark.parametrize("chain", CHAINS)
+@pytest.mark.parametrize(
+    "pixel_type", [sitk.sitkInt16, sitk.sitkUInt8, sitk.sitkFloat32]
+)
+def test_fused_chain_matches_the_filters(
+    chain: list, pixel_type: int, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    image = make_image(pixel_type)
+    expected = run_sequentially(image, chain)
+    ops = [op for transform in chain for op in transform.pointwise_ops()]
+
+    # several chunks
+    monkeypatch.setattr(pointwise, "CHUNK_VOXELS", 50)
+    fused = apply_pointwise(image, ops)
+
+    assert fused.GetPixelID() == expected.GetPixelID()
+    assert fused.GetSpacing() == expected.GetSpacing()
+    np.testing.assert_allclose(
+        sitk.GetArrayViewFromImage(fused),
+        sitk.GetArrayViewFromImage(expected),
+        rtol=1e-6,
+    )
+
+
+@pytest.mark.parametrize("n_components", [1, 3])
+def test_fused_chain_on_vector_images(n_components: int) -> None:
+    image = sitk.Compose(
+        [make_image(sitk.sitkInt16) for _ in range(n_components)]
+    )
+    chain = [WindowIntensity(400, 40), CastIntensity("float32")]
+
+    expected = run_sequentially(image, chain)
+    fused = apply_pointwise(
+        image, [op for t in chain for op in t.pointwise_ops()]
+    )
+
+    assert fused.GetNumberOfComponentsPerPixel() == n_components
+    assert fused.GetPixelID() == expected.GetPixelID()
+    assert fused.GetSpacing() == expected.GetSpacing()
+    np.testing.assert_array_equal(
+        sitk.GetArrayViewFromImage(fused), sitk.GetArrayViewFromImage(expected)
+    )
+
+
+def test_consecutive_clamps_are_merged() -> None:
+    ops = [Clamp(-1000.5, 2000.7), Clamp(-160, 240), Clamp(0, 1e9)]
+
+    program = compile_pointwise(ops, np.dtype(np.int16))
+
+    assert program == [Clamp(0, 240)]
+
+
+def test_transformer_fuses_pointwise_transforms() -> None:
+    scan = Scan(make_image(sitk.sitkInt16), metadata={"Modality": "CT"})
+    chain = [
+        ClipIntensity(-1000, 1000),
+        WindowIntensity(400, 40),
+        ShiftScaleIntensity(160, 0.5),
+    ]
+    transformer = Transformer(chain)
+
+    (step,) = transformer.plan(scan)
+    (result,) = transformer([scan])
+
+    assert step.kind == StepKind.POINTWISE
+    assert isinstance(result, Scan)
+    expected = run_sequentially(scan, chain)
+    np.testing.assert_array_equal(
+        sitk.GetArrayViewFromImage(result),
+        sitk.GetArrayViewFromImage(expected),
+    )
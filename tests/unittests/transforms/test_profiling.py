@@ -0,0 +1,96 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from imgtools.autopipeline_utils import PipelineResults, save_transform_profile
+from imgtools.coretypes import Scan
+from imgtools.coretypes.base_masks import VectorMask
+from imgtools.transforms import Resample, WindowIntensity
+from imgtools.transforms.profiling import (
+    TransformProfiler,
+    TransformRecord,
+    summarize_records,
+)
+from imgtools.transforms.transformer import Transformer
+
+
+def test_every_step_of_every_image_is_recorded(
+    scan: Scan, mask: VectorMask
+) -> None:
+    transformer = Transformer(
+        [Resample(spacing=(1.6, 1.8, 2.0)), WindowIntensity(400, 40)]
+    )
+    profiler = TransformProfiler()
+
+    transformer([scan, mask], profiler=profiler)
+
+    records = [
+        (r.transform, r.kind, r.image_type, r.modality)
+        for r in profiler.records
+    ]
+    assert records == [
+        ("Resample", "apply", "Scan", "CT"),
+        ("WindowIntensity", "apply", "Scan", "CT"),
+        ("Resample", "reference", "VectorMask", "RTSTRUCT"),
+        ("WindowIntensity", "apply", "VectorMask", "RTSTRUCT"),
+    ]
+    resample = profiler.records[0]
+    assert resample.input_voxels == 16 * 20 * 12
+    assert resample.output_voxels == 8 * 10 * 12
+    assert resample.seconds >= 0
+    assert resample.peak_rss_delta is None or resample.peak_rss_delta >= 0
+
+
+def test_summary_is_per_transform_slowest_first() -> None:
+    def record(transform: str, seconds: float) -> TransformRecord:
+        return TransformRecord(
+            transform=transform,
+            kind="apply",
+            image_type="Scan",
+            modality="MR",
+            seconds=seconds,
+            input_voxels=100,
+            output_voxels=50,
+            peak_rss_delta=None,
+        )
+
+    summary = summarize_records(
+        [record("Resample", 1.0), record("N4", 4.0), record("Resample", 2.0)]
+    )
+
+    assert [row["transform"] for row in summary] == ["N4", "Resample"]
+    resample = summary[1]
+    assert resample["count"] == 2
+    assert resample["total_seconds"] == pytest.approx(3.0)
+    assert resample["max_seconds"] == pytest.approx(2.0)
+    assert resample["output_voxels"] == 100
+    assert resample["voxels_per_second"] == pytest.approx(100 / 3)
+    assert resample["max_peak_rss_delta"] is None
+
+
+def test_pipeline_report_summarizes_all_samples(
+    scan: Scan, tmp_path: Path
+) -> None:
+    transformer = Transformer([Resample(spacing=(1.6, 1.8, 2.0))])
+    results = []
+    for _ in range(2):
+        profiler = TransformProfiler()
+        transformer([scan], profiler=profiler)
+        results.append(SimpleNamespace(transform_profile=profiler.records))
+
+    profile_file = save_transform_profile(
+        PipelineResults(results, [], results), tmp_path / "profile.csv"
+    )
+
+    assert profile_file == tmp_path / "profile.csv"
+    summary = pd.read_csv(profile_file)
+    assert summary["transform"].tolist() == ["Resample"]
+    assert summary["count"].tolist() == [2]
+    assert (
+        save_transform_profile(
+            PipelineResults([], [], []), tmp_path / "empty.csv"
+        )
+        is None
+    )
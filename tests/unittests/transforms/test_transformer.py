@@ -0,0 +1,258 @@
+import numpy as np
+import pytest
+import SimpleITK as sitk
+
+from imgtools.coretypes import MedImage, Scan
+from imgtools.coretypes.base_masks import Mask, VectorMask
+from imgtools.coretypes.spatial_types import ImageGeometry
+from imgtools.transforms import (
+    InPlaneRotate,
+    Resample,
+    Resize,
+    Rotate,
+    WindowIntensity,
+    Zoom,
+)
+from imgtools.transforms.planner import StepKind
+from imgtools.transforms.transformer import Transformer
+
+
+def test_unchanged_grid_is_not_resampled(scan: Scan, mask: VectorMask) -> None:
+    transformer = Transformer([Resample(spacing=(0, 0, 0))])
+
+    assert transformer.plan(scan) == []
+    assert transformer.plan(mask, ref=scan) == []
+
+    new_scan, new_mask = transformer([scan, mask])
+
+    assert isinstance(new_scan, Scan)
+    assert isinstance(new_mask, VectorMask)
+    assert new_mask.roi_mapping == mask.roi_mapping
+    np.testing.assert_array_equal(
+        sitk.GetArrayViewFromImage(new_scan), sitk.GetArrayViewFromImage(scan)
+    )
+    np.testing.assert_array_equal(
+        sitk.GetArrayViewFromImage(new_mask), sitk.GetArrayViewFromImage(mask)
+    )
+
+
+def test_secondary_image_is_resampled_onto_the_reference(
+    scan: Scan, mask: VectorMask
+) -> None:
+    transformer = Transformer(
+        [Resample(spacing=(1.0, 1.0, 1.0)), WindowIntensity(400, 40)]
+    )
+
+    reference = MedImage(Resample(spacing=(1.0, 1.0, 1.0))(scan))
+    plan = transformer.plan(mask, ref=reference)
+    assert [step.kind for step in plan] == [StepKind.REFERENCE, StepKind.APPLY]
+
+    new_scan, new_mask = transformer([scan, mask])
+    assert new_mask.GetSize() == new_scan.GetSize()
+    assert new_mask.GetSpacing() == new_scan.GetSpacing() == (1.0, 1.0, 1.0)
+
+
+def test_consecutive_resamples_are_fused(scan: Scan) -> None:
+    transforms = [Resample(spacing=(1.0, 1.0, 0)), Resize([8, 10, 0])]
+    transformer = Transformer(transforms)
+
+    (step,) = transformer.plan(scan)
+    assert step.kind == StepKind.RESAMPLE
+    assert step.transforms == tuple(transforms)
+
+    expected: sitk.Image = scan
+    for transform in transforms:
+        expected = transform(expected)
+    (fused,) = transformer([scan])
+
+    assert fused.GetSize() == expected.GetSize()
+    np.testing.assert_allclose(fused.GetSpacing(), expected.GetSpacing())
+    assert fused.GetOrigin() == expected.GetOrigin()
+
+
+def test_resamples_with_explicit_sigma_are_not_fused(scan: Scan) -> None:
+    transformer = Transformer(
+        [
+            Resample(spacing=2.0, anti_alias_sigma=0.5),
+            Resample(spacing=3.0),
+        ]
+    )
+
+    plan = transformer.plan(scan)
+
+    assert [step.kind for step in plan] == [StepKind.APPLY, StepKind.APPLY]
+
+
+@pytest.mark.parametrize(
+    "transform",
+    [
+        Resample(spacing=(1.3, 0, 0.7)),
+        Resample(spacing=2.0, output_size=[5, 6, 7]),
+        Resize([7, 0, 30]),
+        Resize(9),
+    ],
+)
+def test_output_geometry_matches_the_transform(
+    scan: Scan, transform: Resample | Resize
+) -> None:
+    predicted = transform.output_geometry(scan.geometry)
+
+    actual = ImageGeometry.from_image(transform(scan))
+
+    assert predicted.is_close(actual)
+
+
+def ramp(scan: Scan) -> Scan:
+    """A linear ramp of the physical coordinates, exact under trilinear
+    interpolation."""
+    z, y, x = np.meshgrid(
+        *(np.arange(n) for n in scan.GetSize()[::-1]), indexing="ij"
+    )
+    spacing = scan.GetSpacing()
+    array = x * spacing[0] + 2 * y * spacing[1] + 3 * z * spacing[2]
+    image = sitk.GetImageFromArray(array.astype(np.float32))
+    image.CopyInformation(scan)
+    return Scan(image, metadata=scan.metadata)
+
+
+def test_spatial_transforms_are_composed_into_one_resample(scan: Scan) -> None:
+    image = ramp(scan)
+    transforms = [
+        Zoom(0.8),
+        InPlaneRotate(0.2),
+        Resample(spacing=(1.0, 1.0, 1.5)),
+    ]
+    transformer = Transformer(transforms)
+
+    (step,) = transformer.plan(image)
+    assert step.kind == StepKind.RESAMPLE
+    assert len(step.coordinate_transforms) == 2
+
+    expected: sitk.Image = image
+    for transform in transforms:
+        expected = transform(expected)
+    (fused,) = transformer([image])
+
+    assert ImageGeometry.from_image(fused).is_close(
+        ImageGeometry.from_image(expected)
+    )
+    # away from the borders the ramp is sampled exactly both ways
+    interior = (slice(3, -3), slice(5, -5), slice(5, -5))
+    np.testing.assert_allclose(
+        sitk.GetArrayViewFromImage(fused)[interior],
+        sitk.GetArrayViewFromImage(expected)[interior],
+        atol=1e-3,
+    )
+
+
+def test_composed_rotations_interpolate_once(scan: Scan) -> None:
+    image = sitk.Cast(scan, sitk.sitkFloat32)
+    centre = [8, 10, 6]
+    transformer = Transformer(
+        [Rotate(centre, [0.0, 0.0, 0.3]), Rotate(centre, [0.0, 0.0, -0.3])]
+    )
+
+    (fused,) = transformer([Scan(image, metadata=scan.metadata)])
+
+    # the rotations cancel out: the voxels are sampled where they are
+    np.testing.assert_allclose(
+        sitk.GetArrayViewFromImage(fused),
+        sitk.GetArrayViewFromImage(image),
+        atol=1e-2,
+    )
+
+
+def sample_on(scan: Scan, n_masks: int) -> list[MedImage]:
+    """A scan, a dose grid and masks saved one by one, off the scan grid."""
+    dose = sitk.GetImageFromArray(
+        np.linspace(0, 70, 6 * 8 * 7, dtype=np.float32).reshape(6, 8, 7)
+    )
+    dose.SetOrigin((-12.0, 3.0, 1.0))
+    dose.SetSpacing((2.5, 2.5, 4.0))
+    masks = []
+    for i in range(n_masks):
+        array = np.zeros((14, 22, 18), dtype=np.uint8)
+        array[i % 10 : i % 10 + 4, 3:12, 2 + i % 8 : 8 + i % 8] = 1
+        mask = sitk.GetImageFromArray(array)
+        mask.SetOrigin((-11.0, 4.5, 1.5))
+        mask.SetSpacing((0.8, 0.9, 2.0))
+        masks.append(Mask(mask, metadata={"Modality": "SEG"}))
+    return [scan, Scan(dose, metadata={"Modality": "RTDOSE"}), *masks]
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_sample_is_planned_once_per_grid(
+    scan: Scan, max_workers: int, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    sample = sample_on(scan, n_masks=6)
+    transformer = Transformer(
+        [Resample(spacing=(1.0, 1.0, 2.5)), WindowIntensity(400, 40)],
+        max_workers=max_workers,
+    )
+    planned = []
+    plan = Transformer.plan
+
+    def counting_plan(
+        self: Transformer, image: sitk.Image, ref: sitk.Image | None = None
+    ) -> list:
+        planned.append(image.GetSize())
+        return plan(self, image, ref)
+
+    monkeypatch.setattr(Transformer, "plan", counting_plan)
+    result = transformer(sample)
+
+    # the scan, then the dose grid and the grid of the masks once each
+    assert sorted(planned) == sorted([scan.GetSize(), (7, 8, 6), (18, 22, 14)])
+    assert [type(image) for image in result] == [type(i) for i in sample]
+    for image, original in zip(result[1:], sample[1:], strict=True):
+        expected = transformer._apply_transforms(original, ref=result[0])
+        assert ImageGeometry.from_image(image).is_close(
+            ImageGeometry.from_image(result[0])
+        )
+        np.testing.assert_array_equal(
+            sitk.GetArrayViewFromImage(image),
+            sitk.GetArrayViewFromImage(expected),
+        )
+
+
+def test_reference_resample_matches_sitk(scan: Scan) -> None:
+    _, dose = sample_on(scan, n_masks=0)
+    transformer = Transformer([Resample(spacing=(1.0, 1.0, 2.5))])
+
+    new_scan, new_dose = transformer([scan, dose])
+    expected = sitk.Resample(dose, new_scan)
+
+    np.testing.assert_array_equal(
+        sitk.GetArrayViewFromImage(new_dose),
+        sitk.GetArrayViewFromImage(expected),
+    )
+
+
+def test_invalid_max_workers() -> None:
+    with pytest.raises(ValueError, match="max_workers"):
+        Transformer([], max_workers=0)
+
+
+def test_fused_zoom_and_rotate_match_the_transforms(scan: Scan) -> None:
+    image = Scan(sitk.Cast(ramp(scan), sitk.sitkInt16), metadata=scan.metadata)
+    transforms = [Zoom(1.3), Rotate([8, 10, 6], [0.0, 0.0, 0.3])]
+    transformer = Transformer(transforms)
+
+    (step,) = transformer.plan(image)
+    assert step.kind == StepKind.RESAMPLE
+
+    expected: sitk.Image = image
+    for transform in transforms:
+        expected = transform(expected)
+    (fused,) = transformer([image])
+    (zoomed,) = Transformer(transforms[:1])([image])
+
+    # the zoom is anti-aliased whether it is fused or not
+    assert zoomed.GetPixelID() == sitk.sitkFloat32
+    assert fused.GetPixelID() == expected.GetPixelID()
+    interior = (slice(3, -3), slice(6, -6), slice(5, -5))
+    np.testing.assert_allclose(
+        sitk.GetArrayViewFromImage(fused)[interior],
+        sitk.GetArrayViewFromImage(expected)[interior],
+        atol=1.0,
+    )
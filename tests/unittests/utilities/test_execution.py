@@ -0,0 +1,77 @@
+import os
+from collections.abc import Iterator
+
+import pytest
+import SimpleITK as sitk
+from joblib import Parallel, delayed
+
+from imgtools.utils.execution import ExecutionResources, run_with_resources
+
+
+@pytest.fixture(autouse=True)
+def restore_threads() -> Iterator[None]:
+    threads = sitk.ProcessObject.GetGlobalDefaultNumberOfThreads()
+    yield
+    sitk.ProcessObject.SetGlobalDefaultNumberOfThreads(threads)
+
+
+@pytest.mark.parametrize(
+    ("n_jobs", "threads_per_job", "expected"),
+    [(4, None, 8), (3, None, 10), (64, None, 1), (4, 2, 2)],
+)
+def test_cores_are_split_between_jobs(
+    n_jobs: int, threads_per_job: int | None, expected: int
+) -> None:
+    resources = ExecutionResources.for_jobs(
+        n_jobs, threads_per_job, cpu_count=32
+    )
+
+    assert resources == ExecutionResources(n_jobs, expected)
+
+
+def test_invalid_resources_are_rejected() -> None:
+    with pytest.raises(ValueError, match="must be positive"):
+        ExecutionResources.for_jobs(2, 0, cpu_count=8)
+
+
+def test_limits_are_restored() -> None:
+    sitk.ProcessObject.SetGlobalDefaultNumberOfThreads(5)
+
+    with ExecutionResources(1, 3).limits():
+        assert sitk.ProcessObject.GetGlobalDefaultNumberOfThreads() == 3
+
+    assert sitk.ProcessObject.GetGlobalDefaultNumberOfThreads() == 5
+
+
+def _worker_threads() -> tuple[int, str | None]:
+    return (
+        sitk.ProcessObject.GetGlobalDefaultNumberOfThreads(),
+        os.environ.get("OMP_NUM_THREADS"),
+    )
+
+
+def test_workers_are_limited() -> None:
+    resources = ExecutionResources(2, 3)
+
+    with resources.parallel_config():
+        results = Parallel(n_jobs=resources.n_jobs)(
+            delayed(run_with_resources)(resources, _worker_threads)
+            for _ in range(2)
+        )
+
+    assert results == [(3, "3"), (3, "3")]
+
+
+def test_sequential_run_leaves_the_caller_unchanged() -> None:
+    sitk.ProcessObject.SetGlobalDefaultNumberOfThreads(5)
+    resources = ExecutionResources(1, 3)
+
+    # with one job, joblib runs the tasks in this process
+    with resources.parallel_config():
+        results = Parallel(n_jobs=resources.n_jobs)(
+            delayed(run_with_resources)(resources, _worker_threads)
+            for _ in range(2)
+        )
+
+    assert [threads for threads, _ in results] == [3, 3]
+    assert sitk.ProcessObject.GetGlobalDefaultNumberOfThreads() == 5
@@ -88,6 +88,56 @@ def test_physical_points_to_idxs(
         assert isinstance(idx, np.ndarray)
 
 
+def pointwise_idxs(
+    image: sitk.Image, points: list[np.ndarray], continuous: bool
+) -> list[np.ndarray]:
+    """Reference conversion, one SimpleITK call per point."""
+    transform = (
+        image.TransformPhysicalPointToContinuousIndex
+        if continuous
+        else image.TransformPhysicalPointToIndex
+    )
+    return [
+        np.array([transform(point.tolist()) for point in slc])[:, ::-1]
+        for slc in points
+    ]
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("continuous", [False, True])
+def test_physical_points_to_idxs_matches_sitk(
+    seed: int, continuous: bool
+) -> None:
+    rng = np.random.default_rng(seed)
+    image = sitk.Image([8, 8, 8], sitk.sitkUInt8)
+    rotation, _ = np.linalg.qr(rng.normal(size=(3, 3)))
+    image.SetDirection(rotation.flatten().tolist())
+    image.SetSpacing(rng.uniform(0.3, 3.0, 3).tolist())
+    image.SetOrigin(rng.uniform(-500, 500, 3).tolist())
+
+    points = [rng.uniform(-600, 600, (n, 3)) for n in (1, 17, 40)]
+    # points exactly halfway between voxels exercise the rounding rule
+    half_idxs = rng.integers(-50, 50, (60, 3)) + 0.5 * rng.integers(
+        0, 2, (60, 3)
+    )
+    points.append(
+        np.array(
+            [
+                image.TransformContinuousIndexToPhysicalPoint(idx.tolist())
+                for idx in half_idxs
+            ]
+        )
+    )
+
+    actual = physical_points_to_idxs(image, points, continuous)
+    expected = pointwise_idxs(image, points, continuous)
+
+    assert len(actual) == len(expected)
+    for act, exp in zip(actual, expected, strict=True):
+        assert act.dtype == exp.dtype
+        np.testing.assert_array_equal(act, exp)
+
+
 @pytest.mark.parametrize(
     "image, idxs, expected_points",
     [